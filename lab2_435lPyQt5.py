@@ -1,13 +1,131 @@
-import json
-import re
+import heapq
+import os
 import sys
+import time
+from collections import OrderedDict
+from functools import cached_property
+from itertools import count, islice
+
+_MODULE_START = time.perf_counter()
+
+from PyQt5.QtCore import Qt, QTimer
 from PyQt5.QtWidgets import (
-    QApplication, QMainWindow, QVBoxLayout, QWidget,
-    QLabel, QLineEdit, QPushButton, QFormLayout, QComboBox, QTableWidget, QTableWidgetItem,QMessageBox
+    QApplication, QMainWindow, QVBoxLayout, QHBoxLayout, QWidget,
+    QLabel, QLineEdit, QPushButton, QFormLayout, QComboBox, QTableWidget, QTableWidgetItem,QMessageBox,
+    QInputDialog, QFileDialog
 )
-import csv
 import sqlite3
 
+from school.audit import AuditLog, parse_when
+from school.db import BUSY_TIMEOUT_MS, Database, is_busy_error
+from school.dedup import DuplicateFinder
+from school.diagnostics import MemoryProfiler
+from school.grades import Gradebook, format_grade, parse_grade
+from school.notify import NOTIFY_TRANSPORT, NotificationDispatcher, Outbox, notification_transport
+from school.reports import SHARD_TRENDS_REPORT, RosterReports, numpy_module
+from school.schedule import Schedule, ScheduleIndex, format_meetings, parse_meetings
+from school.snapshot import Snapshot
+from school.schema import RECORD_SOURCES, create_database
+
+# The school database used when no shard is selected.
+DEFAULT_DB_PATH = 'school_management_system.db'
+# Directory holding one database per campus or term; set SMS_SHARD to work on one of them.
+SHARD_DIR = 'shards'
+CURRENT_SHARD = os.environ.get('SMS_SHARD', '')
+# The database this instance reads and writes, shared by every instance on the same shard.
+DB_PATH = os.path.join(SHARD_DIR, f"{CURRENT_SHARD}.db") if CURRENT_SHARD else DEFAULT_DB_PATH
+# Maximum number of rows a search across all shards shows when every record is shown.
+FEDERATED_LIMIT = 1000
+# Directory of the compressed archive batches written by ColdArchive.
+ARCHIVE_DIR = 'archive'
+# Set SMS_MEMORY_DIAGNOSTICS to trace memory around each user action with MemoryProfiler.
+MEMORY_DIAGNOSTICS = bool(os.environ.get('SMS_MEMORY_DIAGNOSTICS'))
+# Default share of each write path in a LoadTest run.
+LOAD_TEST_MIX = {'add_student': 0.5, 'assign_course': 0.2, 'add_course': 0.1, 'delete_record': 0.2}
+# File LoadTest.save appends run reports to, one JSON object per line.
+LOAD_TEST_RESULTS = 'loadtest_results.jsonl'
+# Rows per page of the SnapshotWindow table.
+SNAPSHOT_PAGE_SIZE = 200
+# Students read into a CourseRosterWindow each time it is scrolled to the end.
+ROSTER_PAGE_SIZE = 100
+
+# Target for cold start to first paint of the main window, in milliseconds.
+STARTUP_BUDGET_MS = 200
+# Number of rows shown in the first paint; the rest of the table is streamed in afterwards.
+INITIAL_PAGE_SIZE = 100
+# Number of rows inserted per event-loop tick while streaming the table.
+TABLE_FILL_CHUNK = 500
+# Changed records above which the records table is reloaded as a whole instead of patched row by row.
+TABLE_PATCH_LIMIT = 500
+# Default number of rows per page of the records table; 0 shows every record.
+DEFAULT_PAGE_SIZE = 100
+# Maximum number of query results kept in the window's QueryCache.
+QUERY_CACHE_SIZE = 256
+# Delay after the last keystroke before the search runs, in milliseconds.
+SEARCH_DELAY_MS = 250
+# How often the window checks the database for changes made by other instances, in milliseconds.
+CHANGE_POLL_MS = 500
+# Number of most recent ChangeLog entries kept for instances that fall behind.
+CHANGE_LOG_RETENTION = 10000
+# Time queued record writes wait for more writes before being flushed, in milliseconds.
+WRITE_BEHIND_DELAY_MS = 200
+# Number of queued writes that triggers a flush without waiting for the timer.
+WRITE_BEHIND_MAX_OPS = 200
+
+_email_pattern = None
+_json = None
+
+
+def email_pattern():
+    """
+    Returns the compiled email regex, compiling it on first use.
+
+    The ``re`` module and the pattern are only loaded when an email is actually
+    validated, keeping them off the startup path.
+
+    Returns:
+        re.Pattern: The compiled email pattern.
+    """
+    global _email_pattern
+    if _email_pattern is None:
+        import re
+        _email_pattern = re.compile(r'^\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
+    return _email_pattern
+
+
+def json_module():
+    """
+    Returns the ``json`` module, importing it on first use.
+
+    Only saving, loading and the archive read or write JSON, so startup does not
+    import it.
+
+    Returns:
+        module: The ``json`` module.
+    """
+    global _json
+    if _json is None:
+        import json
+        _json = json
+    return _json
+
+
+def thread_pool(workers):
+    """
+    Creates a thread pool, importing ``concurrent.futures`` on first use.
+
+    The module pulls in ``logging`` and ``threading``, which the window does not need
+    until a federated query, a bulk load, an integrity scan or a load test runs.
+
+    Args:
+        workers (int): The maximum number of worker threads.
+
+    Returns:
+        concurrent.futures.ThreadPoolExecutor: The new pool.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    return ThreadPoolExecutor(max_workers=workers)
+
 
 # Part1
 class Person:
@@ -58,8 +176,7 @@ class Person:
         Raises:
             ValueError: If the email format is invalid.
         """
-        email_regex = r'^\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-        if not re.match(email_regex, email):
+        if not email_pattern().match(email):
             raise ValueError(f"Invalid email format: {email}")
         return email
 
@@ -81,6 +198,15 @@ class Person:
         return age
 
     # Serialization methods
+    def to_dict(self):
+        """
+        Returns the person's data in the JSON layout written by `save_to_file`.
+
+        Returns:
+            dict: The data to save.
+        """
+        return dict(self.__dict__)
+
     def save_to_file(self, filename):
         """
         Saves the person's data to a file in JSON format.
@@ -92,7 +218,7 @@ class Person:
             None
         """
         with open(filename, 'w') as f:
-            json.dump(self.__dict__, f, indent=4)
+            json_module().dump(self.to_dict(), f, indent=4)
         print(f"Data saved to {filename}")
 
     @classmethod
@@ -114,7 +240,7 @@ class Person:
         """
         try:
             with open(filename, 'r') as f:
-                data = json.load(f)
+                data = json_module().load(f)
         
             name = data.get('name', 'Unknown')
             age = data.get('age', 0)
@@ -127,7 +253,7 @@ class Person:
 
         except FileNotFoundError:
             print(f"File {filename} not found.")
-        except json.JSONDecodeError:
+        except json_module().JSONDecodeError:
             print(f"Error decoding JSON from file {filename}.")
         except KeyError as e:
             print(f"Missing expected key: {e}")
@@ -141,6 +267,7 @@ class Student(Person):
     Attributes:
         student_id (str): The ID of the student.
         registered_courses (list): A list of courses the student is registered in.
+        schedule (Schedule): The meeting times of the registered courses.
     """
     def __init__(self, name, age, email, student_id):
         """
@@ -155,10 +282,12 @@ class Student(Person):
         super().__init__(name, age, email)  # Call Person's __init__
         self.student_id = student_id
         self.registered_courses = []
+        self.schedule = Schedule()
 
     def register_course(self, course):
         """
-        Registers the student for a course if not already registered.
+        Registers the student for a course if not already registered and if it does
+        not clash with the student's schedule.
 
         Args:
             course (Course): The course to register the student in.
@@ -169,31 +298,45 @@ class Student(Person):
         Raises:
             ValueError: If the student is already registered for the course.
         """
-        if course not in self.registered_courses:
-            self.registered_courses.append(course)
-            print("Registered for course")
-        else:
+        if course in self.registered_courses:
             print("Course already registered")
+            return
+        clash = self.schedule.add(course, course.meetings)
+        if clash is not None:
+            print(f"Course clashes with {clash.course_name}")
+            return
+        self.registered_courses.append(course)
+        print("Registered for course")
 
-    def save_to_file(self, filename):
+    def to_dict(self):
         """
-        Saves the student's data to a file in JSON format.
+        Returns the student's data in the JSON layout written by `save_to_file`.
 
-        Args:
-            filename (str): The name of the file to save the data to.
+        Courses are saved by their course ID.
 
         Returns:
-            None
+            dict: The data to save.
         """
-        data = {
+        return {
             "name": self.name,
             "age": self.age,
             "email": self._email,
             "student_id": self.student_id,
             "registered_courses": [course.course_id for course in self.registered_courses]
         }
+
+    def save_to_file(self, filename):
+        """
+        Saves the student's data to a file in JSON format.
+
+        Args:
+            filename (str): The name of the file to save the data to.
+
+        Returns:
+            None
+        """
         with open(filename, 'w') as f:
-            json.dump(data, f, indent=4)
+            json_module().dump(self.to_dict(), f, indent=4)
         print(f"Student data saved to {filename}")
 
 class Instructor(Person):
@@ -204,6 +347,7 @@ class Instructor(Person):
     Attributes:
         instructor_id (str): The ID of the instructor.
         assigned_courses (list): A list of courses the instructor is assigned to teach.
+        schedule (Schedule): The meeting times of the assigned courses.
     """
 
     def __init__(self, name, age, email, instructor_id):
@@ -219,10 +363,12 @@ class Instructor(Person):
         super().__init__(name, age, email)  # Call Person's __init__
         self.instructor_id = instructor_id
         self.assigned_courses = []
+        self.schedule = Schedule()
 
     def assign_course(self, course):
         """
-        Assigns the instructor to a course if not already assigned.
+        Assigns the instructor to a course if not already assigned and if it does not
+        clash with the instructor's schedule.
 
         Args:
             course (Course): The course to assign the instructor to.
@@ -234,31 +380,45 @@ class Instructor(Person):
             ValueError: If the instructor is already assigned to the course.
         """
        
-        if course not in self.assigned_courses:
-            self.assigned_courses.append(course)
-            print(f"Assigned to teach course: {course}")
-        else:
+        if course in self.assigned_courses:
             print(f"Already assigned to teach course: {course}")
+            return
+        clash = self.schedule.add(course, course.meetings)
+        if clash is not None:
+            print(f"Course {course} clashes with {clash.course_name}")
+            return
+        self.assigned_courses.append(course)
+        print(f"Assigned to teach course: {course}")
 
-    def save_to_file(self, filename):
+    def to_dict(self):
         """
-        Saves the instructor's data to a file in JSON format.
+        Returns the instructor's data in the JSON layout written by `save_to_file`.
 
-        Args:
-            filename (str): The name of the file to save the data to.
+        Courses are saved by their course ID.
 
         Returns:
-            None
+            dict: The data to save.
         """
-        data = {
+        return {
             "name": self.name,
             "age": self.age,
             "email": self._email,
             "instructor_id": self.instructor_id,
             "assigned_courses": [course.course_id for course in self.assigned_courses]
         }
+
+    def save_to_file(self, filename):
+        """
+        Saves the instructor's data to a file in JSON format.
+
+        Args:
+            filename (str): The name of the file to save the data to.
+
+        Returns:
+            None
+        """
         with open(filename, 'w') as f:
-            json.dump(data, f, indent=4)
+            json_module().dump(self.to_dict(), f, indent=4)
         print(f"Instructor data saved to {filename}")
 
 class Course:
@@ -270,8 +430,15 @@ class Course:
         course_name (str): The name of the course.
         instructor (Instructor): The instructor teaching the course.
         enrolled_students (list): A list of students enrolled in the course.
+        capacity (int): The maximum number of enrolled students, or None for no limit.
+        meetings (list): The weekly meetings, as ``(start, end)`` minutes since Monday 00:00.
+        waitlist (list): A heap of ``(-priority, time, sequence, student)`` entries for
+            the students waiting for a seat; the highest priority, then the earliest, is first.
     """
-    def __init__(self, course_id, course_name, instructor):
+
+    _waitlist_sequence = count()
+
+    def __init__(self, course_id, course_name, instructor, capacity=None, meetings=''):
         """
         Initializes a new Course instance.
 
@@ -279,18 +446,30 @@ class Course:
             course_id (str): The ID of the course.
             course_name (str): The name of the course.
             instructor (Instructor): The instructor assigned to the course.
+            capacity (int): The maximum number of enrolled students, or None for no limit.
+            meetings (str): The weekly meeting times, such as ``"Mon 09:00-10:30, Wed 09:00-10:30"``.
+
+        Raises:
+            ValueError: If the meeting times are invalid.
         """
         self.course_id = course_id
         self.course_name = course_name
         self.instructor = instructor
         self.enrolled_students = []
+        self.capacity = capacity
+        self.meetings = parse_meetings(meetings)
+        self.waitlist = []
+        self._waiting = set()
 
-    def add_student(self, student):
+    def add_student(self, student, priority=0):
         """
-        Enrolls a student in the course if not already enrolled.
+        Enrolls a student in the course if not already enrolled, or puts them on the
+        waitlist if the course is full. A course that clashes with the student's
+        schedule is refused; an enrolled student's schedule gains its meetings.
 
         Args:
             student (Student): The student to enroll in the course.
+            priority (int): The student's waitlist priority if the course is full; higher goes first.
 
         Returns:
             None
@@ -298,11 +477,125 @@ class Course:
         Raises:
             ValueError: If the student is already enrolled in the course.
         """
-        if student not in self.enrolled_students:
+        clash = student.schedule.conflict(self.meetings, ignore=self)
+        if student in self.enrolled_students:
+            print("Student already enrolled")
+        elif clash is not None:
+            print(f"{self.course_name} clashes with {clash.course_name} for {student.name}")
+        elif self.is_full():
+            self.join_waitlist(student, priority)
+            print(f"{self.course_name} is full; {student.name} is on the waitlist")
+        else:
             self.enrolled_students.append(student)
+            student.schedule.add(self, self.meetings)
             print(f"Student {student.name} enrolled in {self.course_name}")
-        else:
-            print("Student already enrolled")
+
+    def is_full(self):
+        """
+        Returns whether every seat of the course is taken.
+
+        Returns:
+            bool: False for a course without a capacity.
+        """
+        return self.capacity is not None and len(self.enrolled_students) >= self.capacity
+
+    def join_waitlist(self, student, priority=0):
+        """
+        Puts a student on the waitlist, in O(log n).
+
+        Args:
+            student (Student): The student waiting for a seat.
+            priority (int): Higher priorities are promoted first; equal priorities in waiting order.
+        """
+        if student in self._waiting:
+            return
+        self._waiting.add(student)
+        heapq.heappush(self.waitlist, (-priority, time.time(), next(self._waitlist_sequence), student))
+
+    def leave_waitlist(self, student):
+        """
+        Takes a student off the waitlist.
+
+        The heap entry is only dropped when it reaches the top, keeping this O(1).
+
+        Args:
+            student (Student): The waiting student.
+        """
+        self._waiting.discard(student)
+
+    def remove_student(self, student):
+        """
+        Unregisters a student, freeing their schedule, and gives the freed seat to the
+        first student on the waitlist.
+
+        Args:
+            student (Student): The enrolled student.
+
+        Returns:
+            list: The students promoted from the waitlist.
+        """
+        if student in self.enrolled_students:
+            self.enrolled_students.remove(student)
+            student.schedule.remove(self)
+        return self.promote()
+
+    def set_capacity(self, capacity):
+        """
+        Changes the capacity, promoting as many waiting students as there are new seats.
+
+        Args:
+            capacity (int): The new capacity, or None for no limit.
+
+        Returns:
+            list: The students promoted from the waitlist.
+        """
+        self.capacity = capacity
+        return self.promote()
+
+    def promote(self):
+        """
+        Enrolls waiting students, in waitlist order, while there are free seats.
+
+        Each promotion is O(log n). A student whose schedule has gained a clashing
+        course while waiting is taken off the waitlist instead.
+
+        Returns:
+            list: The students promoted.
+        """
+        promoted = []
+        while self.waitlist and not self.is_full():
+            student = heapq.heappop(self.waitlist)[3]
+            if student not in self._waiting:
+                continue
+            self._waiting.discard(student)
+            if student in self.enrolled_students:
+                continue
+            clash = student.schedule.add(self, self.meetings)
+            if clash is not None:
+                print(f"{self.course_name} clashes with {clash.course_name} for {student.name}; "
+                      f"they left the waitlist")
+                continue
+            self.enrolled_students.append(student)
+            promoted.append(student)
+        return promoted
+
+    def to_dict(self):
+        """
+        Returns the course's data in the JSON layout written by `save_to_file`.
+
+        The instructor and the enrolled students are saved by name.
+
+        Returns:
+            dict: The data to save.
+        """
+        return {
+            "course_id": self.course_id,
+            "course_name": self.course_name,
+            "instructor": self.instructor.name if self.instructor else None,
+            "enrolled_students": [student.name for student in self.enrolled_students],
+            "capacity": self.capacity,
+            "meetings": format_meetings(self.meetings)
+        }
 
     def save_to_file(self, filename):
         """
@@ -314,14 +607,8 @@ class Course:
         Returns:
             None
         """
-        data = {
-            "course_id": self.course_id,
-            "course_name": self.course_name,
-            "instructor": self.instructor.name,
-            "enrolled_students": [student.name for student in self.enrolled_students]
-        }
         with open(filename, 'w') as f:
-            json.dump(data, f, indent=4)
+            json_module().dump(self.to_dict(), f, indent=4)
         print(f"Course data saved to {filename}")
 
 class SchoolManagementSystem(QMainWindow):
@@ -349,19 +636,230 @@ class SchoolManagementSystem(QMainWindow):
         self.students = []
         self.instructors = []
         self.courses = []
-        self.create_student_form()
-        self.create_instructor_form()
-        self.create_course_form()
+        self.startup_ms = None
+        self._table_fill_rows = None
+        self.search_query = ''
+        self.search_scope = "Current shard"
+        self.archive = ColdArchive(ARCHIVE_DIR)
+        self.reports_window = None
+        self.duplicates_window = None
+        self.snapshot_windows = []
+        self.roster_windows = []
+        self.sort_column = None
+        self.sort_descending = False
+        self.page_size = DEFAULT_PAGE_SIZE
+        self.query_cache = QueryCache(QUERY_CACHE_SIZE)
+        self.pager = RecordPager(DEFAULT_PAGE_SIZE, self.query_cache)
+        # The database objects are created on first use, and the change feed and the
+        # dispatcher in start_background_work, so none of them delay the first paint.
+        self.change_feed = None
+        self.change_timer = None
+        self.dispatcher = None
+        self._table_items = {}
+        self.student_form = None
+        self.instructor_form = None
+        self.course_form = None
+        self.memory_profiler = None
+        if MEMORY_DIAGNOSTICS:
+            # Before the UI is built, so buttons and timers connect to the tracked methods.
+            self.memory_profiler = MemoryProfiler()
+            self.memory_profiler.instrument(self, {
+                'update_records_table': 'refresh', 'search_records': 'search',
+                'load_data_from_file': 'load', 'open_snapshot': 'load',
+                'export_to_csv': 'export', 'save_snapshot': 'export',
+                'toggle_student_form': 'form open', 'toggle_instructor_form': 'form open',
+                'toggle_course_form': 'form open', 'show_reports': 'window open',
+                'show_duplicates': 'window open',
+            })
+        self.create_form_toggles()
         self.create_records_table()
+        self.create_pagination_controls()
         self.create_search_functionality()
         self.create_edit_delete_buttons()
         self.show()
+        QTimer.singleShot(0, self.start_background_work)
+        QTimer.singleShot(0, self.load_initial_page)
+
+    @cached_property
+    def db(self):
+        """
+        The connections to the school database; they are opened on first use.
+        """
+        return Database(DB_PATH)
+
+    @cached_property
+    def write_queue(self):
+        """
+        The `WriteBehindQueue` of the record writes, created on the first write.
+        """
+        return WriteBehindQueue(self.db)
+
+    @cached_property
+    def write_timer(self):
+        """
+        The timer that flushes `write_queue` ``WRITE_BEHIND_DELAY_MS`` after the last queued write.
+        """
+        timer = QTimer(self)
+        timer.setSingleShot(True)
+        timer.setInterval(WRITE_BEHIND_DELAY_MS)
+        timer.timeout.connect(self.flush_writes)
+        return timer
+
+    @cached_property
+    def audit(self):
+        """
+        The `AuditLog` reader, created on the first audit query or checkpoint.
+        """
+        return AuditLog()
+
+    @cached_property
+    def integrity(self):
+        """
+        The `IntegrityChecker`, created on the first check.
+        """
+        return IntegrityChecker(DB_PATH)
+
+    @cached_property
+    def gradebook(self):
+        """
+        The `Gradebook`; its totals are read on the first grade report.
+        """
+        return Gradebook()
+
+    def start_background_work(self):
+        """
+        Starts following the changes of other instances and sending notifications,
+        once the window has been shown.
+
+        Runs before `load_initial_page`, so the change feed starts at a ChangeLog entry
+        no later than the first page read and no change committed in between is missed.
+        """
+        try:
+            self.change_feed = ChangeFeed(self.db)
+        except sqlite3.Error as e:
+            QMessageBox.warning(self, "Database Error", str(e))
+            return
+        self.change_timer = QTimer(self)
+        self.change_timer.setInterval(CHANGE_POLL_MS)
+        self.change_timer.timeout.connect(self.sync_changes)
+        self.change_timer.start()
+        if NOTIFY_TRANSPORT:
+            self.dispatcher = NotificationDispatcher(DB_PATH, notification_transport(NOTIFY_TRANSPORT))
+            self.dispatcher.start()
+
+    def closeEvent(self, event):
+        """
+        Flushes the queued writes and stops the notification dispatcher before the
+        window closes, and logs the memory report in memory diagnostics mode.
+        """
+        if self.memory_profiler is not None:
+            import logging
+            logging.getLogger(__name__).info("Memory report:\n%s", self.memory_profiler.report())
+        self.flush_writes()
+        if self.dispatcher is not None:
+            self.dispatcher.stop()
+        self.db.close()
+        super().closeEvent(event)
+
+    def paintEvent(self, event):
+        """
+        Records the cold start time the first time the main window is painted.
+
+        The time is measured from module import to first paint and stored in
+        ``startup_ms``. It is logged as a warning when slower than ``STARTUP_BUDGET_MS``
+        and as information otherwise, which is shown when the ``SMS_STARTUP_TRACE``
+        environment variable is set; run ``--startup-check`` to fail on a slow start.
+        """
+        super().paintEvent(event)
+        if self.startup_ms is None:
+            self.startup_ms = (time.perf_counter() - _MODULE_START) * 1000
+            import logging
+            over = self.startup_ms > STARTUP_BUDGET_MS
+            logging.getLogger(__name__).log(
+                logging.WARNING if over else logging.INFO, "Startup to first paint: %.1f ms (%s, target %d ms)",
+                self.startup_ms, 'over budget' if over else 'ok', STARTUP_BUDGET_MS)
+
+    def create_form_toggles(self):
+        """
+        Creates the row of buttons that open the student, instructor and course forms,
+        and the container the forms are placed in once they are built.
+
+        The forms themselves are only built the first time they are needed.
+        """
+        toggle_row = QHBoxLayout()
+        for text, handler in (("Student Form", self.toggle_student_form),
+                              ("Instructor Form", self.toggle_instructor_form),
+                              ("Course Form", self.toggle_course_form)):
+            button = QPushButton(text)
+            button.clicked.connect(handler)
+            toggle_row.addWidget(button)
+        self.layout.addLayout(toggle_row)
+
+        self.forms_layout = QVBoxLayout()
+        self.layout.addLayout(self.forms_layout)
+
+    def toggle_student_form(self):
+        """
+        Shows or hides the student form, building it on first use.
+        """
+        form = self.ensure_student_form()
+        form.setVisible(not form.isVisible())
+
+    def toggle_instructor_form(self):
+        """
+        Shows or hides the instructor form, building it on first use.
+        """
+        form = self.ensure_instructor_form()
+        form.setVisible(not form.isVisible())
+
+    def toggle_course_form(self):
+        """
+        Shows or hides the course form, building it on first use.
+        """
+        form = self.ensure_course_form()
+        form.setVisible(not form.isVisible())
+
+    def ensure_student_form(self):
+        """
+        Returns the student form widget, creating it if it has not been built yet.
+
+        Returns:
+            QWidget: The container holding the student form.
+        """
+        if self.student_form is None:
+            self.student_form = self.create_student_form()
+        return self.student_form
+
+    def ensure_instructor_form(self):
+        """
+        Returns the instructor form widget, creating it if it has not been built yet.
+
+        Returns:
+            QWidget: The container holding the instructor form.
+        """
+        if self.instructor_form is None:
+            self.instructor_form = self.create_instructor_form()
+        return self.instructor_form
+
+    def ensure_course_form(self):
+        """
+        Returns the course form widget, creating it if it has not been built yet.
+
+        Returns:
+            QWidget: The container holding the course form.
+        """
+        if self.course_form is None:
+            self.course_form = self.create_course_form()
+        return self.course_form
 
     def create_student_form(self):
         """
         Creates the form for adding students, with input fields for name, age, email,
         student ID, and a course dropdown for course registration. Adds a button to 
         register the student.
+
+        Returns:
+            QWidget: The hidden container holding the form.
         """
         student_form = QFormLayout()
 
@@ -384,13 +882,20 @@ class SchoolManagementSystem(QMainWindow):
         add_student_button.clicked.connect(self.add_student)
         student_form.addRow(add_student_button)
 
-        self.layout.addLayout(student_form)
+        container = QWidget()
+        container.setLayout(student_form)
+        container.setVisible(False)
+        self.forms_layout.addWidget(container)
+        return container
 
     def create_instructor_form(self):
         """
         Creates the form for adding instructors, with input fields for name, age, email,
         and instructor ID. Adds a dropdown for selecting a course to assign to the instructor
         and a button to assign the course.
+
+        Returns:
+            QWidget: The hidden container holding the form.
         """
         instructor_form = QFormLayout()
         self.instructor_name_input = QLineEdit()
@@ -411,28 +916,42 @@ class SchoolManagementSystem(QMainWindow):
         assign_course_button.clicked.connect(self.assign_course)
         instructor_form.addRow(assign_course_button)
 
-        self.layout.addLayout(instructor_form)
+        container = QWidget()
+        container.setLayout(instructor_form)
+        container.setVisible(False)
+        self.forms_layout.addWidget(container)
+        return container
 
     def create_course_form(self):
         """
         Creates the form for adding courses, with input fields for course ID, course name,
-        and instructor. Adds a button to register the new course.
+        instructor and meeting times. Adds a button to register the new course.
+
+        Returns:
+            QWidget: The hidden container holding the form.
         """
         course_form = QFormLayout()
 
         self.course_id_input = QLineEdit()
         self.course_name_input = QLineEdit()
         self.course_instructor_input = QLineEdit()
+        self.course_meetings_input = QLineEdit()
+        self.course_meetings_input.setPlaceholderText("Mon 09:00-10:30, Wed 09:00-10:30")
 
         course_form.addRow(QLabel("Course ID:"), self.course_id_input)
         course_form.addRow(QLabel("Course Name:"), self.course_name_input)
         course_form.addRow(QLabel("Instructor Name:"), self.course_instructor_input)
+        course_form.addRow(QLabel("Meeting Times:"), self.course_meetings_input)
 
         add_course_button = QPushButton("Add Course")
         add_course_button.clicked.connect(self.add_course)
         course_form.addRow(add_course_button)
 
-        self.layout.addLayout(course_form)
+        container = QWidget()
+        container.setLayout(course_form)
+        container.setVisible(False)
+        self.forms_layout.addWidget(container)
+        return container
 
     def create_records_table(self):
         """
@@ -442,10 +961,132 @@ class SchoolManagementSystem(QMainWindow):
      
         self.records_table = QTableWidget()
         self.records_table.setColumnCount(5)  
-        self.records_table.setHorizontalHeaderLabels(["Type", "Name", "Details", "Email/ID", "Registered Courses"])
+        self.records_table.setHorizontalHeaderLabels(["Type", "Name", "Details", "Email/ID", "Courses/Students"])
+        # Whole rows are selected; Ctrl and Shift select several for Bulk Edit.
+        self.records_table.setSelectionBehavior(QTableWidget.SelectRows)
+        self.records_table.setSelectionMode(QTableWidget.ExtendedSelection)
+        self.records_table.cellDoubleClicked.connect(self.open_course_roster)
+
+        header = self.records_table.horizontalHeader()
+        header.setSectionsClickable(True)
+        header.sectionClicked.connect(self.sort_records)
+        for column in range(self.records_table.columnCount()):
+            if column not in RECORD_SORT_KEYS:
+                self.records_table.horizontalHeaderItem(column).setToolTip("This column cannot be sorted")
 
         self.layout.addWidget(self.records_table)
 
+    def sort_records(self, column):
+        """
+        Sorts the records table by the clicked column.
+
+        Clicking the current sort column again reverses the order. Sorting is done
+        by SQLite through the indexes created in `create_database`, and the active
+        search filter is kept. Columns without an entry in `RECORD_SORT_KEYS` keep the
+        current order.
+
+        Args:
+            column (int): The index of the clicked column.
+        """
+        if column not in RECORD_SORT_KEYS:
+            return
+        if column == self.sort_column:
+            self.sort_descending = not self.sort_descending
+        else:
+            self.sort_column = column
+            self.sort_descending = False
+
+        header = self.records_table.horizontalHeader()
+        header.setSortIndicatorShown(True)
+        header.setSortIndicator(column, Qt.DescendingOrder if self.sort_descending else Qt.AscendingOrder)
+        self.update_records_table()
+
+    def create_pagination_controls(self):
+        """
+        Adds the page size selector, first/previous/next/last buttons, the page
+        indicator and a jump-to-page input below the records table.
+        """
+        pagination_row = QHBoxLayout()
+
+        pagination_row.addWidget(QLabel("Rows per page:"))
+        self.page_size_dropdown = QComboBox()
+        self.page_size_dropdown.addItems(["All"] + [str(size) for size in RecordPager.PAGE_SIZES])
+        self.page_size_dropdown.setCurrentText(str(self.page_size) if self.page_size else "All")
+        self.page_size_dropdown.currentTextChanged.connect(self.change_page_size)
+        pagination_row.addWidget(self.page_size_dropdown)
+
+        for text, action in (("<< First", "first"), ("< Previous", "previous"),
+                             ("Next >", "next"), ("Last >>", "last")):
+            button = QPushButton(text)
+            button.clicked.connect(lambda checked=False, action=action: self.turn_page(action))
+            pagination_row.addWidget(button)
+
+        self.page_label = QLabel()
+        pagination_row.addWidget(self.page_label)
+
+        self.jump_input = QLineEdit()
+        self.jump_input.setPlaceholderText("Page")
+        self.jump_input.setMaximumWidth(60)
+        self.jump_input.returnPressed.connect(self.jump_to_page)
+        pagination_row.addWidget(self.jump_input)
+        jump_button = QPushButton("Go")
+        jump_button.clicked.connect(self.jump_to_page)
+        pagination_row.addWidget(jump_button)
+
+        self.layout.addLayout(pagination_row)
+
+    def change_page_size(self, text):
+        """
+        Switches between paged browsing and showing every record.
+
+        Args:
+            text (str): The selected page size, or "All".
+        """
+        self.page_size = 0 if text == "All" else int(text)
+        self.update_records_table()
+
+    def turn_page(self, action):
+        """
+        Moves to the first, previous, next or last page.
+
+        Args:
+            action (str): One of "first", "previous", "next" or "last".
+        """
+        if not self.page_size or self.search_scope != "Current shard":
+            return
+        try:
+            with self.db.reading() as cursor:
+                getattr(self.pager, action)(cursor)
+        except sqlite3.OperationalError as e:
+            self.statusBar().showMessage(f"Database busy: {e}")
+            return
+        self.show_current_page()
+
+    def jump_to_page(self):
+        """
+        Moves to the page number typed in the jump-to input.
+        """
+        text = self.jump_input.text().strip()
+        if not self.page_size or self.search_scope != "Current shard" or not text.isdigit():
+            return
+        try:
+            with self.db.reading() as cursor:
+                self.pager.jump(cursor, int(text))
+        except sqlite3.OperationalError as e:
+            self.statusBar().showMessage(f"Database busy: {e}")
+            return
+        self.jump_input.clear()
+        self.show_current_page()
+
+    def show_current_page(self):
+        """
+        Replaces the records table contents with the pager's current page.
+        """
+        self.clear_table()
+        self.append_table_rows(self.pager.rows)
+        self.page_label.setText(f"Page {self.pager.page_number} of {self.pager.page_count} "
+                                f"({self.pager.total} records)")
+
     def create_search_functionality(self):
         """
         Adds a search input and button to allow users to search through records
@@ -453,9 +1094,20 @@ class SchoolManagementSystem(QMainWindow):
         """
         search_form = QFormLayout()
 
-        # Search input
+        # Search input; the search also runs shortly after the user stops typing
         self.search_input = QLineEdit()
         search_form.addRow(QLabel("Search (by Name, ID, or Course):"), self.search_input)
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(SEARCH_DELAY_MS)
+        self.search_timer.timeout.connect(self.search_records)
+        self.search_input.textChanged.connect(self.search_timer.start)
+
+        # Scope: the shard this instance works on, or every campus and term shard
+        self.scope_dropdown = QComboBox()
+        self.scope_dropdown.addItems(["Current shard", "All shards", "Archive"])
+        self.scope_dropdown.currentTextChanged.connect(self.change_search_scope)
+        search_form.addRow(QLabel("Search in:"), self.scope_dropdown)
 
         # Search button
         search_button = QPushButton("Search")
@@ -464,6 +1116,70 @@ class SchoolManagementSystem(QMainWindow):
 
         self.layout.addLayout(search_form)
 
+    def change_search_scope(self, text):
+        """
+        Switches between the current shard and the read-only searches across all
+        shards or in the archive.
+
+        Args:
+            text (str): The selected scope, "Current shard", "All shards" or "Archive".
+        """
+        self.search_scope = text
+        self.update_records_table()
+
+    def show_federated_results(self):
+        """
+        Fills the records table with the search results of every shard.
+
+        The shards are searched in parallel through `FederatedQuery`. At most one page
+        of rows, or `FEDERATED_LIMIT` rows when every record is shown, is displayed; the
+        type column names the shard each record comes from.
+        """
+        federated = FederatedQuery(list_shards())
+        limit = self.page_size or FEDERATED_LIMIT
+        try:
+            results = federated.search(self.search_query, self.sort_column, self.sort_descending, limit)
+            total = sum(federated.count(self.search_query).values())
+        except sqlite3.Error as e:
+            QMessageBox.warning(self, "Database Error", str(e))
+            return
+
+        self.show_read_only_rows(results)
+        self.page_label.setText(f"Showing {len(results)} of {total} records "
+                                f"in {len(federated.shards)} shards (read-only)")
+
+    def show_archive_results(self):
+        """
+        Fills the records table with the archived records matching the search query.
+
+        The type column names the archive batch each record comes from; select a row
+        and use "Restore Selected From Archive" to bring it back.
+        """
+        results = self.archive.search(self.search_query)
+        self.show_read_only_rows(results)
+        self.page_label.setText(f"{len(results)} archived records (read-only)")
+
+    def show_read_only_rows(self, results):
+        """
+        Replaces the records table contents with rows from another shard or the archive.
+
+        Args:
+            results (list): Tuples of (source name, raw row). The source is added to the
+                type column and kept as the first cell's data.
+        """
+        self.clear_table()
+        self.records_table.setUpdatesEnabled(False)
+        self.records_table.setRowCount(len(results))
+        for index, (source, row) in enumerate(results):
+            values = format_record_row(row)
+            values = (f"{values[0]} ({source})",) + values[1:]
+            for col, value in enumerate(values):
+                item = QTableWidgetItem(value)
+                if col == 0:
+                    item.setData(Qt.UserRole, source)
+                self.records_table.setItem(index, col, item)
+        self.records_table.setUpdatesEnabled(True)
+
     def create_edit_delete_buttons(self):
         """
         Adds buttons for editing and deleting selected records from the system.
@@ -475,112 +1191,716 @@ class SchoolManagementSystem(QMainWindow):
         edit_button.clicked.connect(self.edit_record)
         edit_delete_form.addRow(edit_button)
 
+        bulk_edit_button = QPushButton("Bulk Edit Selected Records")
+        bulk_edit_button.clicked.connect(self.bulk_edit_records)
+        edit_delete_form.addRow(bulk_edit_button)
+
         # Delete button
         delete_button = QPushButton("Delete Selected Record")
         delete_button.clicked.connect(self.delete_record)
         edit_delete_form.addRow(delete_button)
 
-        self.layout.addLayout(edit_delete_form)
+        # Archive buttons
+        archive_button = QPushButton("Archive Completed Courses")
+        archive_button.clicked.connect(self.archive_courses)
+        edit_delete_form.addRow(archive_button)
 
-    def add_student(self):
-        """
-        Adds a new student to the system by collecting data from the input fields
-        and registering them for a selected course in the database.
+        restore_button = QPushButton("Restore Selected From Archive")
+        restore_button.clicked.connect(self.restore_from_archive)
+        edit_delete_form.addRow(restore_button)
 
-        Raises:
-        -------
-        sqlite3.IntegrityError
-            If there is an error inserting the student or registering the course.
-        """
-        name = self.student_name_input.text()
-        age = int(self.student_age_input.text())
-        email = self.student_email_input.text()
-        student_id = self.student_id_input.text()
-        selected_course = self.course_dropdown.currentText()
+        # Waitlist buttons
+        capacity_button = QPushButton("Set Course Capacity")
+        capacity_button.clicked.connect(self.set_course_capacity)
+        edit_delete_form.addRow(capacity_button)
 
-        
-        conn = sqlite3.connect('school_management_system.db')
-        cursor = conn.cursor()
+        roster_button = QPushButton("Show Course Roster")
+        roster_button.clicked.connect(lambda: self.open_course_roster())
+        edit_delete_form.addRow(roster_button)
+
+        waitlist_button = QPushButton("Show Course Waitlist")
+        waitlist_button.clicked.connect(self.show_waitlist)
+        edit_delete_form.addRow(waitlist_button)
+
+        drop_button = QPushButton("Drop Student From Course")
+        drop_button.clicked.connect(self.drop_student_from_course)
+        edit_delete_form.addRow(drop_button)
+
+        grade_button = QPushButton("Set Grade")
+        grade_button.clicked.connect(self.set_grade)
+        edit_delete_form.addRow(grade_button)
+
+        grades_button = QPushButton("Show Grades")
+        grades_button.clicked.connect(self.show_grades)
+        edit_delete_form.addRow(grades_button)
+
+        notifications_button = QPushButton("Notifications")
+        notifications_button.clicked.connect(self.show_notifications)
+        edit_delete_form.addRow(notifications_button)
+
+        conflicts_button = QPushButton("Find Schedule Conflicts")
+        conflicts_button.clicked.connect(self.show_schedule_conflicts)
+        edit_delete_form.addRow(conflicts_button)
+
+        history_button = QPushButton("Record History")
+        history_button.clicked.connect(self.show_history)
+        edit_delete_form.addRow(history_button)
+
+        save_snapshot_button = QPushButton("Save Snapshot")
+        save_snapshot_button.clicked.connect(lambda: self.save_snapshot())
+        edit_delete_form.addRow(save_snapshot_button)
+
+        open_snapshot_button = QPushButton("Open Snapshot")
+        open_snapshot_button.clicked.connect(lambda: self.open_snapshot())
+        edit_delete_form.addRow(open_snapshot_button)
+
+        self.integrity_button = QPushButton("Check Integrity")
+        self.integrity_button.clicked.connect(self.check_integrity)
+        edit_delete_form.addRow(self.integrity_button)
+
+        if self.memory_profiler is not None:
+            memory_button = QPushButton("Memory Report")
+            memory_button.clicked.connect(self.show_memory_report)
+            edit_delete_form.addRow(memory_button)
+
+        reports_button = QPushButton("Reports")
+        reports_button.clicked.connect(self.show_reports)
+        edit_delete_form.addRow(reports_button)
+
+        duplicates_button = QPushButton("Find Duplicate People")
+        duplicates_button.clicked.connect(self.show_duplicates)
+        edit_delete_form.addRow(duplicates_button)
 
+        self.layout.addLayout(edit_delete_form)
+
+    def archive_courses(self):
+        """
+        Moves completed courses, their registrations and the people only they involve
+        into the archive.
+
+        The course IDs are asked for in a dialog, separated by commas. Queued writes are
+        flushed first so the archive sees them.
+        """
+        text, ok = QInputDialog.getText(self, "Archive Courses", "IDs of the completed courses (comma-separated):")
+        course_ids = [course_id.strip() for course_id in text.split(',') if course_id.strip()]
+        if not ok or not course_ids:
+            return
+        self.flush_writes()
+        try:
+            name = self.archive.archive_courses(self.db, course_ids)
+        except (sqlite3.Error, OSError) as e:
+            QMessageBox.critical(self, "Error", f"Error archiving courses: {e}")
+            return
+        if name is None:
+            QMessageBox.warning(self, "Archive", "None of these courses exist.")
+            return
+        QMessageBox.information(self, "Success", f"Courses archived to {name}.")
+        self.update_records_table()
+
+    def restore_from_archive(self):
+        """
+        Restores the record selected in the archive view.
+
+        Registrations of the record come back once the student and the course are both
+        restored.
+        """
+        selected_row = self.records_table.currentRow()
+        if self.search_scope != "Archive" or selected_row == -1:
+            QMessageBox.warning(self, "Restore Error", "Search in the archive and select a record to restore.")
+            return
+        batch = self.records_table.item(selected_row, 0).data(Qt.UserRole)
+        record_id = self.records_table.item(selected_row, 2).text().split(': ')[-1]
         try:
-            # Insert student into the database
-            cursor.execute('''
-            INSERT INTO Students (name, age, email, student_id) VALUES (?, ?, ?, ?)
-            ''', (name, age, email, student_id))
+            self.archive.restore(self.db, batch, [record_id])
+        except (sqlite3.Error, OSError) as e:
+            QMessageBox.critical(self, "Error", f"Error restoring record: {e}")
+            return
+        QMessageBox.information(self, "Success", f"Record {record_id} restored from {batch}.")
+        self.update_records_table()
+
+    def selected_record(self, record_type):
+        """
+        Returns the ID of the selected record if it is of the given type, warning otherwise.
 
-           
-            course_id = self.get_course_id_from_name(selected_course.split(":")[0].strip())
+        Args:
+            record_type (str): The record type the action needs.
 
-         
-            student_db_id = cursor.lastrowid
-            cursor.execute('''
-            INSERT INTO Registrations (student_id, course_id) VALUES (?, ?)
-            ''', (student_db_id, course_id))
+        Returns:
+            str: The selected record's ID, or None.
+        """
+        selected_row = self.records_table.currentRow()
+        if (selected_row == -1 or self.search_scope != "Current shard"
+                or self.records_table.item(selected_row, 0).text() != record_type):
+            QMessageBox.warning(self, "Selection Error", f"Please select a {record_type.lower()} in the current shard.")
+            return None
+        return self.records_table.item(selected_row, 2).text().split(": ")[-1]
 
-            conn.commit()
+    def set_course_capacity(self):
+        """
+        Sets the capacity of the selected course; 0 removes the limit.
 
-            QMessageBox.information(self, "Success", f"Student {name} registered for {selected_course} successfully.")
+        Raising the capacity promotes waiting students into the new seats in the same
+        transaction as the change, see `create_database`.
+        """
+        course_id = self.selected_record("Course")
+        if course_id is None:
+            return
+        capacity, ok = QInputDialog.getInt(self, "Course Capacity", f"Seats in {course_id} (0 for no limit):", 0, 0)
+        if not ok:
+            return
+        self.write_queue.update("Course", course_id, {'capacity': capacity or None})
+        self.schedule_flush()
 
-        except sqlite3.IntegrityError as e:
-            QMessageBox.critical(self, "Error", f"Error inserting student or registering course: {e}")
-        finally:
-            conn.close()
+    def show_waitlist(self):
+        """
+        Shows the seats of the selected course and its waitlist in promotion order.
+        """
+        course_id = self.selected_record("Course")
+        if course_id is None:
+            return
+        self.flush_writes()
+        with self.db.reading() as cursor:
+            waitlist = fetch_waitlist(cursor, course_id)
+        if waitlist is None:
+            QMessageBox.warning(self, "Waitlist", f"Course {course_id} no longer exists.")
+            return
+        capacity, registered, waiting = waitlist
+        lines = [f"{registered} of {capacity if capacity is not None else 'unlimited'} seats taken."]
+        lines += [f"{position}. {name} ({student_id}), priority {priority}"
+                  for position, (student_id, name, priority) in enumerate(waiting[:50], 1)]
+        if len(waiting) > 50:
+            lines.append(f"... and {len(waiting) - 50} more")
+        QMessageBox.information(self, f"Waitlist of {course_id}", "\n".join(lines))
+
+    def open_course_roster(self, row=None, column=None):
+        """
+        Opens the details and roster of the selected course in a new window.
+
+        Also connected to double-clicks on the records table, where rows other than
+        courses are ignored.
+
+        Args:
+            row (int): The double-clicked row, if any.
+            column (int): The double-clicked column, if any.
+        """
+        if row is not None and self.records_table.item(row, 0).text() != "Course":
+            return
+        course_id = self.selected_record("Course")
+        if course_id is None:
+            return
+        self.flush_writes()
+        window = CourseRosterWindow(self.db, course_id)
+        self.roster_windows = [other for other in self.roster_windows if other.isVisible()] + [window]
+        window.show()
+
+    def drop_student_from_course(self):
+        """
+        Removes the selected student from a course, or from its waitlist.
+
+        The freed seat goes to the first student on the course's waitlist.
+        """
+        student_id = self.selected_record("Student")
+        if student_id is None:
+            return
+        course_id, ok = QInputDialog.getText(self, "Drop Course", "Course ID:")
+        if not ok or not course_id.strip():
+            return
+        with self.db.reading() as cursor:
+            cursor.execute("SELECT id FROM Courses WHERE course_id = ?", (course_id.strip(),))
+            course = cursor.fetchone()
+        if course is None:
+            QMessageBox.warning(self, "Drop Course", f"Course {course_id} does not exist.")
+            return
+        self.write_queue.unregister(student_id, course[0])
+        self.schedule_flush()
+
+    def set_grade(self):
+        """
+        Sets or clears the selected student's grade for one of their courses.
+
+        The student's GPA and the course average are updated by triggers in the same
+        transaction, see `create_database`.
+        """
+        student_id = self.selected_record("Student")
+        if student_id is None:
+            return
+        course_id, ok = QInputDialog.getText(self, "Set Grade", "Course ID:")
+        if not ok or not course_id.strip():
+            return
+        grade, ok = QInputDialog.getText(self, "Set Grade", "Grade (A to F or points from 0 to 4, empty to clear):")
+        if not ok:
+            return
+        try:
+            points = parse_grade(grade)
+        except ValueError as e:
+            QMessageBox.warning(self, "Set Grade", str(e))
+            return
+        # A registration still in the queue has to be written before it can be graded.
+        self.flush_writes()
+        with self.db.reading() as cursor:
+            course = cursor.execute(
+                "SELECT Courses.id, Registrations.id FROM Courses LEFT JOIN Registrations "
+                "ON Registrations.course_id = Courses.id "
+                "AND Registrations.student_id = (SELECT id FROM Students WHERE student_id = ?) "
+                "WHERE Courses.course_id = ?", (student_id, course_id.strip())).fetchone()
+        if course is None:
+            QMessageBox.warning(self, "Set Grade", f"Course {course_id} does not exist.")
+            return
+        if course[1] is None:
+            QMessageBox.warning(self, "Set Grade", f"Student {student_id} is not registered for {course_id}.")
+            return
+        self.write_queue.grade(student_id, course[0], points)
+        self.schedule_flush()
+
+    def show_grades(self):
+        """
+        Shows the grades, GPA and class rank of the selected student, or the average
+        grade of the selected course.
+
+        The figures come from `gradebook`, which is read on first use and then kept up
+        to date by `sync_changes`.
+        """
+        selected_row = self.records_table.currentRow()
+        record_type = "Course" if selected_row != -1 and self.records_table.item(
+            selected_row, 0).text() == "Course" else "Student"
+        record_id = self.selected_record(record_type)
+        if record_id is None:
+            return
+        self.flush_writes()
+        self.sync_changes()
+        table, columns = RECORD_SOURCES[record_type]
+        with self.db.reading() as cursor:
+            if not self.gradebook.loaded:
+                self.gradebook.load(cursor)
+            row = cursor.execute(f"SELECT id FROM {table} WHERE {columns['record_id']} = ?", (record_id,)).fetchone()
+            if row is None:
+                QMessageBox.warning(self, "Grades", f"{record_type} {record_id} no longer exists.")
+                return
+            if record_type == "Course":
+                registered = cursor.execute("SELECT COUNT(*) FROM Registrations WHERE course_id = ?", row).fetchone()[0]
+            else:
+                grades = cursor.execute(
+                    "SELECT Courses.course_id, Courses.course_name, Registrations.grade FROM Registrations "
+                    "JOIN Courses ON Courses.id = Registrations.course_id "
+                    "WHERE Registrations.student_id = ? ORDER BY Courses.course_id", row).fetchall()
+
+        if record_type == "Course":
+            average = self.gradebook.average(row[0])
+            graded = self.gradebook.courses[row[0]][1] if average is not None else 0
+            lines = [f"Average: {f'{average:.2f}' if average is not None else 'no grades yet'}",
+                     f"{graded} of {registered} students graded."]
+        else:
+            gpa = self.gradebook.gpa(row[0])
+            standing = self.gradebook.standing(row[0])
+            lines = [f"GPA: {f'{gpa:.2f}' if gpa is not None else 'no grades yet'}"]
+            if standing is not None:
+                rank, ranked, percentile = standing
+                lines.append(f"Class rank: {rank} of {ranked}, ahead of {percentile:.1f}% of ranked students")
+            lines.append("")
+            lines += [f"{course_id}  {name}: {format_grade(grade) or 'not graded'}" for course_id, name, grade in grades]
+        QMessageBox.information(self, f"Grades of {record_id}", "\n".join(lines))
+
+    def save_snapshot(self, filename=None):
+        """
+        Writes every record of the current shard to a `Snapshot` file.
+
+        Rows are streamed from the database into the file, so the records are never all
+        in memory at once. Queued writes are flushed first so the snapshot includes them.
+
+        Args:
+            filename (str): The snapshot file. If not given, it is asked for in a dialog
+                and the result is confirmed in a message box.
+        """
+        interactive = filename is None
+        if interactive:
+            filename, _ = QFileDialog.getSaveFileName(self, "Save Snapshot", "",
+                                                      "Snapshot Files (*.snap);;All Files (*)")
+            if not filename:
+                return
+        self.flush_writes()
+        headers = [self.records_table.horizontalHeaderItem(col).text() for col in range(self.records_table.columnCount())]
+        try:
+            with self.db.reading() as cursor:
+                count = Snapshot.write(filename, headers, map(format_record_row, iter_record_rows(cursor)))
+        except (sqlite3.Error, OSError) as e:
+            QMessageBox.critical(self, "Error", f"Error saving the snapshot: {e}")
+            return
+        if interactive:
+            QMessageBox.information(self, "Snapshot Saved", f"{count} records saved to {filename}.")
+
+    def show_notifications(self):
+        """
+        Shows how many notifications are waiting, sent and failed, and the throughput
+        and retries of this instance's `NotificationDispatcher`.
+        """
+        self.flush_writes()
+        with self.db.reading() as cursor:
+            counts = Outbox.counts(cursor)
+        lines = [f"{counts['pending']} waiting, {counts['sent']} sent, {counts['failed']} failed.", ""]
+        if self.dispatcher is None:
+            lines.append("This instance does not send notifications; set SMS_NOTIFY_TRANSPORT to "
+                         "smtp://host:port or spool:directory, or run --dispatch-notifications.")
+        else:
+            lines.append(self.dispatcher.report())
+        QMessageBox.information(self, "Notifications", "\n".join(lines))
+
+    def show_memory_report(self):
+        """
+        Shows the memory growth per action tracked so far by `memory_profiler`.
+        """
+        QMessageBox.information(self, "Memory Report", self.memory_profiler.report())
+
+    def open_snapshot(self, filename=None):
+        """
+        Opens a `Snapshot` file read-only in a new window.
+
+        Args:
+            filename (str): The snapshot file; asked for in a dialog if not given.
+        """
+        if filename is None:
+            filename, _ = QFileDialog.getOpenFileName(self, "Open Snapshot", "",
+                                                      "Snapshot Files (*.snap);;All Files (*)")
+            if not filename:
+                return
+        try:
+            window = SnapshotWindow(Snapshot(filename))
+        except (ValueError, OSError) as e:
+            QMessageBox.critical(self, "Error", f"Error opening the snapshot: {e}")
+            return
+        self.snapshot_windows = [other for other in self.snapshot_windows if other.isVisible()] + [window]
+        window.show()
+
+    def show_history(self):
+        """
+        Shows the selected record as it was at a point in time, and for a course, its roster then.
+
+        The state is rebuilt by `AuditLog` from the nearest checkpoint before that time.
+        """
+        selected_row = self.records_table.currentRow()
+        if selected_row == -1 or self.search_scope != "Current shard":
+            QMessageBox.warning(self, "Selection Error", "Please select a record in the current shard.")
+            return
+        record_type = self.records_table.item(selected_row, 0).text()
+        record_id = self.records_table.item(selected_row, 2).text().split(": ")[-1]
+        text, ok = QInputDialog.getText(self, "Record History",
+                                        f"{record_type} {record_id} as of (YYYY-MM-DD or YYYY-MM-DD HH:MM):")
+        if not ok or not text.strip():
+            return
+        self.flush_writes()
+        try:
+            when = parse_when(text)
+            record = self.audit.record_at(self.db.reader, record_type, record_id, when)
+            roster = self.audit.roster_at(self.db.reader, record_id, when) if record_type == "Course" else None
+        except (ValueError, sqlite3.Error) as e:
+            QMessageBox.warning(self, "Record History", str(e))
+            return
+        if record is None:
+            QMessageBox.information(self, "Record History", f"{record_type} {record_id} did not exist on {text.strip()}.")
+            return
+        lines = [f"{column}: {value}" for column, value in record.items()]
+        if roster is not None:
+            lines.append(f"Enrolled: {len(roster)}")
+            lines += [f"  {name} ({student_id})" for student_id, name in roster[:50]]
+            if len(roster) > 50:
+                lines.append(f"  ... and {len(roster) - 50} more")
+        QMessageBox.information(self, f"{record_type} {record_id} on {text.strip()}", "\n".join(lines))
+
+    def check_integrity(self):
+        """
+        Lists the rows that refer to a missing student, instructor or course, and offers to repair them.
+
+        The first check scans the whole database; after that `flush_writes` keeps the list
+        up to date by checking only the rows each flush changed.
+        """
+        self.flush_writes()
+        try:
+            self.integrity.check(self.db.reader)
+        except sqlite3.Error as e:
+            QMessageBox.warning(self, "Check Integrity", f"Could not check the database: {e}")
+            return
+        self.update_integrity_button()
+        orphans = sorted(self.integrity.orphans.items())
+        if not orphans:
+            QMessageBox.information(self, "Check Integrity", "No rows refer to missing records.")
+            return
+        lines = [f"{table} row {row_id}: {column} {missing_id} does not exist"
+                 for (table, row_id, column), missing_id in orphans[:50]]
+        if len(orphans) > 50:
+            lines.append(f"... and {len(orphans) - 50} more")
+        lines.append("\nDelete the orphaned registrations and waitlist entries, and unassign the courses?")
+        if QMessageBox.question(self, "Check Integrity", "\n".join(lines)) != QMessageBox.Yes:
+            return
+        try:
+            repaired = self.db.write(self.integrity.repair)
+            self.integrity.check(self.db.reader)
+        except sqlite3.Error as e:
+            QMessageBox.critical(self, "Check Integrity", f"Could not repair the database: {e}")
+            return
+        self.update_integrity_button()
+        self.sync_changes()
+        QMessageBox.information(self, "Check Integrity", f"{repaired} rows repaired.")
+
+    def update_integrity_button(self):
+        """
+        Shows the number of known orphaned rows on the Check Integrity button.
+        """
+        count = len(self.integrity.orphans)
+        self.integrity_button.setText(f"Check Integrity ({count} orphaned rows)" if count else "Check Integrity")
+
+    def show_schedule_conflicts(self):
+        """
+        Lists the students and instructors with overlapping courses.
+
+        Registrations and assignments are checked as they are written, but waitlist
+        promotions and edited meeting times are not, so this report finds the rest.
+        """
+        self.flush_writes()
+        with self.db.reading() as cursor:
+            conflicts = find_schedule_conflicts(cursor)
+        if not conflicts:
+            QMessageBox.information(self, "Schedule Conflicts", "No schedule conflicts found.")
+            return
+        lines = [f"{record_type} {name} ({person_id}): {first} and {second} overlap on {overlap}"
+                 for record_type, person_id, name, first, second, overlap in conflicts[:50]]
+        if len(conflicts) > 50:
+            lines.append(f"... and {len(conflicts) - 50} more")
+        QMessageBox.information(self, "Schedule Conflicts", "\n".join(lines))
+
+    def show_reports(self):
+        """
+        Opens the Reports window, or refreshes and raises it if it is already open.
+
+        Queued writes are flushed first so the reports include them.
+        """
+        self.flush_writes()
+        if self.reports_window is None:
+            self.reports_window = ReportsWindow(self.db)
+        else:
+            self.reports_window.refresh()
+        self.reports_window.show()
+        self.reports_window.raise_()
+
+    def show_duplicates(self):
+        """
+        Opens the window of duplicate people, or searches again if it is already open.
+
+        Queued writes are flushed first so every person is checked.
+        """
+        self.flush_writes()
+        if self.duplicates_window is None:
+            self.duplicates_window = DuplicatesWindow(self.db)
+        else:
+            self.duplicates_window.refresh()
+        self.duplicates_window.show()
+        self.duplicates_window.raise_()
+
+    def add_student(self):
+        """
+        Adds a new student to the system by collecting data from the input fields
+        and registering them for a selected course in the database.
+
+        The writes go through `write_queue`, which is flushed straight away so the
+        message reports what was actually saved: a full course puts the student on
+        its waitlist, and errors such as a duplicate ID or email keep the inputs.
+        """
+        name = self.student_name_input.text()
+        age = int(self.student_age_input.text())
+        email = self.student_email_input.text()
+        student_id = self.student_id_input.text()
+        selected_course = self.course_dropdown.currentText()
+
+
+        # Queue the student and the registration; both are written by the next flush
+        self.write_queue.insert('Student', {'name': name, 'age': age, 'email': email, 'student_id': student_id})
+        course_id = self.get_course_id_from_name(selected_course.split(":")[0].strip())
+        if course_id is not None:
+            self.write_queue.register(student_id, course_id)
+        failures = self.flush_writes()
+        if failures is None:
+            QMessageBox.information(self, "Queued", f"Student {name} will be saved once the database is free.")
+        elif failures:
+            return
+        elif course_id is None:
+            QMessageBox.information(self, "Success", f"Student {name} added successfully.")
+        elif self.registration_status(student_id, course_id) == 'waitlisted':
+            QMessageBox.information(self, "Waitlisted",
+                                    f"Student {name} added; {selected_course} is full, so they are on its waitlist.")
+        else:
+            QMessageBox.information(self, "Success", f"Student {name} registered for {selected_course} successfully.")
 
         self.student_name_input.clear()
         self.student_age_input.clear()
         self.student_email_input.clear()
         self.student_id_input.clear()
-        self.update_records_table()
-        
+
+    def registration_status(self, student_id, course_db_id):
+        """
+        Reads whether a student holds a seat in a course or is waiting for one.
+
+        Args:
+            student_id (str): The student's ID.
+            course_db_id (int): The course's database ID.
+
+        Returns:
+            str: ``registered``, ``waitlisted``, or None if neither.
+        """
+        with self.db.reading() as cursor:
+            cursor.execute("""
+                SELECT 'registered' FROM Registrations JOIN Students ON Students.id = Registrations.student_id
+                WHERE Students.student_id = ? AND Registrations.course_id = ?
+                UNION ALL
+                SELECT 'waitlisted' FROM Waitlist JOIN Students ON Students.id = Waitlist.student_id
+                WHERE Students.student_id = ? AND Waitlist.course_id = ?""",
+                           (student_id, course_db_id, student_id, course_db_id))
+            row = cursor.fetchone()
+        return row[0] if row else None
+
     def get_course_id_from_name(self, course_name):
-        conn = sqlite3.connect('school_management_system.db')
-        cursor = conn.cursor()
-        cursor.execute('SELECT id FROM Courses WHERE course_name = ?', (course_name,))
-        result = cursor.fetchone()
-        conn.close()
-        if result:
-            return result[0]
-        else:
+        """
+        Looks up the database ID of a course by its name.
+
+        Lookups, including misses, are cached in `query_cache` until a course with
+        that name is added, edited or deleted.
+
+        Args:
+            course_name (str): The course name.
+
+        Returns:
+            int: The course's database ID, or None if no course has that name.
+        """
+        def load():
+            with self.db.reading() as cursor:
+                cursor.execute('SELECT id FROM Courses WHERE course_name = ?', (course_name,))
+                result = cursor.fetchone()
+            if result:
+                return result[0]
+            else:
+                return None
+        return self.query_cache.get(('course_id', course_name), load, ('course_name', course_name))
+
+    def get_record_details(self, record_type, record_id):
+        """
+        Returns the stored fields of a student, instructor or course, through `query_cache`.
+
+        Args:
+            record_type (str): One of ``Student``, ``Instructor`` or ``Course``.
+            record_id (str): The ID shown in the records table.
+
+        Returns:
+            dict: The record's columns by name, or None if it does not exist.
+        """
+        def load():
+            with self.db.reading() as cursor:
+                return fetch_record_details(cursor, record_type, record_id)
+        return self.query_cache.get(('details', record_type, record_id), load, ('record', record_type, record_id))
+
+    def cache_stats(self):
+        """
+        Returns the hit/miss statistics of the query cache.
+
+        Returns:
+            dict: See `QueryCache.stats`.
+        """
+        return self.query_cache.stats()
+
+    def db_stats(self):
+        """
+        Returns the contention statistics of the database connections.
+
+        Returns:
+            dict: See `Database.stats`.
+        """
+        return self.db.stats()
+
+    def show_cache_stats(self):
+        """
+        Shows the query cache and database contention statistics in the status bar.
+        """
+        stats = self.cache_stats()
+        db = self.db_stats()
+        self.statusBar().showMessage(
+            f"Query cache: {stats['hits']} hits, {stats['misses']} misses "
+            f"({stats['hit_rate']:.0%}), {stats['size']} entries | "
+            f"Writes: {db['writes']}, {db['retries']} retries, p95 {db['write_p95_ms']:.0f} ms")
+
+    def schedule_flush(self):
+        """
+        Starts the flush timer for newly queued writes, or flushes straight away
+        once `WRITE_BEHIND_MAX_OPS` writes are waiting.
+        """
+        if len(self.write_queue) >= WRITE_BEHIND_MAX_OPS:
+            self.flush_writes()
+        elif not self.write_timer.isActive():
+            self.write_timer.start()
+
+    def flush_writes(self):
+        """
+        Writes the queued changes in one transaction and updates the table once.
+
+        The table and the query cache are then brought up to date through
+        `sync_changes`, which only re-reads the records the flush touched. Writes the
+        database rejects are reported together; the others are kept. The audit log
+        gets a new checkpoint once enough changes have been logged.
+
+        Returns:
+            list: The rejected writes, as returned by `WriteBehindQueue.flush`, or None
+            if the database was busy and the writes are still queued.
+        """
+        self.write_timer.stop()
+        if not len(self.write_queue):
+            return []
+        try:
+            failures = self.write_queue.flush()
+        except sqlite3.Error as e:
+            # The database is busy or locked; the writes stay queued for the next attempt.
+            QMessageBox.warning(self, "Database Error", f"Could not save changes yet: {e}")
+            self.write_timer.start()
             return None
-        
+        if failures:
+            QMessageBox.critical(self, "Error", "Some changes could not be saved:\n" + "\n".join(
+                f"{action} {record_type} {record_id}: {error}" for action, record_type, record_id, error in failures))
+        try:
+            self.db.write(self.audit.maybe_checkpoint)
+        except sqlite3.Error:
+            pass  # The next flush tries again.
+        # Once the database has been scanned, each flush only checks the rows it changed.
+        if self.integrity.last_seq is not None:
+            try:
+                self.integrity.check(self.db.reader)
+            except sqlite3.Error:
+                pass  # The next flush checks the same entries.
+            self.update_integrity_button()
+        self.sync_changes()
+        return failures
+
     def assign_course(self):
         """
         Assigns an instructor to a course by collecting data from the input fields
         and updating the course in the database with the assigned instructor.
 
-        Raises:
-        -------
-        sqlite3.IntegrityError
-            If there is an error assigning the course.
+        The writes go through `write_queue`, which is flushed straight away so the
+        message reports what was actually saved; errors such as a duplicate ID or
+        email keep the inputs.
         """
         name = self.instructor_name_input.text()
         age = int(self.instructor_age_input.text())
         email = self.instructor_email_input.text()
         instructor_id = self.instructor_id_input.text()
         selected_course = self.instructor_course_dropdown.currentText()
-        conn = sqlite3.connect('school_management_system.db')
-        cursor = conn.cursor()
-
-        try:
-            cursor.execute('''
-            INSERT INTO Instructors (name, age, email, instructor_id) VALUES (?, ?, ?, ?)
-            ''', (name, age, email, instructor_id))
 
-            course_id = self.get_course_id_from_name(selected_course.split(":")[0].strip())
-
-            instructor_db_id = cursor.lastrowid
-
-            cursor.execute('''
-            UPDATE Courses SET instructor_id = ? WHERE id = ?
-            ''', (instructor_db_id, course_id))
-
-            conn.commit()
+        self.write_queue.insert('Instructor', {'name': name, 'age': age, 'email': email, 'instructor_id': instructor_id})
+        course_id = self.get_course_id_from_name(selected_course.split(":")[0].strip())
+        if course_id is not None:
+            self.write_queue.assign(course_id, instructor_id)
+        failures = self.flush_writes()
+        if failures is None:
+            QMessageBox.information(self, "Queued", f"Instructor {name} will be saved once the database is free.")
+        elif failures:
+            return
+        elif course_id is None:
+            QMessageBox.information(self, "Success", f"Instructor {name} added successfully.")
+        else:
             QMessageBox.information(self, "Success", f"Instructor {name} assigned to {selected_course} successfully.")
-
-        except sqlite3.IntegrityError as e:
-            QMessageBox.critical(self, "Error", f"Error assigning course: {e}")
-        finally:
-            conn.close()
         self.instructor_name_input.clear()
         self.instructor_age_input.clear()
         self.instructor_email_input.clear()
@@ -592,144 +1912,301 @@ class SchoolManagementSystem(QMainWindow):
         Adds a new course to the system by collecting data from the input fields
         and inserting the course into the database.
 
-        Raises:
-        -------
-        sqlite3.IntegrityError
-            If there is an error adding the course.
+        The write goes through `write_queue`, which is flushed straight away so the
+        message reports what was actually saved; errors such as a duplicate course ID
+        keep the inputs. Invalid meeting times are reported right away and nothing is
+        queued.
         """
         course_id = self.course_id_input.text()
         course_name = self.course_name_input.text()
         instructor_id = self.course_instructor_input.text()  # Use instructor_id
-
-        conn = sqlite3.connect('school_management_system.db')
-        cursor = conn.cursor()
-
         try:
-            cursor.execute('''
-                INSERT INTO Courses (course_id, course_name, instructor_id)
-                VALUES (?, ?, ?)
-            ''', (course_id, course_name, instructor_id)) 
-            conn.commit()
+            meetings = format_meetings(parse_meetings(self.course_meetings_input.text()))
+        except ValueError as e:
+            QMessageBox.warning(self, 'Error', str(e))
+            return
 
+        self.write_queue.insert('Course', {'course_id': course_id, 'course_name': course_name,
+                                           'instructor_id': instructor_id, 'meetings': meetings})
+        failures = self.flush_writes()
+        if failures is None:
+            QMessageBox.information(self, 'Queued', 'The course will be saved once the database is free.')
+        elif failures:
+            return
+        else:
             QMessageBox.information(self, 'Success', 'Course added successfully!')
 
-            self.update_records_table()
-
-        except sqlite3.IntegrityError as e:
-            QMessageBox.critical(self, "Error", f"Error adding course: {e}")
-        finally:
-            conn.close()
-
         # Clear the input fields so they are ready for the next entry
         self.course_id_input.clear()
         self.course_name_input.clear()
         self.course_instructor_input.clear()
+        self.course_meetings_input.clear()
 
     def update_records_table(self):
         """
         Updates the records table by fetching the latest student, instructor,
         and course data from the database and displaying it in the table.
+
+        In paged mode only the current page is re-read. It stays on the same page
+        unless the search query, sort order or page size changed, in which case it
+        goes back to the first page. If the database stays busy, the table is left as
+        it is and the error is shown in the status bar.
+
+        When searching all shards or the archive, the table shows
+        `show_federated_results` or `show_archive_results` instead.
         """
-   
-        self.records_table.setRowCount(0)
+        if self.search_scope == "All shards":
+            self.show_federated_results()
+            return
+        if self.search_scope == "Archive":
+            self.show_archive_results()
+            return
+        try:
+            with self.db.reading() as cursor:
+                # Everything is re-read below, so pending changes only need to reach the cache.
+                if self.apply_pending_changes(cursor) is None:
+                    self.query_cache.clear()
+                if self.page_size:
+                    settings = (self.search_query, self.sort_column, self.sort_descending, self.page_size)
+                    if settings != (self.pager.query, self.pager.sort_column, self.pager.descending, self.pager.page_size):
+                        self.pager.configure(cursor, *settings)
+                    else:
+                        self.pager.reload(cursor)
+                else:
+                    rows = self.query_cache.get(
+                        ('records', 'all', self.search_query, self.sort_column, self.sort_descending),
+                        lambda: list(iter_record_rows(cursor, self.search_query, self.sort_column, self.sort_descending)),
+                        ('search', self.search_query))
+        except sqlite3.OperationalError as e:
+            self.statusBar().showMessage(f"Database busy: {e}")
+            return
 
-        conn = sqlite3.connect('school_management_system.db')
-        cursor = conn.cursor()
+        self.show_cache_stats()
+        if self.page_size:
+            self.show_current_page()
+            return
+        self.clear_table()
+        self.append_table_rows(rows)
+        self.page_label.setText(f"{len(rows)} records")
 
-        cursor.execute('SELECT name, student_id, email FROM Students')
-        students = cursor.fetchall()
-        for student in students:
-            row_position = self.records_table.rowCount()
-            self.records_table.insertRow(row_position)
-            self.records_table.setItem(row_position, 0, QTableWidgetItem('Student'))
-            self.records_table.setItem(row_position, 1, QTableWidgetItem(student[0]))  # name
-            self.records_table.setItem(row_position, 2, QTableWidgetItem(f'ID: {student[1]}'))  # student ID
-            self.records_table.setItem(row_position, 3, QTableWidgetItem(student[2]))  # email
-            self.records_table.setItem(row_position, 4, QTableWidgetItem(''))  # empty for course
+    def load_initial_page(self):
+        """
+        Fills the records table after the window has been shown.
 
-        cursor.execute('SELECT name, instructor_id, email FROM Instructors')
-        instructors = cursor.fetchall()
-        for instructor in instructors:
-            row_position = self.records_table.rowCount()
-            self.records_table.insertRow(row_position)
-            self.records_table.setItem(row_position, 0, QTableWidgetItem('Instructor'))
-            self.records_table.setItem(row_position, 1, QTableWidgetItem(instructor[0]))  # name
-            self.records_table.setItem(row_position, 2, QTableWidgetItem(f'ID: {instructor[1]}'))  # instructor ID
-            self.records_table.setItem(row_position, 3, QTableWidgetItem(instructor[2]))  # email
-            self.records_table.setItem(row_position, 4, QTableWidgetItem(''))  # empty for course
+        In paged mode this loads the first page. When every record is shown, the first
+        ``INITIAL_PAGE_SIZE`` rows are inserted straight away and the remaining rows are
+        streamed in ``TABLE_FILL_CHUNK`` rows per event-loop tick, so the window stays
+        responsive while a large table is loading.
+        """
+        if self.page_size:
+            try:
+                self.update_records_table()
+            except sqlite3.Error as e:
+                QMessageBox.warning(self, "Database Error", str(e))
+            return
 
-        cursor.execute('SELECT course_name, course_id FROM Courses')
-        courses = cursor.fetchall()
-        for course in courses:
-            row_position = self.records_table.rowCount()
-            self.records_table.insertRow(row_position)
-            self.records_table.setItem(row_position, 0, QTableWidgetItem('Course'))
-            self.records_table.setItem(row_position, 1, QTableWidgetItem(course[0]))  # course name
-            self.records_table.setItem(row_position, 2, QTableWidgetItem(f'ID: {course[1]}'))  # course ID
-            self.records_table.setItem(row_position, 3, QTableWidgetItem(''))  # empty for instructor
-            self.records_table.setItem(row_position, 4, QTableWidgetItem(''))  # empty for student registrations
+        try:
+            with self.db.reading() as cursor:
+                rows = list(iter_record_rows(cursor, self.search_query, self.sort_column, self.sort_descending))
+        except sqlite3.Error as e:
+            QMessageBox.warning(self, "Database Error", str(e))
+            return
 
-        # Close the connection
-        conn.close()
+        self.clear_table()
+        self.append_table_rows(rows[:INITIAL_PAGE_SIZE])
+        self.page_label.setText(f"{len(rows)} records")
+        self._table_fill_rows = iter(rows[INITIAL_PAGE_SIZE:])
+        QTimer.singleShot(0, self._fill_next_chunk)
+
+    def _fill_next_chunk(self):
+        """
+        Appends the next chunk of streamed rows and reschedules itself until done.
+
+        Streaming stops early if the table has been refreshed in the meantime.
+        """
+        if self._table_fill_rows is None:
+            return
+        chunk = list(islice(self._table_fill_rows, TABLE_FILL_CHUNK))
+        if not chunk:
+            self._table_fill_rows = None
+            return
+        self.append_table_rows(chunk)
+        QTimer.singleShot(0, self._fill_next_chunk)
+
+    def clear_table(self):
+        """
+        Empties the records table and stops any streaming still in progress.
+        """
+        self._table_fill_rows = None
+        self._table_items = {}
+        self.records_table.setRowCount(0)
+
+    def append_table_rows(self, rows):
+        """
+        Appends rows to the records table in one batch.
+
+        Args:
+            rows (list): Raw rows from `iter_record_rows`.
+        """
+        self.records_table.setUpdatesEnabled(False)
+        start = self.records_table.rowCount()
+        self.records_table.setRowCount(start + len(rows))
+        for offset, row in enumerate(rows):
+            self.set_table_row(start + offset, row)
+        self.records_table.setUpdatesEnabled(True)
+
+    def set_table_row(self, index, row):
+        """
+        Fills one row of the records table from a raw row.
+
+        The first cell remembers the row's sort key, and `_table_items` maps the
+        record to that cell, so `patch_table_rows` can find and place records later.
+
+        Args:
+            index (int): The table row to fill.
+            row (tuple): A raw row from `iter_record_rows`.
+        """
+        for col, value in enumerate(format_record_row(row)):
+            item = QTableWidgetItem(value)
+            if col == 0:
+                item.setData(Qt.UserRole, record_sort_key(row, self.sort_column))
+                self._table_items[(row[0], row[5])] = item
+            self.records_table.setItem(index, col, item)
+
+    def sync_changes(self):
+        """
+        Brings the records table up to date with changes committed by other instances.
+
+        Runs on `change_timer`. Only the records listed in the ChangeLog since the last
+        check are re-read: when every record is shown they are patched into the table in
+        place, unless more than `TABLE_PATCH_LIMIT` changed and the table is filled again,
+        and in paged mode the current page is reloaded. If this instance fell
+        further behind than the log reaches back, the table is refreshed as a whole.
+        Does nothing before `start_background_work` opened the change feed, as the first
+        page has not been read yet either.
+        """
+        if self.change_feed is None:
+            return
+        if self._table_fill_rows is not None:
+            # Still streaming the initial rows; try again on the next tick.
+            return
+        if self.search_scope != "Current shard":
+            # Other shards and the archive are shown as a snapshot, refreshed by searching again.
+            return
+        try:
+            with self.db.reading() as cursor:
+                changed = self.apply_pending_changes(cursor)
+                if changed and self.page_size:
+                    self.pager.reload(cursor)
+        except sqlite3.Error:
+            # The database is busy or locked; the changes stay pending until the next tick.
+            return
+
+        if changed is None:
+            self.query_cache.clear()
+            self.update_records_table()
+        elif changed:
+            if self.page_size:
+                self.show_current_page()
+            elif len(changed) > TABLE_PATCH_LIMIT:
+                # Moving thousands of rows one by one costs more than filling the table again.
+                self.update_records_table()
+            else:
+                self.patch_table_rows(changed)
+                self.page_label.setText(f"{self.records_table.rowCount()} records")
+            self.show_cache_stats()
+
+    def apply_pending_changes(self, cursor):
+        """
+        Reads the changes waiting in `change_feed` and drops the cache entries they affect.
+
+        The GPAs and averages of the changed students and courses are read into
+        `gradebook` again.
+
+        Args:
+            cursor (sqlite3.Cursor): An open cursor on the school database.
+
+        Returns:
+            dict: The current raw row of each changed record by (type, row ID), with
+            None for deleted records, or None if the changes can no longer be listed,
+            also before `start_background_work` opened the feed.
+        """
+        changes = self.change_feed.poll() if self.change_feed is not None else None
+        if changes is None:
+            self.gradebook.reset()
+            return None
+        changed = {}
+        for record_type, row_id, old in changes:
+            key = (record_type, row_id)
+            if key not in changed:
+                changed[key] = fetch_record_row(cursor, record_type, row_id)
+            rows = [record_change_from_row(changed[key])] if changed[key] else []
+            if old is not None:
+                rows.append(old)
+            if rows:
+                self.query_cache.invalidate(record_type, *rows)
+        # Grade changes are logged as changes of the student and the course involved.
+        for record_type in ('Student', 'Course'):
+            self.gradebook.refresh(cursor, record_type,
+                                   [row_id for changed_type, row_id in changed if changed_type == record_type])
+        return changed
+
+    def patch_table_rows(self, changed):
+        """
+        Updates, removes or inserts individual rows of the records table.
+
+        Each changed record is taken out of the table and, if it still exists and matches
+        the search query, inserted again at its sorted position, found by binary search
+        over the sort keys kept in the table.
+
+        Args:
+            changed (dict): The current raw row of each changed record, as returned by
+                `apply_pending_changes`.
+        """
+        table = self.records_table
+        table.setUpdatesEnabled(False)
+        for key, row in changed.items():
+            item = self._table_items.pop(key, None)
+            if item is not None:
+                table.removeRow(item.row())
+            if row is None or not record_matches(row, self.search_query):
+                continue
+            sort_key = record_sort_key(row, self.sort_column)
+            low, high = 0, table.rowCount()
+            while low < high:
+                middle = (low + high) // 2
+                other = tuple(table.item(middle, 0).data(Qt.UserRole))
+                if (other < sort_key) if self.sort_descending else (sort_key < other):
+                    high = middle
+                else:
+                    low = middle + 1
+            table.insertRow(low)
+            self.set_table_row(low, row)
+        table.setUpdatesEnabled(True)
 
     def search_records(self):
-            """
-            Searches the student, instructor, and course records based on a query
-            (name, ID, or course) entered in the search input field.
-            """
-            query = self.search_input.text().lower()
-
-            # Clear the table before searching
-            self.records_table.setRowCount(0)
-
-            # Search students in the database
-            self.cursor.execute("SELECT name, student_id, email, course FROM students WHERE LOWER(name) LIKE ? OR LOWER(student_id) LIKE ? OR LOWER(email) LIKE ?", 
-                                (f"%{query}%", f"%{query}%", f"%{query}%"))
-            students = self.cursor.fetchall()
-
-            for student in students:
-                row_position = self.records_table.rowCount()
-                self.records_table.insertRow(row_position)
-                self.records_table.setItem(row_position, 0, QTableWidgetItem('Student'))
-                self.records_table.setItem(row_position, 1, QTableWidgetItem(student[0]))  # name
-                self.records_table.setItem(row_position, 2, QTableWidgetItem(f'ID: {student[1]}'))  # student ID
-                self.records_table.setItem(row_position, 3, QTableWidgetItem(student[2]))  # email
-                self.records_table.setItem(row_position, 4, QTableWidgetItem(student[3]))  # course
-
-            # Search instructors in the database
-            self.cursor.execute("SELECT name, instructor_id, email, course FROM instructors WHERE LOWER(name) LIKE ? OR LOWER(instructor_id) LIKE ? OR LOWER(email) LIKE ?", 
-                                (f"%{query}%", f"%{query}%", f"%{query}%"))
-            instructors = self.cursor.fetchall()
-
-            for instructor in instructors:
-                row_position = self.records_table.rowCount()
-                self.records_table.insertRow(row_position)
-                self.records_table.setItem(row_position, 0, QTableWidgetItem('Instructor'))
-                self.records_table.setItem(row_position, 1, QTableWidgetItem(instructor[0]))  # name
-                self.records_table.setItem(row_position, 2, QTableWidgetItem(f'ID: {instructor[1]}'))  # instructor ID
-                self.records_table.setItem(row_position, 3, QTableWidgetItem(instructor[2]))  # email
-                self.records_table.setItem(row_position, 4, QTableWidgetItem(instructor[3]))  # course
-
-            # Search courses in the database
-            self.cursor.execute("SELECT course_name, course_id, instructor_name FROM courses WHERE LOWER(course_name) LIKE ? OR LOWER(course_id) LIKE ? OR LOWER(instructor_name) LIKE ?", 
-                                (f"%{query}%", f"%{query}%", f"%{query}%"))
-            courses = self.cursor.fetchall()
-
-            for course in courses:
-                row_position = self.records_table.rowCount()
-                self.records_table.insertRow(row_position)
-                self.records_table.setItem(row_position, 0, QTableWidgetItem('Course'))
-                self.records_table.setItem(row_position, 1, QTableWidgetItem(course[0]))  # course name
-                self.records_table.setItem(row_position, 2, QTableWidgetItem(f'ID: {course[1]}'))  # course ID
-                self.records_table.setItem(row_position, 3, QTableWidgetItem(course[2]))  # instructor name
-                self.records_table.setItem(row_position, 4, QTableWidgetItem(''))  # no registered courses for courses
+        """
+        Searches the student, instructor, and course records based on a query
+        (name, ID, or course) entered in the search input field.
+
+        The query stays active, so later refreshes and sorting only show matching records.
+        Repeated queries are answered from `query_cache`.
+        """
+        self.search_timer.stop()
+        self.search_query = self.search_input.text().strip().lower()
+        self.update_records_table()
 
     def edit_record(self):
         """
         Edits the selected record in the records table.
 
         Based on the selected row in the table, this method fetches the current data of the student, 
-        instructor, or course and updates the corresponding record in the database.
+        instructor, or course and updates the corresponding record in the database with the values
+        entered in the matching form. Empty form fields keep their current value, and
+        the course dropdown only registers the student or assigns the instructor while
+        its form is open, so a form that was never shown adds no course.
+
+        The update goes through `write_queue`, so rapid edits of one record are written once.
 
         Raises:
         -------
@@ -740,375 +2217,2978 @@ class SchoolManagementSystem(QMainWindow):
         if selected_row == -1:
             QMessageBox.warning(self, "Edit Error", "Please select a record to edit.")
             return
+        if self.search_scope != "Current shard":
+            QMessageBox.warning(self, "Edit Error", "Records can only be edited in the current shard.")
+            return
 
         # Get current data of the selected record
         record_type = self.records_table.item(selected_row, 0).text()
-        name = self.records_table.item(selected_row, 1).text()
         details = self.records_table.item(selected_row, 2).text()
-        email_id = self.records_table.item(selected_row, 3).text()
-        registered_courses = self.records_table.item(selected_row, 4).text()
-
-        # Edit fields based on type of record
-        if record_type == "Student":
-            # Get new data for student
-            new_name = self.student_name_input.text()
-            new_age = self.student_age_input.text()
-            new_email = self.student_email_input.text()
-            new_course = self.course_dropdown.currentText()
-
-            # Update student record in the database
-            student_id = details.split(": ")[1]  # Extract student ID
-            self.cursor.execute('''
-                UPDATE students 
-                SET name = ?, email = ?, course = ? 
-                WHERE student_id = ?''', (new_name, new_email, new_course, student_id))
-            self.conn.commit()
-
-        elif record_type == "Instructor":
-            # Get new data for instructor
-            new_name = self.instructor_name_input.text()
-            new_age = self.instructor_age_input.text()
-            new_email = self.instructor_email_input.text()
-            new_course = self.instructor_course_dropdown.currentText()
-
-            # Update instructor record in the database
-            instructor_id = details.split(": ")[1]  # Extract instructor ID
-            self.cursor.execute('''
-                UPDATE instructors 
-                SET name = ?, email = ?, course = ? 
-                WHERE instructor_id = ?''', (new_name, new_email, new_course, instructor_id))
-            self.conn.commit()
-
-        elif record_type == "Course":
-            # Get new data for course
-            new_course_id = self.course_id_input.text()
-            new_course_name = self.course_name_input.text()
-            new_instructor_name = self.course_instructor_input.text()
-
-            # Update course record in the database
-            self.cursor.execute('''
-                UPDATE courses 
-                SET course_name = ?, instructor_name = ? 
-                WHERE course_id = ?''', (new_course_name, new_instructor_name, new_course_id))
-            self.conn.commit()
-
-        # Refresh the table after editing
-        self.update_records_table()
+        record_id = details.split(": ")[-1]
+        old = self.get_record_details(record_type, record_id)
+        if old is None:
+            QMessageBox.warning(self, "Edit Error", f"{record_type} with ID {record_id} no longer exists.")
+            self.update_records_table()
+            return
+
+        try:
+            # Collect the non-empty fields of the matching form
+            if record_type == "Student":
+                form = self.ensure_student_form()
+                fields = {'name': self.student_name_input.text(),
+                          'age': self.student_age_input.text(),
+                          'email': self.student_email_input.text()}
+                new_course = self.course_dropdown.currentText() if form.isVisibleTo(self) else None
+            elif record_type == "Instructor":
+                form = self.ensure_instructor_form()
+                fields = {'name': self.instructor_name_input.text(),
+                          'age': self.instructor_age_input.text(),
+                          'email': self.instructor_email_input.text()}
+                new_course = self.instructor_course_dropdown.currentText() if form.isVisibleTo(self) else None
+            elif record_type == "Course":
+                self.ensure_course_form()
+                fields = {'course_id': self.course_id_input.text(),
+                          'course_name': self.course_name_input.text(),
+                          'instructor_id': self.course_instructor_input.text(),
+                          'meetings': format_meetings(parse_meetings(self.course_meetings_input.text()))}
+                new_course = None
+            else:
+                return
+            fields = {column: value for column, value in fields.items() if value}
+            if 'age' in fields:
+                fields['age'] = int(fields['age'])
+        except ValueError as e:
+            QMessageBox.critical(self, "Error", f"Error editing record: {e}")
+            return
+
+        # Queue the update; repeated edits of the same record are merged until the next flush
+        self.write_queue.update(record_type, record_id, fields)
+        if new_course is not None:
+            course_db_id = self.get_course_id_from_name(new_course.split(":")[0].strip())
+            if course_db_id is not None:
+                if record_type == "Student":
+                    self.write_queue.register(record_id, course_db_id)
+                else:
+                    self.write_queue.assign(course_db_id, record_id)
+        if fields.get('course_id', record_id) != record_id:
+            # Later edits refer to the new course ID, so write the rename straight away.
+            self.flush_writes()
+        else:
+            self.schedule_flush()
+
+    def selected_records(self):
+        """
+        Returns the type and ID of every selected record, warning if there are none.
+
+        Returns:
+            list: A (record type, record ID) tuple per selected row, in table order.
+        """
+        rows = sorted({item.row() for item in self.records_table.selectedItems()})
+        if not rows or self.search_scope != "Current shard":
+            QMessageBox.warning(self, "Selection Error", "Please select records in the current shard.")
+            return []
+        return [(self.records_table.item(row, 0).text(), self.records_table.item(row, 2).text().split(": ")[-1])
+                for row in rows]
+
+    def bulk_edit_records(self):
+        """
+        Applies one change to every selected record of the records table.
+
+        The change is one of `BULK_EDIT_ACTIONS`; selected records it does not apply to
+        are skipped. All writes are queued in `write_queue` and flushed together, so
+        they are written in one transaction and the table is updated once at the end.
+        """
+        selected = self.selected_records()
+        if not selected:
+            return
+        action, ok = QInputDialog.getItem(self, "Bulk Edit", f"Change for the {len(selected)} selected records:",
+                                          list(BULK_EDIT_ACTIONS), 0, False)
+        if not ok:
+            return
+        targets = [record for record in selected if record[0] in BULK_EDIT_ACTIONS[action]]
+        if not targets:
+            QMessageBox.warning(self, "Bulk Edit", f"{action} does not apply to any of the selected records.")
+            return
+
+        if action == 'Set age':
+            value, ok = QInputDialog.getInt(self, "Bulk Edit", "Age:", 18, 5, 120)
+        elif action == 'Change email domain':
+            value, ok = QInputDialog.getText(self, "Bulk Edit", "New email domain:")
+            value = value.strip().lstrip('@')
+            if ok and (not value or '@' in value or ' ' in value):
+                QMessageBox.warning(self, "Bulk Edit", f"Invalid email domain: {value!r}")
+                return
+        elif action == 'Move students to course':
+            source, ok = QInputDialog.getText(self, "Bulk Edit", "Course ID to move from (empty to only register):")
+            if ok:
+                target, ok = QInputDialog.getText(self, "Bulk Edit", "Course ID to move to:")
+            if ok:
+                source, target = source.strip(), target.strip()
+                with self.db.reading() as cursor:
+                    courses = dict(cursor.execute(
+                        "SELECT course_id, id FROM Courses WHERE course_id IN (?, ?)", (source, target)))
+                for course_id in (source, target) if source else (target,):
+                    if course_id not in courses:
+                        QMessageBox.warning(self, "Bulk Edit", f"Course {course_id or '(empty)'} does not exist.")
+                        return
+                value = (courses.get(source) if source else None, courses[target])
+        else:
+            value, ok = QInputDialog.getText(self, "Bulk Edit", "Instructor ID:")
+            value = value.strip()
+            if ok:
+                with self.db.reading() as cursor:
+                    exists = cursor.execute("SELECT 1 FROM Instructors WHERE instructor_id = ?", (value,)).fetchone()
+                if exists is None:
+                    QMessageBox.warning(self, "Bulk Edit", f"Instructor {value} does not exist.")
+                    return
+        if not ok:
+            return
+
+        changed = self.queue_bulk_edit(action, targets, value)
+        self.flush_writes()
+        QMessageBox.information(self, "Bulk Edit", f"{action}: {changed} of {len(selected)} selected records changed.")
+
+    def queue_bulk_edit(self, action, records, value):
+        """
+        Queues the writes of a bulk edit in `write_queue` without flushing them.
+
+        Args:
+            action (str): One of `BULK_EDIT_ACTIONS`.
+            records (list): (record type, record ID) tuples of records the action applies to.
+            value: The age for ``Set age``, the domain for ``Change email domain``, a tuple
+                of the database IDs of the course to move from (or None) and to for
+                ``Move students to course``, and the instructor ID for ``Assign instructor``.
+
+        Returns:
+            int: The number of records changes were queued for.
+        """
+        if action == 'Set age':
+            for record_type, record_id in records:
+                self.write_queue.update(record_type, record_id, {'age': value})
+            return len(records)
+        if action == 'Move students to course':
+            source, target = value
+            for _, student_id in records:
+                if source is not None:
+                    self.write_queue.unregister(student_id, source)
+                self.write_queue.register(student_id, target)
+            return len(records)
+        if action == 'Assign instructor':
+            rows = self._bulk_read('Course', [record_id for _, record_id in records], 'id')
+        else:
+            rows = {}
+            for record_type in ('Student', 'Instructor'):
+                rows.update(((record_type, record_id), email) for record_id, email in self._bulk_read(
+                    record_type, [record_id for kind, record_id in records if kind == record_type], 'email').items())
+        changed = 0
+        for record_type, record_id in records:
+            key = record_id if action == 'Assign instructor' else (record_type, record_id)
+            if key not in rows:
+                continue
+            if action == 'Assign instructor':
+                self.write_queue.assign(rows[key], value)
+            else:
+                email = f"{rows[key].partition('@')[0]}@{value}"
+                if email == rows[key]:
+                    continue
+                self.write_queue.update(record_type, record_id, {'email': email})
+            changed += 1
+        return changed
+
+    def _bulk_read(self, record_type, record_ids, column):
+        # One query per 500 IDs, within SQLite's limit on query parameters.
+        table, columns = RECORD_SOURCES[record_type]
+        id_column = columns['record_id']
+        rows = {}
+        with self.db.reading() as cursor:
+            for start in range(0, len(record_ids), 500):
+                chunk = record_ids[start:start + 500]
+                rows.update(cursor.execute(f"SELECT {id_column}, {column} FROM {table} "
+                                           f"WHERE {id_column} IN ({', '.join('?' * len(chunk))})", chunk))
+        return rows
+
+    def delete_record(self):
+        """
+        Deletes the selected record from the records table and database.
+
+        The delete goes through `write_queue`, where it replaces any queued update of
+        the same record, and is flushed straight away so the message reports whether
+        it was saved.
+
+        Raises:
+        -------
+        ValueError:
+            If no row is selected for deletion.
+        """
+        selected_row = self.records_table.currentRow()
+        if selected_row == -1:
+            QMessageBox.warning(self, "Delete Error", "Please select a record to delete.")
+            return
+        if self.search_scope != "Current shard":
+            QMessageBox.warning(self, "Delete Error", "Records can only be deleted in the current shard.")
+            return
+        record_type = self.records_table.item(selected_row, 0).text()
+        record_id = self.records_table.item(selected_row, 2).text() 
+
+        record_id = record_id.split(': ')[-1]  
+
+        if record_type in RECORD_SOURCES:
+            self.write_queue.delete(record_type, record_id)
+            failures = self.flush_writes()
+            if failures is None:
+                QMessageBox.information(self, "Queued",
+                                        f"{record_type} with ID {record_id} will be deleted once the database is free.")
+            elif not failures:
+                QMessageBox.information(self, "Success", f"{record_type} with ID {record_id} deleted successfully.")
+
+    def save_data_to_file(self):
+        """
+        Saves all student, instructor, and course data to a JSON file.
+
+        This method allows the user to save the current state of the school management system to a file,
+        which can be reloaded later.
+
+        Raises:
+        -------
+        IOError:
+            If there is an error during file writing.
+        """
+        self.cursor.execute("SELECT * FROM students")
+        students = self.cursor.fetchall()
+        
+        self.cursor.execute("SELECT * FROM instructors")
+        instructors = self.cursor.fetchall()
+
+        self.cursor.execute("SELECT * FROM courses")
+        courses = self.cursor.fetchall()
+
+        data = {
+            "students": [
+                {"student_id": student[0], "name": student[1], "age": student[2], "email": student[3], "course": student[4]}
+                for student in students
+            ],
+            "instructors": [
+                {"instructor_id": instructor[0], "name": instructor[1], "age": instructor[2], "email": instructor[3]}
+                for instructor in instructors
+            ],
+            "courses": [
+                {"course_id": course[0], "name": course[1], "instructor": course[2]}
+                for course in courses
+            ]
+        }
+
+        filename, _ = QFileDialog.getSaveFileName(self, "Save Data", "", "JSON Files (*.json);;All Files (*)")
+        if filename:
+            with open(filename, 'w') as f:
+                json_module().dump(data, f, indent=4)
+            QMessageBox.information(self, "Data Saved", "Data has been saved successfully.")
+
+    def load_data_from_file(self):
+        """
+        Loads student, instructor, and course data from a JSON file.
+
+        This method allows the user to load previously saved data back into the system.
+        A snapshot file (``.snap``) is opened read-only in a `SnapshotWindow` instead,
+        without reading it whole.
+
+        Raises:
+        -------
+        IOError:
+            If there is an error during file reading.
+        """
+        filename, _ = QFileDialog.getOpenFileName(self, "Load Data", "",
+                                                  "JSON Files (*.json);;Snapshot Files (*.snap);;All Files (*)")
+        if filename.endswith('.snap'):
+            self.open_snapshot(filename)
+        elif filename:
+            with open(filename, 'r') as f:
+                data = json_module().load(f)
+                
+                # Load students
+                self.students = [Student(**student_data) for student_data in data.get("students", [])]
+                # Load instructors
+                self.instructors = [Instructor(**instructor_data) for instructor_data in data.get("instructors", [])]
+                # Load courses
+                self.courses = [Course(**course_data) for course_data in data.get("courses", [])]
+                
+                # Update the records table
+                self.update_records_table()
+                QMessageBox.information(self, "Data Loaded", "Data has been loaded successfully.")
+
+    def export_to_csv(self):
+        """
+        Exports all student, instructor, and course data to a CSV file.
+
+        Raises:
+        -------
+        IOError:
+            If there is an error during file writing.
+        """
+        filename, _ = QFileDialog.getSaveFileName(self, "Export Data", "", "CSV Files (*.csv);;All Files (*)")
+        if filename:
+            import csv
+            with open(filename, 'w', newline='') as csvfile:
+                writer = csv.writer(csvfile)
+                
+                # Write Students
+                writer.writerow(['Students'])
+                writer.writerow(['Name', 'Age', 'Email', 'Student ID', 'Registered Courses'])
+                for student in self.students:
+                    writer.writerow([student.name, student.age, student._email, student.student_id, ', '.join(student.registered_courses)])
+                writer.writerow([])  # Blank line to separate sections
+                
+                # Write Instructors
+                writer.writerow(['Instructors'])
+                writer.writerow(['Name', 'Age', 'Email', 'Instructor ID', 'Assigned Courses'])
+                for instructor in self.instructors:
+                    writer.writerow([instructor.name, instructor.age, instructor._email, instructor.instructor_id, ', '.join(instructor.assigned_courses)])
+                writer.writerow([])  # Blank line to separate sections
+                
+                # Write Courses
+                writer.writerow(['Courses'])
+                writer.writerow(['Course ID', 'Course Name', 'Instructor', 'Enrolled Students'])
+                for course in self.courses:
+                    writer.writerow([course.course_id, course.course_name, course.instructor.name, ', '.join(student.name for student in course.enrolled_students)])
+            
+            QMessageBox.information(self, "Data Exported", "Data has been exported successfully to CSV.")
+
+    def create_menu(self):
+        """
+        Create the menu bar for the application with options for saving, loading, and exporting data.
+
+        This method sets up a menu bar with a "File" menu that contains the following actions:
+        
+        - **Save Data**: Saves the current data to a file in JSON format.
+        - **Load Data**: Loads data from a JSON file into the system.
+        - **Export to CSV**: Exports the current data to a CSV file.
+
+        The menu is added to the application's menu bar.
+        """
+        # Create menu bar
+        menu_bar = self.menuBar()
+        
+        # Create File menu
+        file_menu = menu_bar.addMenu("File")
+        
+        # Add Save Data action
+        save_action = QAction("Save Data", self)
+        save_action.triggered.connect(self.save_data_to_file)
+        file_menu.addAction(save_action)
+
+        # Add Load Data action
+        load_action = QAction("Load Data", self)
+        load_action.triggered.connect(self.load_data_from_file)
+        file_menu.addAction(load_action)
+
+        # Add Export to CSV action
+        export_action = QAction("Export to CSV", self)
+        export_action.triggered.connect(self.export_to_csv)
+        file_menu.addAction(export_action)
+    def validate_input(self, name, age, email, student_or_instructor_id):
+        """
+        Validate user input for adding or editing a record.
+
+        :param name: The name of the student or instructor. Should contain only alphabetic characters and spaces.
+        :type name: str
+        :param age: The age of the student or instructor. Must be a number between 5 and 120.
+        :type age: str
+        :param email: The email address of the student or instructor. Must be a valid email format.
+        :type email: str
+        :param student_or_instructor_id: The unique ID of the student or instructor. Must be alphanumeric.
+        :type student_or_instructor_id: str
+
+        :returns: True if all validations pass, otherwise False.
+        :rtype: bool
+
+        This method validates the following:
+        - The name contains only alphabetic characters and spaces.
+        - The age is a valid number between 5 and 120.
+        - The email is in a valid email format.
+        - The student or instructor ID is alphanumeric.
+        
+        If any validation fails, a warning message is displayed and the function returns False.
+        """
+        if not name.replace(" ", "").isalpha():
+            QMessageBox.warning(self, "Invalid Input", "Name should only contain alphabetic characters and spaces.")
+            return False
+
+        # Validate Age (between 5 and 120)
+        if not age.isdigit() or not (5 <= int(age) <= 120):
+            QMessageBox.warning(self, "Invalid Input", "Age should be a valid number between 5 and 120.")
+            return False
+
+        # Validate Email using regex
+        if not email_pattern().match(email):
+            QMessageBox.warning(self, "Invalid Input", "Please enter a valid email address.")
+            return False
+
+        # Validate Student/Instructor ID (should be alphanumeric)
+        if not student_or_instructor_id.isalnum():
+            QMessageBox.warning(self, "Invalid Input", "ID should be alphanumeric.")
+            return False
+
+        # If all validations pass
+        return True
+
+    def add_instructor(self):
+        """
+        Add a new instructor to the system.
+
+        This method collects the input fields for the instructor's name, age, email, and ID. 
+        It then validates the input using `validate_input`. If validation passes, 
+        it creates an Instructor object and appends it to the instructors list.
+
+        :raises: A warning message if any of the inputs are invalid.
+
+        :returns: None
+        """
+        name = self.name_input.text()
+        age = self.age_input.text()
+        email = self.email_input.text()
+        instructor_id = self.instructor_id_input.text()
+
+        if self.validate_input(name, age, email, instructor_id):
+            # Proceed with adding the instructor
+            instructor = Instructor(name, int(age), email, instructor_id)
+            self.instructors.append(instructor)
+            QMessageBox.information(self, "Success", "Instructor added successfully!")
+
+
+# Record types in the default row order of the records table.
+RECORD_TYPES = ('Student', 'Instructor', 'Course')
+
+# Changes offered by Bulk Edit, with the record types each one applies to.
+BULK_EDIT_ACTIONS = {
+    'Set age': ('Student', 'Instructor'),
+    'Change email domain': ('Student', 'Instructor'),
+    'Move students to course': ('Student',),
+    'Assign instructor': ('Course',),
+}
+
+# Search condition of each record type; each placeholder takes the same LIKE pattern.
+RECORD_FILTERS = {
+    'Student': "LOWER(name) LIKE ? OR LOWER(student_id) LIKE ? OR LOWER(email) LIKE ?",
+    'Instructor': "LOWER(name) LIKE ? OR LOWER(instructor_id) LIKE ? OR LOWER(email) LIKE ?",
+    'Course': "LOWER(course_name) LIKE ? OR LOWER(course_id) LIKE ?",
+}
+
+# Sort terms for the sortable columns of the records table, as (result column, case-insensitive).
+# Each order matches an index created in create_database, so SQLite merges index scans
+# instead of sorting; the record type breaks any remaining ties. Column 0 (Type) is
+# sorted by reading the record types one after another, each by record_id. Column 4
+# (Courses/Students) is deliberately not sortable: its counts are computed per row, so
+# no index orders them and sorting would read and sort the whole table on every page.
+RECORD_SORT_KEYS = {
+    0: (),
+    1: (('name', True), ('record_id', False)),
+    2: (('record_id', False),),
+    3: (('email', True), ('record_id', False)),
+}
+
+# Count shown in the last records table column: registered courses per student, assigned
+# courses per instructor and registered students per course, each read through an index.
+RECORD_LINK_COUNTS = {
+    'Student': "(SELECT COUNT(*) FROM Registrations WHERE Registrations.student_id = Students.id)",
+    'Instructor': "(SELECT COUNT(*) FROM Courses AS assigned WHERE assigned.instructor_id = Instructors.id)",
+    'Course': "(SELECT COUNT(*) FROM Registrations WHERE Registrations.course_id = Courses.id)",
+}
+
+# Position of each result column in the raw rows returned by iter_record_rows.
+_RAW_COLUMNS = {'type': 0, 'name': 1, 'record_id': 2, 'email': 3, 'courses': 4, 'row_id': 5}
+
+
+def _record_select(record_type):
+    table, columns = RECORD_SOURCES[record_type]
+    return (f"SELECT '{record_type}' AS type, {columns['name']} AS name, {columns['record_id']} AS record_id, "
+            f"{columns['email']} AS email, {RECORD_LINK_COUNTS[record_type]} AS courses, id AS row_id FROM {table}")
+
+
+def _record_filter(record_type, query):
+    if not query:
+        return [], []
+    condition = RECORD_FILTERS[record_type]
+    return [f"({condition})"], [f"%{query}%"] * condition.count('?')
+
+
+def iter_record_rows(cursor, query='', sort_column=None, descending=False, after=None, offset=0):
+    """
+    Yield raw records table rows in display order, optionally starting after a keyset position.
+
+    Rows are (type, name, record_id, email, courses, row_id). Ordering follows
+    `RECORD_SORT_KEYS`; without a sort column, students come first, then instructors and
+    courses, each in insertion order. Seeking with ``after`` uses the indexes, so reading
+    the next page costs the same at any depth.
+
+    :param cursor: An open cursor on the school database.
+    :type cursor: sqlite3.Cursor
+    :param query: Lower-case text to search for in names, IDs and emails; empty for all records.
+    :type query: str
+    :param sort_column: The records table column to sort by, or None for the default order.
+    :type sort_column: int or None
+    :param descending: Whether to read the order backwards.
+    :type descending: bool
+    :param after: The key (from `record_row_key`) of the row to continue after, or None to start at the beginning.
+    :type after: tuple or None
+    :param offset: Number of rows to skip first. Unlike ``after``, this reads the skipped rows.
+    :type offset: int
+    :return: Raw rows.
+    :rtype: generator of tuple
+    """
+    terms = RECORD_SORT_KEYS.get(sort_column)
+    less = descending
+    direction = ' DESC' if descending else ''
+
+    if terms:
+        selects = []
+        params = []
+        for record_type in RECORD_TYPES:
+            conditions, condition_params = _record_filter(record_type, query)
+            if after is not None:
+                columns = RECORD_SOURCES[record_type][1]
+                *values, after_type = after
+                ties_follow = (record_type < after_type) if less else (record_type > after_type)
+                op = ('<' if less else '>') + ('=' if ties_follow else '')
+                left = ', '.join(columns[name] for name, _ in terms)
+                right = ', '.join('? COLLATE NOCASE' if nocase else '?' for _, nocase in terms)
+                conditions.append(f"({left}) {op} ({right})")
+                condition_params.extend(values)
+            sql = _record_select(record_type)
+            if conditions:
+                sql += " WHERE " + " AND ".join(conditions)
+            selects.append(sql)
+            params.extend(condition_params)
+        order_by = ', '.join(f"{name}{' COLLATE NOCASE' if nocase else ''}{direction}" for name, nocase in terms)
+        sql = ' UNION ALL '.join(selects) + f" ORDER BY {order_by}, type{direction}"
+        if offset:
+            sql += " LIMIT -1 OFFSET ?"
+            params.append(offset)
+        # Not "yield from": closing this generator early would close the shared cursor.
+        for row in cursor.execute(sql, params):
+            yield row
+        return
+
+    # Orders that read one record type after another.
+    if sort_column == 0:
+        record_types = sorted(RECORD_TYPES, reverse=descending)
+        key_column = 'record_id'
+    else:
+        record_types = list(reversed(RECORD_TYPES)) if descending else list(RECORD_TYPES)
+        key_column = 'row_id'
+    if after is not None:
+        after_type, after_value = after
+        record_types = record_types[record_types.index(after_type):]
+
+    for record_type in record_types:
+        conditions, params = _record_filter(record_type, query)
+        if after is not None and record_type == after_type:
+            key_source = 'id' if key_column == 'row_id' else RECORD_SOURCES[record_type][1]['record_id']
+            conditions.append(f"{key_source} {'<' if less else '>'} ?")
+            params.append(after_value)
+        where = " WHERE " + " AND ".join(conditions) if conditions else ""
+        if offset:
+            count = cursor.execute(f"SELECT COUNT(*) FROM ({_record_select(record_type)}{where})", params).fetchone()[0]
+            if count <= offset:
+                offset -= count
+                continue
+        sql = f"{_record_select(record_type)}{where} ORDER BY {key_column}{direction}"
+        if offset:
+            sql += " LIMIT -1 OFFSET ?"
+            params.append(offset)
+            offset = 0
+        for row in cursor.execute(sql, params):
+            yield row
+
+
+def record_row_key(row, sort_column):
+    """
+    Return the keyset position of a raw row for the given sort column.
+
+    :param row: A raw row from `iter_record_rows`.
+    :type row: tuple
+    :param sort_column: The records table column the rows are sorted by, or None.
+    :type sort_column: int or None
+    :return: The key to pass as ``after`` to continue after this row.
+    :rtype: tuple
+    """
+    terms = RECORD_SORT_KEYS.get(sort_column)
+    if terms:
+        return tuple(row[_RAW_COLUMNS[name]] for name, _ in terms) + (row[0],)
+    return (row[0], row[_RAW_COLUMNS['record_id' if sort_column == 0 else 'row_id']])
+
+
+def record_sort_key(row, sort_column):
+    """
+    Return a key that orders raw rows the way `iter_record_rows` does for a sort column.
+
+    Descending orders are the same keys compared in reverse. Case-insensitive terms are
+    compared in lower case.
+
+    :param row: A raw row from `iter_record_rows`.
+    :type row: tuple
+    :param sort_column: The records table column the rows are sorted by, or None.
+    :type sort_column: int or None
+    :return: The sort key.
+    :rtype: tuple
+    """
+    terms = RECORD_SORT_KEYS.get(sort_column)
+    if terms:
+        key = tuple(row[_RAW_COLUMNS[name]] for name, _ in terms)
+        return tuple(value.lower() if nocase else value for value, (_, nocase) in zip(key, terms)) + (row[0],)
+    if sort_column == 0:
+        return (row[0], row[_RAW_COLUMNS['record_id']])
+    return (RECORD_TYPES.index(row[0]), row[_RAW_COLUMNS['row_id']])
+
+
+def record_matches(row, query):
+    """
+    Check whether a raw row matches a search query, as the `RECORD_FILTERS` conditions do.
+
+    :param row: A raw row from `iter_record_rows`.
+    :type row: tuple
+    :param query: Lower-case search text; empty matches every row.
+    :type query: str
+    :return: True if the name, ID or email contains the query.
+    :rtype: bool
+    """
+    return not query or any(query in str(row[_RAW_COLUMNS[name]]).lower() for name in ('name', 'record_id', 'email'))
+
+
+def format_record_row(row):
+    """
+    Convert a raw row into the values shown in the records table.
+
+    The last column only counts the courses of a person or the students of a course;
+    `CourseRosterWindow` lists a course's students.
+
+    :param row: A raw row from `iter_record_rows`.
+    :type row: tuple
+    :return: A tuple of (type, name, details, email/ID, number of courses or students).
+    :rtype: tuple
+    """
+    record_type, name, record_id, email, count, _ = row
+    if count == '':
+        return (record_type, name, f'ID: {record_id}', email, '')
+    noun = 'student' if record_type == 'Course' else 'course'
+    return (record_type, name, f'ID: {record_id}', email, f"{count} {noun}{'s' if count != 1 else ''}")
+
+
+def count_records(cursor, query=''):
+    """
+    Count the rows of the records table matching a search query.
+
+    :param cursor: An open cursor on the school database.
+    :type cursor: sqlite3.Cursor
+    :param query: Lower-case search text; empty to count every record.
+    :type query: str
+    :return: The number of matching rows.
+    :rtype: int
+    """
+    total = 0
+    for record_type in RECORD_TYPES:
+        conditions, params = _record_filter(record_type, query)
+        where = " WHERE " + " AND ".join(conditions) if conditions else ""
+        total += cursor.execute(f"SELECT COUNT(*) FROM {RECORD_SOURCES[record_type][0]}{where}", params).fetchone()[0]
+    return total
+
+
+def fetch_record_rows(cursor, query='', sort_column=None, descending=False):
+    """
+    Yield the rows shown in the records table.
+
+    Without a sort column, students come first, then instructors and courses.
+
+    :param cursor: An open cursor on the school database.
+    :type cursor: sqlite3.Cursor
+    :param query: Lower-case text to search for in names, IDs and emails; empty for all records.
+    :type query: str
+    :param sort_column: The records table column to sort by, or None for the default order.
+    :type sort_column: int or None
+    :param descending: Whether to sort in descending order.
+    :type descending: bool
+    :return: Tuples of (type, name, details, email/ID, number of courses or students).
+    :rtype: generator of tuple
+    """
+    for row in iter_record_rows(cursor, query, sort_column, descending):
+        yield format_record_row(row)
+
+
+def fetch_record_row(cursor, record_type, row_id):
+    """
+    Fetch the raw records table row of one record by its primary key.
+
+    :param cursor: An open cursor on the school database.
+    :type cursor: sqlite3.Cursor
+    :param record_type: One of ``Student``, ``Instructor`` or ``Course``.
+    :type record_type: str
+    :param row_id: The record's ``id`` column.
+    :type row_id: int
+    :return: The raw row, or None if the record does not exist.
+    :rtype: tuple or None
+    """
+    return cursor.execute(f"{_record_select(record_type)} WHERE id = ?", (row_id,)).fetchone()
+
+
+def fetch_record_details(cursor, record_type, record_id):
+    """
+    Fetch the stored fields of one student, instructor or course by its ID.
+
+    :param cursor: An open cursor on the school database.
+    :type cursor: sqlite3.Cursor
+    :param record_type: One of ``Student``, ``Instructor`` or ``Course``.
+    :type record_type: str
+    :param record_id: The student, instructor or course ID shown in the records table.
+    :type record_id: str
+    :return: The record's columns by name, or None if it does not exist.
+    :rtype: dict or None
+    """
+    table, columns = RECORD_SOURCES[record_type]
+    cursor.execute(f"SELECT * FROM {table} WHERE {columns['record_id']} = ?", (record_id,))
+    row = cursor.fetchone()
+    if row is None:
+        return None
+    return dict(zip((column[0] for column in cursor.description), row))
+
+
+def fetch_waitlist(cursor, course_id):
+    """
+    Fetch the seats and the waitlist of a course.
+
+    :param cursor: An open cursor on the school database.
+    :type cursor: sqlite3.Cursor
+    :param course_id: The course ID shown in the records table.
+    :type course_id: str
+    :return: The capacity (None for no limit), the number of registered students, and
+        ``(student_id, name, priority)`` per waiting student in promotion order; None if
+        the course does not exist.
+    :rtype: tuple or None
+    """
+    cursor.execute("SELECT id, capacity, (SELECT COUNT(*) FROM Registrations WHERE course_id = Courses.id) "
+                   "FROM Courses WHERE course_id = ?", (course_id,))
+    course = cursor.fetchone()
+    if course is None:
+        return None
+    cursor.execute("SELECT Students.student_id, Students.name, Waitlist.priority FROM Waitlist "
+                   "JOIN Students ON Students.id = Waitlist.student_id WHERE Waitlist.course_id = ? "
+                   "ORDER BY Waitlist.priority DESC, Waitlist.enqueued_at, Waitlist.id", (course[0],))
+    return course[1], course[2], cursor.fetchall()
+
+
+def find_schedule_conflicts(cursor):
+    """
+    Find every pair of overlapping courses in a student's or an instructor's week.
+
+    All meetings are sorted once by person and start time and swept in a single
+    pass, keeping the meetings still running at each start: O(n log n) plus the
+    number of clashes, for n meetings across all registrations and assignments.
+
+    :param cursor: An open cursor on the school database.
+    :type cursor: sqlite3.Cursor
+    :return: ``(record type, ID, name, first course, second course, overlap)`` per
+        clash, such as ``('Student', 'S1', 'Ann', 'CS101', 'MA201', 'Mon 10:00-10:30')``.
+    :rtype: list
+    """
+    meetings = []
+    for record_type, sql in (
+            ('Student', "SELECT Students.student_id, Students.name, Courses.course_id, Courses.meetings "
+                        "FROM Registrations JOIN Students ON Students.id = Registrations.student_id "
+                        "JOIN Courses ON Courses.id = Registrations.course_id WHERE Courses.meetings != ''"),
+            ('Instructor', "SELECT Instructors.instructor_id, Instructors.name, Courses.course_id, Courses.meetings "
+                           "FROM Courses JOIN Instructors ON Instructors.id = Courses.instructor_id "
+                           "WHERE Courses.meetings != ''")):
+        for person_id, name, course_id, course_meetings in cursor.execute(sql):
+            meetings.extend((record_type, person_id, start, end, course_id, name)
+                            for start, end in parse_meetings(course_meetings))
+    meetings.sort(key=lambda meeting: meeting[:4])
+
+    conflicts = []
+    person, active = None, []
+    for record_type, person_id, start, end, course_id, name in meetings:
+        if (record_type, person_id) != person:
+            person, active = (record_type, person_id), []
+        active = [(active_end, active_course) for active_end, active_course in active if active_end > start]
+        for active_end, active_course in active:
+            overlap = format_meetings([(start, min(end, active_end))])
+            conflicts.append((record_type, person_id, name, active_course, course_id, overlap))
+        active.append((end, course_id))
+    return conflicts
+
+
+def record_change(record_type, fields):
+    """
+    Describe a stored record in the form `QueryCache.invalidate` matches against.
+
+    :param record_type: One of ``Student``, ``Instructor`` or ``Course``.
+    :type record_type: str
+    :param fields: The record's columns by name, as returned by `fetch_record_details`.
+    :type fields: dict
+    :return: The record's name, ID and email as shown in the records table.
+    :rtype: dict
+    """
+    columns = RECORD_SOURCES[record_type][1]
+    return {
+        'name': str(fields.get(columns['name']) or ''),
+        'record_id': str(fields.get(columns['record_id']) or ''),
+        'email': str(fields.get('email') or ''),
+    }
+
+
+def record_change_from_row(row):
+    """
+    Describe a raw records table row in the form `QueryCache.invalidate` matches against.
+
+    :param row: A raw row from `iter_record_rows`.
+    :type row: tuple
+    :return: The record's name, ID and email.
+    :rtype: dict
+    """
+    return {name: str(row[_RAW_COLUMNS[name]] or '') for name in ('name', 'record_id', 'email')}
+
+
+def shard_path(key):
+    """
+    Return the database file of a campus or term shard.
+
+    :param key: The shard name, such as ``"north-2024-fall"``.
+    :type key: str
+    :return: The path of the shard's database in `SHARD_DIR`.
+    :rtype: str
+    """
+    return os.path.join(SHARD_DIR, f"{key}.db")
+
+
+def list_shards():
+    """
+    Return every database a search across all shards covers.
+
+    :return: The database path by shard name. The default database is listed as
+        ``"main"`` when it exists.
+    :rtype: dict
+    """
+    import glob
+    shards = {}
+    if os.path.exists(DEFAULT_DB_PATH):
+        shards['main'] = DEFAULT_DB_PATH
+    for path in sorted(glob.glob(os.path.join(SHARD_DIR, '*.db'))):
+        shards[os.path.splitext(os.path.basename(path))[0]] = path
+    return shards
+
+
+class FederatedQuery:
+    """
+    Runs records table queries on several shard databases in parallel and merges the results.
+
+    Each shard is read in its own thread over its own read-only connection; sqlite3
+    releases the GIL while a query runs, so the shards are searched at the same time.
+    Every shard returns its rows already in display order, so the results are merged
+    without sorting them again.
+
+    Attributes:
+        shards (dict): The database path by shard name.
+    """
+
+    def __init__(self, shards):
+        """
+        Initializes the query over a set of shards.
+
+        Args:
+            shards (dict): The database path by shard name, as returned by `list_shards`.
+        """
+        self.shards = dict(shards)
+
+    def search(self, query='', sort_column=None, descending=False, limit=None):
+        """
+        Returns the matching rows of every shard in display order.
+
+        Args:
+            query (str): Lower-case search text; empty for all records.
+            sort_column (int): The records table column to sort by, or None.
+            descending (bool): Whether to sort in descending order.
+            limit (int): The maximum number of rows to return, or None for all of them.
+
+        Returns:
+            list: Tuples of (shard name, raw row), where raw rows are as from `iter_record_rows`.
+        """
+        def read(name, cursor):
+            rows = iter_record_rows(cursor, query, sort_column, descending)
+            return [(name, row) for row in (islice(rows, limit) if limit is not None else rows)]
+
+        merged = heapq.merge(*self._run(read).values(), reverse=descending,
+                             key=lambda item: record_sort_key(item[1], sort_column))
+        return list(islice(merged, limit) if limit is not None else merged)
+
+    def count(self, query=''):
+        """
+        Counts the matching rows in each shard.
+
+        Args:
+            query (str): Lower-case search text; empty to count every record.
+
+        Returns:
+            dict: The number of matching rows by shard name.
+        """
+        return self._run(lambda name, cursor: count_records(cursor, query))
+
+    def _run(self, work):
+        def run_on(item):
+            name, path = item
+            conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+            conn.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
+            try:
+                return name, work(name, conn.cursor())
+            finally:
+                conn.close()
+
+        if not self.shards:
+            return {}
+        with thread_pool(len(self.shards)) as pool:
+            return dict(pool.map(run_on, self.shards.items()))
+
+
+class ColdArchive:
+    """
+    A compressed, read-only archive of completed courses and the people only they involved.
+
+    `archive_courses` moves courses out of the database together with their
+    registrations, the students who have no other registration and the instructors
+    who teach no other course. Each call writes one gzip-compressed JSON batch to the
+    archive directory; batches are never changed in place. Records are stored by their
+    user-facing IDs, so `restore` can put them back with new row IDs.
+
+    The archive is only read on demand, by `search` and `restore`.
+
+    Attributes:
+        directory (str): The directory holding the batch files.
+    """
+
+    TABLES = ('students', 'instructors', 'courses', 'registrations')
+
+    def __init__(self, directory=ARCHIVE_DIR):
+        """
+        Initializes the archive in a directory, which is created on the first write.
+
+        Args:
+            directory (str): The directory holding the batch files.
+        """
+        self.directory = directory
+        self._loaded = {}
+
+    def batches(self):
+        """
+        Returns the names of the archived batches, oldest first.
+
+        Returns:
+            list: Batch names, to pass to `load` or `restore`.
+        """
+        import glob
+        return sorted(os.path.basename(path)[:-len('.json.gz')]
+                      for path in glob.glob(os.path.join(self.directory, '*.json.gz')))
+
+    def load(self, name):
+        """
+        Reads one batch; the last batches read are kept in memory until their file changes.
+
+        Args:
+            name (str): The batch name.
+
+        Returns:
+            dict: Lists of ``students``, ``instructors``, ``courses`` and ``registrations``.
+        """
+        import gzip
+        path = self._path(name)
+        stamp = os.path.getmtime(path)
+        cached = self._loaded.get(name)
+        if cached is None or cached[0] != stamp:
+            with gzip.open(path, 'rt', encoding='utf-8') as file:
+                cached = self._loaded[name] = (stamp, json_module().load(file))
+        return cached[1]
+
+    def search(self, query=''):
+        """
+        Searches every batch the way the records table is searched.
+
+        Args:
+            query (str): Lower-case search text; empty for every archived record.
+
+        Returns:
+            list: Tuples of (batch name, raw row) with rows shaped like those of
+            `iter_record_rows` and no row ID.
+        """
+        results = []
+        for name in self.batches():
+            batch = self.load(name)
+            for record_type, key in (('Student', 'students'), ('Instructor', 'instructors'), ('Course', 'courses')):
+                columns = RECORD_SOURCES[record_type][1]
+                for record in batch[key]:
+                    row = (record_type, record[columns['name']], record[columns['record_id']],
+                           record.get('email', ''), '', None)
+                    if record_matches(row, query):
+                        results.append((name, row))
+        return results
+
+    def archive_courses(self, db, course_ids, name=None):
+        """
+        Moves courses and the records that only they involve into a new batch.
+
+        Args:
+            db (Database): The database to archive from.
+            course_ids (list): The IDs of the completed courses.
+            name (str): The batch name; defaults to one based on the current time.
+
+        Returns:
+            str: The batch name, or None if none of the courses exist.
+        """
+        name = name or time.strftime('batch-%Y%m%d-%H%M%S')
+        ids = json_module().dumps(list(course_ids))
+
+        def work(conn):
+            conn.execute("DROP TABLE IF EXISTS temp.archived_courses")
+            conn.execute("CREATE TEMP TABLE archived_courses AS "
+                         "SELECT id FROM Courses WHERE course_id IN (SELECT value FROM json_each(?))", (ids,))
+            batch = {
+                'courses': self._rows(conn, '''
+                    SELECT c.course_id, c.course_name, i.instructor_id, c.meetings FROM Courses c
+                    LEFT JOIN Instructors i ON i.id = c.instructor_id
+                    WHERE c.id IN archived_courses'''),
+                'registrations': self._rows(conn, '''
+                    SELECT s.student_id, c.course_id, r.grade FROM Registrations r
+                    JOIN Students s ON s.id = r.student_id JOIN Courses c ON c.id = r.course_id
+                    WHERE r.course_id IN archived_courses'''),
+                'students': self._rows(conn, '''
+                    SELECT name, age, email, student_id FROM Students s
+                    WHERE id IN (SELECT student_id FROM Registrations WHERE course_id IN archived_courses)
+                    AND NOT EXISTS (SELECT 1 FROM Registrations r
+                                    WHERE r.student_id = s.id AND r.course_id NOT IN archived_courses)'''),
+                'instructors': self._rows(conn, '''
+                    SELECT name, age, email, instructor_id FROM Instructors i
+                    WHERE id IN (SELECT instructor_id FROM Courses WHERE id IN archived_courses)
+                    AND NOT EXISTS (SELECT 1 FROM Courses c
+                                    WHERE c.instructor_id = i.id AND c.id NOT IN archived_courses)'''),
+            }
+            if not batch['courses']:
+                return None
+            # The batch is written before anything is deleted, so a failure leaves duplicates, not losses.
+            self._write(name, batch)
+            # Waiting students stay in the live database; clearing the waitlists first also
+            # keeps the deleted registrations from promoting anyone into archived courses.
+            conn.execute("DELETE FROM Waitlist WHERE course_id IN archived_courses")
+            conn.execute("DELETE FROM Registrations WHERE course_id IN archived_courses")
+            conn.executemany("DELETE FROM Students WHERE student_id = ?",
+                             [(student['student_id'],) for student in batch['students']])
+            conn.executemany("DELETE FROM Instructors WHERE instructor_id = ?",
+                             [(instructor['instructor_id'],) for instructor in batch['instructors']])
+            conn.execute("DELETE FROM Courses WHERE id IN archived_courses")
+            conn.execute("DROP TABLE temp.archived_courses")
+            return name
+
+        return db.write(work)
+
+    def restore(self, db, name, record_ids=None):
+        """
+        Puts archived records back into the database.
+
+        Records whose ID is already in use are skipped. A registration is restored once
+        both its student and its course are back; the others stay archived.
+
+        Args:
+            db (Database): The database to restore into.
+            name (str): The batch name.
+            record_ids (list): The student, instructor and course IDs to restore, or
+                None for the whole batch.
+
+        Returns:
+            int: The number of records and registrations restored.
+        """
+        batch = self.load(name)
+        wanted = None if record_ids is None else set(record_ids)
+
+        def chosen(record, id_column):
+            return wanted is None or record[id_column] in wanted
+
+        def work(conn):
+            remaining = {table: [] for table in self.TABLES}
+            restored = 0
+            for key, table, id_column in (('students', 'Students', 'student_id'),
+                                          ('instructors', 'Instructors', 'instructor_id')):
+                for person in batch[key]:
+                    if chosen(person, id_column):
+                        conn.execute(f"INSERT OR IGNORE INTO {table} (name, age, email, {id_column}) "
+                                     "VALUES (?, ?, ?, ?)",
+                                     (person['name'], person['age'], person['email'], person[id_column]))
+                        restored += 1
+                    else:
+                        remaining[key].append(person)
+            for course in batch['courses']:
+                if chosen(course, 'course_id'):
+                    conn.execute("INSERT OR IGNORE INTO Courses (course_id, course_name, instructor_id, meetings) "
+                                 "SELECT ?, ?, (SELECT id FROM Instructors WHERE instructor_id = ?), ?",
+                                 (course['course_id'], course['course_name'], course['instructor_id'],
+                                  course.get('meetings', '')))
+                    restored += 1
+                else:
+                    remaining['courses'].append(course)
+            for registration in batch['registrations']:
+                ids = conn.execute("SELECT (SELECT id FROM Students WHERE student_id = ?), "
+                                   "(SELECT id FROM Courses WHERE course_id = ?)",
+                                   (registration['student_id'], registration['course_id'])).fetchone()
+                if None in ids:
+                    remaining['registrations'].append(registration)
+                else:
+                    conn.execute("INSERT OR IGNORE INTO Registrations (student_id, course_id, grade) VALUES (?, ?, ?)",
+                                 ids + (registration.get('grade'),))
+                    restored += 1
+            return restored, remaining
+
+        restored, remaining = db.write(work)
+        # The batch only changes once the restore is committed.
+        if any(remaining[table] for table in ('students', 'instructors', 'courses')):
+            self._write(name, remaining)
+        else:
+            os.remove(self._path(name))
+            self._loaded.pop(name, None)
+        return restored
+
+    def _path(self, name):
+        return os.path.join(self.directory, f"{name}.json.gz")
+
+    def _write(self, name, batch):
+        import gzip
+        os.makedirs(self.directory, exist_ok=True)
+        self._loaded.pop(name, None)
+        path = self._path(name)
+        with gzip.open(path + '.tmp', 'wt', encoding='utf-8') as file:
+            json_module().dump(batch, file)
+        os.replace(path + '.tmp', path)
+
+    @staticmethod
+    def _rows(conn, sql):
+        cursor = conn.execute(sql)
+        columns = [column[0] for column in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor]
+
+
+def _parse_entity(source, raw=None):
+    """
+    Parse one file written by a ``save_to_file`` method into an entity whose references are not linked yet.
+
+    Students and instructors keep their course IDs, and courses their instructor and
+    student names, until `EntityFiles` re-links them. This runs in the worker
+    processes of `EntityFiles`, so it reports errors by value instead of raising.
+
+    :param source: The file path, or the archive member name when `raw` is given.
+    :type source: str
+    :param raw: The file contents, or None to read them from `source`.
+    :type raw: bytes
+    :return: ``(source, entity, None)``, or ``(source, None, (error type, message))`` if the file is unusable.
+    :rtype: tuple
+    """
+    try:
+        if raw is None:
+            with open(source, 'rb') as f:
+                raw = f.read()
+        data = json_module().loads(raw)
+        if not isinstance(data, dict):
+            raise ValueError("Expected a JSON object")
+        if 'student_id' in data:
+            entity = Student(data['name'], data['age'], data['email'], data['student_id'])
+            entity.registered_courses = list(data.get('registered_courses', []))
+        elif 'instructor_id' in data:
+            entity = Instructor(data['name'], data['age'], data['email'], data['instructor_id'])
+            entity.assigned_courses = list(data.get('assigned_courses', []))
+        elif 'course_id' in data:
+            entity = Course(data['course_id'], data['course_name'], data.get('instructor'), data.get('capacity'),
+                            data.get('meetings', ''))
+            entity.enrolled_students = list(data.get('enrolled_students', []))
+        else:
+            entity = Person(data['name'], data['age'], data['_email'])
+        return source, entity, None
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        return source, None, (type(e).__name__, str(e))
+
+
+def _write_entity(path, data):
+    """
+    Write one entity's data the way its ``save_to_file`` method does, without printing.
+
+    :param path: The file to write.
+    :type path: str
+    :param data: The entity's `to_dict` data.
+    :type data: dict
+    :return: ``(path, None)``, or ``(path, (error type, message))`` if the file could not be written.
+    :rtype: tuple
+    """
+    try:
+        with open(path, 'w') as f:
+            json_module().dump(data, f, indent=4)
+        return path, None
+    except (OSError, TypeError, ValueError) as e:
+        return path, (type(e).__name__, str(e))
+
+
+class EntityReport:
+    """
+    What a bulk load or save of entity files did, and everything that went wrong.
+
+    Attributes:
+        counts (dict): The number of entities loaded or saved, by class name.
+        errors (list): One dict per file that failed, with its ``source``, the ``error`` type and a ``message``.
+        unresolved (list): One dict per reference that matched no loaded entity, with its ``source``
+            and the ``reference`` (a course ID, or an instructor or student name).
+    """
+
+    def __init__(self):
+        """
+        Initializes an empty report.
+        """
+        self.counts = {kind: 0 for kind in EntityFiles.KINDS}
+        self.errors = []
+        self.unresolved = []
+
+    @property
+    def ok(self):
+        """
+        bool: Whether every file was handled and every reference resolved.
+        """
+        return not self.errors and not self.unresolved
+
+    def add_error(self, source, error):
+        """
+        Records a file that could not be loaded or saved.
+
+        Args:
+            source (str): The file path or archive member name.
+            error (tuple): The error type name and message.
+        """
+        self.errors.append({'source': source, 'error': error[0], 'message': error[1]})
+
+    def add_unresolved(self, source, reference):
+        """
+        Records a reference that matched no loaded entity.
+
+        Args:
+            source (str): The file holding the reference.
+            reference (str): The course ID, or instructor or student name, that was not found.
+        """
+        self.unresolved.append({'source': source, 'reference': reference})
+
+    def summary(self):
+        """
+        Returns a one-line description of the report, for status messages.
+
+        Returns:
+            str: The counts, failed files and unresolved references.
+        """
+        counts = ', '.join(f"{count} {kind}s" for kind, count in self.counts.items() if count)
+        return (f"{counts or 'Nothing'} processed; {len(self.errors)} files failed; "
+                f"{len(self.unresolved)} references unresolved")
+
+
+class EntityFiles:
+    """
+    Loads and saves whole directories of the JSON files written by the ``save_to_file`` methods.
+
+    Files are parsed in a pool of worker processes, or threads, and the loaded objects are
+    then re-linked: students and instructors refer to their courses by course ID, and
+    courses to their instructor and students by name. A bad file or a dangling reference
+    does not stop a load; it is collected into the returned `EntityReport`.
+
+    A directory can also be packed into a single ZIP archive. The archive's central
+    directory indexes the files by name, so `load` can read the whole archive and `read`
+    a single entity without unpacking anything.
+
+    Attributes:
+        workers (int): The size of the pool, or None for one worker per CPU.
+        processes (bool): Whether files are parsed in worker processes rather than threads.
+    """
+
+    KINDS = ('Person', 'Student', 'Instructor', 'Course')
+
+    def __init__(self, workers=None, processes=True):
+        """
+        Initializes the loader.
+
+        Args:
+            workers (int): The size of the pool, or None for one worker per CPU.
+            processes (bool): Whether files are parsed in worker processes; threads avoid
+                the process start-up cost for small directories.
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.processes = processes
+
+    def load(self, source):
+        """
+        Loads every entity file in a directory or packed archive, then re-links their references.
+
+        Args:
+            source (str): A directory of ``*.json`` files, or an archive written by `pack` or `save`.
+
+        Returns:
+            tuple: A dict of entity lists keyed by class name (see `KINDS`), and the `EntityReport`.
+        """
+        import glob
+        import zipfile
+        if zipfile.is_zipfile(source):
+            with zipfile.ZipFile(source) as archive:
+                names = [name for name in archive.namelist() if name.endswith('.json')]
+                jobs = (names, [archive.read(name) for name in names])
+        else:
+            jobs = (sorted(glob.glob(os.path.join(source, '*.json'))),)
+
+        entities = {kind: [] for kind in self.KINDS}
+        sources = {}
+        report = EntityReport()
+        with self._pool() as pool:
+            for name, entity, error in pool.map(_parse_entity, *jobs, chunksize=self._chunksize(len(jobs[0]))):
+                if error:
+                    report.add_error(name, error)
+                else:
+                    entities[type(entity).__name__].append(entity)
+                    sources[id(entity)] = name
+        self._relink(entities, sources, report)
+        for kind, loaded in entities.items():
+            report.counts[kind] = len(loaded)
+        return entities, report
+
+    def read(self, archive_path, kind, key):
+        """
+        Reads a single entity from a packed archive, using the archive's index.
+
+        The entity's references are not linked: it holds course IDs or names instead.
+
+        Args:
+            archive_path (str): The archive written by `pack` or `save`.
+            kind (str): ``"Student"``, ``"Instructor"`` or ``"Course"``.
+            key (str): The student, instructor or course ID.
+
+        Returns:
+            object: The entity.
+
+        Raises:
+            KeyError: If the archive holds no such entity.
+            ValueError: If the entity's file is invalid.
+        """
+        import zipfile
+        name = self._filename(kind, key)
+        with zipfile.ZipFile(archive_path) as archive:
+            _, entity, error = _parse_entity(name, archive.read(name))
+        if error:
+            raise ValueError(f"{name}: {error[1]}")
+        return entity
+
+    def save(self, entities, destination, packed=False):
+        """
+        Saves entities to one file each, in the same format as their ``save_to_file`` methods.
+
+        Files are named after the entity's class and ID, such as ``student_S1.json``, so
+        saving again replaces the earlier files.
+
+        Args:
+            entities: A dict of entity lists as returned by `load`, or any iterable of entities.
+            destination (str): The directory to write to, or the archive path when `packed`.
+            packed (bool): Whether to write a single archive instead of a directory.
+
+        Returns:
+            EntityReport: The number of entities saved per class, and the files that failed.
+        """
+        if isinstance(entities, dict):
+            entities = [entity for kind in self.KINDS for entity in entities.get(kind, ())]
+        report = EntityReport()
+        files = {}
+        for index, entity in enumerate(entities):
+            kind = type(entity).__name__
+            key = index if kind == 'Person' else getattr(entity, f"{kind.lower()}_id")
+            files[self._filename(kind, key)] = entity
+        if packed:
+            import zipfile
+            with zipfile.ZipFile(destination, 'w', zipfile.ZIP_DEFLATED) as archive:
+                for name, entity in files.items():
+                    try:
+                        archive.writestr(name, json_module().dumps(entity.to_dict(), indent=4))
+                    except (TypeError, ValueError) as e:
+                        report.add_error(name, (type(e).__name__, str(e)))
+                    else:
+                        report.counts[type(entity).__name__] += 1
+            return report
+
+        os.makedirs(destination, exist_ok=True)
+        paths = [os.path.join(destination, name) for name in files]
+        # Writing is bound by I/O, so threads are enough and nothing has to be pickled.
+        with thread_pool(self.workers) as pool:
+            results = pool.map(_write_entity, paths, [entity.to_dict() for entity in files.values()])
+            for (path, error), entity in zip(results, files.values()):
+                if error:
+                    report.add_error(path, error)
+                else:
+                    report.counts[type(entity).__name__] += 1
+        return report
+
+    def pack(self, directory, archive_path):
+        """
+        Packs a directory of entity files into a single archive, without parsing them.
+
+        Args:
+            directory (str): The directory of ``*.json`` files.
+            archive_path (str): The archive to write.
+
+        Returns:
+            int: The number of files packed.
+        """
+        import glob
+        import zipfile
+        paths = sorted(glob.glob(os.path.join(directory, '*.json')))
+        with zipfile.ZipFile(archive_path, 'w', zipfile.ZIP_DEFLATED) as archive:
+            for path in paths:
+                archive.write(path, os.path.basename(path))
+        return len(paths)
+
+    def _pool(self):
+        if self.processes:
+            from concurrent.futures import ProcessPoolExecutor
+            return ProcessPoolExecutor(max_workers=self.workers)
+        return thread_pool(self.workers)
+
+    def _chunksize(self, count):
+        # A few chunks per worker keeps the pool busy without paying per-file pickling overhead.
+        return max(1, count // (self.workers * 4))
+
+    @staticmethod
+    def _filename(kind, key):
+        from urllib.parse import quote
+        return f"{kind.lower()}_{quote(str(key), safe='')}.json"
+
+    @staticmethod
+    def _relink(entities, sources, report):
+        courses = {}
+        for course in entities['Course']:
+            if course.course_id in courses:
+                report.add_error(sources[id(course)], ('ValueError', f"Duplicate course ID: {course.course_id}"))
+            else:
+                courses[course.course_id] = course
+        entities['Course'] = list(courses.values())
+        # The names listed in the course files, resolved once the ID references are linked.
+        listed = {}
+        for course in courses.values():
+            listed[id(course)] = (course.instructor, course.enrolled_students)
+            course.instructor = None
+            course.enrolled_students = []
+
+        for student in entities['Student']:
+            course_ids, student.registered_courses = student.registered_courses, []
+            for course_id in course_ids:
+                course = courses.get(course_id)
+                if course is None:
+                    report.add_unresolved(sources[id(student)], course_id)
+                elif course not in student.registered_courses:
+                    student.registered_courses.append(course)
+                    course.enrolled_students.append(student)
+        for instructor in entities['Instructor']:
+            course_ids, instructor.assigned_courses = instructor.assigned_courses, []
+            for course_id in course_ids:
+                course = courses.get(course_id)
+                if course is None:
+                    report.add_unresolved(sources[id(instructor)], course_id)
+                elif course not in instructor.assigned_courses:
+                    instructor.assigned_courses.append(course)
+                    if course.instructor is None:
+                        course.instructor = instructor
+
+        def unique_names(people):
+            by_name = {}
+            for person in people:
+                by_name[person.name] = None if person.name in by_name else person
+            return by_name
+
+        instructors = unique_names(entities['Instructor'])
+        students = unique_names(entities['Student'])
+        for course in courses.values():
+            instructor_name, student_names = listed[id(course)]
+            if instructor_name and course.instructor is None:
+                instructor = instructors.get(instructor_name)
+                if instructor is None:
+                    report.add_unresolved(sources[id(course)], instructor_name)
+                else:
+                    course.instructor = instructor
+                    instructor.assigned_courses.append(course)
+            enrolled = {student.name for student in course.enrolled_students}
+            for name in student_names:
+                if name in enrolled:
+                    continue
+                student = students.get(name)
+                if student is None:
+                    report.add_unresolved(sources[id(course)], name)
+                else:
+                    course.enrolled_students.append(student)
+                    student.registered_courses.append(course)
+                    enrolled.add(name)
+
+
+class ReportsWindow(QWidget):
+    """
+    A window showing the reports of `RosterReports` for the current database.
+
+    The roster is read when the window opens and on "Refresh"; switching reports only
+    recomputes them from the columns already read.
+
+    Attributes:
+        db (Database): The database reported on.
+        reports (RosterReports): The columns read on the last refresh.
+    """
+
+    def __init__(self, db):
+        """
+        Initializes the window and shows the first report.
+
+        Args:
+            db (Database): The database to report on.
+        """
+        super().__init__()
+        self.db = db
+        self.reports = None
+        self.setWindowTitle("Reports")
+        self.resize(700, 500)
+        layout = QVBoxLayout(self)
+
+        controls = QHBoxLayout()
+        self.report_picker = QComboBox()
+        self.report_picker.addItems(list(RosterReports.REPORTS) + [SHARD_TRENDS_REPORT[0]])
+        self.report_picker.currentTextChanged.connect(self.show_report)
+        controls.addWidget(self.report_picker)
+        refresh_button = QPushButton("Refresh")
+        refresh_button.clicked.connect(self.refresh)
+        controls.addWidget(refresh_button)
+        layout.addLayout(controls)
+
+        self.report_table = QTableWidget()
+        self.report_table.setEditTriggers(QTableWidget.NoEditTriggers)
+        layout.addWidget(self.report_table)
+        self.status_label = QLabel()
+        layout.addWidget(self.status_label)
+        self.refresh()
+
+    def refresh(self):
+        """
+        Re-reads the roster from the database and shows the selected report again.
+        """
+        try:
+            with self.db.reading() as cursor:
+                self.reports = RosterReports.from_database(cursor)
+        except sqlite3.Error as e:
+            QMessageBox.critical(self, "Error", f"Error reading the roster: {e}")
+            return
+        self.show_report(self.report_picker.currentText())
+
+    def show_report(self, title):
+        """
+        Computes a report and fills the table with it.
+
+        The shard comparison reads every shard in `list_shards` instead of the
+        roster of the current database.
+
+        Args:
+            title (str): The report title in `RosterReports.REPORTS`, or the title in
+                `SHARD_TRENDS_REPORT`.
+        """
+        if self.reports is None:
+            return
+        started = time.perf_counter()
+        if title == SHARD_TRENDS_REPORT[0]:
+            try:
+                headers, rows = SHARD_TRENDS_REPORT[1], RosterReports.shard_trends(list_shards())
+            except sqlite3.Error as e:
+                QMessageBox.critical(self, "Error", f"Error reading the shards: {e}")
+                return
+        else:
+            headers, rows = self.reports.report(title)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self.report_table.setUpdatesEnabled(False)
+        self.report_table.clear()
+        self.report_table.setColumnCount(len(headers))
+        self.report_table.setHorizontalHeaderLabels(headers)
+        self.report_table.setRowCount(len(rows))
+        for index, row in enumerate(rows):
+            for col, value in enumerate(row):
+                self.report_table.setItem(index, col, QTableWidgetItem(str(value)))
+        self.report_table.setUpdatesEnabled(True)
+        engine = "NumPy" if numpy_module() else "Python"
+        self.status_label.setText(f"{len(rows)} rows in {elapsed_ms:.1f} ms ({engine})")
+
+
+class DuplicatesWindow(QWidget):
+    """
+    A window listing the merge suggestions of `DuplicateFinder` and merging the chosen ones.
+
+    Merged records reach the records table through the change feed, like any other
+    change to the database.
+
+    Attributes:
+        db (Database): The database checked.
+        suggestions (list): The suggestions shown, as returned by `DuplicateFinder.suggestions`.
+    """
+
+    HEADERS = ("Score", "Type", "Keep", "Duplicate")
+
+    def __init__(self, db):
+        """
+        Initializes the window and searches for duplicates.
+
+        Args:
+            db (Database): The database to check.
+        """
+        super().__init__()
+        self.db = db
+        self.suggestions = []
+        self.setWindowTitle("Duplicate People")
+        self.resize(800, 500)
+        layout = QVBoxLayout(self)
+        self.suggestion_table = QTableWidget()
+        self.suggestion_table.setColumnCount(len(self.HEADERS))
+        self.suggestion_table.setHorizontalHeaderLabels(self.HEADERS)
+        self.suggestion_table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.suggestion_table.setSelectionBehavior(QTableWidget.SelectRows)
+        layout.addWidget(self.suggestion_table)
+
+        buttons = QHBoxLayout()
+        merge_button = QPushButton("Merge Selected")
+        merge_button.clicked.connect(self.merge_selected)
+        buttons.addWidget(merge_button)
+        refresh_button = QPushButton("Refresh")
+        refresh_button.clicked.connect(self.refresh)
+        buttons.addWidget(refresh_button)
+        layout.addLayout(buttons)
+        self.status_label = QLabel()
+        layout.addWidget(self.status_label)
+        self.refresh()
+
+    def refresh(self):
+        """
+        Searches the database for duplicates again and lists them.
+        """
+        started = time.perf_counter()
+        try:
+            with self.db.reading() as cursor:
+                finder = DuplicateFinder.from_database(cursor)
+        except sqlite3.Error as e:
+            QMessageBox.critical(self, "Error", f"Error reading people: {e}")
+            return
+        self.suggestions = finder.suggestions()
+        elapsed_ms = (time.perf_counter() - started) * 1000
+
+        def describe(person):
+            return f"{person[3]} ({person[2]}, {person[4]})"
+
+        self.suggestion_table.setRowCount(len(self.suggestions))
+        for index, (score, keep, duplicate) in enumerate(self.suggestions):
+            for col, value in enumerate((f"{score:.2f}", keep[1], describe(keep), describe(duplicate))):
+                self.suggestion_table.setItem(index, col, QTableWidgetItem(value))
+        self.status_label.setText(f"{len(self.suggestions)} suggestions among {len(finder.people)} people "
+                                  f"in {elapsed_ms:.0f} ms")
+
+    def merge_selected(self):
+        """
+        Merges the duplicate of each selected suggestion into the record kept.
+
+        Each merge is its own transaction; suggestions involving a record already
+        merged away are skipped.
+        """
+        rows = sorted({index.row() for index in self.suggestion_table.selectedIndexes()})
+        if not rows:
+            QMessageBox.warning(self, "Merge", "Select the suggestions to merge.")
+            return
+        merged = set()
+        try:
+            for row in rows:
+                _, keep, duplicate = self.suggestions[row]
+                if keep[:2] in merged or duplicate[:2] in merged:
+                    continue
+                self.db.write(lambda conn: DuplicateFinder.merge_rows(conn, keep[1], keep[0], duplicate[0]))
+                merged.add(duplicate[:2])
+        except sqlite3.Error as e:
+            QMessageBox.critical(self, "Error", f"Error merging records: {e}")
+        self.refresh()
+        QMessageBox.information(self, "Merge", f"{len(merged)} duplicates merged.")
+
+
+class IntegrityChecker:
+    """
+    Finds rows that refer to a student, instructor or course that no longer exists.
+
+    Deleting a student or course removes its registrations and waitlist entries through
+    triggers, but deleting an instructor leaves their courses pointing at the missing
+    row, and databases written before the triggers existed, or by tools that bypass
+    them, can hold orphaned registrations.
+
+    `scan` checks every row, with the tables split into ID ranges that are read in
+    parallel on separate connections. `check` is incremental: it reads the AuditLog
+    entries appended since the last check and only looks at the rows they touched and
+    at the rows referring to deleted ones. `repair` deletes orphaned registrations and
+    waitlist entries and unassigns courses from missing instructors.
+
+    Attributes:
+        path (str): The path of the database file.
+        workers (int): Number of connections `scan` reads with in parallel.
+        orphans (dict): The missing row ID per ``(table, row ID, column)`` found so far.
+        last_seq (int): The last AuditLog entry `orphans` accounts for, or None before
+            the first scan.
+    """
+
+    REFERENCES = (
+        ('Registrations', 'student_id', 'Students'),
+        ('Registrations', 'course_id', 'Courses'),
+        ('Waitlist', 'student_id', 'Students'),
+        ('Waitlist', 'course_id', 'Courses'),
+        ('Courses', 'instructor_id', 'Instructors'),
+    )
+    SCAN_RANGE = 50000
+
+    def __init__(self, path=DB_PATH, workers=4):
+        """
+        Initializes the checker; nothing is read until the first `check` or `scan`.
+
+        Args:
+            path (str): The path of the database file.
+            workers (int): Number of connections `scan` reads with in parallel.
+        """
+        self.path = path
+        self.workers = workers
+        self.orphans = {}
+        self.last_seq = None
+
+    def scan(self):
+        """
+        Checks every referring row, replacing the orphans found so far.
+
+        Returns:
+            list: ``(table, row ID, column, missing ID)`` per orphan.
+        """
+        conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True)
+        try:
+            # Taken first, so changes made during the scan are checked again by the next `check`.
+            last_seq = conn.execute("SELECT COALESCE(MAX(seq), 0) FROM AuditLog").fetchone()[0]
+            tasks = []
+            for table, column, target in self.REFERENCES:
+                low, high = conn.execute(f"SELECT MIN(id), MAX(id) FROM {table}").fetchone()
+                if low is not None:
+                    tasks += [(table, column, target, start, start + self.SCAN_RANGE - 1)
+                              for start in range(low, high + 1, self.SCAN_RANGE)]
+        finally:
+            conn.close()
+        # SQLite releases the GIL while it runs a query, so threads read the ranges in parallel.
+        with thread_pool(self.workers) as pool:
+            found = [orphan for orphans in pool.map(self._scan_range, tasks) for orphan in orphans]
+        self.orphans = {orphan[:3]: orphan[3] for orphan in found}
+        self.last_seq = last_seq
+        return found
+
+    def check(self, conn):
+        """
+        Checks the rows changed since the last check, and whether known orphans remain.
+
+        The first call runs a full `scan` instead.
+
+        Args:
+            conn (sqlite3.Connection): A connection to the school database.
+
+        Returns:
+            list: ``(table, row ID, column, missing ID)`` per orphan found by this call.
+        """
+        if self.last_seq is None:
+            return self.scan()
+        changed = {}
+        deleted = {}
+        last_seq = self.last_seq
+        for last_seq, table, row_id, removed in conn.execute(
+                "SELECT seq, table_name, row_id, data IS NULL FROM AuditLog WHERE seq > ? ORDER BY seq",
+                (self.last_seq,)):
+            (deleted if removed else changed).setdefault(table, set()).add(row_id)
+        known = {}
+        for table, row_id, column in self.orphans:
+            known.setdefault((table, column), set()).add(row_id)
+        self.orphans = {}
+        found = []
+        for table, column, target in self.REFERENCES:
+            by_id = known.get((table, column), set()) | changed.get(table, set())
+            rows = self._orphans(conn, table, column, target, "r.id", by_id)
+            rows += self._orphans(conn, table, column, target, f"r.{column}", deleted.get(target, set()))
+            for row_id, missing_id in rows:
+                if (table, row_id, column) not in self.orphans:
+                    self.orphans[table, row_id, column] = missing_id
+                    if row_id not in known.get((table, column), ()):
+                        found.append((table, row_id, column, missing_id))
+        self.last_seq = last_seq
+        return found
+
+    def repair(self, conn):
+        """
+        Deletes the orphaned registrations and waitlist entries, and unassigns the courses
+        of missing instructors.
+
+        Meant for `Database.write`; run `check` afterwards to drop the repaired orphans.
+
+        Args:
+            conn (sqlite3.Connection): A connection inside a write transaction.
+
+        Returns:
+            int: The number of rows repaired.
+        """
+        repaired = 0
+        for table, column, target in self.REFERENCES:
+            row_ids = [row_id for orphan_table, row_id, orphan_column in self.orphans
+                       if (orphan_table, orphan_column) == (table, column)]
+            for start in range(0, len(row_ids), 500):
+                chunk = row_ids[start:start + 500]
+                marks = ", ".join("?" * len(chunk))
+                # Only rows still referring to a missing row are touched.
+                missing = f"{column} IS NOT NULL AND {column} NOT IN (SELECT id FROM {target})"
+                if table == 'Courses':
+                    sql = f"UPDATE Courses SET {column} = NULL WHERE id IN ({marks}) AND {missing}"
+                else:
+                    sql = f"DELETE FROM {table} WHERE id IN ({marks}) AND {missing}"
+                repaired += conn.execute(sql, chunk).rowcount
+        return repaired
+
+    @staticmethod
+    def _orphans(conn, table, column, target, key, values):
+        values = list(values)
+        rows = []
+        for start in range(0, len(values), 500):
+            chunk = values[start:start + 500]
+            rows += conn.execute(
+                f"SELECT r.id, r.{column} FROM {table} r LEFT JOIN {target} t ON t.id = r.{column} "
+                f"WHERE {key} IN ({', '.join('?' * len(chunk))}) AND r.{column} IS NOT NULL AND t.id IS NULL",
+                chunk).fetchall()
+        return rows
+
+    def _scan_range(self, task):
+        table, column, target, start, stop = task
+        conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True)
+        try:
+            return [(table, row_id, column, missing_id) for row_id, missing_id in conn.execute(
+                f"SELECT r.id, r.{column} FROM {table} r LEFT JOIN {target} t ON t.id = r.{column} "
+                f"WHERE r.id BETWEEN ? AND ? AND r.{column} IS NOT NULL AND t.id IS NULL", (start, stop))]
+        finally:
+            conn.close()
+
+
+class SnapshotWindow(QWidget):
+    """
+    A read-only window paging through a `Snapshot`, one page of decoded rows at a time.
+
+    Attributes:
+        snapshot (Snapshot): The mapped snapshot.
+        page (int): The page shown, from 0.
+    """
+
+    def __init__(self, snapshot):
+        """
+        Initializes the window and shows the first page.
+
+        Args:
+            snapshot (Snapshot): The snapshot to show; the window closes it when closed.
+        """
+        super().__init__()
+        self.snapshot = snapshot
+        self.page = 0
+        self.setWindowTitle(f"Snapshot - {os.path.basename(snapshot.path)}")
+        self.resize(800, 500)
+        layout = QVBoxLayout(self)
+
+        controls = QHBoxLayout()
+        self.search_input = QLineEdit()
+        self.search_input.setPlaceholderText("Name starts with...")
+        self.search_input.returnPressed.connect(self.search)
+        controls.addWidget(self.search_input)
+        previous_button = QPushButton("Previous")
+        previous_button.clicked.connect(lambda: self.show_page(self.page - 1))
+        controls.addWidget(previous_button)
+        next_button = QPushButton("Next")
+        next_button.clicked.connect(lambda: self.show_page(self.page + 1))
+        controls.addWidget(next_button)
+        layout.addLayout(controls)
+
+        self.snapshot_table = QTableWidget()
+        self.snapshot_table.setColumnCount(len(snapshot.columns))
+        self.snapshot_table.setHorizontalHeaderLabels(snapshot.columns)
+        self.snapshot_table.setEditTriggers(QTableWidget.NoEditTriggers)
+        layout.addWidget(self.snapshot_table)
+        self.status_label = QLabel()
+        layout.addWidget(self.status_label)
+        self.show_page(0)
+
+    def show_page(self, page):
+        """
+        Decodes and shows one page of rows.
+
+        Args:
+            page (int): The page number; it is clamped to the existing pages.
+        """
+        pages = max((len(self.snapshot) + SNAPSHOT_PAGE_SIZE - 1) // SNAPSHOT_PAGE_SIZE, 1)
+        self.page = min(max(page, 0), pages - 1)
+        start = self.page * SNAPSHOT_PAGE_SIZE
+        self.fill(self.snapshot.rows(start, start + SNAPSHOT_PAGE_SIZE))
+        self.status_label.setText(f"Page {self.page + 1} of {pages} ({len(self.snapshot)} rows)")
+
+    def search(self):
+        """
+        Shows the rows whose name starts with the search text, or the current page if it is empty.
+        """
+        prefix = self.search_input.text().strip()
+        if not prefix:
+            self.show_page(self.page)
+            return
+        rows = self.snapshot.search(prefix, limit=SNAPSHOT_PAGE_SIZE)
+        self.fill(rows)
+        self.status_label.setText(f"{len(rows)} rows starting with {prefix!r}")
+
+    def fill(self, rows):
+        """
+        Replaces the table contents with rows.
+
+        Args:
+            rows (list): The rows to show.
+        """
+        self.snapshot_table.setUpdatesEnabled(False)
+        self.snapshot_table.setRowCount(len(rows))
+        for index, row in enumerate(rows):
+            for col, value in enumerate(row):
+                self.snapshot_table.setItem(index, col, QTableWidgetItem(str(value)))
+        self.snapshot_table.setUpdatesEnabled(True)
+
+    def closeEvent(self, event):
+        self.snapshot.close()
+        super().closeEvent(event)
+
+
+class CourseRosterWindow(QWidget):
+    """
+    A course's details, average grade and roster, with the students read a page at a time.
+
+    The first `ROSTER_PAGE_SIZE` students are read when the window opens and the next
+    page whenever the roster is scrolled to its end. Pages follow the registration
+    order, continuing after the last registration shown, which ``idx_registrations_course``
+    serves without sorting, so a page costs the same at any depth.
+
+    Attributes:
+        db (Database): The database the roster is read from.
+        course_id (str): The course ID shown in the records table.
+        total (int): Number of students registered when the window was last reloaded.
+    """
+
+    def __init__(self, db, course_id):
+        """
+        Initializes the window and reads the course and the first page of its roster.
+
+        Args:
+            db (Database): The database to read from.
+            course_id (str): The course ID shown in the records table.
+        """
+        super().__init__()
+        self.db = db
+        self.course_id = course_id
+        self.total = 0
+        self._row_id = None
+        self._last_registration = 0
+        self.setWindowTitle(f"Course - {course_id}")
+        self.resize(500, 450)
+        layout = QVBoxLayout(self)
+
+        self.details_label = QLabel()
+        layout.addWidget(self.details_label)
+        self.roster_table = QTableWidget()
+        self.roster_table.setColumnCount(4)
+        self.roster_table.setHorizontalHeaderLabels(["Student ID", "Name", "Email", "Grade"])
+        self.roster_table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.roster_table.verticalScrollBar().valueChanged.connect(self.on_scroll)
+        layout.addWidget(self.roster_table)
+
+        controls = QHBoxLayout()
+        self.status_label = QLabel()
+        controls.addWidget(self.status_label)
+        refresh_button = QPushButton("Refresh")
+        refresh_button.clicked.connect(self.reload)
+        controls.addWidget(refresh_button)
+        layout.addLayout(controls)
+        self.reload()
+
+    def reload(self):
+        """
+        Reads the course details again and shows its roster from the first page.
+        """
+        with self.db.reading() as cursor:
+            course = cursor.execute(
+                "SELECT Courses.id, Courses.course_name, Courses.capacity, Courses.meetings, "
+                "Instructors.name, Instructors.instructor_id, "
+                "(SELECT COUNT(*) FROM Registrations WHERE Registrations.course_id = Courses.id), "
+                "GradeTotals.points / GradeTotals.graded, GradeTotals.graded "
+                "FROM Courses LEFT JOIN Instructors ON Instructors.id = Courses.instructor_id "
+                "LEFT JOIN GradeTotals ON GradeTotals.record_type = 'Course' AND GradeTotals.row_id = Courses.id "
+                "WHERE Courses.course_id = ?", (self.course_id,)).fetchone()
+        self.roster_table.setRowCount(0)
+        self._last_registration = 0
+        if course is None:
+            self._row_id = None
+            self.total = 0
+            self.details_label.setText(f"Course {self.course_id} no longer exists.")
+            self.status_label.setText("")
+            return
+        self._row_id, name, capacity, meetings, instructor, instructor_id, self.total, average, graded = course
+        self.details_label.setText(
+            f"{self.course_id}  {name}\n"
+            f"Instructor: {f'{instructor} ({instructor_id})' if instructor else 'None'}\n"
+            f"Meetings: {meetings or 'not set'}\n"
+            f"Seats: {self.total} of {capacity if capacity is not None else 'unlimited'} taken\n"
+            f"Average grade: {f'{average:.2f} over {graded} graded' if graded else 'no grades yet'}")
+        self.load_more()
+
+    def load_more(self):
+        """
+        Reads and appends the next page of students.
+        """
+        if self._row_id is None:
+            return
+        with self.db.reading() as cursor:
+            rows = cursor.execute(
+                "SELECT Registrations.id, Students.student_id, Students.name, Students.email, Registrations.grade "
+                "FROM Registrations "
+                "JOIN Students ON Students.id = Registrations.student_id "
+                "WHERE Registrations.course_id = ? AND Registrations.id > ? ORDER BY Registrations.id LIMIT ?",
+                (self._row_id, self._last_registration, ROSTER_PAGE_SIZE)).fetchall()
+        if rows:
+            self._last_registration = rows[-1][0]
+        start = self.roster_table.rowCount()
+        self.roster_table.setUpdatesEnabled(False)
+        self.roster_table.setRowCount(start + len(rows))
+        for index, row in enumerate(rows, start):
+            for col, value in enumerate(row[1:4] + (format_grade(row[4]),)):
+                self.roster_table.setItem(index, col, QTableWidgetItem(str(value)))
+        self.roster_table.setUpdatesEnabled(True)
+        if len(rows) < ROSTER_PAGE_SIZE:
+            # The end of the roster; registrations made or dropped since the reload are counted.
+            self.total = self.roster_table.rowCount()
+        self.status_label.setText(f"Showing {self.roster_table.rowCount()} of {self.total} students")
+
+    def on_scroll(self, value):
+        """
+        Reads the next page once the roster is scrolled to its end.
+
+        Args:
+            value (int): The position of the vertical scroll bar.
+        """
+        if value >= self.roster_table.verticalScrollBar().maximum() and self.roster_table.rowCount() < self.total:
+            self.load_more()
+
+
+def _load_test_clerk(db_path, mix, rate, deadline, clerk, seed):
+    """
+    Runs one simulated clerk until the deadline, like one app instance at one desk.
+
+    Every operation goes through a `WriteBehindQueue` and is flushed right away, as a
+    clerk submitting a form would; each clerk has its own connections.
+
+    :return: ``(operation, latency in ms, error type or None)`` per operation, and the
+        clerk's `Database.stats`.
+    :rtype: tuple
+    """
+    import random
+    rng = random.Random(seed)
+    db = Database(db_path)
+    queue = WriteBehindQueue(db)
+    operations, weights = zip(*mix.items())
+    with db.reading() as cursor:
+        courses = [row[0] for row in cursor.execute("SELECT id FROM Courses WHERE course_id LIKE 'LTC%'")]
+        instructors = [row[0] for row in cursor.execute(
+            "SELECT instructor_id FROM Instructors WHERE instructor_id LIKE 'LTI%'")]
+    created = []
+    samples = []
+    interval = 1 / rate if rate else 0
+    next_at = time.perf_counter()
+    for number in count():
+        if interval:
+            delay = next_at - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            next_at += interval
+        if time.time() >= deadline:
+            break
+        operation = rng.choices(operations, weights)[0]
+        if operation == 'delete_record' and not created:
+            operation = 'add_student'  # Nothing of this clerk's to delete yet.
+        key = f"{clerk}-{number}"
+        if operation == 'add_student':
+            queue.insert('Student', {'name': f"Load Test {key}", 'age': rng.randint(17, 40),
+                                     'email': f"lt{key}@example.com", 'student_id': f"LTS{key}"})
+            queue.register(f"LTS{key}", rng.choice(courses))
+            created.append(f"LTS{key}")
+        elif operation == 'assign_course':
+            queue.assign(rng.choice(courses), rng.choice(instructors))
+        elif operation == 'add_course':
+            queue.insert('Course', {'course_id': f"LTX{key}", 'course_name': f"Load Test Course {key}"})
+        else:
+            queue.delete('Student', created.pop(rng.randrange(len(created))))
+        started = time.perf_counter()
+        try:
+            failures = queue.flush()
+            error = type(failures[0][3]).__name__ if failures else None
+        except sqlite3.Error as e:
+            queue = WriteBehindQueue(db)
+            error = type(e).__name__
+        samples.append((operation, (time.perf_counter() - started) * 1000, error))
+    stats = db.stats()
+    db.close()
+    return samples, stats
+
+
+def _load_test_process(db_path, mix, rate, deadline, clerks, prefix):
+    """
+    Runs several clerks on threads of one process and collects their results.
+
+    Clerk names start with ``prefix``; they seed the clerk's random choices and make the
+    IDs it creates unique.
+    """
+    with thread_pool(clerks) as pool:
+        futures = [pool.submit(_load_test_clerk, db_path, mix, rate, deadline, f"{prefix}.{clerk}", f"{prefix}.{clerk}")
+                   for clerk in range(clerks)]
+        return [future.result() for future in futures]
+
+
+class LoadTest:
+    """
+    A load generator for the write paths of the window, driven headlessly.
+
+    Many simulated clerks run `add_student`, `assign_course`, `add_course` and
+    `delete_record` style operations against one database at once, on threads of
+    several processes, in a configurable mix and at a configurable rate per clerk.
+    Each operation is queued and flushed the way the window does it, so retries and
+    lock waits go through `Database.write`.
+
+    Run it on a copy of the database: it adds load test courses, instructors and
+    students (IDs starting with ``LT``), and leaves the ones it did not delete.
+
+    Attributes:
+        db_path (str): The database under test.
+        processes (int): Number of processes.
+        clerks (int): Number of clerks (threads) per process.
+        duration (float): Length of the run, in seconds.
+        mix (dict): Relative weight of each operation.
+        rate (float): Operations per second per clerk; 0 runs them back to back.
+    """
+
+    def __init__(self, db_path, processes=1, clerks=4, duration=10.0, mix=None, rate=0.0):
+        """
+        Configures a run.
+
+        Args:
+            db_path (str): The database under test; the schema is created if needed.
+            processes (int): Number of processes.
+            clerks (int): Number of clerks (threads) per process.
+            duration (float): Length of the run, in seconds.
+            mix (dict): Relative weight of each operation; defaults to `LOAD_TEST_MIX`.
+            rate (float): Operations per second per clerk; 0 runs them back to back.
+
+        Raises:
+            ValueError: If the mix names an unknown operation or has no positive weight.
+        """
+        self.db_path = db_path
+        self.processes = processes
+        self.clerks = clerks
+        self.duration = duration
+        self.mix = dict(mix or LOAD_TEST_MIX)
+        self.rate = rate
+        unknown = set(self.mix) - set(LOAD_TEST_MIX)
+        if unknown or not any(weight > 0 for weight in self.mix.values()):
+            raise ValueError(f"Invalid operation mix {self.mix}; operations are {', '.join(LOAD_TEST_MIX)}")
+
+    def run(self, label=''):
+        """
+        Seeds the database, runs the clerks and summarizes their operations.
+
+        Args:
+            label (str): A name for the run in the saved results.
+
+        Returns:
+            dict: The report, see `summarize`.
+        """
+        from datetime import datetime
+        create_database(self.db_path)
+        self._seed()
+        started = time.time()
+        deadline = started + self.duration
+        # The start time keeps the IDs of this run apart from those left by earlier runs.
+        arguments = [(self.db_path, self.mix, self.rate, deadline, self.clerks, f"{started:.0f}.{process}")
+                     for process in range(self.processes)]
+        if self.processes > 1:
+            from concurrent.futures import ProcessPoolExecutor
+            with ProcessPoolExecutor(max_workers=self.processes) as pool:
+                results = [clerk for process in pool.map(_load_test_process, *zip(*arguments)) for clerk in process]
+        else:
+            results = _load_test_process(*arguments[0])
+        report = self.summarize(results, time.time() - started)
+        report.update({
+            'label': label,
+            'started': datetime.fromtimestamp(started).isoformat(timespec='seconds'),
+            'db_path': self.db_path,
+            'config': {'processes': self.processes, 'clerks': self.clerks, 'duration': self.duration,
+                       'mix': self.mix, 'rate': self.rate},
+        })
+        return report
+
+    @staticmethod
+    def summarize(results, elapsed):
+        """
+        Aggregates the samples and connection statistics of every clerk.
+
+        Args:
+            results (list): ``(samples, stats)`` per clerk, as returned by the workers.
+            elapsed (float): Wall-clock length of the run, in seconds.
+
+        Returns:
+            dict: Throughput, error rate, lock wait and retries, and latency
+            percentiles overall and per operation, in milliseconds.
+        """
+        def percentiles(latencies):
+            latencies = sorted(latencies)
+            if not latencies:
+                return {'p50': 0.0, 'p95': 0.0, 'p99': 0.0, 'max': 0.0}
+            pick = lambda fraction: latencies[min(len(latencies) - 1, int(fraction * len(latencies)))]
+            return {'p50': pick(0.5), 'p95': pick(0.95), 'p99': pick(0.99), 'max': latencies[-1]}
+
+        samples = [sample for clerk_samples, _ in results for sample in clerk_samples]
+        errors = {}
+        for _, _, error in samples:
+            if error is not None:
+                errors[error] = errors.get(error, 0) + 1
+        by_operation = {}
+        for operation in sorted({sample[0] for sample in samples}):
+            chosen = [sample for sample in samples if sample[0] == operation]
+            by_operation[operation] = dict(percentiles([latency for _, latency, _ in chosen]), count=len(chosen),
+                                           errors=sum(error is not None for _, _, error in chosen))
+        total_errors = sum(errors.values())
+        return {
+            'elapsed_s': elapsed,
+            'operations': len(samples),
+            'throughput': len(samples) / elapsed if elapsed else 0.0,
+            'errors': total_errors,
+            'error_rate': total_errors / len(samples) if samples else 0.0,
+            'error_types': errors,
+            'lock_wait_ms': sum(stats['wait_ms'] for _, stats in results),
+            'retries': sum(stats['retries'] for _, stats in results),
+            'latency_ms': percentiles([latency for _, latency, _ in samples]),
+            'by_operation': by_operation,
+        }
+
+    @staticmethod
+    def save(report, path=LOAD_TEST_RESULTS):
+        """
+        Appends a report to the results file.
+
+        Args:
+            report (dict): A report returned by `run`.
+            path (str): The results file, one JSON report per line.
+        """
+        with open(path, 'a') as f:
+            f.write(json_module().dumps(report) + '\n')
+
+    @staticmethod
+    def load(path=LOAD_TEST_RESULTS):
+        """
+        Reads the saved reports, oldest first.
+
+        Args:
+            path (str): The results file.
+
+        Returns:
+            list: The reports; empty if the file does not exist.
+        """
+        if not os.path.exists(path):
+            return []
+        with open(path) as f:
+            return [json_module().loads(line) for line in f if line.strip()]
+
+    @staticmethod
+    def compare(reports):
+        """
+        Formats reports side by side, one line per run.
+
+        Args:
+            reports (list): Reports returned by `run` or `load`.
+
+        Returns:
+            str: A text table of the throughput, latency, lock wait and errors of each run.
+        """
+        lines = [f"{'started':<20} {'label':<16} {'procs':>5} {'clerks':>6} {'ops/s':>9} {'p50 ms':>8} "
+                 f"{'p95 ms':>8} {'p99 ms':>8} {'wait ms':>10} {'retries':>7} {'errors':>7}"]
+        for report in reports:
+            config, latency = report['config'], report['latency_ms']
+            lines.append(f"{report['started']:<20} {report['label'][:16]:<16} {config['processes']:>5} "
+                         f"{config['clerks']:>6} {report['throughput']:>9.1f} {latency['p50']:>8.1f} "
+                         f"{latency['p95']:>8.1f} {latency['p99']:>8.1f} {report['lock_wait_ms']:>10.0f} "
+                         f"{report['retries']:>7} {report['error_rate']:>7.1%}")
+        return '\n'.join(lines)
+
+    def _seed(self):
+        # Courses and instructors for the clerks to register students in and assign.
+        def work(conn):
+            conn.executemany("INSERT OR IGNORE INTO Instructors (name, age, email, instructor_id) VALUES (?, ?, ?, ?)",
+                             [(f"Load Test Instructor {n}", 45, f"lti{n}@example.com", f"LTI{n}") for n in range(20)])
+            conn.executemany("INSERT OR IGNORE INTO Courses (course_id, course_name) VALUES (?, ?)",
+                             [(f"LTC{n}", f"Load Test Seed Course {n}") for n in range(50)])
+        db = Database(self.db_path)
+        try:
+            db.write(work)
+        finally:
+            db.close()
+
+
+class ChangeFeed:
+    """
+    Follows the changes committed to the records by any connection to the database.
+
+    Triggers created in `create_database` append one ChangeLog entry per inserted,
+    updated or deleted student, instructor or course, with the old name, ID and email
+    for updates and deletes. The feed reads through the database's read connection and
+    checks ``PRAGMA data_version`` first, which only changes after another connection
+    commits, so polling an idle database does not touch the log at all.
+
+    Attributes:
+        last_seq (int): The ChangeLog sequence number of the last change read.
+    """
+
+    def __init__(self, db):
+        """
+        Starts the feed after the latest logged change.
+
+        Args:
+            db (Database): The database to follow.
+        """
+        self.db = db
+        self.last_seq = db.reader.execute("SELECT COALESCE(MAX(seq), 0) FROM ChangeLog").fetchone()[0]
+        self.data_version = self._data_version()
+        self._pruned_seq = 0
+
+    def poll(self):
+        """
+        Returns the changes committed since the previous call.
+
+        Returns:
+            list: Tuples of (record type, row ID, old values) in commit order, where the
+            old values are a `record_change` dict, or None for inserts. Returns None
+            instead if older entries were pruned before this feed read them.
+        """
+        version = self._data_version()
+        if version == self.data_version:
+            return []
+        self.data_version = version
+        rows = self.db.reader.execute(
+            "SELECT seq, record_type, row_id, old_name, old_record_id, old_email FROM ChangeLog "
+            "WHERE seq > ? ORDER BY seq", (self.last_seq,)).fetchall()
+        if not rows:
+            return []
+        # Sequence numbers have no gaps, so a jump means entries were pruned unread.
+        complete = rows[0][0] == self.last_seq + 1
+        self.last_seq = rows[-1][0]
+        self._prune()
+        if not complete:
+            return None
+        return [(record_type, row_id, None if old_id is None else
+                 {'name': old_name or '', 'record_id': old_id, 'email': old_email or ''})
+                for _, record_type, row_id, old_name, old_id, old_email in rows]
+
+    def _data_version(self):
+        return self.db.reader.execute("PRAGMA data_version").fetchone()[0]
+
+    def _prune(self):
+        # Trim the log in steps of a tenth of the retention, not on every poll.
+        cutoff = self.last_seq - CHANGE_LOG_RETENTION
+        if cutoff - self._pruned_seq >= CHANGE_LOG_RETENTION // 10:
+            self.db.write(lambda conn: conn.execute("DELETE FROM ChangeLog WHERE seq <= ?", (cutoff,)))
+            self._pruned_seq = cutoff
+
+
+class WriteBehindQueue:
+    """
+    Queues record writes and applies them later in one transaction.
+
+    Writes to the same record are coalesced while they wait: an update is merged into
+    a pending insert or update of that record, a delete replaces them, and an insert
+    followed by a delete cancels out, as do a registration and an unregistration of the
+    same student and course. Registrations, grades and course assignments are queued
+    by the user-facing IDs of the records involved, so they can refer to records that
+    are still in the queue.
+
+    Attributes:
+        db (Database): The database the writes are applied to.
+        queued (int): Number of writes submitted.
+        coalesced (int): Number of writes merged into or cancelled by others.
+        flushes (int): Number of flushes that wrote something.
+    """
+
+    def __init__(self, db):
+        """
+        Initializes an empty queue.
+
+        Args:
+            db (Database): The database the writes are applied to.
+        """
+        self.db = db
+        self.queued = 0
+        self.coalesced = 0
+        self.flushes = 0
+        self._entries = []
+        self._latest = {}
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def insert(self, record_type, fields):
+        """
+        Queues a new student, instructor or course.
+
+        Args:
+            record_type (str): One of ``Student``, ``Instructor`` or ``Course``.
+            fields (dict): The new row's values by column name, including its ID column.
+        """
+        record_id = fields[RECORD_SOURCES[record_type][1]['record_id']]
+        entry = self._pending('record', record_type, record_id)
+        if entry is not None and entry[0] == 'delete':
+            entry[0], entry[3] = 'replace', dict(fields)
+            self.coalesced += 1
+        else:
+            # Anything else is kept, so inserting an existing ID fails as it would unqueued.
+            self._append('insert', record_type, record_id, dict(fields))
+
+    def update(self, record_type, record_id, fields):
+        """
+        Queues new values for some columns of a record.
+
+        Args:
+            record_type (str): One of ``Student``, ``Instructor`` or ``Course``.
+            record_id (str): The record's current ID.
+            fields (dict): The new values by column name.
+        """
+        if not fields:
+            return
+        entry = self._pending('record', record_type, record_id)
+        if entry is None:
+            self._append('update', record_type, record_id, dict(fields))
+            return
+        self.coalesced += 1
+        if entry[0] != 'delete':
+            entry[3].update(fields)
+
+    def delete(self, record_type, record_id):
+        """
+        Queues the deletion of a record.
+
+        Args:
+            record_type (str): One of ``Student``, ``Instructor`` or ``Course``.
+            record_id (str): The record's ID.
+        """
+        entry = self._pending('record', record_type, record_id)
+        if entry is None:
+            self._append('delete', record_type, record_id, None)
+            return
+        self.coalesced += 1
+        if entry[0] == 'insert':
+            # The record was never written, so neither is needed.
+            self._cancel(entry, ('record', record_type, record_id))
+        else:
+            entry[0], entry[3] = 'delete', None
 
-    def delete_record(self):
+    def register(self, student_id, course_db_id, priority=0):
         """
-        Deletes the selected record from the records table and database.
+        Queues the registration of a student for a course.
 
-        Raises:
-        -------
-        ValueError:
-            If no row is selected for deletion.
-        sqlite3.Error:
-            If an error occurs during the deletion in the database.
+        If the course is full when the queue is flushed, the student joins its
+        waitlist instead (see `create_database`).
+
+        Args:
+            student_id (str): The student's ID.
+            course_db_id (int): The course's database ID.
+            priority (int): The student's waitlist priority if the course is full; higher goes first.
         """
-        selected_row = self.records_table.currentRow()
-        if selected_row == -1:
-            QMessageBox.warning(self, "Delete Error", "Please select a record to delete.")
+        entry = self._pending('register', student_id, course_db_id)
+        if entry is not None:
+            self.coalesced += 1
+            if entry[0] == 'unregister':
+                self._cancel(entry, ('register', student_id, course_db_id))
+            else:
+                entry[3] = priority
             return
-        record_type = self.records_table.item(selected_row, 0).text()
-        record_id = self.records_table.item(selected_row, 2).text() 
-
-        record_id = record_id.split(': ')[-1]  
+        self._append('register', student_id, course_db_id, priority)
 
-        conn = sqlite3.connect('school_management_system.db')
-        cursor = conn.cursor()
+    def unregister(self, student_id, course_db_id):
+        """
+        Queues the removal of a student from a course, or from its waitlist.
 
-        try:
-            if record_type == "Student":
-                cursor.execute("DELETE FROM Students WHERE student_id = ?", (record_id,))
-                QMessageBox.information(self, "Success", f"Student with ID {record_id} deleted successfully.")
+        A freed seat goes to the first student on the course's waitlist.
 
-            elif record_type == "Instructor":
-                cursor.execute("DELETE FROM Instructors WHERE instructor_id = ?", (record_id,))
-                QMessageBox.information(self, "Success", f"Instructor with ID {record_id} deleted successfully.")
+        Args:
+            student_id (str): The student's ID.
+            course_db_id (int): The course's database ID.
+        """
+        entry = self._pending('register', student_id, course_db_id)
+        if entry is not None:
+            self.coalesced += 1
+            if entry[0] == 'register':
+                self._cancel(entry, ('register', student_id, course_db_id))
+            return
+        self._append('unregister', student_id, course_db_id, None)
 
-            elif record_type == "Course":
-                cursor.execute("DELETE FROM Courses WHERE course_id = ?", (record_id,))
-                QMessageBox.information(self, "Success", f"Course with ID {record_id} deleted successfully.")
+    def assign(self, course_db_id, instructor_id):
+        """
+        Queues the assignment of an instructor to a course; the last assignment wins.
 
-            conn.commit()
-        except sqlite3.Error as e:
-            QMessageBox.critical(self, "Database Error", f"An error occurred: {e}")
-        finally:
+        Args:
+            course_db_id (int): The course's database ID.
+            instructor_id (str): The instructor's ID.
+        """
+        entry = self._pending('assign', course_db_id, None)
+        if entry is not None:
+            entry[3] = instructor_id
+            self.coalesced += 1
+            return
+        self._append('assign', course_db_id, None, instructor_id)
 
-            conn.close()
+    def grade(self, student_id, course_db_id, points):
+        """
+        Queues a student's grade for a course they are registered for; the last grade wins.
 
-       
-        self.update_records_table()
+        Args:
+            student_id (str): The student's ID.
+            course_db_id (int): The course's database ID.
+            points (float): The grade points, or None to clear the grade.
+        """
+        entry = self._pending('grade', student_id, course_db_id)
+        if entry is not None:
+            entry[3] = points
+            self.coalesced += 1
+            return
+        self._append('grade', student_id, course_db_id, points)
 
-    def save_data_to_file(self):
+    def flush(self):
         """
-        Saves all student, instructor, and course data to a JSON file.
+        Writes every queued change in one transaction and empties the queue.
 
-        This method allows the user to save the current state of the school management system to a file,
-        which can be reloaded later.
+        Each write runs in its own savepoint, so a write the database rejects, or whose
+        course has unreadable meeting times, is rolled back and reported without losing
+        the others. A registration, grade or course assignment of a student or instructor
+        whose queued insert was rejected is skipped and reported too, so it cannot
+        apply to an existing record that already has that ID. New students,
+        registrations and course assignments queue their notifications in the `Outbox`
+        within the same savepoint.
+
+        Returns:
+            list: A tuple of (action, record type, record ID, error) per rejected write.
 
         Raises:
-        -------
-        IOError:
-            If there is an error during file writing.
+            sqlite3.Error: If the transaction itself fails, for example because the
+            database stayed locked; the queue is then kept.
         """
-        self.cursor.execute("SELECT * FROM students")
-        students = self.cursor.fetchall()
-        
-        self.cursor.execute("SELECT * FROM instructors")
-        instructors = self.cursor.fetchall()
-
-        self.cursor.execute("SELECT * FROM courses")
-        courses = self.cursor.fetchall()
+        entries = [entry for entry in self._entries if entry[0] is not None]
+        if not entries:
+            self._entries, self._latest, self._size = [], {}, 0
+            return []
+
+        def apply(conn):
+            failures = []
+            rejected = set()
+            schedules = ScheduleIndex(conn)
+            for entry in entries:
+                needs = self._requires(*entry)
+                if needs in rejected:
+                    failures.append((entry[0], entry[1], entry[2], ValueError(f"{needs[0]} {needs[1]} was not saved")))
+                    continue
+                conn.execute("SAVEPOINT queued_write")
+                try:
+                    self._check_schedule(schedules, *entry)
+                    changed = [conn.execute(sql, params).rowcount for sql, params in self._statements(*entry)]
+                    self._notify(conn, *entry, changed[0])
+                    self._track_schedule(schedules, *entry, changed[0])
+                except (sqlite3.Error, ValueError) as e:
+                    if is_busy_error(e):
+                        raise
+                    conn.execute("ROLLBACK TO queued_write")
+                    failures.append((entry[0], entry[1], entry[2], e))
+                    if entry[0] in ('insert', 'replace'):
+                        rejected.add((entry[1], entry[2]))
+                conn.execute("RELEASE queued_write")
+            return failures
+
+        failures = self.db.write(apply)
+        self._entries, self._latest, self._size = [], {}, 0
+        self.flushes += 1
+        return failures
+
+    def _pending(self, kind, first, second):
+        return self._latest.get((kind, first, second))
+
+    @staticmethod
+    def _requires(action, first, second, value):
+        # The person a link write refers to by ID, as (record type, ID), or None.
+        if action in ('register', 'unregister', 'grade'):
+            return ('Student', first)
+        if action == 'assign' and value:
+            return ('Instructor', value)
+        return None
+
+    @staticmethod
+    def _check_schedule(schedules, action, first, second, value):
+        # Runs inside the write's savepoint; the index holds the writes flushed before it.
+        if action == 'register':
+            clash = schedules.conflict(second, student_id=first)
+        elif action == 'assign' and value:
+            clash = schedules.conflict(first, instructor_id=value)
+        else:
+            return
+        if clash is not None:
+            raise sqlite3.IntegrityError(f"Schedule conflict with {clash}")
+
+    @staticmethod
+    def _track_schedule(schedules, action, first, second, value, changed):
+        # Only runs once the write succeeded. A registration for a full course only joins its waitlist.
+        if action == 'register':
+            if changed:
+                schedules.registered(first, second)
+        elif action == 'assign':
+            schedules.assigned(first, value)
+        elif action not in ('insert', 'grade'):
+            # Freed seats promote waiting students, and updates may change meeting times or capacities.
+            schedules.clear()
+
+    @staticmethod
+    def _notify(conn, action, first, second, value, changed):
+        # Also runs inside the write's savepoint, so a rejected write notifies nobody.
+        if not changed:
+            return
+        if action == 'insert' and first == 'Student':
+            Outbox.enqueue(conn, 'welcome', value['email'], name=value['name'], record_id=value['student_id'])
+        elif action == 'register':
+            student = conn.execute("SELECT id FROM Students WHERE student_id = ?", (first,)).fetchone()
+            if student is not None:
+                Outbox.registered(conn, student[0], second)
+        elif action == 'assign' and value:
+            Outbox.assigned(conn, first)
+
+    def _cancel(self, entry, key):
+        entry[0] = None
+        del self._latest[key]
+        self._size -= 1
+
+    def _append(self, action, first, second, value):
+        kind = {'register': 'register', 'unregister': 'register', 'assign': 'assign',
+                'grade': 'grade'}.get(action, 'record')
+        entry = [action, first, second, value]
+        self._entries.append(entry)
+        self._latest[(kind, first, second)] = entry
+        self._size += 1
+        self.queued += 1
+
+    @staticmethod
+    def _statements(action, first, second, value):
+        if action == 'register':
+            statements = [("INSERT OR IGNORE INTO Registrations (student_id, course_id) "
+                           "SELECT id, ? FROM Students WHERE student_id = ?", (second, first))]
+            if value:
+                # Only has an effect if the course was full and the student joined its waitlist.
+                statements.append(("UPDATE Waitlist SET priority = ? WHERE course_id = ? "
+                                   "AND student_id = (SELECT id FROM Students WHERE student_id = ?)",
+                                   (value, second, first)))
+            return statements
+        if action == 'unregister':
+            return [(f"DELETE FROM {table} WHERE course_id = ? "
+                     "AND student_id = (SELECT id FROM Students WHERE student_id = ?)", (second, first))
+                    for table in ('Waitlist', 'Registrations')]
+        if action == 'grade':
+            return [("UPDATE Registrations SET grade = ? WHERE course_id = ? "
+                     "AND student_id = (SELECT id FROM Students WHERE student_id = ?)", (value, second, first))]
+        if action == 'assign':
+            return [("UPDATE Courses SET instructor_id = (SELECT id FROM Instructors WHERE instructor_id = ?) "
+                     "WHERE id = ?", (value, first))]
+        table, columns = RECORD_SOURCES[first]
+        id_column = columns['record_id']
+        statements = []
+        if action in ('delete', 'replace'):
+            statements.append((f"DELETE FROM {table} WHERE {id_column} = ?", (second,)))
+        if action in ('insert', 'replace'):
+            statements.append((f"INSERT INTO {table} ({', '.join(value)}) VALUES ({', '.join('?' * len(value))})",
+                               tuple(value.values())))
+        if action == 'update':
+            statements.append((f"UPDATE {table} SET {', '.join(f'{column} = ?' for column in value)} "
+                               f"WHERE {id_column} = ?", tuple(value.values()) + (second,)))
+        return statements
+
+
+class QueryCache:
+    """
+    A bounded LRU cache of read query results with write-through invalidation.
 
-        data = {
-            "students": [
-                {"student_id": student[0], "name": student[1], "age": student[2], "email": student[3], "course": student[4]}
-                for student in students
-            ],
-            "instructors": [
-                {"instructor_id": instructor[0], "name": instructor[1], "age": instructor[2], "email": instructor[3]}
-                for instructor in instructors
-            ],
-            "courses": [
-                {"course_id": course[0], "name": course[1], "instructor": course[2]}
-                for course in courses
-            ]
-        }
+    Every entry declares what it depends on:
 
-        filename, _ = QFileDialog.getSaveFileName(self, "Save Data", "", "JSON Files (*.json);;All Files (*)")
-        if filename:
-            with open(filename, 'w') as f:
-                json.dump(data, f, indent=4)
-            QMessageBox.information(self, "Data Saved", "Data has been saved successfully.")
+    - ``('course_name', name)``: a course name to ID lookup.
+    - ``('search', query)``: a records table query for the given search text.
+    - ``('record', record_type, record_id)``: the details of one record.
 
-    def load_data_from_file(self):
-        """
-        Loads student, instructor, and course data from a JSON file.
+    Writers call `invalidate` with the old and new values of each row they touch, and
+    only the entries those rows could affect are dropped. A search entry, for example,
+    is only dropped when one of the rows matches its search text.
 
-        This method allows the user to load previously saved data back into the system.
+    Attributes:
+        maxsize (int): The maximum number of entries kept.
+        hits (int): Number of lookups answered from the cache.
+        misses (int): Number of lookups that ran the query.
+        evictions (int): Number of entries dropped to stay within ``maxsize``.
+        invalidations (int): Number of entries dropped because their rows changed.
+    """
 
-        Raises:
-        -------
-        IOError:
-            If there is an error during file reading.
+    def __init__(self, maxsize=256):
         """
-        filename, _ = QFileDialog.getOpenFileName(self, "Load Data", "", "JSON Files (*.json);;All Files (*)")
-        if filename:
-            with open(filename, 'r') as f:
-                data = json.load(f)
-                
-                # Load students
-                self.students = [Student(**student_data) for student_data in data.get("students", [])]
-                # Load instructors
-                self.instructors = [Instructor(**instructor_data) for instructor_data in data.get("instructors", [])]
-                # Load courses
-                self.courses = [Course(**course_data) for course_data in data.get("courses", [])]
-                
-                # Update the records table
-                self.update_records_table()
-                QMessageBox.information(self, "Data Loaded", "Data has been loaded successfully.")
+        Initializes an empty cache.
 
-    def export_to_csv(self):
+        Args:
+            maxsize (int): The maximum number of entries kept.
         """
-        Exports all student, instructor, and course data to a CSV file.
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
 
-        Raises:
-        -------
-        IOError:
-            If there is an error during file writing.
-        """
-        filename, _ = QFileDialog.getSaveFileName(self, "Export Data", "", "CSV Files (*.csv);;All Files (*)")
-        if filename:
-            with open(filename, 'w', newline='') as csvfile:
-                writer = csv.writer(csvfile)
-                
-                # Write Students
-                writer.writerow(['Students'])
-                writer.writerow(['Name', 'Age', 'Email', 'Student ID', 'Registered Courses'])
-                for student in self.students:
-                    writer.writerow([student.name, student.age, student._email, student.student_id, ', '.join(student.registered_courses)])
-                writer.writerow([])  # Blank line to separate sections
-                
-                # Write Instructors
-                writer.writerow(['Instructors'])
-                writer.writerow(['Name', 'Age', 'Email', 'Instructor ID', 'Assigned Courses'])
-                for instructor in self.instructors:
-                    writer.writerow([instructor.name, instructor.age, instructor._email, instructor.instructor_id, ', '.join(instructor.assigned_courses)])
-                writer.writerow([])  # Blank line to separate sections
-                
-                # Write Courses
-                writer.writerow(['Courses'])
-                writer.writerow(['Course ID', 'Course Name', 'Instructor', 'Enrolled Students'])
-                for course in self.courses:
-                    writer.writerow([course.course_id, course.course_name, course.instructor.name, ', '.join(student.name for student in course.enrolled_students)])
-            
-            QMessageBox.information(self, "Data Exported", "Data has been exported successfully to CSV.")
+    def __len__(self):
+        return len(self._entries)
 
-    def create_menu(self):
+    def get(self, key, loader, depends):
         """
-        Create the menu bar for the application with options for saving, loading, and exporting data.
+        Returns the cached value for a key, running ``loader`` on a miss.
 
-        This method sets up a menu bar with a "File" menu that contains the following actions:
-        
-        - **Save Data**: Saves the current data to a file in JSON format.
-        - **Load Data**: Loads data from a JSON file into the system.
-        - **Export to CSV**: Exports the current data to a CSV file.
+        Args:
+            key (tuple): The cache key; it must identify the query and its parameters.
+            loader (callable): Called without arguments to produce the value on a miss.
+            depends (tuple): What the value depends on, as described in the class docstring.
 
-        The menu is added to the application's menu bar.
+        Returns:
+            The cached or freshly loaded value.
         """
-        # Create menu bar
-        menu_bar = self.menuBar()
-        
-        # Create File menu
-        file_menu = menu_bar.addMenu("File")
-        
-        # Add Save Data action
-        save_action = QAction("Save Data", self)
-        save_action.triggered.connect(self.save_data_to_file)
-        file_menu.addAction(save_action)
-
-        # Add Load Data action
-        load_action = QAction("Load Data", self)
-        load_action.triggered.connect(self.load_data_from_file)
-        file_menu.addAction(load_action)
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return self._entries[key][0]
+        self.misses += 1
+        value = loader()
+        self._entries[key] = (value, depends)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+        return value
+
+    def invalidate(self, record_type, *rows):
+        """
+        Drops the entries affected by a write to records of one type.
 
-        # Add Export to CSV action
-        export_action = QAction("Export to CSV", self)
-        export_action.triggered.connect(self.export_to_csv)
-        file_menu.addAction(export_action)
-    def validate_input(self, name, age, email, student_or_instructor_id):
+        Args:
+            record_type (str): One of ``Student``, ``Instructor`` or ``Course``.
+            *rows (dict): The old and/or new values of each written row, from `record_change`.
         """
-        Validate user input for adding or editing a record.
+        stale = [key for key, (_, depends) in self._entries.items()
+                 if self._affected(depends, record_type, rows)]
+        for key in stale:
+            del self._entries[key]
+        self.invalidations += len(stale)
 
-        :param name: The name of the student or instructor. Should contain only alphabetic characters and spaces.
-        :type name: str
-        :param age: The age of the student or instructor. Must be a number between 5 and 120.
-        :type age: str
-        :param email: The email address of the student or instructor. Must be a valid email format.
-        :type email: str
-        :param student_or_instructor_id: The unique ID of the student or instructor. Must be alphanumeric.
-        :type student_or_instructor_id: str
+    def clear(self):
+        """
+        Drops every entry, for writes whose effect cannot be described row by row.
+        """
+        self.invalidations += len(self._entries)
+        self._entries.clear()
 
-        :returns: True if all validations pass, otherwise False.
-        :rtype: bool
+    def stats(self):
+        """
+        Returns the cache statistics.
 
-        This method validates the following:
-        - The name contains only alphabetic characters and spaces.
-        - The age is a valid number between 5 and 120.
-        - The email is in a valid email format.
-        - The student or instructor ID is alphanumeric.
-        
-        If any validation fails, a warning message is displayed and the function returns False.
+        Returns:
+            dict: Hits, misses, hit rate, evictions, invalidations and current size.
         """
-        if not name.replace(" ", "").isalpha():
-            QMessageBox.warning(self, "Invalid Input", "Name should only contain alphabetic characters and spaces.")
-            return False
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'evictions': self.evictions,
+            'invalidations': self.invalidations,
+            'size': len(self._entries),
+        }
 
-        # Validate Age (between 5 and 120)
-        if not age.isdigit() or not (5 <= int(age) <= 120):
-            QMessageBox.warning(self, "Invalid Input", "Age should be a valid number between 5 and 120.")
-            return False
+    @staticmethod
+    def _affected(depends, record_type, rows):
+        kind = depends[0]
+        if kind == 'course_name':
+            return record_type == 'Course' and any(row['name'] == depends[1] for row in rows)
+        if kind == 'record':
+            return record_type == depends[1] and any(row['record_id'] == depends[2] for row in rows)
+        if kind == 'search':
+            query = depends[1]
+            return not query or any(query in row['name'].lower() or query in row['record_id'].lower()
+                                    or query in row['email'].lower() for row in rows)
+        return True
 
-        # Validate Email using regex
-        email_regex = r'^\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-        if not re.match(email_regex, email):
-            QMessageBox.warning(self, "Invalid Input", "Please enter a valid email address.")
-            return False
 
-        # Validate Student/Instructor ID (should be alphanumeric)
-        if not student_or_instructor_id.isalnum():
-            QMessageBox.warning(self, "Invalid Input", "ID should be alphanumeric.")
-            return False
+class RecordPager:
+    """
+    Keyset (seek) pagination over the records table.
 
-        # If all validations pass
-        return True
+    The pager remembers the keys of the first and last row of the current page and
+    asks SQLite for the rows just after or before them, so first, previous, next and
+    last pages take the same time however deep the page is. Jumping to an arbitrary
+    page number is the exception: it has to skip the rows before it.
 
-    def add_instructor(self):
+    Attributes:
+        page_size (int): Number of rows per page.
+        page_number (int): The 1-based number of the current page.
+        page_count (int): Number of pages for the current query.
+        rows (list): The raw rows of the current page.
+    """
+
+    PAGE_SIZES = (50, 100, 500, 1000)
+
+    def __init__(self, page_size=100, cache=None):
         """
-        Add a new instructor to the system.
+        Initializes the pager with no rows loaded.
 
-        This method collects the input fields for the instructor's name, age, email, and ID. 
-        It then validates the input using `validate_input`. If validation passes, 
-        it creates an Instructor object and appends it to the instructors list.
+        Args:
+            page_size (int): Number of rows per page.
+            cache (QueryCache): Optional cache for page reads and row counts.
+        """
+        self.cache = cache
+        self.page_size = page_size
+        self.query = ''
+        self.sort_column = None
+        self.descending = False
+        self.page_number = 1
+        self.page_count = 1
+        self.total = 0
+        self.rows = []
+        self._page_after = None
+
+    def configure(self, cursor, query='', sort_column=None, descending=False, page_size=None):
+        """
+        Sets the search query and sort order, recounts the rows and loads the first page.
 
-        :raises: A warning message if any of the inputs are invalid.
+        Args:
+            cursor (sqlite3.Cursor): An open cursor on the school database.
+            query (str): Lower-case search text.
+            sort_column (int): The column to sort by, or None.
+            descending (bool): Whether to sort in descending order.
+            page_size (int): A new page size, or None to keep the current one.
+        """
+        self.query = query
+        self.sort_column = sort_column
+        self.descending = descending
+        if page_size:
+            self.page_size = page_size
+        self.recount(cursor)
+        self.first(cursor)
+
+    def recount(self, cursor):
+        """
+        Recounts the matching rows and updates `page_count`.
 
-        :returns: None
+        Args:
+            cursor (sqlite3.Cursor): An open cursor on the school database.
         """
-        name = self.name_input.text()
-        age = self.age_input.text()
-        email = self.email_input.text()
-        instructor_id = self.instructor_id_input.text()
+        self.total = self._cached(('count', self.query), lambda: count_records(cursor, self.query))
+        self.page_count = max(1, -(-self.total // self.page_size))
+        self.page_number = min(self.page_number, self.page_count)
 
-        if self.validate_input(name, age, email, instructor_id):
-            # Proceed with adding the instructor
-            instructor = Instructor(name, int(age), email, instructor_id)
-            self.instructors.append(instructor)
-            QMessageBox.information(self, "Success", "Instructor added successfully!")
+    def first(self, cursor):
+        """
+        Loads the first page.
+        """
+        self._load(cursor, None, 1)
 
+    def next(self, cursor):
+        """
+        Loads the page after the current one, if there is one.
+        """
+        if self.rows and self.page_number < self.page_count:
+            self._load(cursor, record_row_key(self.rows[-1], self.sort_column), self.page_number + 1)
 
-def create_database():
-    """
-    Create the database schema for the school management system.
+    def previous(self, cursor):
+        """
+        Loads the page before the current one, if there is one.
+        """
+        if self.rows and self.page_number > 1:
+            before = self._read(cursor, record_row_key(self.rows[0], self.sort_column), self.page_size, backwards=True)
+            self._set_page(cursor, before, self.page_number - 1)
 
-    This function creates four tables:
-    
-    - **Students**: Stores student details (id, name, age, email, student_id).
-    - **Instructors**: Stores instructor details (id, name, age, email, instructor_id).
-    - **Courses**: Stores course details (id, course_id, course_name, instructor_id).
-    - **Registrations**: Stores registration details (id, student_id, course_id) with a unique constraint 
-      ensuring that each student can only register for a course once.
+    def last(self, cursor):
+        """
+        Loads the last page, reading the order backwards so no rows are skipped.
+        """
+        size = self.total - (self.page_count - 1) * self.page_size or self.page_size
+        self._set_page(cursor, self._read(cursor, None, size, backwards=True), self.page_count)
 
-    :raises sqlite3.Error: If there is any issue with executing SQL commands.
-    """
-    conn = sqlite3.connect('school_management_system.db')
-    cursor = conn.cursor()
+    def jump(self, cursor, page_number):
+        """
+        Loads a page by number.
 
-    cursor.execute(''' 
-    CREATE TABLE IF NOT EXISTS Students ( 
-        id INTEGER PRIMARY KEY AUTOINCREMENT, 
-        name TEXT NOT NULL, 
-        age INTEGER NOT NULL CHECK(age >= 5 AND age <= 120), 
-        email TEXT NOT NULL UNIQUE, 
-        student_id TEXT NOT NULL UNIQUE 
-    ) 
-    ''')
-
-    cursor.execute(''' 
-    CREATE TABLE IF NOT EXISTS Instructors ( 
-        id INTEGER PRIMARY KEY AUTOINCREMENT, 
-        name TEXT NOT NULL, 
-        age INTEGER NOT NULL CHECK(age >= 5 AND age <= 120), 
-        email TEXT NOT NULL UNIQUE, 
-        instructor_id TEXT NOT NULL UNIQUE 
-    ) 
-    ''')
-
-    cursor.execute(''' 
-    CREATE TABLE IF NOT EXISTS Courses ( 
-        id INTEGER PRIMARY KEY AUTOINCREMENT, 
-        course_id TEXT NOT NULL UNIQUE, 
-        course_name TEXT NOT NULL, 
-        instructor_id INTEGER, 
-        FOREIGN KEY (instructor_id) REFERENCES Instructors(id) 
-    ) 
-    ''')
-
-    cursor.execute(''' 
-    CREATE TABLE IF NOT EXISTS Registrations ( 
-        id INTEGER PRIMARY KEY AUTOINCREMENT, 
-        student_id INTEGER, 
-        course_id INTEGER, 
-        FOREIGN KEY (student_id) REFERENCES Students(id), 
-        FOREIGN KEY (course_id) REFERENCES Courses(id), 
-        UNIQUE (student_id, course_id) 
-    ) 
-    ''')
-
-    conn.commit()
-    conn.close()
+        Args:
+            cursor (sqlite3.Cursor): An open cursor on the school database.
+            page_number (int): The 1-based page to load; clamped to the valid range.
+        """
+        page_number = max(1, min(page_number, self.page_count))
+        if page_number == 1:
+            self.first(cursor)
+        elif page_number == self.page_count:
+            self.last(cursor)
+        elif page_number == self.page_number + 1:
+            self.next(cursor)
+        elif page_number == self.page_number - 1:
+            self.previous(cursor)
+        elif page_number != self.page_number:
+            offset = (page_number - 1) * self.page_size
+            rows = self._cached(('offset', self.query, self.sort_column, self.descending, offset, self.page_size),
+                                lambda: list(islice(iter_record_rows(cursor, self.query, self.sort_column,
+                                                                     self.descending, offset=offset), self.page_size)))
+            self._set_page(cursor, rows, page_number)
+
+    def reload(self, cursor):
+        """
+        Reloads the current page in place, for example after records were changed.
+        """
+        self.recount(cursor)
+        if self._page_after is None and self.page_number > 1:
+            self.jump(cursor, self.page_number)
+        else:
+            self._load(cursor, self._page_after, self.page_number)
+
+    def _cached(self, key, loader):
+        if self.cache is None:
+            return loader()
+        return self.cache.get(('records',) + key, loader, ('search', self.query))
+
+    def _read(self, cursor, after, limit, backwards=False):
+        def load():
+            rows = list(islice(iter_record_rows(cursor, self.query, self.sort_column, self.descending != backwards,
+                                                after=after), limit))
+            if backwards:
+                rows.reverse()
+            return rows
+        return self._cached(('page', self.query, self.sort_column, self.descending, backwards, after, limit), load)
+
+    def _load(self, cursor, after, page_number):
+        self.rows = self._read(cursor, after, self.page_size)
+        self.page_number = page_number
+        self._page_after = after
+
+    def _set_page(self, cursor, rows, page_number):
+        self.rows = rows
+        self.page_number = page_number
+        if page_number == 1 or not rows:
+            self._page_after = None
+        else:
+            # The key of the row just before this page lets reload() seek straight back to it.
+            before = self._read(cursor, record_row_key(rows[0], self.sort_column), 1, backwards=True)
+            self._page_after = record_row_key(before[0], self.sort_column) if before else None
 
 def insert_student(name, age, email, student_id):
     """
@@ -1126,7 +5206,7 @@ def insert_student(name, age, email, student_id):
     :raises sqlite3.Error: If there is any issue inserting the student into the database.
     """
     try:
-        conn = sqlite3.connect('school_management_system.db')
+        conn = sqlite3.connect(DB_PATH)
         cursor = conn.cursor()
         cursor.execute(''' 
         INSERT INTO Students (name, age, email, student_id) VALUES (?, ?, ?, ?) 
@@ -1144,7 +5224,7 @@ def get_students():
     :return: A list of tuples, where each tuple represents a student (name, age, email, student_id).
     :rtype: list of tuple
     """
-    conn = sqlite3.connect('school_management_system.db')
+    conn = sqlite3.connect(DB_PATH)
     cursor = conn.cursor()
     cursor.execute('SELECT * FROM Students')
     students = cursor.fetchall()
@@ -1167,7 +5247,7 @@ def update_student(student_id, name, age, email):
     :raises sqlite3.Error: If there is any issue updating the student's record.
     """
     try:
-        conn = sqlite3.connect('school_management_system.db')
+        conn = sqlite3.connect(DB_PATH)
         cursor = conn.cursor()
         cursor.execute(''' 
         UPDATE Students SET name = ?, age = ?, email = ? WHERE student_id = ? 
@@ -1188,7 +5268,7 @@ def delete_student(student_id):
     :raises sqlite3.Error: If there is any issue deleting the student's record.
     """
     try:
-        conn = sqlite3.connect('school_management_system.db')
+        conn = sqlite3.connect(DB_PATH)
         cursor = conn.cursor()
         cursor.execute(''' 
         DELETE FROM Students WHERE student_id = ? 
@@ -1221,7 +5301,7 @@ def load_students_into_table(self):
 
     :return: None
     """
-    conn = sqlite3.connect('school_management_system.db')
+    conn = sqlite3.connect(DB_PATH)
     cursor = conn.cursor()
     cursor.execute('SELECT name, age, email, student_id FROM Students')
     students = cursor.fetchall()
@@ -1250,7 +5330,7 @@ def update_records_table(self):
     self.records_table.setRowCount(0)  
 
     try:
-        conn = sqlite3.connect('school_management_system.db')
+        conn = sqlite3.connect(DB_PATH)
         cursor = conn.cursor()
 
         cursor.execute('SELECT course_id, course_name, instructor_id FROM Courses')
@@ -1286,7 +5366,122 @@ def update_records_table(self):
         conn.close()
 
 if __name__ == "__main__":
-   
+    if sys.argv[1:2] == ['--load-test']:
+        import argparse
+        parser = argparse.ArgumentParser(prog=f"{sys.argv[0]} --load-test",
+                                         description="Drive the write paths headlessly and report how they hold up.")
+        parser.add_argument('--db', default='loadtest.db', help="database under test (default: %(default)s)")
+        parser.add_argument('--processes', type=int, default=1)
+        parser.add_argument('--clerks', type=int, default=4, help="clerks (threads) per process")
+        parser.add_argument('--duration', type=float, default=10.0, help="seconds")
+        parser.add_argument('--rate', type=float, default=0.0, help="operations per second per clerk; 0 for no limit")
+        parser.add_argument('--mix', default='', help="e.g. add_student=5,assign_course=2,add_course=1,delete_record=2")
+        parser.add_argument('--label', default='')
+        parser.add_argument('--results', default=LOAD_TEST_RESULTS, help="file the report is appended to")
+        arguments = parser.parse_args(sys.argv[2:])
+        mix = {name: float(weight) for name, weight in (part.split('=') for part in arguments.mix.split(',') if part)}
+        load_test = LoadTest(arguments.db, arguments.processes, arguments.clerks, arguments.duration,
+                             mix or None, arguments.rate)
+        LoadTest.save(load_test.run(arguments.label), arguments.results)
+        print(LoadTest.compare(LoadTest.load(arguments.results)[-10:]))
+        sys.exit(0)
+
+    if sys.argv[1:2] == ['--dispatch-notifications']:
+        import argparse
+        parser = argparse.ArgumentParser(prog=f"{sys.argv[0]} --dispatch-notifications",
+                                         description="Send the notification outbox without opening the window.")
+        parser.add_argument('--db', default=DB_PATH, help="database to send from (default: %(default)s)")
+        parser.add_argument('--transport', default=NOTIFY_TRANSPORT or 'spool:outbox',
+                            help="smtp://host:port or spool:directory (default: %(default)s)")
+        parser.add_argument('--once', action='store_true', help="send what is due, then exit")
+        arguments = parser.parse_args(sys.argv[2:])
+        create_database(arguments.db)
+        dispatcher = NotificationDispatcher(arguments.db, notification_transport(arguments.transport))
+        try:
+            if arguments.once:
+                # Failed messages wait for their retry time, so this ends.
+                while dispatcher.dispatch_once():
+                    pass
+            else:
+                dispatcher.start()
+                while True:
+                    time.sleep(60)
+                    print(dispatcher.report(), flush=True)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            dispatcher.stop()
+        print(dispatcher.report())
+        sys.exit(0)
+
+    if sys.argv[1:2] == ['--soak-test']:
+        import argparse
+        import tempfile
+        parser = argparse.ArgumentParser(prog=f"{sys.argv[0]} --soak-test",
+                                         description="Repeat user actions headlessly and report the memory they leave behind.")
+        parser.add_argument('--db', default=DB_PATH, help="database to open (default: %(default)s)")
+        parser.add_argument('--iterations', type=int, default=2000, help="repetitions measured per action")
+        parser.add_argument('--warmup', type=int, default=20)
+        arguments = parser.parse_args(sys.argv[2:])
+        os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+        DB_PATH = arguments.db
+        create_database(DB_PATH)
+        app = QApplication(sys.argv)
+        profiler = MemoryProfiler()
+        window = SchoolManagementSystem()
+        snapshot_path = os.path.join(tempfile.mkdtemp(), 'soak.snap')
+        window.save_snapshot(snapshot_path)
+        queries = iter(['a', 'an', 'e', ''] * (arguments.iterations + arguments.warmup))
+
+        def search():
+            window.search_input.setText(next(queries))
+            window.search_records()
+
+        def load():
+            window.open_snapshot(snapshot_path)
+            window.snapshot_windows[-1].close()
+
+        growth = profiler.soak({
+            'refresh': window.update_records_table,
+            'search': search,
+            'form open': window.toggle_student_form,
+            'load': load,
+            'export': lambda: window.save_snapshot(snapshot_path),
+        }, arguments.iterations, arguments.warmup, progress=app.processEvents)
+        print(profiler.report())
+        print("\nLeft behind per repetition:")
+        for action, per_call in growth.items():
+            print(f"    {per_call:>+10.1f} B  {action}")
+        window.memory_profiler = None
+        window.close()
+        sys.exit(0)
+
+    if sys.argv[1:2] == ['--startup-check']:
+        import argparse
+        parser = argparse.ArgumentParser(prog=f"{sys.argv[0]} --startup-check",
+                                         description="Open the window and fail if its first paint misses the startup budget.")
+        parser.add_argument('--db', default=DB_PATH, help="database to open (default: %(default)s)")
+        parser.add_argument('--budget-ms', type=float, default=STARTUP_BUDGET_MS,
+                            help="allowed time from start to first paint (default: %(default)s)")
+        arguments = parser.parse_args(sys.argv[2:])
+        DB_PATH = arguments.db
+        create_database(DB_PATH)
+        app = QApplication(sys.argv)
+        window = SchoolManagementSystem()
+        deadline = time.perf_counter() + 10
+        while window.startup_ms is None and time.perf_counter() < deadline:
+            app.processEvents()
+        window.close()
+        if window.startup_ms is None:
+            print("The window was not painted within 10 s.")
+            sys.exit(1)
+        print(f"Startup to first paint: {window.startup_ms:.1f} ms (budget {arguments.budget_ms:g} ms)")
+        sys.exit(0 if window.startup_ms <= arguments.budget_ms else 1)
+
+    import logging
+    logging.basicConfig(format='%(message)s', level=logging.INFO if os.environ.get('SMS_STARTUP_TRACE')
+                        or MEMORY_DIAGNOSTICS else logging.WARNING)
+    create_database(DB_PATH)
     app = QApplication(sys.argv)
     window = SchoolManagementSystem()
     sys.exit(app.exec_())
@@ -0,0 +1,7 @@
+"""
+Code shared by the Tkinter and PyQt5 school management applications.
+
+Both applications work on the same SQLite database. Everything that does not depend
+on a user interface toolkit lives here, so the two applications create the same
+schema and read, report on and notify about the records in the same way.
+"""
@@ -0,0 +1,160 @@
+"""
+Point-in-time queries over the append-only audit log of the school database.
+"""
+import time
+
+from school.schema import AUDITED_COLUMNS, RECORD_SOURCES
+
+# Number of AuditLog entries after which AuditLog takes a new checkpoint.
+AUDIT_CHECKPOINT_INTERVAL = 5000
+
+
+def parse_when(text):
+    """
+    Parses the point in time of an audit query, in local time.
+
+    :param text: A date such as ``2024-05-01``, meaning the end of that day, or a date
+        and time such as ``2024-05-01 14:30``.
+    :type text: str
+    :return: The point in time as a Unix timestamp.
+    :rtype: float
+    :raises ValueError: If the text is not an ISO date or date and time.
+    """
+    from datetime import datetime, timedelta
+    text = text.strip()
+    when = datetime.fromisoformat(text)
+    if len(text) <= 10:
+        when += timedelta(days=1, microseconds=-1)
+    return when.timestamp()
+
+
+class AuditLog:
+    """
+    Answers questions about past states of the records from the append-only AuditLog.
+
+    Triggers created by :func:`school.schema.create_database` append the new values of
+    every inserted or updated student, instructor, course and registration, and a
+    tombstone for every deleted one. Every :data:`AUDIT_CHECKPOINT_INTERVAL` entries a
+    checkpoint stores the complete state, compressed, so a past state is the nearest
+    earlier checkpoint plus at most that many entries replayed on top of it.
+
+    :param interval: Number of entries between checkpoints.
+    :type interval: int
+    """
+
+    def __init__(self, interval=AUDIT_CHECKPOINT_INTERVAL):
+        """
+        Constructor method to initialize the log reader.
+        """
+        self.interval = interval
+
+    @staticmethod
+    def checkpoint(conn):
+        """
+        Stores the current state of the audited tables as a checkpoint.
+
+        Must run inside a write transaction, so no entry is appended while the tables are read.
+
+        :param conn: A connection to the school database.
+        :type conn: sqlite3.Connection
+        :return: The sequence number of the last entry the checkpoint includes.
+        :rtype: int
+        """
+        import json
+        import zlib
+        seq = conn.execute("SELECT COALESCE(MAX(seq), 0) FROM AuditLog").fetchone()[0]
+        state = {table: {row[0]: dict(zip(columns, row[1:]))
+                         for row in conn.execute(f"SELECT id, {', '.join(columns)} FROM {table}")}
+                 for table, columns in AUDITED_COLUMNS.items()}
+        conn.execute("INSERT OR IGNORE INTO AuditCheckpoint (seq, at, state) VALUES (?, ?, ?)",
+                     (seq, time.time(), zlib.compress(json.dumps(state).encode())))
+        return seq
+
+    def maybe_checkpoint(self, conn):
+        """
+        Takes a checkpoint if :attr:`interval` entries were appended since the last one.
+
+        :param conn: A connection inside a write transaction.
+        :type conn: sqlite3.Connection
+        :return: Whether a checkpoint was taken.
+        :rtype: bool
+        """
+        pending = conn.execute("SELECT COALESCE(MAX(seq), 0) - (SELECT COALESCE(MAX(seq), 0) FROM AuditCheckpoint) "
+                               "FROM AuditLog").fetchone()[0]
+        if pending < self.interval:
+            return False
+        self.checkpoint(conn)
+        return True
+
+    def state_at(self, conn, when):
+        """
+        Rebuilds the audited tables as they were at a point in time.
+
+        :param conn: A connection to the school database.
+        :type conn: sqlite3.Connection
+        :param when: The point in time, as a Unix timestamp.
+        :type when: float
+        :return: The rows of each table by row ID, as dicts of the audited columns.
+        :rtype: dict
+        :raises ValueError: If the point in time is before the first checkpoint.
+        """
+        import json
+        import zlib
+        first = conn.execute("SELECT MIN(at) FROM AuditCheckpoint").fetchone()[0]
+        if first is None or when < first:
+            raise ValueError("The audit history starts later than that")
+        last = conn.execute("SELECT COALESCE(MAX(seq), 0) FROM AuditLog WHERE at <= ?", (when,)).fetchone()[0]
+        seq, state = conn.execute("SELECT seq, state FROM AuditCheckpoint WHERE seq <= ? ORDER BY seq DESC LIMIT 1",
+                                  (last,)).fetchone()
+        state = {table: {int(row_id): row for row_id, row in rows.items()}
+                 for table, rows in json.loads(zlib.decompress(state)).items()}
+        for table, row_id, data in conn.execute(
+                "SELECT table_name, row_id, data FROM AuditLog WHERE seq > ? AND seq <= ? ORDER BY seq", (seq, last)):
+            if data is None:
+                state[table].pop(row_id, None)
+            else:
+                state[table][row_id] = json.loads(data)
+        return state
+
+    def record_at(self, conn, record_type, record_id, when):
+        """
+        Returns a student, instructor or course as it was at a point in time.
+
+        :param conn: A connection to the school database.
+        :type conn: sqlite3.Connection
+        :param record_type: One of ``Student``, ``Instructor`` or ``Course``.
+        :type record_type: str
+        :param record_id: The record's ID at that time.
+        :type record_id: str
+        :param when: The point in time, as a Unix timestamp.
+        :type when: float
+        :return: The record's audited columns, or None if it did not exist then.
+        :rtype: dict or None
+        """
+        table, columns = RECORD_SOURCES[record_type]
+        rows = self.state_at(conn, when)[table]
+        return next((row for row in rows.values() if row[columns['record_id']] == record_id), None)
+
+    def roster_at(self, conn, course_id, when):
+        """
+        Returns the students enrolled in a course at a point in time.
+
+        :param conn: A connection to the school database.
+        :type conn: sqlite3.Connection
+        :param course_id: The course's ID at that time.
+        :type course_id: str
+        :param when: The point in time, as a Unix timestamp.
+        :type when: float
+        :return: ``(student_id, name)`` per enrolled student, sorted by name, or None if
+            the course did not exist then.
+        :rtype: list of tuple or None
+        """
+        state = self.state_at(conn, when)
+        course = next((row_id for row_id, row in state['Courses'].items() if row['course_id'] == course_id), None)
+        if course is None:
+            return None
+        students = state['Students']
+        return sorted(((students[row['student_id']]['student_id'], students[row['student_id']]['name'])
+                       for row in state['Registrations'].values()
+                       if row['course_id'] == course and row['student_id'] in students),
+                      key=lambda student: (student[1].lower(), student[0]))
@@ -0,0 +1,174 @@
+"""
+Connections to the shared school database that retry writes while another instance holds the lock.
+"""
+import sqlite3
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# How long SQLite itself waits for a lock before reporting the database as busy, in milliseconds.
+BUSY_TIMEOUT_MS = 250
+# Number of times a write is retried after the database was busy, and the backoff between
+# attempts: it doubles from the base delay up to the maximum, with random jitter.
+WRITE_RETRIES = 6
+RETRY_BASE_MS = 20
+RETRY_MAX_MS = 500
+
+
+def is_busy_error(error):
+    """
+    Check whether an SQLite error means another connection holds a lock.
+
+    :param error: The error raised by sqlite3.
+    :type error: sqlite3.Error
+    :return: True for "database is locked" and "database is busy" errors.
+    :rtype: bool
+    """
+    return isinstance(error, sqlite3.OperationalError) and any(
+        text in str(error) for text in ('locked', 'busy'))
+
+
+class Database:
+    """
+    The connections of one application instance to the shared school database.
+
+    Reads and writes use separate connections. The read connection is read-only and,
+    with the database in WAL mode (see :func:`school.schema.create_database`), never
+    waits for writers. Writes run in ``BEGIN IMMEDIATE`` transactions, which take the
+    write lock up front so SQLite's busy timeout applies. If the lock is still held
+    after :data:`BUSY_TIMEOUT_MS`, the whole transaction is retried after a jittered
+    exponential backoff, so instances that collided do not retry in lockstep.
+
+    :param path: The path of the database file.
+    :type path: str
+    :ivar reads: Number of read blocks run.
+    :vartype reads: int
+    :ivar writes: Number of committed write transactions.
+    :vartype writes: int
+    :ivar retries: Number of write attempts repeated because the database was busy.
+    :vartype retries: int
+    :ivar failures: Number of writes that gave up after :data:`WRITE_RETRIES` retries.
+    :vartype failures: int
+    :ivar wait_ms: Total time spent waiting for the write lock and in backoff.
+    :vartype wait_ms: float
+    """
+
+    def __init__(self, path):
+        """
+        Constructor method to initialize the connection pair; connections are opened on first use.
+        """
+        self.path = path
+        self.reads = 0
+        self.writes = 0
+        self.retries = 0
+        self.failures = 0
+        self.wait_ms = 0.0
+        self._write_ms = deque(maxlen=1000)
+        self._reader = None
+        self._writer = None
+
+    @property
+    def reader(self):
+        """
+        The read-only connection.
+        """
+        if self._reader is None:
+            self._reader = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True)
+            self._reader.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
+        return self._reader
+
+    @property
+    def writer(self):
+        """
+        The write connection; it is in autocommit mode and :meth:`write` manages its transactions.
+        """
+        if self._writer is None:
+            self._writer = sqlite3.connect(self.path, isolation_level=None)
+            self._writer.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
+        return self._writer
+
+    def close(self):
+        """
+        Closes both connections.
+        """
+        for conn in (self._reader, self._writer):
+            if conn is not None:
+                conn.close()
+        self._reader = self._writer = None
+
+    @contextmanager
+    def reading(self):
+        """
+        Context manager yielding a cursor on the read connection.
+        """
+        cursor = self.reader.cursor()
+        try:
+            yield cursor
+        finally:
+            cursor.close()
+            self.reads += 1
+
+    def write(self, work):
+        """
+        Runs ``work(connection)`` in one write transaction, retrying while the database is busy.
+
+        ``work`` may run more than once, so it must not change anything outside the
+        database before it returns.
+
+        :param work: Called with the write connection; its return value is returned.
+        :type work: callable
+        :return: The return value of ``work``.
+        :raises sqlite3.OperationalError: If the database is still busy after
+            :data:`WRITE_RETRIES` retries.
+        :raises Exception: Anything else ``work`` raises; the transaction is rolled back.
+        """
+        conn = self.writer
+        started = time.perf_counter()
+        for attempt in range(WRITE_RETRIES + 1):
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                locked = time.perf_counter()
+                result = work(conn)
+                conn.execute("COMMIT")
+            except BaseException as e:
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+                if not is_busy_error(e):
+                    raise
+                if attempt == WRITE_RETRIES:
+                    self.failures += 1
+                    raise
+                self.retries += 1
+                import random
+                delay = min(RETRY_MAX_MS, RETRY_BASE_MS * 2 ** attempt) * random.uniform(0.5, 1.5)
+                time.sleep(delay / 1000)
+                continue
+            finished = time.perf_counter()
+            self.writes += 1
+            self.wait_ms += (locked - started) * 1000
+            self._write_ms.append((finished - started) * 1000)
+            return result
+
+    def stats(self):
+        """
+        Returns the contention statistics.
+
+        :return: Reads, writes, retries, failures, total lock wait and the median, 95th
+            percentile and maximum latency of the last 1000 writes, in milliseconds.
+        :rtype: dict
+        """
+        latencies = sorted(self._write_ms)
+
+        def percentile(fraction):
+            return latencies[min(len(latencies) - 1, int(fraction * len(latencies)))] if latencies else 0.0
+
+        return {
+            'reads': self.reads,
+            'writes': self.writes,
+            'retries': self.retries,
+            'failures': self.failures,
+            'wait_ms': self.wait_ms,
+            'write_p50_ms': percentile(0.5),
+            'write_p95_ms': percentile(0.95),
+            'write_max_ms': latencies[-1] if latencies else 0.0,
+        }
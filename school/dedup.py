@@ -0,0 +1,269 @@
+"""
+The search for students and instructors entered more than once.
+"""
+from itertools import combinations
+
+# Lowest similarity at which DuplicateFinder suggests merging two people, between 0 and 1.
+DEDUP_THRESHOLD = 0.8
+# Largest block of people sharing a blocking key that DuplicateFinder compares pairwise.
+DEDUP_MAX_BLOCK = 200
+
+
+class DuplicateFinder:
+    """
+    Finds students and instructors that were probably entered more than once.
+
+    Comparing every pair of people is quadratic, so people are first grouped into
+    blocks by cheap blocking keys: the normalized local part of their email, the
+    Soundex codes of their name, and the trigrams of their name. Only people of the
+    same type sharing a block are compared. Blocks larger than :data:`DEDUP_MAX_BLOCK`,
+    such as a trigram found in many names, are skipped; their members still meet in
+    the blocks of their other keys.
+
+    The PyQt5 application reads the people with :meth:`from_database` and merges them
+    with :meth:`merge_rows`; the Tkinter application uses :meth:`from_records` and
+    :meth:`merge_records` on its record store.
+
+    :param people: ``(key, record type, record ID, name, email, age)`` per person, oldest first.
+    :type people: list of tuple
+    """
+
+    # Soundex digit of each consonant; other letters have none.
+    SOUNDEX_CODES = {letter: str(digit) for digit, letters in
+                     enumerate(('bfpv', 'cgjkqsxz', 'dt', 'l', 'mn', 'r'), 1) for letter in letters}
+
+    def __init__(self, people):
+        """
+        Constructor method to initialize the finder.
+        """
+        self.people = list(people)
+
+    @classmethod
+    def from_database(cls, cursor):
+        """
+        Reads the students and instructors of a database.
+
+        :param cursor: A cursor or connection on the school database.
+        :type cursor: sqlite3.Cursor
+        :return: The finder; each person's key is its row ID.
+        :rtype: :class:`DuplicateFinder`
+        """
+        return cls(cursor.execute(
+            "SELECT id, 'Student', student_id, name, email, age FROM Students "
+            "UNION ALL SELECT id, 'Instructor', instructor_id, name, email, age FROM Instructors "
+            "ORDER BY 2 DESC, 1").fetchall())
+
+    @classmethod
+    def from_records(cls, records):
+        """
+        Reads the students and instructors of a list of records.
+
+        :param records: The records, such as the Tkinter application's ``data_records``.
+        :type records: list of dict
+        :return: The finder; each person's key is the position of its record in ``records``.
+        :rtype: :class:`DuplicateFinder`
+        """
+        return cls((index, record['type'], record['id'], record['name'], record.get('email', ''), record.get('age'))
+                   for index, record in enumerate(records) if record['type'] in ('Student', 'Instructor'))
+
+    def suggestions(self, threshold=DEDUP_THRESHOLD):
+        """
+        Returns the likely duplicates, most similar first.
+
+        :param threshold: The lowest similarity score to suggest, between 0 and 1.
+        :type threshold: float
+        :return: ``(score, person to keep, duplicate)`` per pair; the older record is kept.
+        :rtype: list of tuple
+        """
+        suggestions = []
+        for first, second in self.candidate_pairs():
+            score = self.score(self.people[first], self.people[second])
+            if score >= threshold:
+                suggestions.append((score, self.people[first], self.people[second]))
+        suggestions.sort(key=lambda suggestion: -suggestion[0])
+        return suggestions
+
+    def candidate_pairs(self):
+        """
+        Returns the pairs of people that share a block.
+
+        :return: ``(index, index)`` pairs into ``people``, the older person first.
+        :rtype: set of tuple
+        """
+        blocks = {}
+        for index, person in enumerate(self.people):
+            for key in self.blocking_keys(person[3], person[4]):
+                blocks.setdefault((person[1],) + key, []).append(index)
+        pairs = set()
+        for members in blocks.values():
+            if 1 < len(members) <= DEDUP_MAX_BLOCK:
+                pairs.update(combinations(members, 2))
+        return pairs
+
+    @classmethod
+    def blocking_keys(cls, name, email):
+        """
+        Returns the blocks a person belongs to.
+
+        :param name: The person's name.
+        :type name: str
+        :param email: The person's email.
+        :type email: str
+        :return: ``(kind, value)`` keys.
+        :rtype: set of tuple
+        """
+        keys = set()
+        local = cls.email_local_part(email)
+        if local:
+            keys.add(('email', local))
+        tokens = cls.normalize_name(name).split()
+        if tokens:
+            keys.add(('soundex', ' '.join(sorted(cls.soundex(token) for token in tokens))))
+        letters = ''.join(tokens)
+        keys.update(('trigram', letters[i:i + 3]) for i in range(len(letters) - 2))
+        return keys
+
+    @classmethod
+    def score(cls, first, second):
+        """
+        Returns how similar two people are.
+
+        Names count for 70% and email local parts for 30%; ages more than a year
+        apart lower the score by 0.2.
+
+        :param first: A person, as in ``people``.
+        :type first: tuple
+        :param second: Another person.
+        :type second: tuple
+        :return: The similarity, at most 1.
+        :rtype: float
+        """
+        from difflib import SequenceMatcher
+        names = [' '.join(sorted(cls.normalize_name(person[3]).split())) for person in (first, second)]
+        name = SequenceMatcher(None, *names).ratio()
+        email = SequenceMatcher(None, cls.email_local_part(first[4]), cls.email_local_part(second[4])).ratio()
+        score = 0.7 * name + 0.3 * email
+        try:
+            if abs(int(first[5]) - int(second[5])) > 1:
+                score -= 0.2
+        except (TypeError, ValueError):
+            pass
+        return round(score, 3)
+
+    @staticmethod
+    def normalize_name(name):
+        """
+        Returns a name in lower case, without accents or punctuation, with single spaces between words.
+
+        :param name: The name.
+        :type name: str
+        :rtype: str
+        """
+        import unicodedata
+        decomposed = unicodedata.normalize('NFKD', name or '').lower()
+        return ' '.join(''.join(c if c.isalnum() else ' ' for c in decomposed
+                                if not unicodedata.combining(c)).split())
+
+    @staticmethod
+    def email_local_part(email):
+        """
+        Returns the part of an email before the ``@``, lower-cased, without dots or a ``+tag``.
+
+        :param email: The email.
+        :type email: str
+        :rtype: str
+        """
+        return (email or '').lower().split('@')[0].split('+')[0].replace('.', '')
+
+    @classmethod
+    def soundex(cls, word):
+        """
+        Returns the Soundex code of a word, which is equal for most spellings of the same sound.
+
+        :param word: A normalized word.
+        :type word: str
+        :return: A letter and three digits, or an empty string for a word without letters.
+        :rtype: str
+        """
+        letters = [c for c in word if c.isalpha()]
+        if not letters:
+            return ''
+        code, last = letters[0].upper(), cls.SOUNDEX_CODES.get(letters[0])
+        for letter in letters[1:]:
+            digit = cls.SOUNDEX_CODES.get(letter)
+            if digit and digit != last:
+                code += digit
+            # H and W do not separate two letters with the same code; vowels do.
+            if letter not in 'hw':
+                last = digit
+        return (code + '000')[:4]
+
+    @staticmethod
+    def merge_rows(conn, record_type, keep_id, duplicate_id):
+        """
+        Merges a duplicate person into the one kept, in the database.
+
+        The duplicate's registrations, or the courses it teaches, are moved to the kept
+        person and the duplicate is deleted. Run it inside a write transaction, so the
+        merge is applied as a whole or not at all.
+
+        :param conn: A connection inside a write transaction.
+        :type conn: sqlite3.Connection
+        :param record_type: ``"Student"`` or ``"Instructor"``.
+        :type record_type: str
+        :param keep_id: The row ID of the person kept.
+        :type keep_id: int
+        :param duplicate_id: The row ID of the duplicate.
+        :type duplicate_id: int
+        """
+        if record_type == 'Student':
+            # Registrations the kept student already has stay behind and are deleted.
+            conn.execute("UPDATE OR IGNORE Registrations SET student_id = ? WHERE student_id = ?",
+                         (keep_id, duplicate_id))
+            conn.execute("DELETE FROM Registrations WHERE student_id = ?", (duplicate_id,))
+            conn.execute("DELETE FROM Students WHERE id = ?", (duplicate_id,))
+        else:
+            conn.execute("UPDATE Courses SET instructor_id = ? WHERE instructor_id = ?", (keep_id, duplicate_id))
+            conn.execute("DELETE FROM Instructors WHERE id = ?", (duplicate_id,))
+
+    @staticmethod
+    def merge_records(store, keep, duplicate):
+        """
+        Merges a duplicate person into the one kept, as one batch of store changes.
+
+        Courses naming the duplicate as a student or instructor name the kept person
+        instead, along with the duplicate's grades, the kept person gains the duplicate's
+        courses, and the duplicate is removed.
+
+        :param store: The store holding both records.
+        :type store: RecordStore
+        :param keep: The record kept.
+        :type keep: dict
+        :param duplicate: The record merged away.
+        :type duplicate: dict
+        """
+        link = 'students' if duplicate['type'] == 'Student' else 'instructor'
+        with store.batch():
+            for course in store.records:
+                if course['type'] != 'Course':
+                    continue
+                if link == 'students' and duplicate['name'] in course.get('students', ()):
+                    with store.editing(course):
+                        grades = course.get('grades') or {}
+                        # Grades are keyed by name, so with equal names there is nothing to move.
+                        if duplicate['name'] != keep['name'] and duplicate['name'] in grades:
+                            # The grade moves with the registration, unless the kept person keeps their own.
+                            grade = grades.pop(duplicate['name'])
+                            if keep['name'] not in course['students']:
+                                grades[keep['name']] = grade
+                        course['students'] = list(dict.fromkeys(
+                            keep['name'] if name == duplicate['name'] else name for name in course['students']))
+                elif link == 'instructor' and course.get('instructor') == duplicate['name']:
+                    with store.editing(course):
+                        course['instructor'] = keep['name']
+            missing = [name for name in duplicate.get('courses', ()) if name not in keep.get('courses', ())]
+            if missing:
+                with store.editing(keep):
+                    keep.setdefault('courses', []).extend(missing)
+            store.remove(duplicate)
+
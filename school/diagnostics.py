@@ -0,0 +1,218 @@
+"""
+Memory diagnostics for the user actions of either application.
+
+Tracing allocations slows every allocation down, so nothing is traced until a
+:class:`MemoryProfiler` is created, and its modules are only imported then.
+"""
+from contextlib import contextmanager
+
+# Stack frames kept per traced allocation; more frames attribute allocations better but cost more.
+MEMORY_TRACE_FRAMES = 10
+
+
+class MemoryProfiler:
+    """
+    Attributes memory growth to user actions with :mod:`tracemalloc` snapshots.
+
+    :meth:`track` takes a snapshot before and after an action, after a garbage collection,
+    and adds the difference to the action's totals: net bytes, the source lines that
+    allocated them and the growth in live objects per type. Actions nested in a tracked
+    action count towards the outer one. :meth:`soak` repeats actions many times and
+    measures what each repetition leaves behind, which separates leaks from one-off caches.
+
+    :ivar actions: Per action name, a dict of ``calls``, ``net_bytes``, ``allocators``
+        (bytes per source line) and ``objects`` (count per type).
+    :vartype actions: dict
+
+    :param frames: Stack frames kept per allocation.
+    :type frames: int
+    :param top: Number of allocators and object types reported per action.
+    :type top: int
+    """
+
+    def __init__(self, frames=MEMORY_TRACE_FRAMES, top=10):
+        """
+        Constructor method to start tracing allocations, if they are not traced already.
+        """
+        import tracemalloc
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+        self.top = top
+        self.actions = {}
+        self._depth = 0
+        self._filters = [tracemalloc.Filter(False, tracemalloc.__file__),
+                         tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+                         tracemalloc.Filter(False, "<unknown>")]
+
+    def instrument(self, obj, actions):
+        """
+        Replaces methods of an object with tracked versions.
+
+        Call it before the methods are given to buttons or connected to signals.
+
+        :param obj: The object, such as the application window.
+        :param actions: The action name per method name.
+        :type actions: dict
+        """
+        for name, action in actions.items():
+            setattr(obj, name, self.wrap(getattr(obj, name), action))
+
+    def wrap(self, method, action):
+        """
+        Returns a version of a bound method whose calls are tracked as an action.
+
+        :param method: The bound method.
+        :type method: callable
+        :param action: The action name.
+        :type action: str
+        :return: The tracked method.
+        :rtype: callable
+        """
+        import functools
+        import inspect
+        parameters = inspect.signature(method).parameters.values()
+        if any(parameter.kind == parameter.VAR_POSITIONAL for parameter in parameters):
+            accepted = None
+        else:
+            accepted = sum(parameter.kind in (parameter.POSITIONAL_ONLY, parameter.POSITIONAL_OR_KEYWORD)
+                           for parameter in parameters)
+
+        @functools.wraps(method)
+        def tracked(*args, **kwargs):
+            # Tk event bindings and Qt signals pass arguments, such as an event or a button's
+            # checked state, the method may not take.
+            if accepted is not None:
+                args = args[:accepted]
+            with self.track(action):
+                return method(*args, **kwargs)
+        return tracked
+
+    @contextmanager
+    def track(self, action):
+        """
+        Context manager attributing the memory growth of the enclosed code to an action.
+
+        :param action: The action name, such as ``refresh`` or ``search``.
+        :type action: str
+        """
+        if self._depth:
+            self._depth += 1
+            try:
+                yield
+            finally:
+                self._depth -= 1
+            return
+        before, objects = self._snapshot()
+        self._depth = 1
+        try:
+            yield
+        finally:
+            self._depth = 0
+            self._record(action, 1, before, objects)
+
+    def soak(self, actions, iterations=1000, warmup=20, progress=None):
+        """
+        Repeats each action many times and records what the repetitions leave behind.
+
+        Each action first runs ``warmup`` times so caches and lazily built widgets are
+        in place, then ``iterations`` times between two snapshots. Steady growth over
+        the repetitions points at a leak; the allocators show where.
+
+        :param actions: A callable per action name.
+        :type actions: dict
+        :param iterations: Repetitions measured per action.
+        :type iterations: int
+        :param warmup: Repetitions run before measuring.
+        :type warmup: int
+        :param progress: Called after each repetition, for example to process pending events.
+        :type progress: callable
+        :return: Bytes left behind per repetition, per action name.
+        :rtype: dict
+        """
+        growth = {}
+        for action, run in actions.items():
+            for _ in range(warmup):
+                run()
+                if progress:
+                    progress()
+            before, objects = self._snapshot()
+            self._depth = 1
+            try:
+                for _ in range(iterations):
+                    run()
+                    if progress:
+                        progress()
+            finally:
+                self._depth = 0
+                net = self._record(action, iterations, before, objects)
+            growth[action] = net / iterations
+        return growth
+
+    def report(self):
+        """
+        Formats the totals of every action, largest net growth first.
+
+        :return: A text report of net growth, top allocators and object growth per action.
+        :rtype: str
+        """
+        def size(value):
+            for unit in ('B', 'KiB'):
+                if abs(value) < 1024:
+                    return f"{value:+.1f} {unit}"
+                value /= 1024
+            return f"{value:+.1f} MiB"
+
+        lines = []
+        for action, stats in sorted(self.actions.items(), key=lambda item: -item[1]['net_bytes']):
+            lines.append(f"{action}: {stats['calls']} calls, {size(stats['net_bytes'])} net "
+                         f"({size(stats['net_bytes'] / stats['calls'])} per call)")
+            for line, allocated in sorted(stats['allocators'].items(), key=lambda item: -item[1])[:self.top]:
+                if allocated > 0:
+                    lines.append(f"    {size(allocated):>12}  {line}")
+            for name, grown in sorted(stats['objects'].items(), key=lambda item: -item[1])[:self.top]:
+                if grown > 0:
+                    lines.append(f"    {grown:>+12}  {name} objects")
+        return "\n".join(lines) or "No actions tracked yet."
+
+    def _snapshot(self):
+        import gc
+        import tracemalloc
+        # Objects are counted before the snapshot is taken, so the snapshot is not among them.
+        gc.collect()
+        objects = self._object_counts()
+        return [tracemalloc.take_snapshot().filter_traces(self._filters)], objects
+
+    @staticmethod
+    def _object_counts():
+        import gc
+        counts = {}
+        for obj in gc.get_objects():
+            name = type(obj).__name__
+            counts[name] = counts.get(name, 0) + 1
+        return counts
+
+    def _record(self, action, calls, before, objects):
+        import gc
+        import tracemalloc
+        gc.collect()
+        after = tracemalloc.take_snapshot().filter_traces(self._filters)
+        stats = self.actions.setdefault(action, {'calls': 0, 'net_bytes': 0, 'allocators': {}, 'objects': {}})
+        stats['calls'] += calls
+        net = 0
+        for difference in after.compare_to(before[0], 'lineno'):
+            net += difference.size_diff
+            if difference.size_diff:
+                frame = difference.traceback[0]
+                line = f"{frame.filename}:{frame.lineno}"
+                stats['allocators'][line] = stats['allocators'].get(line, 0) + difference.size_diff
+        stats['net_bytes'] += net
+        # Drop both snapshots before counting objects, so their traces are not counted as growth.
+        before.clear()
+        after = difference = None
+        gc.collect()
+        for name, number in self._object_counts().items():
+            grown = number - objects.get(name, 0)
+            if grown:
+                stats['objects'][name] = stats['objects'].get(name, 0) + grown
+        return net
+
@@ -0,0 +1,291 @@
+"""
+Grades, GPAs, course averages and class ranks.
+"""
+from array import array
+
+# Grade points of the letter grades a registration can be given; points from 0 to 4 are accepted too.
+GRADE_POINTS = {'A': 4.0, 'A-': 3.7, 'B+': 3.3, 'B': 3.0, 'B-': 2.7, 'C+': 2.3, 'C': 2.0, 'C-': 1.7,
+                'D+': 1.3, 'D': 1.0, 'F': 0.0}
+# Steps per grade point in which Gradebook ranks GPAs; GPAs within one step of each other tie.
+GPA_RANK_STEPS = 1000
+
+
+def parse_grade(text):
+    """
+    Parses a grade given as a letter from :data:`GRADE_POINTS` or as grade points.
+
+    :param text: A grade such as ``"B+"`` or ``"3.3"``; empty or None for no grade.
+    :type text: str
+    :return: The grade points, or None for no grade.
+    :rtype: float or None
+    :raises ValueError: If the text is neither a known letter nor a number from 0 to 4.
+    """
+    text = (text or '').strip().upper()
+    if not text:
+        return None
+    if text in GRADE_POINTS:
+        return GRADE_POINTS[text]
+    try:
+        points = float(text)
+    except ValueError:
+        points = None
+    if points is None or not 0 <= points <= 4:
+        raise ValueError(f"Invalid grade: {text!r}; expected a letter from A to F or points from 0 to 4")
+    return points
+
+
+def format_grade(points):
+    """
+    Formats grade points as their letter if there is one, and as a number otherwise.
+
+    :param points: The grade points, or None.
+    :type points: float
+    :return: The grade, such as ``"B+"`` or ``"3.45"``, or an empty string for no grade.
+    :rtype: str
+    """
+    if points is None:
+        return ''
+    for letter, letter_points in GRADE_POINTS.items():
+        if abs(points - letter_points) < 1e-9:
+            return letter
+    return f"{points:.2f}"
+
+
+class Gradebook:
+    """
+    GPAs, course averages and class ranks, kept up to date one change at a time.
+
+    The grade point totals come from the GradeTotals table, which triggers keep in step
+    with every graded registration (see :func:`school.schema.create_database`), so
+    reading a student's GPA or a course average is a single lookup. Class ranks are
+    answered from a Fenwick tree counting the graded students per GPA step of
+    1 / :data:`GPA_RANK_STEPS`: a rank or a percentile is a prefix sum, and a regrade
+    moves one student between two steps, both in O(log n) instead of sorting the
+    student body again.
+
+    :ivar students: ``(grade points, graded courses)`` per student key, the row ID here.
+    :vartype students: dict
+    :ivar courses: ``(grade points, graded students)`` per course key, the row ID here.
+    :vartype courses: dict
+    :ivar loaded: Whether the totals have been read since the last :meth:`reset`.
+    :vartype loaded: bool
+    """
+
+    def __init__(self):
+        """
+        Constructor method to initialize an empty gradebook; the first :meth:`load` reads the totals.
+        """
+        self.reset()
+
+    def reset(self):
+        """
+        Forgets the totals, so the next :meth:`load` reads them again.
+        """
+        self.students = {}
+        self.courses = {}
+        self.loaded = False
+        # Index 0 is unused; step i of the GPA scale is counted at index i + 1.
+        self._steps = array('l', [0]) * (4 * GPA_RANK_STEPS + 2)
+        self._ranked = 0
+
+    def load(self, cursor):
+        """
+        Reads every total and builds the rank tree in one pass.
+
+        :param cursor: An open cursor on the school database.
+        :type cursor: sqlite3.Cursor
+        """
+        self.reset()
+        for record_type, row_id, points, graded in cursor.execute(
+                "SELECT record_type, row_id, points, graded FROM GradeTotals WHERE graded > 0"):
+            (self.students if record_type == 'Student' else self.courses)[row_id] = (points, graded)
+        steps = self._steps
+        for points, graded in self.students.values():
+            steps[self._step(points / graded)] += 1
+        # Turns the per-step counts into a Fenwick tree in place.
+        for index in range(1, len(steps)):
+            parent = index + (index & -index)
+            if parent < len(steps):
+                steps[parent] += steps[index]
+        self._ranked = len(self.students)
+        self.loaded = True
+
+    def refresh(self, cursor, record_type, row_ids):
+        """
+        Reads the totals of some students or courses again, after their grades changed.
+
+        Does nothing before the first :meth:`load`, which reads everything anyway.
+
+        :param cursor: An open cursor on the school database.
+        :type cursor: sqlite3.Cursor
+        :param record_type: ``"Student"`` or ``"Course"``.
+        :type record_type: str
+        :param row_ids: The row IDs of the changed records.
+        :type row_ids: list of int
+        """
+        if not self.loaded:
+            return
+        totals = self.students if record_type == 'Student' else self.courses
+        row_ids = list(row_ids)
+        for start in range(0, len(row_ids), 500):
+            chunk = row_ids[start:start + 500]
+            current = dict.fromkeys(chunk)
+            current.update((row_id, (points, graded)) for row_id, points, graded in cursor.execute(
+                f"SELECT row_id, points, graded FROM GradeTotals WHERE record_type = ? "
+                f"AND row_id IN ({', '.join('?' * len(chunk))}) AND graded > 0", [record_type] + chunk))
+            for row_id, total in current.items():
+                old = totals.pop(row_id, None)
+                if total is not None:
+                    totals[row_id] = total
+                if record_type == 'Student':
+                    if old is not None:
+                        self._count(self._step(old[0] / old[1]), -1)
+                    if total is not None:
+                        self._count(self._step(total[0] / total[1]), 1)
+
+    def gpa(self, student):
+        """
+        Returns a student's GPA over their graded courses.
+
+        :param student: The student's key.
+        :return: The GPA, or None if no course grades the student.
+        :rtype: float or None
+        """
+        total = self.students.get(student)
+        return total[0] / total[1] if total else None
+
+    def average(self, course):
+        """
+        Returns the average grade points of a course's graded students.
+
+        :param course: The course's key.
+        :return: The average, or None if the course grades no student.
+        :rtype: float or None
+        """
+        total = self.courses.get(course)
+        return total[0] / total[1] if total else None
+
+    def standing(self, student):
+        """
+        Returns a student's class rank among all students with a GPA.
+
+        Students whose GPAs fall in the same step share a rank, the best one of the step.
+
+        :param student: The student's key.
+        :return: ``(rank, ranked students, percentile)``, where the percentile is the share
+            of ranked students with a lower GPA, or None if the student has no GPA.
+        :rtype: tuple or None
+        """
+        gpa = self.gpa(student)
+        if gpa is None:
+            return None
+        step = self._step(gpa)
+        above = self._ranked - self._below(step + 1)
+        return above + 1, self._ranked, 100.0 * self._below(step) / self._ranked
+
+    def _step(self, gpa):
+        # Tree indexes start at 1; the clamp keeps rounding drift of the totals in range.
+        return min(max(round(gpa * GPA_RANK_STEPS), 0), 4 * GPA_RANK_STEPS) + 1
+
+    def _count(self, index, delta):
+        self._ranked += delta
+        while index < len(self._steps):
+            self._steps[index] += delta
+            index += index & -index
+
+    def _below(self, index):
+        # Number of students in the steps before this tree index.
+        index -= 1
+        total = 0
+        while index > 0:
+            total += self._steps[index]
+            index -= index & -index
+        return total
+
+
+class RecordGradebook(Gradebook):
+    """
+    A :class:`Gradebook` over in-memory records instead of the GradeTotals table.
+
+    Grades are kept in the courses: a course's ``grades`` maps the name of each graded
+    student to their grade points, and only names the course lists in ``students``
+    count. The owner calls :meth:`remove` before a course changes and :meth:`add` after,
+    so the totals only move by the grades of that course. Students are keyed by name
+    and courses by the ``id()`` of their record.
+    """
+
+    def __init__(self, records=()):
+        """
+        Constructor method to total the grades of an initial list of records.
+        """
+        self.reset(records)
+
+    @staticmethod
+    def grades(course):
+        """
+        Returns the grades a course counts.
+
+        :param course: A course record.
+        :type course: dict
+        :return: The grade points per name of a graded student of the course.
+        :rtype: dict
+        """
+        grades = course.get('grades') or {}
+        return {name: grades[name] for name in course.get('students', []) if grades.get(name) is not None}
+
+    def reset(self, records=()):
+        """
+        Replaces the totals with those of a list of records.
+
+        :param records: The records; only courses hold grades.
+        :type records: list of dict
+        """
+        super().reset()
+        for record in records:
+            self.add(record)
+        self.loaded = True
+
+    def add(self, record):
+        """
+        Adds the grades of a course that was added or edited.
+
+        :param record: The record; other types are ignored.
+        :type record: dict
+        """
+        if record['type'] == 'Course':
+            grades = self.grades(record)
+            if grades:
+                self.courses[id(record)] = (sum(grades.values()), len(grades))
+            for name, points in grades.items():
+                self._move(name, points, 1)
+
+    def remove(self, record):
+        """
+        Removes the grades of a course that is removed or about to be edited.
+
+        :param record: The record, still holding the grades it was added with.
+        :type record: dict
+        """
+        if record['type'] == 'Course' and self.courses.pop(id(record), None) is not None:
+            for name, points in self.grades(record).items():
+                self._move(name, -points, -1)
+
+    def average(self, course):
+        """
+        Returns the average grade points of a course's graded students.
+
+        :param course: The course record.
+        :type course: dict
+        :return: The average, or None if the course grades no student.
+        :rtype: float or None
+        """
+        return super().average(id(course))
+
+    def _move(self, name, points, graded):
+        old = self.students.pop(name, None)
+        total = (old[0] + points, old[1] + graded) if old else (points, graded)
+        if old:
+            self._count(self._step(old[0] / old[1]), -1)
+        if total[1] > 0:
+            self.students[name] = total
+            self._count(self._step(total[0] / total[1]), 1)
@@ -0,0 +1,503 @@
+"""
+Notifications for students and instructors, queued in the database and sent by email.
+"""
+import itertools
+import os
+import sqlite3
+import time
+from collections import deque
+
+from school.db import Database
+
+# Where NotificationDispatcher sends the Outbox, such as "smtp://localhost:1025" or "spool:outbox";
+# when empty, messages wait in the Outbox for an instance or a --dispatch-notifications run that sends them.
+NOTIFY_TRANSPORT = os.environ.get('SMS_NOTIFY_TRANSPORT', '')
+# Sender address of the notifications.
+NOTIFY_SENDER = os.environ.get('SMS_NOTIFY_SENDER', 'registrar@school.example')
+# Oldest due Outbox messages whose recipients NotificationDispatcher serves per round.
+NOTIFY_BATCH_SIZE = 200
+# Seconds NotificationDispatcher waits between rounds once the Outbox is drained.
+NOTIFY_INTERVAL_S = 5.0
+# Delivery attempts per message before it is marked failed.
+NOTIFY_MAX_ATTEMPTS = 8
+# Wait before retrying a failed delivery, in seconds; it doubles per attempt up to the maximum.
+NOTIFY_RETRY_BASE_S = 30.0
+NOTIFY_RETRY_MAX_S = 3600.0
+# Seconds a claimed message stays reserved for its dispatcher; after that another one may send it.
+NOTIFY_LEASE_S = 300.0
+
+
+class Outbox:
+    """
+    Notifications for students and instructors, queued in the Outbox table.
+
+    Messages are written with the connection of the change they report, inside its
+    transaction, so a change that is rolled back never notifies anyone and a committed
+    one always does. :class:`NotificationDispatcher` sends them later.
+
+    :cvar TEMPLATES: Subject and body template per kind of notification.
+    :vartype TEMPLATES: dict
+    """
+
+    TEMPLATES = {
+        'welcome': ("Welcome to the school",
+                    "Hello {name},\n\nyour student record has been created with the ID {record_id}."),
+        'registered': ("Registered for {course_name}",
+                       "Hello {name},\n\nyou are now registered for {course_id} {course_name}."),
+        'assigned': ("Assigned to {course_name}",
+                     "Hello {name},\n\nyou have been assigned to teach {course_id} {course_name}."),
+    }
+
+    @classmethod
+    def enqueue(cls, conn, kind, recipient, **values):
+        """
+        Queues one notification.
+
+        :param conn: A connection inside the transaction of the change.
+        :type conn: sqlite3.Connection
+        :param kind: A key of :attr:`TEMPLATES`.
+        :type kind: str
+        :param recipient: The recipient's email address.
+        :type recipient: str
+        :param values: The values the templates refer to.
+        """
+        subject, body = cls.TEMPLATES[kind]
+        conn.execute('INSERT INTO Outbox (recipient, subject, body) VALUES (?, ?, ?)',
+                     (recipient, subject.format(**values), body.format(**values)))
+
+    @classmethod
+    def registered(cls, conn, student_row_id, course_row_id):
+        """
+        Notifies a student of a registration, if it exists; a student who joined the
+        waitlist instead is not notified.
+
+        :param conn: A connection inside the transaction of the change.
+        :type conn: sqlite3.Connection
+        :param student_row_id: The student's row ID.
+        :type student_row_id: int
+        :param course_row_id: The course's row ID.
+        :type course_row_id: int
+        """
+        row = conn.execute('''
+            SELECT s.name, s.email, c.course_id, c.course_name FROM Registrations r
+            JOIN Students s ON s.id = r.student_id JOIN Courses c ON c.id = r.course_id
+            WHERE r.student_id = ? AND r.course_id = ?''', (student_row_id, course_row_id)).fetchone()
+        if row is not None:
+            cls.enqueue(conn, 'registered', row[1], name=row[0], course_id=row[2], course_name=row[3])
+
+    @classmethod
+    def assigned(cls, conn, course_row_id):
+        """
+        Notifies the instructor now assigned to a course, if any.
+
+        :param conn: A connection inside the transaction of the change.
+        :type conn: sqlite3.Connection
+        :param course_row_id: The course's row ID.
+        :type course_row_id: int
+        """
+        row = conn.execute('''
+            SELECT i.name, i.email, c.course_id, c.course_name FROM Courses c
+            JOIN Instructors i ON i.id = c.instructor_id WHERE c.id = ?''', (course_row_id,)).fetchone()
+        if row is not None:
+            cls.enqueue(conn, 'assigned', row[1], name=row[0], course_id=row[2], course_name=row[3])
+
+    @staticmethod
+    def counts(cursor):
+        """
+        Counts the messages per status.
+
+        :param cursor: An open cursor or connection on the school database.
+        :type cursor: sqlite3.Cursor or sqlite3.Connection
+        :return: The number of ``pending``, ``sent`` and ``failed`` messages.
+        :rtype: dict
+        """
+        counts = dict.fromkeys(('pending', 'sent', 'failed'), 0)
+        counts.update(cursor.execute('SELECT status, COUNT(*) FROM Outbox GROUP BY status'))
+        return counts
+
+
+class SpoolTransport:
+    """
+    Delivers notifications as ``.eml`` files in a spool directory, for a mail program
+    or a person to pick up.
+
+    :param directory: The spool directory; it is created on the first message.
+    :type directory: str
+    """
+
+    def __init__(self, directory):
+        """
+        Constructor method to set the spool directory.
+        """
+        self.directory = directory
+        self._count = itertools.count(1)
+
+    def send(self, message):
+        """
+        Writes one message to a new file.
+
+        :param message: The message.
+        :type message: email.message.EmailMessage
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, f'{time.strftime("%Y%m%d-%H%M%S")}-{os.getpid()}-{next(self._count)}.eml')
+        with open(path + '.tmp', 'wb') as file:
+            file.write(message.as_bytes())
+        # Readers of the spool only ever see complete messages.
+        os.replace(path + '.tmp', path)
+
+    def close(self):
+        """
+        Does nothing; every message is written on its own.
+        """
+
+
+class SMTPTransport:
+    """
+    Delivers notifications to an SMTP server, reusing one connection while it stays open.
+
+    :param host: The server's host name.
+    :type host: str
+    :param port: The server's port.
+    :type port: int
+    :param timeout: Seconds to wait for the server.
+    :type timeout: float
+    :param starttls: Whether to switch to TLS before sending.
+    :type starttls: bool
+    :param username: The login name, if the server needs one.
+    :type username: str, optional
+    :param password: The password for ``username``.
+    :type password: str, optional
+    """
+
+    def __init__(self, host='localhost', port=25, timeout=10.0, starttls=False, username=None, password=None):
+        """
+        Constructor method to set the server; it is connected to on the first message.
+        """
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.starttls = starttls
+        self.username = username
+        self.password = password
+        self._smtp = None
+
+    def send(self, message):
+        """
+        Sends one message, connecting again once if the server closed the connection.
+
+        :param message: The message.
+        :type message: email.message.EmailMessage
+        :raises smtplib.SMTPException: If the server rejects the message.
+        :raises OSError: If the server cannot be reached.
+        """
+        import smtplib
+        for attempt in range(2):
+            if self._smtp is None:
+                self._smtp = self._connect()
+            try:
+                self._smtp.send_message(message)
+                return
+            except smtplib.SMTPServerDisconnected:
+                self._smtp = None
+                if attempt:
+                    raise
+
+    def close(self):
+        """
+        Closes the connection, if one is open.
+        """
+        import smtplib
+        if self._smtp is not None:
+            try:
+                self._smtp.quit()
+            except (smtplib.SMTPException, OSError):
+                pass
+            self._smtp = None
+
+    def _connect(self):
+        import smtplib
+        smtp = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            if self.starttls:
+                smtp.starttls()
+            if self.username:
+                smtp.login(self.username, self.password or '')
+        except BaseException:
+            smtp.close()
+            raise
+        return smtp
+
+
+def notification_transport(spec):
+    """
+    Creates the transport a :data:`NOTIFY_TRANSPORT` setting describes.
+
+    :param spec: ``smtp://[user:password@]host[:port]`` (``smtp+starttls://`` to switch
+        to TLS) or ``spool:directory``.
+    :type spec: str
+    :return: The transport.
+    :rtype: :class:`SMTPTransport` or :class:`SpoolTransport`
+    :raises ValueError: If the setting names neither kind of transport.
+    """
+    from urllib.parse import unquote, urlsplit
+    if spec.startswith('spool:'):
+        return SpoolTransport(spec[len('spool:'):] or 'outbox')
+    parts = urlsplit(spec)
+    if parts.scheme not in ('smtp', 'smtp+starttls') or not parts.hostname:
+        raise ValueError(f"Invalid notification transport: {spec!r}; expected smtp://host:port or spool:directory")
+    return SMTPTransport(parts.hostname, parts.port or 25, starttls=parts.scheme == 'smtp+starttls',
+                         username=unquote(parts.username) if parts.username else None,
+                         password=unquote(parts.password) if parts.password else None)
+
+
+class NotificationDispatcher:
+    """
+    Sends the Outbox through a transport, one digest per recipient and round.
+
+    Each round takes the recipients of the ``batch_size`` oldest due messages and claims
+    every message due for them in one short write transaction, by pushing their next
+    attempt :data:`NOTIFY_LEASE_S` into the future, so dispatchers in several instances
+    never send the same message twice in a row; a dispatcher that dies mid-round leaves
+    its messages to be claimed again once the lease ends. The claimed messages are
+    grouped per recipient into one email each, and the outcome is written back in a
+    second transaction: delivered messages are marked sent, and failed ones are retried
+    after an exponential backoff until ``max_attempts``, after which they are marked failed.
+
+    :meth:`dispatch_once` runs one round; :meth:`start` runs rounds on a background
+    thread, back to back while a backlog remains and every ``interval`` seconds
+    otherwise. Use one or the other, since the database connections belong to the
+    thread that dispatches first.
+
+    :param path: The path of the database file.
+    :type path: str
+    :param transport: Where the digests are sent.
+    :type transport: :class:`SMTPTransport` or :class:`SpoolTransport`
+    :param sender: The From address of the digests.
+    :type sender: str
+    :param batch_size: Oldest due messages whose recipients are served per round.
+    :type batch_size: int
+    :param interval: Seconds between rounds once the Outbox is drained.
+    :type interval: float
+    :param max_attempts: Delivery attempts per message before it is marked failed.
+    :type max_attempts: int
+    :ivar sent: Messages delivered; ``digests`` counts the emails that carried them.
+    :vartype sent: int
+    :ivar failed_attempts: Messages whose delivery attempt failed; ``retries`` of them were
+        scheduled for another attempt and ``gave_up`` marked failed.
+    :vartype failed_attempts: int
+    :ivar errors: Rounds that could not read or update the Outbox.
+    :vartype errors: int
+    :ivar crashes: Rounds on the background thread that failed in any other way, such as
+        a bad template; the thread carries on with the next round.
+    :vartype crashes: int
+    :ivar last_error: The error of the last failed round, or None.
+    :vartype last_error: str or None
+    :ivar latencies: Seconds from queueing to delivery of the last 1000 messages.
+    :vartype latencies: collections.deque
+    """
+
+    def __init__(self, path, transport, sender=NOTIFY_SENDER, batch_size=NOTIFY_BATCH_SIZE,
+                 interval=NOTIFY_INTERVAL_S, max_attempts=NOTIFY_MAX_ATTEMPTS):
+        """
+        Constructor method; nothing is sent before :meth:`dispatch_once` or :meth:`start`.
+        """
+        self.path = path
+        self.transport = transport
+        self.sender = sender
+        self.batch_size = batch_size
+        self.interval = interval
+        self.max_attempts = max_attempts
+        self.rounds = 0
+        self.sent = 0
+        self.digests = 0
+        self.failed_attempts = 0
+        self.retries = 0
+        self.gave_up = 0
+        self.errors = 0
+        self.crashes = 0
+        self.last_error = None
+        self.send_seconds = 0.0
+        self.latencies = deque(maxlen=1000)
+        self._db = None
+        self._thread = None
+        self._stopping = None
+
+    def dispatch_once(self):
+        """
+        Claims the due messages, sends them and records the outcome.
+
+        :return: The number of messages claimed.
+        :rtype: int
+        :raises sqlite3.Error: If the Outbox cannot be read or updated; claimed messages
+            are then sent again once their lease ends.
+        """
+        if self._db is None:
+            self._db = Database(self.path)
+        now = time.time()
+
+        def claim(conn):
+            # The recipients of the oldest due messages, with every message due for them.
+            recipients = [row[0] for row in conn.execute(
+                "SELECT DISTINCT recipient FROM (SELECT recipient FROM Outbox WHERE status = 'pending' "
+                "AND next_attempt <= ? ORDER BY next_attempt, id LIMIT ?)", (now, self.batch_size))]
+            rows = []
+            for start in range(0, len(recipients), 500):
+                chunk = recipients[start:start + 500]
+                rows += conn.execute(
+                    "SELECT id, recipient, subject, body, created_at, attempts FROM Outbox "
+                    f"WHERE status = 'pending' AND next_attempt <= ? AND recipient IN ({', '.join('?' * len(chunk))}) "
+                    "ORDER BY id", [now] + chunk).fetchall()
+            conn.executemany('UPDATE Outbox SET next_attempt = ? WHERE id = ?',
+                             [(now + NOTIFY_LEASE_S, row[0]) for row in rows])
+            return rows
+
+        rows = self._db.write(claim)
+        if not rows:
+            return 0
+        self.rounds += 1
+        by_recipient = {}
+        for row in rows:
+            by_recipient.setdefault(row[1], []).append(row)
+        delivered = []
+        failed = []
+        for recipient, messages in by_recipient.items():
+            started = time.perf_counter()
+            try:
+                self.transport.send(self._digest(recipient, messages))
+            except Exception as error:
+                failed += [(row, f'{type(error).__name__}: {error}') for row in messages]
+            else:
+                delivered += messages
+                self.digests += 1
+            finally:
+                self.send_seconds += time.perf_counter() - started
+        finished = time.time()
+
+        def record(conn):
+            conn.executemany("UPDATE Outbox SET status = 'sent', sent_at = ?, attempts = attempts + 1, "
+                             "last_error = NULL WHERE id = ?", [(finished, row[0]) for row in delivered])
+            for row, error in failed:
+                attempts = row[5] + 1
+                if attempts >= self.max_attempts:
+                    conn.execute("UPDATE Outbox SET status = 'failed', attempts = ?, last_error = ? WHERE id = ?",
+                                 (attempts, error, row[0]))
+                else:
+                    delay = min(NOTIFY_RETRY_MAX_S, NOTIFY_RETRY_BASE_S * 2 ** (attempts - 1))
+                    conn.execute('UPDATE Outbox SET attempts = ?, last_error = ?, next_attempt = ? WHERE id = ?',
+                                 (attempts, error, finished + delay, row[0]))
+
+        self._db.write(record)
+        self.sent += len(delivered)
+        self.latencies.extend(finished - row[4] for row in delivered)
+        self.failed_attempts += len(failed)
+        gave_up = sum(1 for row, _ in failed if row[5] + 1 >= self.max_attempts)
+        self.gave_up += gave_up
+        self.retries += len(failed) - gave_up
+        return len(rows)
+
+    def start(self):
+        """
+        Starts dispatching on a background thread.
+        """
+        import threading
+        if self._thread is not None:
+            return
+        self._stopping = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='notification-dispatcher', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=10.0):
+        """
+        Stops the background thread after its current round and closes the transport.
+
+        :param timeout: Seconds to wait for the round to finish.
+        :type timeout: float
+        """
+        if self._thread is not None:
+            self._stopping.set()
+            self._thread.join(timeout)
+            self._thread = None
+        else:
+            self._close()
+
+    def stats(self):
+        """
+        Returns the throughput and retry statistics.
+
+        :return: The counters, the delivery rate while sending in messages per second, and
+            the median and maximum queueing-to-delivery latency in seconds.
+        :rtype: dict
+        """
+        latencies = sorted(self.latencies)
+        return {
+            'rounds': self.rounds,
+            'sent': self.sent,
+            'digests': self.digests,
+            'failed_attempts': self.failed_attempts,
+            'retries': self.retries,
+            'gave_up': self.gave_up,
+            'errors': self.errors,
+            'crashes': self.crashes,
+            'messages_per_s': self.sent / self.send_seconds if self.send_seconds else 0.0,
+            'latency_p50_s': latencies[len(latencies) // 2] if latencies else 0.0,
+            'latency_max_s': latencies[-1] if latencies else 0.0,
+        }
+
+    def report(self):
+        """
+        Formats :meth:`stats` for display.
+
+        :return: The report.
+        :rtype: str
+        """
+        stats = self.stats()
+        return (f"{stats['sent']} messages sent in {stats['digests']} emails over {stats['rounds']} rounds, "
+                f"{stats['messages_per_s']:.1f} messages/s while sending.\n"
+                f"Latency from queueing to delivery: median {stats['latency_p50_s']:.1f} s, "
+                f"max {stats['latency_max_s']:.1f} s.\n"
+                f"{stats['failed_attempts']} failed attempts: {stats['retries']} scheduled for retry, "
+                f"{stats['gave_up']} given up. {stats['errors']} rounds failed to reach the database, "
+                f"{stats['crashes']} failed otherwise"
+                + (f"; last error: {self.last_error}." if self.last_error else "."))
+
+    def _digest(self, recipient, messages):
+        from email.message import EmailMessage
+        from email.utils import formatdate, make_msgid
+        digest = EmailMessage()
+        digest['From'] = self.sender
+        digest['To'] = recipient
+        digest['Date'] = formatdate(localtime=True)
+        digest['Message-ID'] = make_msgid()
+        if len(messages) == 1:
+            digest['Subject'] = messages[0][2]
+            digest.set_content(messages[0][3])
+        else:
+            digest['Subject'] = f'{len(messages)} updates from the school'
+            digest.set_content('\n\n'.join(f"{subject}\n{'-' * len(subject)}\n{body}"
+                                           for _, _, subject, body, _, _ in messages))
+        return digest
+
+    def _run(self):
+        try:
+            while not self._stopping.is_set():
+                try:
+                    claimed = self.dispatch_once()
+                except Exception as error:
+                    # Nothing else would notice the thread dying, so every round gets its chance.
+                    if isinstance(error, sqlite3.Error):
+                        self.errors += 1
+                    else:
+                        self.crashes += 1
+                    self.last_error = f'{type(error).__name__}: {error}'
+                    claimed = 0
+                if claimed < self.batch_size:
+                    self._stopping.wait(self.interval)
+        finally:
+            self._close()
+
+    def _close(self):
+        self.transport.close()
+        if self._db is not None:
+            self._db.close()
+            self._db = None
@@ -0,0 +1,290 @@
+"""
+Roster reports over the students, instructors and courses of either application.
+"""
+import sqlite3
+
+_numpy = None
+
+
+def numpy_module():
+    """
+    Returns NumPy, importing it on first use, or None when it is not installed.
+
+    NumPy is optional: :class:`RosterReports` uses it to aggregate whole columns at once
+    and falls back to plain Python loops, with the same results, without it.
+
+    :return: The ``numpy`` module, or None.
+    :rtype: module
+    """
+    global _numpy
+    if _numpy is None:
+        try:
+            import numpy
+        except ImportError:
+            numpy = False
+        _numpy = numpy
+    return _numpy or None
+
+
+# Title and column headers of the report comparing shards, see RosterReports.shard_trends.
+SHARD_TRENDS_REPORT = ("Shard trends", ("Shard", "Students", "Instructors", "Courses", "Registrations",
+                                        "Mean Class Size", "Mean Student Age"))
+
+
+class RosterReports:
+    """
+    Grouped aggregates and histograms over a whole roster, for the Reports windows and for scripts.
+
+    The roster is read once into columns, from the database with :meth:`from_database`
+    or from record dictionaries with :meth:`from_records`: one entry per course,
+    instructor, student age and registration. Each report is then a few whole-column
+    operations: ``bincount`` calls on integer arrays when NumPy is installed (see
+    :func:`numpy_module`), plain loops otherwise.
+
+    :param courses: ``(key, course ID, name, instructor key or None)`` per course.
+    :type courses: list of tuple
+    :param instructors: ``(key, instructor ID, name, age)`` per instructor.
+    :type instructors: list of tuple
+    :param student_ages: The age of every student.
+    :type student_ages: list of int
+    :param registrations: The course key of every registration.
+    :type registrations: list of int
+    """
+
+    # Report title: (method, column headers).
+    REPORTS = {
+        "Enrolment per course": ('enrolment_per_course', ("Course ID", "Course", "Instructor", "Students")),
+        "Instructor load": ('instructor_load', ("Instructor ID", "Instructor", "Courses", "Students")),
+        "Age distribution": ('age_distribution', ("Type", "Ages", "Count")),
+        "Age statistics": ('age_statistics', ("Type", "Count", "Mean", "Median", "Min", "Max")),
+    }
+
+    def __init__(self, courses, instructors, student_ages, registrations):
+        """
+        Constructor method to read the rows into columns.
+        """
+        instructor_positions = {row[0]: position for position, row in enumerate(instructors)}
+        course_positions = {row[0]: position for position, row in enumerate(courses)}
+        self.course_ids = [row[1] for row in courses]
+        self.course_names = [row[2] for row in courses]
+        self.course_instructor = self._array([instructor_positions.get(row[3], -1) for row in courses])
+        self.instructor_ids = [row[1] for row in instructors]
+        self.instructor_names = [row[2] for row in instructors]
+        self.instructor_ages = self._array([row[3] for row in instructors])
+        self.student_ages = self._array(student_ages)
+        self.registration_courses = self._positions(registrations, course_positions)
+
+    @classmethod
+    def from_database(cls, cursor):
+        """
+        Reads the roster's columns from a database, all from the same snapshot.
+
+        :param cursor: A cursor on the school database, outside a transaction.
+        :type cursor: sqlite3.Cursor
+        :return: The reports over the database's current contents.
+        :rtype: :class:`RosterReports`
+        """
+        cursor.execute("BEGIN")
+        try:
+            instructors = cursor.execute(
+                "SELECT id, instructor_id, name, age FROM Instructors ORDER BY instructor_id").fetchall()
+            courses = cursor.execute(
+                "SELECT id, course_id, course_name, instructor_id FROM Courses ORDER BY course_id").fetchall()
+            student_ages = cls._column(cursor, "SELECT age FROM Students")
+            registrations = cls._column(cursor, "SELECT course_id FROM Registrations WHERE course_id IS NOT NULL")
+        finally:
+            cursor.connection.rollback()
+        return cls(courses, instructors, student_ages, registrations)
+
+    @classmethod
+    def from_records(cls, records):
+        """
+        Reads the columns from record dictionaries, which refer to each other by name.
+
+        :param records: The records, such as the Tkinter application's ``data_records``.
+        :type records: list of dict
+        :return: The reports over the records.
+        :rtype: :class:`RosterReports`
+        """
+        by_type = {"Student": [], "Instructor": [], "Course": []}
+        for record in records:
+            by_type.get(record['type'], []).append(record)
+        instructors = sorted(by_type["Instructor"], key=lambda record: record['id'])
+        courses = sorted(by_type["Course"], key=lambda record: record['id'])
+        instructor_keys, course_keys = {}, {}
+        for key, record in enumerate(instructors):
+            instructor_keys.setdefault(record['name'], key)
+        for key, record in enumerate(courses):
+            course_keys.setdefault(record['name'], key)
+        return cls([(key, record['id'], record['name'], instructor_keys.get(record.get('instructor')))
+                    for key, record in enumerate(courses)],
+                   [(key, record['id'], record['name'], int(record['age'])) for key, record in enumerate(instructors)],
+                   [int(record['age']) for record in by_type["Student"]],
+                   [course_keys.get(name, -1) for record in by_type["Student"] for name in record.get('courses', ())])
+
+    def report(self, title):
+        """
+        Computes a report by its title in :attr:`REPORTS`.
+
+        :param title: The report title.
+        :type title: str
+        :return: The column headers and the list of rows.
+        :rtype: tuple
+        """
+        method, headers = self.REPORTS[title]
+        return headers, getattr(self, method)()
+
+    def enrolment_per_course(self):
+        """
+        Returns the number of students registered in each course, largest first.
+
+        :return: ``(course ID, name, instructor name, students)`` per course.
+        :rtype: list of tuple
+        """
+        counts = self._tolist(self._counts(self.registration_courses, len(self.course_ids)))
+        instructors = self._tolist(self.course_instructor)
+        rows = [(course_id, name, self.instructor_names[instructor] if instructor >= 0 else "", count)
+                for course_id, name, instructor, count in zip(self.course_ids, self.course_names, instructors, counts)]
+        rows.sort(key=lambda row: -row[3])
+        return rows
+
+    def instructor_load(self):
+        """
+        Returns the number of courses and registered students of each instructor, busiest first.
+
+        :return: ``(instructor ID, name, courses, students)`` per instructor.
+        :rtype: list of tuple
+        """
+        size = len(self.instructor_ids)
+        if numpy_module():
+            taught = self.course_instructor[self.registration_courses[self.registration_courses >= 0]]
+        else:
+            taught = [self.course_instructor[course] for course in self.registration_courses if course >= 0]
+        courses = self._tolist(self._counts(self.course_instructor, size))
+        students = self._tolist(self._counts(taught, size))
+        rows = list(zip(self.instructor_ids, self.instructor_names, courses, students))
+        rows.sort(key=lambda row: (-row[3], -row[2]))
+        return rows
+
+    def age_distribution(self, bin_width=5):
+        """
+        Returns a histogram of student and instructor ages.
+
+        :param bin_width: The number of years per bin; bins start at multiples of it.
+        :type bin_width: int
+        :return: ``(type, "low-high", count)`` per bin, from the youngest bin to the oldest.
+        :rtype: list of tuple
+        """
+        rows = []
+        np = numpy_module()
+        for record_type, ages in (("Student", self.student_ages), ("Instructor", self.instructor_ages)):
+            if not len(ages):
+                continue
+            youngest, oldest = (int(ages.min()), int(ages.max())) if np else (min(ages), max(ages))
+            low = youngest // bin_width * bin_width
+            if np:
+                bins = (ages - low) // bin_width
+            else:
+                bins = [(age - low) // bin_width for age in ages]
+            counts = self._tolist(self._counts(bins, (oldest - low) // bin_width + 1))
+            for index, count in enumerate(counts):
+                start = low + index * bin_width
+                rows.append((record_type, f"{start}-{start + bin_width - 1}", count))
+        return rows
+
+    def age_statistics(self):
+        """
+        Returns the count, mean, median and range of student and instructor ages.
+
+        :return: ``(type, count, mean, median, min, max)`` per record type that has records.
+        :rtype: list of tuple
+        """
+        np = numpy_module()
+        rows = []
+        for record_type, ages in (("Student", self.student_ages), ("Instructor", self.instructor_ages)):
+            if not len(ages):
+                continue
+            if np:
+                mean, median = float(ages.mean()), float(np.median(ages))
+                youngest, oldest = int(ages.min()), int(ages.max())
+            else:
+                import statistics
+                mean, median = statistics.fmean(ages), float(statistics.median(ages))
+                youngest, oldest = min(ages), max(ages)
+            rows.append((record_type, len(ages), round(mean, 1), median, youngest, oldest))
+        return rows
+
+    @classmethod
+    def shard_trends(cls, shards):
+        """
+        Returns the totals of several campus or term shards, to compare them over time.
+
+        Shards are read in parallel, each from its own read-only connection.
+
+        :param shards: The database path by shard name.
+        :type shards: dict
+        :return: ``(shard, students, instructors, courses, registrations, mean class size,
+            mean student age)`` per shard, in the order of ``shards``.
+        :rtype: list of tuple
+        """
+        from concurrent.futures import ThreadPoolExecutor
+
+        def totals(item):
+            key, path = item
+            conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+            try:
+                reports = cls.from_database(conn.cursor())
+            finally:
+                conn.close()
+            courses = len(reports.course_ids)
+            registrations = sum(row[3] for row in reports.enrolment_per_course())
+            ages = {row[0]: row[2] for row in reports.age_statistics()}
+            return (key, len(reports.student_ages), len(reports.instructor_ids), courses, registrations,
+                    round(registrations / courses, 1) if courses else 0.0, ages.get("Student", 0.0))
+
+        if not shards:
+            return []
+        with ThreadPoolExecutor(max_workers=len(shards)) as pool:
+            return list(pool.map(totals, shards.items()))
+
+    @staticmethod
+    def _column(cursor, sql):
+        # Flattening the one-column rows in C keeps a million-row column fast to read.
+        from itertools import chain
+        values = chain.from_iterable(cursor.execute(sql))
+        np = numpy_module()
+        return np.fromiter(values, dtype=np.int64) if np else list(values)
+
+    @staticmethod
+    def _array(values):
+        np = numpy_module()
+        return np.asarray(values, dtype=np.int64) if np else list(values)
+
+    @staticmethod
+    def _tolist(values):
+        return values.tolist() if hasattr(values, 'tolist') else list(values)
+
+    @classmethod
+    def _positions(cls, keys, positions):
+        np = numpy_module()
+        if not np:
+            return [positions.get(key, -1) for key in keys]
+        keys = cls._array(keys)
+        if not positions or not len(keys):
+            return np.full(len(keys), -1, dtype=np.int64)
+        # A lookup table indexed by key maps every key in one step.
+        table = np.full(max(max(positions), int(keys.max())) + 1, -1, dtype=np.int64)
+        table[list(positions)] = list(positions.values())
+        return np.where(keys >= 0, table[np.maximum(keys, 0)], -1)
+
+    @staticmethod
+    def _counts(positions, size):
+        np = numpy_module()
+        if np:
+            return np.bincount(positions[positions >= 0], minlength=size)
+        counts = [0] * size
+        for position in positions:
+            if position >= 0:
+                counts[position] += 1
+        return counts
+
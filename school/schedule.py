@@ -0,0 +1,284 @@
+"""
+Course meeting times and the weekly schedules they are checked against.
+"""
+import bisect
+
+# Day names accepted in meeting times, Monday first.
+WEEKDAYS = ('Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun')
+
+
+def parse_meetings(text):
+    """
+    Parses course meeting times such as ``"Mon 09:00-10:30, Wed 09:00-10:30"``.
+
+    :param text: Comma- or semicolon-separated meetings; empty or None for none.
+    :type text: str
+    :return: ``(start, end)`` per meeting, in minutes since Monday 00:00, in week order.
+    :rtype: list of tuple
+    :raises ValueError: If a meeting is not a weekday followed by a ``HH:MM-HH:MM`` range
+        ending after it starts, or if two meetings overlap.
+    """
+    meetings = []
+    for part in (text or '').replace(';', ',').split(','):
+        part = part.strip()
+        if not part:
+            continue
+        try:
+            day, times = part.split()
+            start, end = (int(hours) * 60 + int(minutes)
+                          for hours, minutes in (time_of_day.split(':') for time_of_day in times.split('-')))
+            offset = WEEKDAYS.index(day[:3].title()) * 1440
+        except ValueError:
+            raise ValueError(f"Invalid meeting time: {part!r}; expected e.g. 'Mon 09:00-10:30'") from None
+        if not 0 <= start < end <= 1440:
+            raise ValueError(f"Invalid meeting time: {part!r}; it must end after it starts, on the same day")
+        meetings.append((offset + start, offset + end))
+    meetings.sort()
+    for previous, meeting in zip(meetings, meetings[1:]):
+        if meeting[0] < previous[1]:
+            raise ValueError(f"Meeting times overlap: {format_meetings([previous])} and {format_meetings([meeting])}")
+    return meetings
+
+
+def format_meetings(meetings):
+    """
+    Formats meetings the way :func:`parse_meetings` reads them.
+
+    :param meetings: ``(start, end)`` per meeting, in minutes since Monday 00:00.
+    :type meetings: list of tuple
+    :return: The meetings, such as ``"Mon 09:00-10:30, Wed 09:00-10:30"``.
+    :rtype: str
+    """
+    def clock(minutes):
+        return f"{minutes // 60:02d}:{minutes % 60:02d}"
+    return ', '.join(f"{WEEKDAYS[start // 1440]} {clock(start % 1440)}-{clock(end - start // 1440 * 1440)}"
+                     for start, end in meetings)
+
+
+class Schedule:
+    """
+    The weekly meetings of one student's or instructor's courses, as an interval index.
+
+    A valid schedule never overlaps, so its meetings sorted by start time also have
+    increasing end times. A new meeting can then only clash with its two neighbours in
+    that order, and :meth:`conflict` is a binary search: O(log n) per meeting.
+
+    Stored courses may clash already, for example when they were saved before meeting
+    times were checked. :meth:`load` keeps those out of the index but remembers them in
+    ``overlapping``, which :meth:`conflict` checks one by one.
+
+    :ivar meetings: ``(start, end, course)`` per meeting, sorted by start.
+    :vartype meetings: list of tuple
+    :ivar overlapping: The meetings per course that clashed when loaded.
+    :vartype overlapping: dict
+    """
+
+    def __init__(self):
+        """
+        Constructor method to initialize an empty schedule.
+        """
+        self.meetings = []
+        self.overlapping = {}
+        self._courses = set()
+
+    def conflict(self, meetings, ignore=None):
+        """
+        Returns the course a set of meetings would clash with.
+
+        :param meetings: ``(start, end)`` per meeting, as returned by :func:`parse_meetings`.
+        :type meetings: list of tuple
+        :param ignore: A course whose meetings do not count, such as the course being checked.
+        :return: The first clashing course, or None.
+        """
+        for start, end in meetings:
+            position = bisect.bisect_left(self.meetings, (start,))
+            before = position - 1
+            while before >= 0 and self.meetings[before][2] == ignore:
+                before -= 1
+            if before >= 0 and self.meetings[before][1] > start:
+                return self.meetings[before][2]
+            after = position
+            while after < len(self.meetings) and self.meetings[after][2] == ignore:
+                after += 1
+            if after < len(self.meetings) and self.meetings[after][0] < end:
+                return self.meetings[after][2]
+        for course, course_meetings in self.overlapping.items():
+            if course != ignore and any(start < other_end and other_start < end
+                                        for start, end in meetings for other_start, other_end in course_meetings):
+                return course
+        return None
+
+    def add(self, course, meetings):
+        """
+        Adds the meetings of a course if they do not clash with the schedule.
+
+        Adding a course again replaces its meetings.
+
+        :param course: The course, or any key naming it, such as its name.
+        :param meetings: ``(start, end)`` per meeting.
+        :type meetings: list of tuple
+        :return: The clashing course, in which case nothing was added, or None.
+        """
+        clash = self.conflict(meetings, ignore=course)
+        if clash is None:
+            self.remove(course)
+            for start, end in meetings:
+                bisect.insort(self.meetings, (start, end, course))
+            self._courses.add(course)
+        return clash
+
+    def load(self, courses):
+        """
+        Adds the stored courses of a person, keeping those that clash in ``overlapping``.
+
+        :param courses: ``(course, meetings)`` pairs.
+        :type courses: iterable of tuple
+        :return: ``(course, clashing course)`` per course that clashed with one added before it.
+        :rtype: list of tuple
+        """
+        clashes = []
+        for course, meetings in courses:
+            clash = self.add(course, meetings)
+            if clash is not None:
+                self.overlapping[course] = meetings
+                clashes.append((course, clash))
+        return clashes
+
+    def remove(self, course):
+        """
+        Removes the meetings of a course.
+
+        :param course: The course, or the key it was added with.
+        """
+        self.overlapping.pop(course, None)
+        if course in self._courses:
+            self._courses.discard(course)
+            self.meetings = [meeting for meeting in self.meetings if meeting[2] != course]
+
+
+class ScheduleIndex:
+    """
+    The schedules of the students and instructors touched by one write transaction.
+
+    Each person's schedule is read from the database the first time one of their
+    registrations or assignments is checked, and then kept in step by the caller with
+    :meth:`registered` and :meth:`assigned`, so checking many writes for the same person
+    reads their courses once. Writes that can change schedules in other ways, such as
+    an unregistration promoting a waiting student or new meeting times, call
+    :meth:`clear`. Courses are keyed by their database ID.
+
+    :param conn: A connection inside the write transaction.
+    :type conn: sqlite3.Connection
+    :ivar clashes: ``(person, course name, clashing course name)`` per stored clash found
+        while loading a schedule, where a person is ``(record type, ID)``.
+    :vartype clashes: list of tuple
+    """
+
+    def __init__(self, conn):
+        """
+        Constructor method to initialize an empty index.
+        """
+        self.conn = conn
+        self.clashes = []
+        self._schedules = {}
+        self._courses = {}
+
+    def conflict(self, course_db_id, student_id=None, instructor_id=None):
+        """
+        Finds the course a registration or an assignment would clash with.
+
+        :param course_db_id: The database ID of the course being added.
+        :type course_db_id: int
+        :param student_id: The ID of the student registering, if any.
+        :type student_id: str
+        :param instructor_id: The ID of the instructor being assigned, if any.
+        :type instructor_id: str
+        :return: The name of the first clashing course, or None.
+        :rtype: str or None
+        :raises ValueError: If stored meeting times cannot be parsed.
+        """
+        meetings = self._course(course_db_id)[1]
+        if not meetings:
+            return None
+        clash = self._schedule(student_id, instructor_id).conflict(meetings, ignore=course_db_id)
+        return None if clash is None else self._course(clash)[0]
+
+    def registered(self, student_id, course_db_id):
+        """
+        Adds a course to a student's schedule after the student got a seat in it.
+        """
+        schedule = self._schedules.get(('Student', student_id))
+        if schedule is not None:
+            schedule.load([(course_db_id, self._course(course_db_id)[1])])
+
+    def assigned(self, course_db_id, instructor_id):
+        """
+        Moves a course to an instructor's schedule, or off every schedule for no instructor.
+        """
+        for (record_type, _), schedule in self._schedules.items():
+            if record_type == 'Instructor':
+                schedule.remove(course_db_id)
+        schedule = self._schedules.get(('Instructor', instructor_id)) if instructor_id else None
+        if schedule is not None:
+            schedule.load([(course_db_id, self._course(course_db_id)[1])])
+
+    def clear(self):
+        """
+        Forgets every schedule and course, so they are read again when next needed.
+        """
+        self._schedules.clear()
+        self._courses.clear()
+
+    def _course(self, course_db_id):
+        if course_db_id not in self._courses:
+            row = self.conn.execute("SELECT course_name, meetings FROM Courses WHERE id = ?",
+                                    (course_db_id,)).fetchone()
+            self._courses[course_db_id] = (row[0], parse_meetings(row[1])) if row else (None, [])
+        return self._courses[course_db_id]
+
+    def _schedule(self, student_id, instructor_id):
+        person = ('Student', student_id) if student_id is not None else ('Instructor', instructor_id)
+        schedule = self._schedules.get(person)
+        if schedule is None:
+            if student_id is not None:
+                rows = self.conn.execute(
+                    "SELECT Courses.id, Courses.course_name, Courses.meetings FROM Registrations "
+                    "JOIN Courses ON Courses.id = Registrations.course_id "
+                    "JOIN Students ON Students.id = Registrations.student_id "
+                    "WHERE Students.student_id = ? AND Courses.meetings != '' ORDER BY Registrations.id",
+                    (student_id,))
+            else:
+                rows = self.conn.execute(
+                    "SELECT id, course_name, meetings FROM Courses WHERE instructor_id = "
+                    "(SELECT id FROM Instructors WHERE instructor_id = ?) AND meetings != '' ORDER BY id",
+                    (instructor_id,))
+            courses = []
+            for course_db_id, name, meetings in rows:
+                self._courses[course_db_id] = (name, parse_meetings(meetings))
+                courses.append((course_db_id, self._courses[course_db_id][1]))
+            schedule = self._schedules[person] = Schedule()
+            self.clashes.extend((person, self._course(course)[0], self._course(clash)[0])
+                                for course, clash in schedule.load(courses))
+        return schedule
+
+
+def schedule_conflict(conn, course_db_id, student_id=None, instructor_id=None):
+    """
+    Finds the course a registration or an assignment would clash with, in the database.
+
+    A one-off check through a new :class:`ScheduleIndex`; writers checking several
+    changes in one transaction keep one index instead.
+
+    :param conn: An open connection to the school database.
+    :type conn: sqlite3.Connection
+    :param course_db_id: The database ID of the course being added.
+    :type course_db_id: int
+    :param student_id: The ID of the student registering, if any.
+    :type student_id: str
+    :param instructor_id: The ID of the instructor being assigned, if any.
+    :type instructor_id: str
+    :return: The name of the first clashing course, or None.
+    :rtype: str or None
+    :raises ValueError: If stored meeting times cannot be parsed.
+    """
+    return ScheduleIndex(conn).conflict(course_db_id, student_id, instructor_id)
@@ -0,0 +1,331 @@
+"""
+The tables of the school database shared by both applications.
+"""
+import os
+import sqlite3
+
+# Source expressions of the user-facing columns of each record type: its table, and the
+# expressions giving the record's name, ID and email. row_id, the table's primary key,
+# is ``id`` in every table.
+RECORD_SOURCES = {
+    'Student': ('Students', {'name': 'name', 'record_id': 'student_id', 'email': 'email'}),
+    'Instructor': ('Instructors', {'name': 'name', 'record_id': 'instructor_id', 'email': 'email'}),
+    'Course': ('Courses', {'name': 'course_name', 'record_id': 'course_id', 'email': "''"}),
+}
+
+# Columns recorded in the AuditLog per table, besides the row ID.
+AUDITED_COLUMNS = {
+    'Students': ('name', 'age', 'email', 'student_id'),
+    'Instructors': ('name', 'age', 'email', 'instructor_id'),
+    'Courses': ('course_id', 'course_name', 'instructor_id', 'capacity', 'meetings'),
+    'Registrations': ('student_id', 'course_id', 'grade'),
+}
+
+
+def create_database(db_path):
+    """
+    Creates the school database schema if it does not exist yet.
+
+    Both applications call this, so they can work on the same database file. It creates
+    these tables:
+
+    - **Students**: Stores student details (id, name, age, email, student_id).
+    - **Instructors**: Stores instructor details (id, name, age, email, instructor_id).
+    - **Courses**: Stores course details (id, course_id, course_name, instructor_id, capacity,
+      meetings).
+    - **Registrations**: Stores registration details (id, student_id, course_id, grade) with a unique constraint
+      ensuring that each student can only register for a course once.
+    - **Waitlist**: Stores the students waiting for a seat in a full course, with their priority.
+    - **GradeTotals**: Grade point sums and counts per student and course, kept by triggers.
+    - **Outbox**: Notifications to students and instructors, sent by a ``NotificationDispatcher``.
+    - **ChangeLog**: The changed rows, read by the ``ChangeFeed`` of the PyQt5 application.
+    - **AuditLog** and **AuditCheckpoint**: The append-only history read by :class:`school.audit.AuditLog`.
+
+    It also creates the name and email indexes used to sort the records table. Databases
+    created by earlier versions get the columns added since.
+
+    :param db_path: The database file, such as a campus or term shard.
+    :type db_path: str
+    :raises sqlite3.Error: If there is any issue with executing SQL commands.
+    """
+    from school.audit import AuditLog
+    os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+
+    # WAL lets readers in other instances keep reading while one instance writes.
+    cursor.execute("PRAGMA journal_mode = WAL")
+
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS Students (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL,
+        age INTEGER NOT NULL CHECK(age >= 5 AND age <= 120),
+        email TEXT NOT NULL UNIQUE,
+        student_id TEXT NOT NULL UNIQUE
+    )
+    ''')
+
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS Instructors (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL,
+        age INTEGER NOT NULL CHECK(age >= 5 AND age <= 120),
+        email TEXT NOT NULL UNIQUE,
+        instructor_id TEXT NOT NULL UNIQUE
+    )
+    ''')
+
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS Courses (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        course_id TEXT NOT NULL UNIQUE,
+        course_name TEXT NOT NULL,
+        instructor_id INTEGER,
+        capacity INTEGER,
+        meetings TEXT NOT NULL DEFAULT '',
+        FOREIGN KEY (instructor_id) REFERENCES Instructors(id)
+    )
+    ''')
+    # Databases created before course capacities and meeting times get the columns;
+    # a NULL capacity means no limit and empty meetings mean no fixed time.
+    columns = {column[1] for column in cursor.execute("PRAGMA table_info(Courses)")}
+    for column, definition in (('capacity', 'INTEGER'), ('meetings', "TEXT NOT NULL DEFAULT ''")):
+        if column not in columns:
+            cursor.execute(f"ALTER TABLE Courses ADD COLUMN {column} {definition}")
+
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS Registrations (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        student_id INTEGER,
+        course_id INTEGER,
+        grade REAL CHECK(grade IS NULL OR grade BETWEEN 0 AND 4),
+        FOREIGN KEY (student_id) REFERENCES Students(id),
+        FOREIGN KEY (course_id) REFERENCES Courses(id),
+        UNIQUE (student_id, course_id)
+    )
+    ''')
+    # Databases created before grades get the column; NULL means not graded yet.
+    if 'grade' not in {column[1] for column in cursor.execute("PRAGMA table_info(Registrations)")}:
+        cursor.execute("ALTER TABLE Registrations ADD COLUMN grade REAL CHECK(grade IS NULL OR grade BETWEEN 0 AND 4)")
+
+    # Indexes backing the sortable columns of the records table (see RECORD_SORT_KEYS in the PyQt5 application).
+    cursor.executescript('''
+    CREATE INDEX IF NOT EXISTS idx_students_name ON Students (name COLLATE NOCASE, student_id);
+    CREATE INDEX IF NOT EXISTS idx_students_email ON Students (email COLLATE NOCASE, student_id);
+    CREATE INDEX IF NOT EXISTS idx_instructors_name ON Instructors (name COLLATE NOCASE, instructor_id);
+    CREATE INDEX IF NOT EXISTS idx_instructors_email ON Instructors (email COLLATE NOCASE, instructor_id);
+    CREATE INDEX IF NOT EXISTS idx_courses_name ON Courses (course_name COLLATE NOCASE, course_id);
+    ''')
+    # Indexes for the relationship lookups of the Tkinter application's backend.
+    cursor.executescript('''
+    CREATE INDEX IF NOT EXISTS idx_courses_instructor ON Courses (instructor_id);
+    CREATE INDEX IF NOT EXISTS idx_registrations_course ON Registrations (course_id);
+    ''')
+
+    # Waitlists of full courses. The index keeps each course's queue in promotion order,
+    # so joining it and promoting its head are O(log n). The triggers apply the rules for
+    # every writer: a registration for a full course joins the waitlist instead, a freed
+    # seat promotes the head of the queue, and a higher capacity promotes as many students
+    # as there are new seats, all in the transaction of the change that caused it.
+    cursor.executescript('''
+    CREATE TABLE IF NOT EXISTS Waitlist (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        course_id INTEGER NOT NULL,
+        student_id INTEGER NOT NULL,
+        priority INTEGER NOT NULL DEFAULT 0,
+        enqueued_at REAL NOT NULL DEFAULT (julianday('now')),
+        FOREIGN KEY (course_id) REFERENCES Courses(id),
+        FOREIGN KEY (student_id) REFERENCES Students(id),
+        UNIQUE (course_id, student_id)
+    );
+    CREATE INDEX IF NOT EXISTS idx_waitlist_order ON Waitlist (course_id, priority DESC, enqueued_at, id);
+    CREATE TRIGGER IF NOT EXISTS waitlist_when_full BEFORE INSERT ON Registrations
+    WHEN IFNULL((SELECT capacity FROM Courses WHERE id = NEW.course_id)
+                <= (SELECT COUNT(*) FROM Registrations WHERE course_id = NEW.course_id), 0)
+         AND NOT EXISTS (SELECT 1 FROM Registrations WHERE student_id = NEW.student_id AND course_id = NEW.course_id)
+    BEGIN
+        INSERT OR IGNORE INTO Waitlist (course_id, student_id) VALUES (NEW.course_id, NEW.student_id);
+        SELECT RAISE(IGNORE);
+    END;
+    CREATE TRIGGER IF NOT EXISTS waitlist_registered AFTER INSERT ON Registrations BEGIN
+        DELETE FROM Waitlist WHERE course_id = NEW.course_id AND student_id = NEW.student_id;
+    END;
+    CREATE TRIGGER IF NOT EXISTS waitlist_seat_freed AFTER DELETE ON Registrations BEGIN
+        INSERT INTO Registrations (student_id, course_id)
+        SELECT student_id, course_id FROM Waitlist WHERE course_id = OLD.course_id
+        ORDER BY priority DESC, enqueued_at, id LIMIT 1;
+    END;
+    CREATE TRIGGER IF NOT EXISTS waitlist_capacity_changed AFTER UPDATE OF capacity ON Courses BEGIN
+        INSERT INTO Registrations (student_id, course_id)
+        SELECT student_id, course_id FROM Waitlist WHERE course_id = NEW.id
+        ORDER BY priority DESC, enqueued_at, id
+        LIMIT IFNULL(MAX(0, NEW.capacity - (SELECT COUNT(*) FROM Registrations WHERE course_id = NEW.id)), -1);
+    END;
+    CREATE TRIGGER IF NOT EXISTS cleanup_students_delete AFTER DELETE ON Students BEGIN
+        DELETE FROM Waitlist WHERE student_id = OLD.id;
+        DELETE FROM Registrations WHERE student_id = OLD.id;
+    END;
+    CREATE TRIGGER IF NOT EXISTS cleanup_courses_delete AFTER DELETE ON Courses BEGIN
+        DELETE FROM Waitlist WHERE course_id = OLD.id;
+        DELETE FROM Registrations WHERE course_id = OLD.id;
+    END;
+    ''')
+
+    # Grade point totals per student and per course, read by Gradebook. The triggers keep
+    # them up to date with every graded registration that is added, regraded or removed,
+    # so a GPA or course average costs one lookup instead of a pass over the registrations.
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS GradeTotals (
+        record_type TEXT NOT NULL,
+        row_id INTEGER NOT NULL,
+        points REAL NOT NULL DEFAULT 0,
+        graded INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (record_type, row_id)
+    ) WITHOUT ROWID
+    ''')
+    def add_grades(row):
+        return ''.join(f'''
+        INSERT INTO GradeTotals (record_type, row_id, points, graded)
+        SELECT '{record_type}', {row}.{column}, {row}.grade, 1 WHERE {row}.grade IS NOT NULL
+        ON CONFLICT (record_type, row_id) DO UPDATE SET points = points + excluded.points, graded = graded + 1;'''
+            for record_type, column in (('Student', 'student_id'), ('Course', 'course_id')))
+
+    def remove_grades(row):
+        return ''.join(f'''
+        UPDATE GradeTotals SET points = points - {row}.grade, graded = graded - 1
+        WHERE record_type = '{record_type}' AND row_id = {row}.{column} AND {row}.grade IS NOT NULL;
+        DELETE FROM GradeTotals WHERE record_type = '{record_type}' AND row_id = {row}.{column} AND graded <= 0;'''
+            for record_type, column in (('Student', 'student_id'), ('Course', 'course_id')))
+
+    cursor.executescript(f'''
+    CREATE TRIGGER IF NOT EXISTS grades_insert AFTER INSERT ON Registrations
+    WHEN NEW.grade IS NOT NULL BEGIN {add_grades('NEW')}
+    END;
+    CREATE TRIGGER IF NOT EXISTS grades_delete AFTER DELETE ON Registrations
+    WHEN OLD.grade IS NOT NULL BEGIN {remove_grades('OLD')}
+    END;
+    CREATE TRIGGER IF NOT EXISTS grades_update AFTER UPDATE OF grade, student_id, course_id ON Registrations
+    BEGIN {remove_grades('OLD')} {add_grades('NEW')}
+    END;
+    ''')
+
+    # Notifications waiting for NotificationDispatcher. They are written by the change
+    # they report, in its transaction (see Outbox); times are Unix timestamps.
+    cursor.executescript('''
+    CREATE TABLE IF NOT EXISTS Outbox (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        recipient TEXT NOT NULL,
+        subject TEXT NOT NULL,
+        body TEXT NOT NULL,
+        created_at REAL NOT NULL DEFAULT ((julianday('now') - 2440587.5) * 86400.0),
+        status TEXT NOT NULL DEFAULT 'pending' CHECK(status IN ('pending', 'sent', 'failed')),
+        attempts INTEGER NOT NULL DEFAULT 0,
+        next_attempt REAL NOT NULL DEFAULT ((julianday('now') - 2440587.5) * 86400.0),
+        sent_at REAL,
+        last_error TEXT
+    );
+    CREATE INDEX IF NOT EXISTS idx_outbox_due ON Outbox (next_attempt) WHERE status = 'pending';
+    CREATE INDEX IF NOT EXISTS idx_outbox_recipient ON Outbox (recipient, next_attempt) WHERE status = 'pending';
+    ''')
+
+    # Change log read by the PyQt5 application's ChangeFeed, filled by triggers so every
+    # writer is covered, including the Tkinter application.
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS ChangeLog (
+        seq INTEGER PRIMARY KEY AUTOINCREMENT,
+        record_type TEXT NOT NULL,
+        row_id INTEGER NOT NULL,
+        old_name TEXT,
+        old_record_id TEXT,
+        old_email TEXT
+    )
+    ''')
+    for record_type, (table, columns) in RECORD_SOURCES.items():
+        old_values = ', '.join(f"OLD.{columns[name]}" if columns[name] != "''" else "''"
+                               for name in ('name', 'record_id', 'email'))
+        cursor.executescript(f'''
+        CREATE TRIGGER IF NOT EXISTS log_{table.lower()}_insert AFTER INSERT ON {table} BEGIN
+            INSERT INTO ChangeLog (record_type, row_id) VALUES ('{record_type}', NEW.id);
+        END;
+        CREATE TRIGGER IF NOT EXISTS log_{table.lower()}_update AFTER UPDATE ON {table} BEGIN
+            INSERT INTO ChangeLog (record_type, row_id, old_name, old_record_id, old_email)
+            VALUES ('{record_type}', NEW.id, {old_values});
+        END;
+        CREATE TRIGGER IF NOT EXISTS log_{table.lower()}_delete AFTER DELETE ON {table} BEGIN
+            INSERT INTO ChangeLog (record_type, row_id, old_name, old_record_id, old_email)
+            VALUES ('{record_type}', OLD.id, {old_values});
+        END;
+        ''')
+    # Registrations and course assignments change the counts shown in the records table,
+    # so they are logged as updates of the students, courses and instructors involved.
+    for event, row in (('INSERT', 'NEW'), ('DELETE', 'OLD')):
+        cursor.executescript(f'''
+        CREATE TRIGGER IF NOT EXISTS log_registrations_{event.lower()} AFTER {event} ON Registrations BEGIN
+            INSERT INTO ChangeLog (record_type, row_id, old_name, old_record_id, old_email)
+            SELECT 'Student', id, name, student_id, email FROM Students WHERE id = {row}.student_id;
+            INSERT INTO ChangeLog (record_type, row_id, old_name, old_record_id, old_email)
+            SELECT 'Course', id, course_name, course_id, '' FROM Courses WHERE id = {row}.course_id;
+        END;
+        CREATE TRIGGER IF NOT EXISTS log_courses_{event.lower()}_assigned AFTER {event} ON Courses
+        WHEN {row}.instructor_id IS NOT NULL BEGIN
+            INSERT INTO ChangeLog (record_type, row_id, old_name, old_record_id, old_email)
+            SELECT 'Instructor', id, name, instructor_id, email FROM Instructors WHERE id = {row}.instructor_id;
+        END;
+        ''')
+    cursor.executescript('''
+    CREATE TRIGGER IF NOT EXISTS log_registrations_graded AFTER UPDATE OF grade ON Registrations
+    WHEN OLD.grade IS NOT NEW.grade BEGIN
+        INSERT INTO ChangeLog (record_type, row_id, old_name, old_record_id, old_email)
+        SELECT 'Student', id, name, student_id, email FROM Students WHERE id = NEW.student_id;
+        INSERT INTO ChangeLog (record_type, row_id, old_name, old_record_id, old_email)
+        SELECT 'Course', id, course_name, course_id, '' FROM Courses WHERE id = NEW.course_id;
+    END;
+    CREATE TRIGGER IF NOT EXISTS log_courses_assigned AFTER UPDATE OF instructor_id ON Courses
+    WHEN OLD.instructor_id IS NOT NEW.instructor_id BEGIN
+        INSERT INTO ChangeLog (record_type, row_id, old_name, old_record_id, old_email)
+        SELECT 'Instructor', id, name, instructor_id, email FROM Instructors
+        WHERE id IN (OLD.instructor_id, NEW.instructor_id);
+    END;
+    ''')
+
+    # Append-only audit log with periodic checkpoints, read by AuditLog. Like the change
+    # log it is filled by triggers, so the writes of every instance and both apps count.
+    cursor.executescript('''
+    CREATE TABLE IF NOT EXISTS AuditLog (
+        seq INTEGER PRIMARY KEY AUTOINCREMENT,
+        at REAL NOT NULL DEFAULT ((julianday('now') - 2440587.5) * 86400.0),
+        table_name TEXT NOT NULL,
+        row_id INTEGER NOT NULL,
+        data TEXT
+    );
+    CREATE INDEX IF NOT EXISTS idx_auditlog_at ON AuditLog (at);
+    CREATE TABLE IF NOT EXISTS AuditCheckpoint (
+        seq INTEGER PRIMARY KEY,
+        at REAL NOT NULL,
+        state BLOB NOT NULL
+    );
+    ''')
+    for table, columns in AUDITED_COLUMNS.items():
+        values = ', '.join(f"'{column}', NEW.{column}" for column in columns)
+        # Recreated every time, so databases created before a column was audited log it too.
+        cursor.executescript(f'''
+        DROP TRIGGER IF EXISTS audit_{table.lower()}_insert;
+        DROP TRIGGER IF EXISTS audit_{table.lower()}_update;
+        CREATE TRIGGER IF NOT EXISTS audit_{table.lower()}_insert AFTER INSERT ON {table} BEGIN
+            INSERT INTO AuditLog (table_name, row_id, data) VALUES ('{table}', NEW.id, json_object({values}));
+        END;
+        CREATE TRIGGER IF NOT EXISTS audit_{table.lower()}_update AFTER UPDATE ON {table} BEGIN
+            INSERT INTO AuditLog (table_name, row_id, data) VALUES ('{table}', NEW.id, json_object({values}));
+        END;
+        CREATE TRIGGER IF NOT EXISTS audit_{table.lower()}_delete AFTER DELETE ON {table} BEGIN
+            INSERT INTO AuditLog (table_name, row_id) VALUES ('{table}', OLD.id);
+        END;
+        ''')
+    # History starts with a checkpoint of whatever the database already holds.
+    if cursor.execute("SELECT 1 FROM AuditCheckpoint LIMIT 1").fetchone() is None:
+        AuditLog.checkpoint(conn)
+
+    conn.commit()
+    conn.close()
+
@@ -0,0 +1,188 @@
+"""
+Read-only records snapshots, written and opened the same way by both applications,
+so either one opens the snapshots of the other.
+"""
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+
+class Snapshot:
+    """
+    A read-only records snapshot read through :mod:`mmap`, with an index of row offsets.
+
+    The file starts with a fixed header giving the number of rows and the positions of
+    the sections after the rows::
+
+        header    magic, row count, metadata, offsets and name order positions
+        rows      one compact JSON array per row, newline-terminated
+        metadata  JSON with the column names and the name column
+        offsets   row count + 1 little-endian uint64 byte offsets into the file
+        order     row count little-endian uint32 row numbers, sorted by name
+
+    Opening one only reads the header and the metadata; a row is decoded when it is
+    asked for, and :meth:`search` looks names up by binary search over the name order.
+    The pages are mapped read-only from the file, so every viewer process opening the
+    same snapshot shares them in the page cache.
+
+    :ivar columns: The column names.
+    :vartype columns: list
+    :ivar name_column: The index of the column sorted in the name order.
+    :vartype name_column: int
+
+    :param path: The snapshot file.
+    :type path: str
+    :raises ValueError: If the file is not a snapshot.
+    :raises OSError: If the file cannot be opened.
+    """
+
+    MAGIC = b'SMSSNAP1'
+    HEADER = struct.Struct('<8sQQQQ')
+
+    def __init__(self, path):
+        """
+        Constructor method to map a snapshot file.
+        """
+        self.path = path
+        self._file = open(path, 'rb')
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError(f"{path} is not a snapshot") from None
+        if len(self._map) < self.HEADER.size or self._map[:len(self.MAGIC)] != self.MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a snapshot")
+        _, self._count, meta, self._offsets, self._order = self.HEADER.unpack_from(self._map)
+        import json
+        metadata = json.loads(self._map[meta:self._offsets].rstrip(b'\0'))
+        self.columns = metadata['columns']
+        self.name_column = metadata['name_column']
+
+    @classmethod
+    def write(cls, path, columns, rows, name_column=1):
+        """
+        Writes rows to a new snapshot file, streaming them from any iterable.
+
+        The file is written next to ``path`` and renamed over it once complete, so viewers
+        never map a partial snapshot.
+
+        :param path: The snapshot file.
+        :type path: str
+        :param columns: The column names.
+        :type columns: list of str
+        :param rows: One sequence of JSON-serializable values per row.
+        :type rows: iterable
+        :param name_column: The index of the column sorted in the name order.
+        :type name_column: int
+        :return: The number of rows written.
+        :rtype: int
+        """
+        import json
+        offsets = array('Q')
+        names = []
+        temporary = f"{path}.tmp"
+        with open(temporary, 'wb') as f:
+            f.write(b'\0' * cls.HEADER.size)
+            position = cls.HEADER.size
+            for row in rows:
+                encoded = json.dumps(list(row), separators=(',', ':')).encode() + b'\n'
+                offsets.append(position)
+                names.append(str(row[name_column]).lower())
+                f.write(encoded)
+                position += len(encoded)
+            offsets.append(position)
+            count = len(names)
+            order = array('I', sorted(range(count), key=names.__getitem__))
+            del names
+
+            meta = position
+            f.write(json.dumps({'columns': list(columns), 'name_column': name_column}).encode())
+            f.write(b'\0' * (-f.tell() % 8))
+            offsets_position = f.tell()
+            if sys.byteorder == 'big':
+                offsets.byteswap()
+                order.byteswap()
+            offsets.tofile(f)
+            order_position = f.tell()
+            order.tofile(f)
+            f.seek(0)
+            f.write(cls.HEADER.pack(cls.MAGIC, count, meta, offsets_position, order_position))
+        os.replace(temporary, path)
+        return count
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, index):
+        if not 0 <= index < self._count:
+            raise IndexError(index)
+        import json
+        start, end = struct.unpack_from('<QQ', self._map, self._offsets + 8 * index)
+        return json.loads(self._map[start:end])
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def rows(self, start, stop):
+        """
+        Decodes the rows between two row numbers, such as one page of a table.
+
+        :param start: The first row number.
+        :type start: int
+        :param stop: The row number after the last one.
+        :type stop: int
+        :return: The rows.
+        :rtype: list of list
+        """
+        return [self[index] for index in range(max(start, 0), min(stop, self._count))]
+
+    def search(self, prefix, limit=None):
+        """
+        Finds the rows whose name starts with a prefix, ignoring case, in name order.
+
+        Only the O(log n) rows probed by the binary search and the matches are decoded.
+
+        :param prefix: The name prefix.
+        :type prefix: str
+        :param limit: The maximum number of rows returned.
+        :type limit: int, optional
+        :return: The matching rows.
+        :rtype: list of list
+        """
+        prefix = prefix.lower()
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            if self._name(middle) < prefix:
+                low = middle + 1
+            else:
+                high = middle
+        matches = []
+        for position in range(low, self._count):
+            if limit is not None and len(matches) >= limit:
+                break
+            row = self[self._row_number(position)]
+            if not str(row[self.name_column]).lower().startswith(prefix):
+                break
+            matches.append(row)
+        return matches
+
+    def close(self):
+        """
+        Unmaps and closes the file.
+        """
+        self._map.close()
+        self._file.close()
+
+    def _row_number(self, position):
+        return struct.unpack_from('<I', self._map, self._order + 4 * position)[0]
+
+    def _name(self, position):
+        return str(self[self._row_number(position)][self.name_column]).lower()
+
@@ -0,0 +1,91 @@
+import os
+import sqlite3
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from school.schema import create_database  # noqa: E402
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    """
+    A new school database with the full schema.
+    """
+    path = str(tmp_path / 'school.db')
+    create_database(path)
+    return path
+
+
+@pytest.fixture
+def conn(db_path):
+    """
+    A connection to :func:`db_path` in autocommit mode.
+    """
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    yield conn
+    conn.close()
+
+
+def add_student(conn, student_id, name=None):
+    return conn.execute("INSERT INTO Students (name, age, email, student_id) VALUES (?, 20, ?, ?)",
+                        (name or student_id, f"{student_id.lower()}@school.example", student_id)).lastrowid
+
+
+def add_course(conn, course_id, name=None, capacity=None):
+    return conn.execute("INSERT INTO Courses (course_id, course_name, capacity) VALUES (?, ?, ?)",
+                        (course_id, name or course_id, capacity)).lastrowid
+
+
+def add_instructor(conn, instructor_id, name=None):
+    return conn.execute("INSERT INTO Instructors (name, age, email, instructor_id) VALUES (?, 40, ?, ?)",
+                        (name or instructor_id, f"{instructor_id.lower()}@school.example", instructor_id)).lastrowid
+
+
+def student_record(name, student_id, courses=(), age='20'):
+    """
+    A student in the record format of the Tkinter app.
+    """
+    return {'type': 'Student', 'id': student_id, 'name': name, 'age': age,
+            'email': f"{student_id.lower()}@school.example", 'courses': list(courses)}
+
+
+def instructor_record(name, instructor_id, courses=(), age='40'):
+    """
+    An instructor in the record format of the Tkinter app.
+    """
+    return {'type': 'Instructor', 'id': instructor_id, 'name': name, 'age': age,
+            'email': f"{instructor_id.lower()}@school.example", 'courses': list(courses)}
+
+
+def course_record(name, course_id, instructor='', students=(), grades=None):
+    """
+    A course in the record format of the Tkinter app.
+    """
+    return {'type': 'Course', 'id': course_id, 'name': name, 'instructor': instructor,
+            'students': list(students), 'grades': dict(grades or {}), 'meetings': ''}
+
+
+@pytest.fixture
+def qt_window(db_path, monkeypatch):
+    """
+    The PyQt5 main window on :func:`db_path`, off screen, with its message boxes
+    collected in ``window.messages`` as ``(title, text)`` instead of shown.
+    """
+    pytest.importorskip('PyQt5')
+    monkeypatch.setenv('QT_QPA_PLATFORM', 'offscreen')
+    app = pytest.importorskip('lab2_435lPyQt5')
+    from PyQt5.QtWidgets import QApplication
+    qapp = QApplication.instance() or QApplication([])
+    messages = []
+    for kind in ('information', 'warning', 'critical'):
+        monkeypatch.setattr(app.QMessageBox, kind, lambda parent, title, text, *args: messages.append((title, text)))
+    monkeypatch.setattr(app, 'DB_PATH', db_path)
+    window = app.SchoolManagementSystem()
+    window.messages = messages
+    qapp.processEvents()
+    yield window
+    window.close()
+    qapp.processEvents()
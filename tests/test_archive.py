@@ -0,0 +1,103 @@
+import pytest
+
+from conftest import add_course, add_instructor, add_student
+from school.db import Database
+
+ROWS = {
+    'Students': 'SELECT student_id, name, age, email FROM Students ORDER BY student_id',
+    'Instructors': 'SELECT instructor_id, name FROM Instructors ORDER BY instructor_id',
+    'Courses': '''SELECT c.course_id, c.course_name, i.instructor_id, c.meetings FROM Courses c
+                  LEFT JOIN Instructors i ON i.id = c.instructor_id ORDER BY c.course_id''',
+    'Registrations': '''SELECT s.student_id, c.course_id, r.grade FROM Registrations r
+                        JOIN Students s ON s.id = r.student_id JOIN Courses c ON c.id = r.course_id
+                        ORDER BY 1, 2''',
+}
+
+
+@pytest.fixture
+def school(conn):
+    ann, bob = add_student(conn, 'S1', 'Ann'), add_student(conn, 'S2', 'Bob')
+    hana, ivo = add_instructor(conn, 'I1', 'Hana'), add_instructor(conn, 'I2', 'Ivo')
+    math, art, bio = add_course(conn, 'C1', 'Math'), add_course(conn, 'C2', 'Art'), add_course(conn, 'C3', 'Bio')
+    conn.execute("UPDATE Courses SET instructor_id = ?, meetings = 'Mon 09:00-10:00' WHERE id = ?", (hana, math))
+    conn.execute("UPDATE Courses SET instructor_id = ? WHERE id IN (?, ?)", (ivo, art, bio))
+    conn.executemany("INSERT INTO Registrations (student_id, course_id, grade) VALUES (?, ?, ?)",
+                     [(ann, math, 3.5), (bob, math, None), (bob, art, 2.0)])
+    return conn
+
+
+def contents(conn):
+    return {table: conn.execute(sql).fetchall() for table, sql in ROWS.items()}
+
+
+def assert_archived(conn):
+    # Archiving Math and Bio removes what only they involve.
+    after = contents(conn)
+    assert [row[0] for row in after['Students']] == ['S2']
+    assert [row[0] for row in after['Instructors']] == ['I2']
+    assert [row[0] for row in after['Courses']] == ['C2']
+    assert after['Registrations'] == [('S2', 'C2', 2.0)]
+
+
+@pytest.fixture
+def qt_app():
+    pytest.importorskip('PyQt5')
+    return pytest.importorskip('lab2_435lPyQt5')
+
+
+@pytest.fixture
+def tk_app():
+    return pytest.importorskip('tkinter_withDB')
+
+
+def test_qt_archive_and_restore_round_trip(qt_app, school, db_path, tmp_path):
+    before = contents(school)
+    archive = qt_app.ColdArchive(str(tmp_path / 'archive'))
+    db = Database(db_path)
+    try:
+        assert archive.archive_courses(db, ['C1', 'C3', 'C9'], 'done') == 'done'
+        assert_archived(school)
+        assert archive.batches() == ['done']
+        assert [(name, row[1]) for name, row in archive.search('an')] == [('done', 'Ann'), ('done', 'Hana')]
+        assert archive.archive_courses(db, ['C9'], 'nothing') is None
+
+        # Restoring a course without its instructor leaves the rest archived.
+        assert archive.restore(db, 'done', ['C3']) == 1
+        assert [row[0] for row in contents(school)['Courses']] == ['C2', 'C3']
+        batch = archive.load('done')
+        assert [course['course_id'] for course in batch['courses']] == ['C1']
+
+        assert archive.restore(db, 'done') == 5
+        assert contents(school) == before
+        assert archive.batches() == []
+    finally:
+        db.close()
+
+
+def test_tk_archive_and_restore_round_trip(tk_app, school, db_path, tmp_path):
+    before = contents(school)
+    archive = tk_app.ColdArchive(str(tmp_path / 'archive'))
+    backend = tk_app.SQLiteBackend(db_path)
+    try:
+        assert archive.archive_courses(backend, ['C1', 'C3'], 'done') == 'done'
+        assert_archived(school)
+        assert archive.archive_courses(backend, ['C9']) is None
+        assert archive.restore(backend, 'done') == 6
+        assert contents(school) == before
+        assert archive.batches() == []
+    finally:
+        backend.close()
+
+
+def test_batches_are_shared_between_the_apps(qt_app, tk_app, school, db_path, tmp_path):
+    before = contents(school)
+    directory = str(tmp_path / 'archive')
+    backend = tk_app.SQLiteBackend(db_path)
+    db = Database(db_path)
+    try:
+        tk_app.ColdArchive(directory).archive_courses(backend, ['C1', 'C3'], 'done')
+        assert qt_app.ColdArchive(directory).restore(db, 'done') == 6
+        assert contents(school) == before
+    finally:
+        db.close()
+        backend.close()
@@ -0,0 +1,114 @@
+import time
+from datetime import datetime
+
+import pytest
+
+from conftest import add_course, add_student
+from school.audit import AuditLog, parse_when
+
+
+def mark():
+    # AuditLog times have millisecond precision; keeps the marks clear of the writes around them.
+    time.sleep(0.02)
+    when = time.time()
+    time.sleep(0.02)
+    return when
+
+
+def test_state_at_replays_changes_up_to_a_point_in_time(conn):
+    audit = AuditLog()
+    student = add_student(conn, 'S1', 'Ann')
+    before_rename = mark()
+    conn.execute("UPDATE Students SET name = 'Anne' WHERE id = ?", (student,))
+    before_delete = mark()
+    conn.execute("DELETE FROM Students WHERE id = ?", (student,))
+    assert audit.state_at(conn, before_rename)['Students'][student]['name'] == 'Ann'
+    assert audit.state_at(conn, before_delete)['Students'][student]['name'] == 'Anne'
+    assert student not in audit.state_at(conn, time.time())['Students']
+
+
+def test_record_at_finds_a_record_by_its_id_then(conn):
+    audit = AuditLog()
+    before_insert = mark()
+    course = add_course(conn, 'C1', 'Math')
+    before_renumber = mark()
+    conn.execute("UPDATE Courses SET course_id = 'C2' WHERE id = ?", (course,))
+    assert audit.record_at(conn, 'Course', 'C1', before_insert) is None
+    assert audit.record_at(conn, 'Course', 'C1', before_renumber)['course_name'] == 'Math'
+    assert audit.record_at(conn, 'Course', 'C1', time.time()) is None
+    assert audit.record_at(conn, 'Course', 'C2', time.time())['course_name'] == 'Math'
+
+
+def test_roster_at_lists_the_students_enrolled_then(conn):
+    audit = AuditLog()
+    course = add_course(conn, 'C1', 'Math')
+    ann, bob = add_student(conn, 'S1', 'Ann'), add_student(conn, 'S2', 'bob')
+    for student in (bob, ann):
+        conn.execute("INSERT INTO Registrations (student_id, course_id) VALUES (?, ?)", (student, course))
+    both = mark()
+    conn.execute("DELETE FROM Registrations WHERE student_id = ?", (ann,))
+    assert audit.roster_at(conn, 'C1', both) == [('S1', 'Ann'), ('S2', 'bob')]
+    assert audit.roster_at(conn, 'C1', time.time()) == [('S2', 'bob')]
+    assert audit.roster_at(conn, 'C9', time.time()) is None
+
+
+def test_state_before_the_first_checkpoint_is_refused(conn):
+    first = conn.execute("SELECT MIN(at) FROM AuditCheckpoint").fetchone()[0]
+    with pytest.raises(ValueError):
+        AuditLog().state_at(conn, first - 1)
+
+
+def test_maybe_checkpoint_waits_for_the_interval(conn):
+    audit = AuditLog(interval=3)
+    add_student(conn, 'S1')
+    before_checkpoint = mark()
+    add_student(conn, 'S2')
+    conn.execute("BEGIN IMMEDIATE")
+    assert not audit.maybe_checkpoint(conn)
+    conn.execute("COMMIT")
+    student = add_student(conn, 'S3')
+    conn.execute("BEGIN IMMEDIATE")
+    assert audit.maybe_checkpoint(conn)
+    conn.execute("COMMIT")
+    assert conn.execute("SELECT COUNT(*) FROM AuditCheckpoint").fetchone()[0] == 2
+    conn.execute("UPDATE Students SET name = 'Cy' WHERE id = ?", (student,))
+    # Earlier points are still answered from the first checkpoint, later ones from the new one.
+    assert sorted(row['student_id'] for row in audit.state_at(conn, before_checkpoint)['Students'].values()) == ['S1']
+    assert audit.state_at(conn, time.time())['Students'][student]['name'] == 'Cy'
+
+
+def test_parse_when():
+    assert parse_when('2024-05-01 14:30') == datetime(2024, 5, 1, 14, 30).timestamp()
+    # A date alone means the end of that day.
+    assert parse_when(' 2024-05-01 ') == datetime(2024, 5, 1, 23, 59, 59, 999999).timestamp()
+    with pytest.raises(ValueError):
+        parse_when('yesterday')
+
+
+def test_state_at_recovers_grade_history(conn):
+    audit = AuditLog()
+    course, student = add_course(conn, 'C1', 'Math'), add_student(conn, 'S1', 'Ann')
+    registration = conn.execute("INSERT INTO Registrations (student_id, course_id) VALUES (?, ?)",
+                                (student, course)).lastrowid
+    ungraded = mark()
+    conn.execute("UPDATE Registrations SET grade = 2.0 WHERE id = ?", (registration,))
+    graded = mark()
+    conn.execute("UPDATE Registrations SET grade = 3.7 WHERE id = ?", (registration,))
+    assert [audit.state_at(conn, when)['Registrations'][registration]['grade']
+            for when in (ungraded, graded, time.time())] == [None, 2.0, 3.7]
+
+
+def test_existing_databases_start_auditing_grades(db_path, conn):
+    from school.schema import create_database
+    conn.executescript('''
+    DROP TRIGGER audit_registrations_update;
+    CREATE TRIGGER audit_registrations_update AFTER UPDATE ON Registrations BEGIN
+        INSERT INTO AuditLog (table_name, row_id, data)
+        VALUES ('Registrations', NEW.id, json_object('student_id', NEW.student_id, 'course_id', NEW.course_id));
+    END;
+    ''')
+    create_database(db_path)
+    course, student = add_course(conn, 'C1', 'Math'), add_student(conn, 'S1', 'Ann')
+    conn.execute("INSERT INTO Registrations (student_id, course_id) VALUES (?, ?)", (student, course))
+    conn.execute("UPDATE Registrations SET grade = 4.0")
+    assert AuditLog().state_at(conn, time.time())['Registrations'][1]['grade'] == 4.0
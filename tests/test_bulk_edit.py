@@ -0,0 +1,81 @@
+import sqlite3
+
+import pytest
+
+from conftest import add_course, add_instructor, add_student, student_record
+
+
+@pytest.fixture
+def school(conn):
+    students = [add_student(conn, f'S{n}', f'Student {n}') for n in range(1, 4)]
+    add_instructor(conn, 'I1', 'Hana')
+    math, art = add_course(conn, 'C1', 'Math'), add_course(conn, 'C2', 'Art')
+    conn.executemany("INSERT INTO Registrations (student_id, course_id) VALUES (?, ?)",
+                     [(student, math) for student in students[:2]])
+    return math, art
+
+
+def column(conn, sql):
+    return [row[0] for row in conn.execute(sql)]
+
+
+def test_qt_bulk_edit_from_the_selection(qt_window, conn, school, monkeypatch):
+    app = pytest.importorskip('lab2_435lPyQt5')
+    window = qt_window
+    window.update_records_table()
+    table = window.records_table
+    for row in range(table.rowCount()):
+        if table.item(row, 0).text() in ('Student', 'Course'):
+            table.selectionModel().select(table.model().index(row, 0),
+                                          table.selectionModel().Select | table.selectionModel().Rows)
+    monkeypatch.setattr(app.QInputDialog, 'getItem', lambda *args: ('Set age', True))
+    monkeypatch.setattr(app.QInputDialog, 'getInt', lambda *args: (33, True))
+    flushes = window.write_queue.flushes
+    window.bulk_edit_records()
+    assert window.write_queue.flushes == flushes + 1
+    assert column(conn, "SELECT age FROM Students") == [33, 33, 33]
+    assert window.messages[-1] == ("Bulk Edit", "Set age: 3 of 5 selected records changed.")
+
+
+def test_qt_bulk_edits_are_written_in_one_transaction(qt_window, conn, school):
+    math, art = school
+    window = qt_window
+    students = [('Student', 'S1'), ('Student', 'S2'), ('Student', 'S3')]
+    writes = window.db.writes
+    assert window.queue_bulk_edit('Move students to course', students[:2], (math, art)) == 2
+    assert window.queue_bulk_edit('Change email domain', students + [('Student', 'S9')], 'school.example') == 0
+    assert window.queue_bulk_edit('Change email domain', students[:2] + [('Student', 'S9')], 'new.example') == 2
+    assert window.queue_bulk_edit('Assign instructor', [('Course', 'C1'), ('Course', 'C2')], 'I1') == 2
+    assert window.write_queue.flush() == []
+    assert window.db.writes == writes + 1
+    assert column(conn, "SELECT course_id FROM Registrations ORDER BY student_id") == [art, art]
+    assert column(conn, "SELECT email FROM Students ORDER BY student_id") == [
+        's1@new.example', 's2@new.example', 's3@school.example']
+    assert column(conn, "SELECT instructor_id IS NOT NULL FROM Courses") == [1, 1]
+
+
+def test_tk_editing_many_writes_one_transaction(db_path):
+    tk = pytest.importorskip('tkinter_withDB')
+    backend = tk.SQLiteBackend(db_path)
+    try:
+        store = tk.RecordStore([student_record(f'Student {n}', f'S{n}') for n in range(1, 4)], backend=backend)
+        backend.replace_all(store.records)
+        records = store.records
+        # The third email clashes with the first, so the whole edit is rolled back.
+        with pytest.raises(sqlite3.IntegrityError):
+            with store.editing_many(records):
+                for record in records:
+                    record['email'] = record['email'].replace('school', 'new')
+                records[2]['email'] = records[0]['email']
+        assert [record['email'] for record in records] == [f's{n}@school.example' for n in range(1, 4)]
+        assert column(backend.conn, "SELECT email FROM Students ORDER BY id") == [
+            f's{n}@school.example' for n in range(1, 4)]
+
+        with store.editing_many(records + records[:1]):
+            for record in records:
+                record['age'] = '33'
+        assert column(backend.conn, "SELECT age FROM Students") == [33, 33, 33]
+        assert [record['name'] for record in store.ordered(tk.TABLE_COLUMNS.index("Age"))] == [
+            'Student 1', 'Student 2', 'Student 3']
+    finally:
+        backend.close()
@@ -0,0 +1,63 @@
+from conftest import add_course, add_instructor, add_student
+
+
+def logged(conn, after=0):
+    return [row[1:] for row in conn.execute(
+        "SELECT seq, record_type, row_id, old_name, old_record_id, old_email FROM ChangeLog "
+        "WHERE seq > ? ORDER BY seq", (after,))]
+
+
+def last_seq(conn):
+    return conn.execute("SELECT COALESCE(MAX(seq), 0) FROM ChangeLog").fetchone()[0]
+
+
+def test_insert_logs_no_old_values(conn):
+    student = add_student(conn, 'S1', 'Ann')
+    course = add_course(conn, 'C1', 'Math')
+    assert logged(conn) == [('Student', student, None, None, None), ('Course', course, None, None, None)]
+
+
+def test_update_and_delete_log_old_values(conn):
+    student = add_student(conn, 'S1', 'Ann')
+    course = add_course(conn, 'C1', 'Math')
+    seq = last_seq(conn)
+    conn.execute("UPDATE Students SET name = 'Anne', student_id = 'S9' WHERE id = ?", (student,))
+    conn.execute("DELETE FROM Students WHERE id = ?", (student,))
+    conn.execute("UPDATE Courses SET course_name = 'Algebra' WHERE id = ?", (course,))
+    assert logged(conn, seq) == [
+        ('Student', student, 'Ann', 'S1', 's1@school.example'),
+        ('Student', student, 'Anne', 'S9', 's1@school.example'),
+        ('Course', course, 'Math', 'C1', ''),
+    ]
+
+
+def test_registration_logs_student_and_course(conn):
+    student = add_student(conn, 'S1', 'Ann')
+    course = add_course(conn, 'C1', 'Math')
+    seq = last_seq(conn)
+    conn.execute("INSERT INTO Registrations (student_id, course_id) VALUES (?, ?)", (student, course))
+    conn.execute("UPDATE Registrations SET grade = 3.0 WHERE student_id = ?", (student,))
+    conn.execute("DELETE FROM Registrations WHERE student_id = ?", (student,))
+    expected = [('Student', student, 'Ann', 'S1', 's1@school.example'), ('Course', course, 'Math', 'C1', '')]
+    assert logged(conn, seq) == expected * 3
+
+
+def test_assignment_logs_old_and_new_instructor(conn):
+    first, second = add_instructor(conn, 'I1', 'Kim'), add_instructor(conn, 'I2', 'Lee')
+    course = add_course(conn, 'C1', 'Math')
+    conn.execute("UPDATE Courses SET instructor_id = ? WHERE id = ?", (first, course))
+    seq = last_seq(conn)
+    conn.execute("UPDATE Courses SET instructor_id = ? WHERE id = ?", (second, course))
+    # Triggers on the same event fire in no documented order.
+    assert sorted(logged(conn, seq)) == [('Course', course, 'Math', 'C1', ''),
+                                         ('Instructor', first, 'Kim', 'I1', 'i1@school.example'),
+                                         ('Instructor', second, 'Lee', 'I2', 'i2@school.example')]
+
+
+def test_unchanged_assignment_logs_only_the_course(conn):
+    instructor = add_instructor(conn, 'I1', 'Kim')
+    course = add_course(conn, 'C1', 'Math')
+    conn.execute("UPDATE Courses SET instructor_id = ? WHERE id = ?", (instructor, course))
+    seq = last_seq(conn)
+    conn.execute("UPDATE Courses SET meetings = 'Mon 09:00-10:00' WHERE id = ?", (course,))
+    assert logged(conn, seq) == [('Course', course, 'Math', 'C1', '')]
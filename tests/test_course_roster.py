@@ -0,0 +1,77 @@
+import pytest
+
+from conftest import add_course, add_instructor, add_student, course_record, student_record
+from school.db import Database
+
+
+@pytest.fixture
+def course(conn):
+    math = add_course(conn, 'C1', 'Math', capacity=10)
+    hana = add_instructor(conn, 'I1', 'Hana')
+    conn.execute("UPDATE Courses SET instructor_id = ?, meetings = 'Mon 09:00-10:00' WHERE id = ?", (hana, math))
+    for n in range(7):
+        student = add_student(conn, f'S{n}', f'Student {n}')
+        conn.execute("INSERT INTO Registrations (student_id, course_id, grade) VALUES (?, ?, ?)",
+                     (student, math, 3.0 if n < 2 else None))
+    return math
+
+
+def rows(table):
+    return [[table.item(row, col).text() for col in range(table.columnCount())] for row in range(table.rowCount())]
+
+
+def test_qt_roster_is_read_a_page_at_a_time(qt_window, conn, db_path, course, monkeypatch):
+    app = pytest.importorskip('lab2_435lPyQt5')
+    monkeypatch.setattr(app, 'ROSTER_PAGE_SIZE', 3)
+    db = Database(db_path)
+    try:
+        window = app.CourseRosterWindow(db, 'C1')
+        details = window.details_label.text()
+        assert 'Instructor: Hana (I1)' in details and 'Seats: 7 of 10 taken' in details
+        assert 'Average grade: 3.00 over 2 graded' in details
+        assert [row[0] for row in rows(window.roster_table)] == ['S0', 'S1', 'S2']
+        assert window.status_label.text() == "Showing 3 of 7 students"
+        window.load_more()
+        window.load_more()
+        assert [row[0] for row in rows(window.roster_table)] == [f'S{n}' for n in range(7)]
+        assert rows(window.roster_table)[6][1:3] == ['Student 6', 's6@school.example']
+        window.load_more()
+        assert window.roster_table.rowCount() == 7
+
+        conn.execute("DELETE FROM Registrations WHERE student_id = (SELECT id FROM Students WHERE student_id = 'S0')")
+        window.reload()
+        assert window.total == 6 and rows(window.roster_table)[0][0] == 'S1'
+        conn.execute("DELETE FROM Courses WHERE id = ?", (course,))
+        window.reload()
+        assert window.details_label.text() == "Course C1 no longer exists." and window.roster_table.rowCount() == 0
+        window.close()
+    finally:
+        db.close()
+
+
+def test_qt_records_table_counts_and_opens_courses(qt_window, course):
+    window = qt_window
+    window.update_records_table()
+    table = window.records_table
+    by_type = {}
+    for row in range(table.rowCount()):
+        by_type.setdefault(table.item(row, 0).text(), []).append(row)
+    course_row, student_row = by_type['Course'][0], by_type['Student'][0]
+    assert table.item(course_row, 4).text() == '7 students'
+
+    window.open_course_roster(student_row, 0)
+    assert window.roster_windows == []
+    table.selectRow(course_row)
+    window.open_course_roster(course_row, 0)
+    assert [roster.course_id for roster in window.roster_windows] == ['C1']
+    window.roster_windows[0].close()
+
+
+def test_tk_table_values_count_links():
+    tk = pytest.importorskip('tkinter_withDB')
+    course = course_record('Math', 'C1', 'Hana', [f'Student {n}' for n in range(120)])
+    assert tk.table_values(course)[-1] == 'Instructor: Hana; 120 students'
+    assert tk.table_values(course_record('Art', 'C2', students=['Ann']))[-1] == 'Instructor: ; 1 student'
+    assert tk.table_values(student_record('Ann', 'S1', ['Math']))[-1] == '1 course'
+    # Exports keep the full lists.
+    assert tk.record_values(student_record('Ann', 'S1', ['Math', 'Art']))[-1] == 'Math, Art'
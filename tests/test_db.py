@@ -0,0 +1,75 @@
+import sqlite3
+
+import pytest
+
+from conftest import add_student
+from school import db as school_db
+from school.db import Database, is_busy_error
+
+
+@pytest.fixture
+def database(db_path, monkeypatch):
+    monkeypatch.setattr(school_db, 'BUSY_TIMEOUT_MS', 10)
+    monkeypatch.setattr(school_db, 'WRITE_RETRIES', 2)
+    monkeypatch.setattr(school_db, 'RETRY_BASE_MS', 1)
+    monkeypatch.setattr(school_db, 'RETRY_MAX_MS', 2)
+    database = Database(db_path)
+    yield database
+    database.close()
+
+
+def insert_ann(conn):
+    return add_student(conn, 'S1', 'Ann')
+
+
+def count(conn):
+    return conn.execute('SELECT COUNT(*) FROM Students').fetchone()[0]
+
+
+def test_busy_errors():
+    assert is_busy_error(sqlite3.OperationalError('database is locked'))
+    assert is_busy_error(sqlite3.OperationalError('database is busy'))
+    assert not is_busy_error(sqlite3.OperationalError('no such table: Nope'))
+    assert not is_busy_error(sqlite3.IntegrityError('UNIQUE constraint failed: locked'))
+
+
+def test_busy_attempts_are_rolled_back_and_retried(database, conn):
+    attempts = []
+
+    def work(write_conn):
+        attempts.append(insert_ann(write_conn))
+        if len(attempts) == 1:
+            raise sqlite3.OperationalError('database is locked')
+        return attempts[-1]
+
+    assert database.write(work) == attempts[-1]
+    assert len(attempts) == 2 and count(conn) == 1
+    stats = database.stats()
+    assert (stats['writes'], stats['retries'], stats['failures']) == (1, 1, 0)
+
+
+def test_gives_up_while_another_connection_holds_the_lock(database, conn):
+    conn.execute('BEGIN IMMEDIATE')
+    try:
+        with pytest.raises(sqlite3.OperationalError, match='locked'):
+            database.write(insert_ann)
+        # Readers are not blocked by the writer in WAL mode.
+        with database.reading() as cursor:
+            assert cursor.execute('SELECT COUNT(*) FROM Students').fetchone()[0] == 0
+    finally:
+        conn.execute('ROLLBACK')
+    assert (database.retries, database.failures, database.writes) == (2, 1, 0)
+    database.write(insert_ann)
+    assert count(conn) == 1 and database.writes == 1
+
+
+def test_other_errors_roll_back_without_retrying(database, conn):
+    def work(write_conn):
+        insert_ann(write_conn)
+        raise ValueError('bad input')
+
+    with pytest.raises(ValueError):
+        database.write(work)
+    assert not database.writer.in_transaction
+    assert count(conn) == 0
+    assert (database.retries, database.failures) == (0, 0)
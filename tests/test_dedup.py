@@ -0,0 +1,105 @@
+import pytest
+
+from conftest import add_course, add_instructor, add_student
+from school.dedup import DuplicateFinder
+
+
+def person(key, name, email, age=20, record_type='Student'):
+    return (key, record_type, f'ID{key}', name, email, age)
+
+
+def test_blocking_pairs_only_people_sharing_a_key():
+    finder = DuplicateFinder([
+        person(0, 'Jon Smith', 'jon.smith@a.example'),
+        person(1, 'John Smyth', 'jsmyth@b.example'),
+        person(2, 'Mary Ng', 'jonsmith+x@c.example'),
+        person(3, 'Wu Li', 'wu@d.example'),
+        person(4, 'Jon Smith', 'jon.smith@a.example', record_type='Instructor'),
+    ])
+    pairs = finder.candidate_pairs()
+    # Soundex codes pair the two spellings, the email local part pairs Mary with Jon.
+    assert {(0, 1), (0, 2)} <= pairs
+    assert not any(3 in pair for pair in pairs)
+    # People of different types are never compared.
+    assert not any(4 in pair for pair in pairs)
+
+
+def test_soundex_and_normalization():
+    assert DuplicateFinder.soundex('robert') == DuplicateFinder.soundex('rupert') == 'R163'
+    assert DuplicateFinder.soundex('ashcraft') == 'A261'
+    assert DuplicateFinder.normalize_name("  José  O'Neil ") == 'jose o neil'
+    assert DuplicateFinder.email_local_part('Jon.Smith+tag@x.example') == 'jonsmith'
+
+
+def test_suggestions_keep_the_older_person():
+    finder = DuplicateFinder([
+        person(0, 'Jon Smith', 'jon.smith@a.example'),
+        person(1, 'Smith, Jon', 'jonsmith@b.example'),
+        person(2, 'Jon Smith', 'jsmith@c.example', age=60),
+    ])
+    suggestions = finder.suggestions()
+    assert [(keep[0], duplicate[0]) for _, keep, duplicate in suggestions] == [(0, 1)]
+    assert suggestions[0][0] == 1.0
+    # A large age gap lowers the score below the threshold.
+    assert (0, 2) in finder.candidate_pairs()
+
+
+def test_merge_rows_moves_registrations_and_courses(conn):
+    keep, duplicate = add_student(conn, 'S1', 'Ann'), add_student(conn, 'S2', 'Ann')
+    math, art = add_course(conn, 'C1', 'Math'), add_course(conn, 'C2', 'Art')
+    conn.execute("INSERT INTO Registrations (student_id, course_id, grade) VALUES (?, ?, 4.0)", (keep, math))
+    conn.execute("INSERT INTO Registrations (student_id, course_id, grade) VALUES (?, ?, 1.0)", (duplicate, math))
+    conn.execute("INSERT INTO Registrations (student_id, course_id, grade) VALUES (?, ?, 3.0)", (duplicate, art))
+    kim, kim_again = add_instructor(conn, 'I1', 'Kim'), add_instructor(conn, 'I2', 'Kim')
+    conn.execute("UPDATE Courses SET instructor_id = ? WHERE id = ?", (kim_again, art))
+
+    conn.execute("BEGIN IMMEDIATE")
+    DuplicateFinder.merge_rows(conn, 'Student', keep, duplicate)
+    DuplicateFinder.merge_rows(conn, 'Instructor', kim, kim_again)
+    conn.execute("COMMIT")
+    assert sorted(conn.execute("SELECT student_id, course_id, grade FROM Registrations")) == [
+        (keep, math, 4.0), (keep, art, 3.0)]
+    assert conn.execute("SELECT id FROM Students").fetchall() == [(keep,)]
+    assert conn.execute("SELECT instructor_id FROM Courses WHERE id = ?", (art,)).fetchone() == (kim,)
+    assert conn.execute("SELECT id FROM Instructors").fetchall() == [(kim,)]
+
+
+@pytest.fixture
+def store():
+    tkinter_withDB = pytest.importorskip('tkinter_withDB')
+    return tkinter_withDB.RecordStore([
+        {'type': 'Student', 'id': 'S1', 'name': 'Ann Lee', 'age': '20', 'email': 'ann@x.example', 'courses': ['Math']},
+        {'type': 'Student', 'id': 'S2', 'name': 'Ann Lee', 'age': '20', 'email': 'ann@y.example', 'courses': ['Math', 'Art']},
+        {'type': 'Student', 'id': 'S3', 'name': 'Anne Lee', 'age': '20', 'email': 'anne@x.example', 'courses': ['Bio']},
+        {'type': 'Course', 'id': 'C1', 'name': 'Math', 'instructor': '', 'students': ['Ann Lee'],
+         'grades': {'Ann Lee': 3.0}, 'meetings': ''},
+        {'type': 'Course', 'id': 'C2', 'name': 'Art', 'instructor': '', 'students': ['Ann Lee'],
+         'grades': {'Ann Lee': 2.0}, 'meetings': ''},
+        {'type': 'Course', 'id': 'C3', 'name': 'Bio', 'instructor': '', 'students': ['Anne Lee'],
+         'grades': {'Anne Lee': 4.0}, 'meetings': ''},
+    ])
+
+
+def records(store, record_type):
+    return {record['id']: record for record in store.records if record['type'] == record_type}
+
+
+def test_merge_records_with_the_same_name_keeps_grades(store):
+    students = records(store, 'Student')
+    DuplicateFinder.merge_records(store, students['S1'], students['S2'])
+    courses = records(store, 'Course')
+    assert 'S2' not in records(store, 'Student')
+    assert students['S1']['courses'] == ['Math', 'Art']
+    assert courses['C1']['grades'] == {'Ann Lee': 3.0}
+    assert courses['C2']['grades'] == {'Ann Lee': 2.0}
+    assert store.gradebook.gpa('Ann Lee') == 2.5
+
+
+def test_merge_records_moves_grades_to_another_name(store):
+    students = records(store, 'Student')
+    DuplicateFinder.merge_records(store, students['S1'], students['S3'])
+    bio = records(store, 'Course')['C3']
+    assert bio['students'] == ['Ann Lee']
+    assert bio['grades'] == {'Ann Lee': 4.0}
+    assert students['S1']['courses'] == ['Math', 'Bio']
+    assert store.gradebook.gpa('Anne Lee') is None
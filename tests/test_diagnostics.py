@@ -0,0 +1,83 @@
+import tracemalloc
+
+import pytest
+
+from school.diagnostics import MemoryProfiler
+
+
+class Leak:
+    pass
+
+
+class Clerk:
+    def __init__(self):
+        self.kept = []
+
+    def leak(self):
+        self.kept.append((Leak(), bytearray(100_000)))
+
+    def tidy(self):
+        bytearray(100_000)
+
+
+@pytest.fixture
+def profiler():
+    tracing = tracemalloc.is_tracing()
+    yield MemoryProfiler(frames=5)
+    if not tracing:
+        tracemalloc.stop()
+
+
+def test_growth_is_attributed_to_the_action(profiler):
+    clerk = Clerk()
+    with profiler.track('leak'):
+        clerk.leak()
+    with profiler.track('tidy'):
+        clerk.tidy()
+    leak, tidy = profiler.actions['leak'], profiler.actions['tidy']
+    assert leak['calls'] == 1 and leak['net_bytes'] >= 100_000
+    assert leak['objects'].get('Leak') == 1
+    assert any(line.startswith(__file__) and size >= 100_000 for line, size in leak['allocators'].items())
+    assert tidy['net_bytes'] < 10_000 and 'Leak' not in tidy['objects']
+
+
+def test_nested_actions_count_towards_the_outer_one(profiler):
+    clerk = Clerk()
+    with profiler.track('outer'):
+        with profiler.track('inner'):
+            clerk.leak()
+    assert list(profiler.actions) == ['outer']
+    assert profiler.actions['outer']['net_bytes'] >= 100_000
+
+
+def test_instrumented_methods_ignore_extra_arguments(profiler):
+    clerk = Clerk()
+    profiler.instrument(clerk, {'leak': 'leak', 'tidy': 'tidy'})
+    # Like a Tk event binding or a Qt clicked(bool) signal.
+    clerk.leak('<Button-1>')
+    clerk.tidy(False)
+    assert clerk.leak.__name__ == 'leak' and len(clerk.kept) == 1
+    assert {action: stats['calls'] for action, stats in profiler.actions.items()} == {'leak': 1, 'tidy': 1}
+
+
+def test_soak_separates_leaks_from_steady_actions(profiler):
+    clerk = Clerk()
+    progress = []
+    growth = profiler.soak({'leak': clerk.leak, 'tidy': clerk.tidy}, iterations=5, warmup=2,
+                           progress=lambda: progress.append(1))
+    assert len(progress) == 14 and len(clerk.kept) == 7
+    assert growth['leak'] >= 100_000 and growth['tidy'] < 1_000
+    assert profiler.actions['leak']['calls'] == 5
+
+
+def test_report_lists_the_largest_growth_first(profiler):
+    assert profiler.report() == "No actions tracked yet."
+    clerk = Clerk()
+    with profiler.track('tidy'):
+        clerk.tidy()
+    with profiler.track('leak'):
+        clerk.leak()
+    lines = profiler.report().splitlines()
+    assert lines[0].startswith('leak: 1 calls, +') and 'KiB net' in lines[0]
+    assert any(line.strip() == '+1  Leak objects' for line in lines)
+    assert [line for line in lines if not line.startswith(' ')][-1].startswith('tidy: 1 calls')
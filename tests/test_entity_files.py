@@ -0,0 +1,84 @@
+import json
+import os
+
+import pytest
+
+pytest.importorskip('PyQt5')
+app = pytest.importorskip('lab2_435lPyQt5')
+
+
+@pytest.fixture
+def entities():
+    ann = app.Student('Ann', 20, 'ann@school.example', 'S1')
+    bob = app.Student('Bob', 21, 'bob@school.example', 'S2')
+    hana = app.Instructor('Hana', 40, 'hana@school.example', 'I1')
+    math = app.Course('C1', 'Math', hana, meetings='Mon 09:00-10:00')
+    art = app.Course('C/2', 'Art', None, capacity=10)
+    math.enrolled_students = [ann, bob]
+    art.enrolled_students = [bob]
+    ann.registered_courses = [math]
+    bob.registered_courses = [math, art]
+    hana.assigned_courses = [math]
+    return {'Student': [ann, bob], 'Instructor': [hana], 'Course': [math, art]}
+
+
+def summary(loaded):
+    """The loaded entities with their links, by ID and name."""
+    return {
+        'students': sorted((s.student_id, s.name, [c.course_id for c in s.registered_courses])
+                           for s in loaded['Student']),
+        'instructors': sorted((i.instructor_id, [c.course_id for c in i.assigned_courses])
+                              for i in loaded['Instructor']),
+        'courses': sorted((c.course_id, c.instructor.name if c.instructor else None,
+                           sorted(s.name for s in c.enrolled_students), c.capacity, c.meetings)
+                          for c in loaded['Course']),
+    }
+
+
+@pytest.mark.parametrize('processes', [False, True])
+def test_saved_directory_loads_and_relinks(entities, tmp_path, processes):
+    files = app.EntityFiles(workers=2, processes=processes)
+    report = files.save(entities, str(tmp_path / 'out'))
+    assert report.ok and report.counts == {'Person': 0, 'Student': 2, 'Instructor': 1, 'Course': 2}
+    assert sorted(os.listdir(tmp_path / 'out')) == [
+        'course_C%2F2.json', 'course_C1.json', 'instructor_I1.json', 'student_S1.json', 'student_S2.json']
+
+    loaded, report = files.load(str(tmp_path / 'out'))
+    assert report.ok and report.counts['Course'] == 2
+    assert summary(loaded) == summary(entities)
+
+
+def test_packed_archive_loads_and_reads_single_entities(entities, tmp_path):
+    files = app.EntityFiles(workers=2, processes=False)
+    files.save(entities, str(tmp_path / 'out'))
+    archive = str(tmp_path / 'school.zip')
+    assert files.pack(str(tmp_path / 'out'), archive) == 5
+    loaded, report = files.load(archive)
+    assert report.ok and summary(loaded) == summary(entities)
+
+    bob = files.read(archive, 'Student', 'S2')
+    assert (bob.name, bob.registered_courses) == ('Bob', ['C1', 'C/2'])
+    with pytest.raises(KeyError):
+        files.read(archive, 'Student', 'S9')
+
+    files.save(entities, str(tmp_path / 'direct.zip'), packed=True)
+    loaded, report = files.load(str(tmp_path / 'direct.zip'))
+    assert report.ok and summary(loaded) == summary(entities)
+
+
+def test_bad_files_and_dangling_references_are_reported(entities, tmp_path):
+    files = app.EntityFiles(workers=2, processes=False)
+    directory = tmp_path / 'out'
+    files.save(entities, str(directory))
+    (directory / 'broken.json').write_text('{"name": ')
+    (directory / 'student_S3.json').write_text(json.dumps(
+        {'name': 'Cy', 'age': 22, 'email': 'cy@school.example', 'student_id': 'S3', 'registered_courses': ['C9']}))
+    (directory / 'course_C1_copy.json').write_text(json.dumps(
+        {'course_id': 'C1', 'course_name': 'Math again', 'instructor': 'Nobody', 'enrolled_students': []}))
+
+    loaded, report = files.load(str(directory))
+    assert not report.ok
+    assert sorted((os.path.basename(e['source']), e['error']) for e in report.errors) == [
+        ('broken.json', 'JSONDecodeError'), ('course_C1_copy.json', 'ValueError')]
+    assert [(os.path.basename(u['source']), u['reference']) for u in report.unresolved] == [('student_S3.json', 'C9')]
+    assert report.counts['Student'] == 3 and report.counts['Course'] == 2
@@ -0,0 +1,118 @@
+import pytest
+
+from conftest import add_course, add_student
+from school.grades import Gradebook, RecordGradebook, format_grade, parse_grade
+
+
+def totals(conn):
+    return {row[:2]: row[2:] for row in conn.execute(
+        "SELECT record_type, row_id, points, graded FROM GradeTotals")}
+
+
+def register(conn, student, course, grade=None):
+    conn.execute("INSERT INTO Registrations (student_id, course_id, grade) VALUES (?, ?, ?)",
+                 (student, course, grade))
+
+
+@pytest.fixture
+def school(conn):
+    """
+    Three students and two courses; Ann and Bob tie at 3.5 and Cy has 2.0.
+    """
+    math, art = add_course(conn, 'C1', 'Math'), add_course(conn, 'C2', 'Art')
+    ann, bob, cy = (add_student(conn, student_id) for student_id in ('S1', 'S2', 'S3'))
+    register(conn, ann, math, 4.0)
+    register(conn, ann, art, 3.0)
+    register(conn, bob, math, 3.5)
+    register(conn, cy, art, 2.0)
+    return conn, (ann, bob, cy), (math, art)
+
+
+def test_totals_follow_grades(conn):
+    course, student = add_course(conn, 'C1'), add_student(conn, 'S1')
+    register(conn, student, course)
+    assert totals(conn) == {}
+    conn.execute("UPDATE Registrations SET grade = 3.0")
+    assert totals(conn) == {('Student', student): (3.0, 1), ('Course', course): (3.0, 1)}
+    conn.execute("UPDATE Registrations SET grade = 2.0")
+    assert totals(conn) == {('Student', student): (2.0, 1), ('Course', course): (2.0, 1)}
+    conn.execute("UPDATE Registrations SET grade = NULL")
+    assert totals(conn) == {}
+    conn.execute("UPDATE Registrations SET grade = 4.0")
+    conn.execute("DELETE FROM Registrations")
+    assert totals(conn) == {}
+
+
+def test_gradebook_ranks_with_ties(school):
+    conn, (ann, bob, cy), (math, art) = school
+    gradebook = Gradebook()
+    gradebook.load(conn.cursor())
+    assert gradebook.gpa(ann) == gradebook.gpa(bob) == 3.5
+    assert gradebook.average(math) == 3.75
+    assert gradebook.standing(ann) == gradebook.standing(bob) == (1, 3, pytest.approx(100 / 3))
+    assert gradebook.standing(cy) == (3, 3, 0.0)
+
+
+def test_gradebook_refresh_moves_one_student(school):
+    conn, (ann, bob, cy), (math, art) = school
+    gradebook = Gradebook()
+    gradebook.load(conn.cursor())
+    conn.execute("UPDATE Registrations SET grade = 4.0 WHERE student_id = ?", (cy,))
+    new = add_student(conn, 'S4')
+    register(conn, new, math, 1.0)
+    gradebook.refresh(conn.cursor(), 'Student', [cy, new])
+    gradebook.refresh(conn.cursor(), 'Course', [math, art])
+    assert gradebook.standing(cy) == (1, 4, 75.0)
+    assert gradebook.standing(ann) == (2, 4, 25.0)
+    assert gradebook.standing(new) == (4, 4, 0.0)
+    assert gradebook.average(art) == 3.5
+
+    conn.execute("DELETE FROM Registrations WHERE student_id = ?", (new,))
+    gradebook.refresh(conn.cursor(), 'Student', [new])
+    assert gradebook.standing(new) is None
+    assert gradebook.standing(ann) == (2, 3, pytest.approx(0.0))
+    # Loading from scratch agrees with the refreshed ranks.
+    reloaded = Gradebook()
+    reloaded.load(conn.cursor())
+    assert [reloaded.standing(s) for s in (ann, bob, cy)] == [gradebook.standing(s) for s in (ann, bob, cy)]
+
+
+def test_refresh_before_load_does_nothing(school):
+    conn, (ann, bob, cy), _ = school
+    gradebook = Gradebook()
+    gradebook.refresh(conn.cursor(), 'Student', [ann])
+    assert gradebook.gpa(ann) is None and not gradebook.loaded
+
+
+def test_record_gradebook_add_and_remove():
+    math = {'type': 'Course', 'students': ['Ann', 'Bob'], 'grades': {'Ann': 4.0, 'Bob': 2.0, 'Cy': 1.0}}
+    art = {'type': 'Course', 'students': ['Ann'], 'grades': {'Ann': 3.0}}
+    gradebook = RecordGradebook([math, art, {'type': 'Student', 'name': 'Ann'}])
+    assert gradebook.gpa('Ann') == 3.5
+    # Cy is not registered, so their grade does not count.
+    assert gradebook.gpa('Cy') is None
+    assert gradebook.average(math) == 3.0
+    assert gradebook.standing('Bob') == (2, 2, 0.0)
+
+    gradebook.remove(math)
+    math['grades']['Bob'] = 4.0
+    gradebook.add(math)
+    assert gradebook.standing('Bob') == (1, 2, 50.0)
+    gradebook.remove(art)
+    assert gradebook.gpa('Ann') == 4.0 and gradebook.average(art) is None
+    assert gradebook.standing('Ann') == (1, 2, 0.0)
+
+
+@pytest.mark.parametrize('text, points', [('b+', 3.3), (' A ', 4.0), ('2.5', 2.5), ('', None), (None, None)])
+def test_parse_grade(text, points):
+    assert parse_grade(text) == points
+
+
+@pytest.mark.parametrize('text', ['E', '4.5', '-1'])
+def test_parse_grade_rejects(text):
+    with pytest.raises(ValueError):
+        parse_grade(text)
+
+
+def test_format_grade():
+    assert [format_grade(points) for points in (3.3, 0.0, 3.45, None)] == ['B+', 'F', '3.45', '']
@@ -0,0 +1,98 @@
+import pytest
+
+from conftest import add_course, add_instructor, add_student, course_record, instructor_record, student_record
+from school.db import Database
+
+
+@pytest.fixture
+def qt_app():
+    pytest.importorskip('PyQt5')
+    return pytest.importorskip('lab2_435lPyQt5')
+
+
+@pytest.fixture
+def tk_app():
+    return pytest.importorskip('tkinter_withDB')
+
+
+def test_qt_check_finds_courses_of_a_deleted_instructor(qt_app, conn, db_path, monkeypatch):
+    monkeypatch.setattr(qt_app.IntegrityChecker, 'SCAN_RANGE', 2)
+    hana, ivo = add_instructor(conn, 'I1', 'Hana'), add_instructor(conn, 'I2', 'Ivo')
+    courses = [add_course(conn, f'C{n}') for n in range(5)]
+    conn.execute("UPDATE Courses SET instructor_id = ? WHERE id IN (?, ?)", (hana, courses[1], courses[3]))
+    conn.execute("UPDATE Courses SET instructor_id = ? WHERE id = ?", (ivo, courses[4]))
+    ann = add_student(conn, 'S1', 'Ann')
+    conn.execute("INSERT INTO Registrations (student_id, course_id) VALUES (?, ?)", (ann, courses[1]))
+    checker = qt_app.IntegrityChecker(db_path, workers=2)
+    # The first check is a full scan.
+    assert checker.check(conn) == [] and checker.last_seq is not None
+
+    conn.execute("DELETE FROM Instructors WHERE id = ?", (hana,))
+    assert sorted(checker.check(conn)) == [('Courses', courses[1], 'instructor_id', hana),
+                                           ('Courses', courses[3], 'instructor_id', hana)]
+    # Known orphans are kept, but only reported when first found.
+    assert checker.check(conn) == [] and len(checker.orphans) == 2
+    assert sorted(checker.scan()) == sorted((*key, missing) for key, missing in checker.orphans.items())
+
+    db = Database(db_path)
+    try:
+        assert db.write(checker.repair) == 2
+    finally:
+        db.close()
+    assert checker.check(conn) == [] and checker.orphans == {}
+    assert conn.execute("SELECT COUNT(*) FROM Courses WHERE instructor_id IS NOT NULL").fetchone()[0] == 1
+
+
+def test_qt_check_reads_only_the_changed_rows(qt_app, conn, db_path):
+    math = add_course(conn, 'C1', 'Math')
+    checker = qt_app.IntegrityChecker(db_path)
+    checker.scan()
+    # A registration written without its student, as a tool bypassing the app could.
+    conn.execute("INSERT INTO Registrations (student_id, course_id) VALUES (?, ?)", (999, math))
+    registration = conn.execute("SELECT id FROM Registrations").fetchone()[0]
+    assert checker.check(conn) == [('Registrations', registration, 'student_id', 999)]
+    conn.execute("DELETE FROM Registrations")
+    assert checker.check(conn) == [] and checker.orphans == {}
+
+
+def test_tk_check_after_deleting_an_instructor(tk_app):
+    hana = instructor_record('Hana', 'I1', ['Math', 'Art'])
+    math, art = course_record('Math', 'C1', 'Hana', ['Ann']), course_record('Art', 'C2', 'Hana')
+    store = tk_app.RecordStore([hana, math, art, student_record('Ann', 'S1', ['Math'])])
+    integrity = store.integrity
+    # Loaded records are only checked by a full check.
+    assert integrity.check() == []
+    assert integrity.check(full=True) == []
+
+    store.remove(hana)
+    assert integrity.check() == [('Course', 'Art', 'Instructor', 'Hana', 'missing'),
+                                 ('Course', 'Math', 'Instructor', 'Hana', 'missing')]
+    assert integrity.check() == [] and len(integrity.broken_links()) == 2
+
+    assert integrity.repair(store) == 2
+    assert integrity.check() == [] and integrity.broken_links() == []
+    assert math['instructor'] == 'None' and art['instructor'] == 'None'
+
+
+def test_tk_repair_gives_way_to_the_latest_change(tk_app):
+    ann = student_record('Ann', 'S1', ['Math'])
+    bob = student_record('Bob', 'S2')
+    math = course_record('Math', 'C1', students=['Ann'])
+    store = tk_app.RecordStore([ann, bob, math])
+    with store.editing(math):
+        math['students'] = []
+    with store.editing(bob):
+        bob['courses'] = ['Math']
+    assert store.integrity.check() == [('Student', 'Ann', 'Course', 'Math', 'one-sided'),
+                                       ('Student', 'Bob', 'Course', 'Math', 'one-sided')]
+    store.integrity.repair(store)
+    # Ann was dropped from the course after registering, Bob registered after.
+    assert (ann['courses'], bob['courses'], math['students']) == ([], ['Math'], ['Bob'])
+    assert store.integrity.check() == []
+
+
+def test_scan_checks_a_records_file(tk_app):
+    records = [course_record('Math', 'C1', 'Hana', ['Ann']), student_record('Ann', 'S1')]
+    assert tk_app.IntegrityChecker.scan(records) == [
+        ('Course', 'Math', 'Instructor', 'Hana', 'missing'),
+        ('Course', 'Math', 'Student', 'Ann', 'one-sided')]
@@ -0,0 +1,51 @@
+import pytest
+
+pytest.importorskip('PyQt5')
+app = pytest.importorskip('lab2_435lPyQt5')
+
+
+@pytest.mark.parametrize('mix', [{'drop_tables': 1}, {'add_student': 0, 'add_course': 0}])
+def test_invalid_mixes_are_refused(db_path, mix):
+    with pytest.raises(ValueError, match='Invalid operation mix'):
+        app.LoadTest(db_path, mix=mix)
+
+
+def test_short_run_writes_through_the_queue(db_path, conn):
+    report = app.LoadTest(db_path, clerks=2, duration=0.3,
+                          mix={'add_student': 3, 'assign_course': 1, 'add_course': 1}).run('smoke')
+    assert report['operations'] > 0 and report['errors'] == 0
+    assert set(report['by_operation']) <= {'add_student', 'assign_course', 'add_course'}
+    assert sum(operation['count'] for operation in report['by_operation'].values()) == report['operations']
+    assert report['label'] == 'smoke' and report['config']['clerks'] == 2
+    seeded = conn.execute("SELECT COUNT(*) FROM Courses WHERE course_id LIKE 'LTC%'").fetchone()[0]
+    added = conn.execute("SELECT COUNT(*) FROM Students WHERE student_id LIKE 'LT%'").fetchone()[0]
+    assert seeded >= 50 and added == report['by_operation']['add_student']['count']
+
+
+def test_summarize_aggregates_every_clerk():
+    stats = {'wait_ms': 5.0, 'retries': 1}
+    results = [
+        ([('add_student', 10.0, None), ('add_student', 30.0, 'OperationalError')], stats),
+        ([('delete_record', 20.0, None), ('add_student', 40.0, None)], stats),
+    ]
+    report = app.LoadTest.summarize(results, 2.0)
+    assert (report['operations'], report['throughput'], report['errors'], report['error_rate']) == (4, 2.0, 1, 0.25)
+    assert report['error_types'] == {'OperationalError': 1}
+    assert (report['lock_wait_ms'], report['retries']) == (10.0, 2)
+    assert report['latency_ms'] == {'p50': 30.0, 'p95': 40.0, 'p99': 40.0, 'max': 40.0}
+    assert report['by_operation']['add_student'] == {'p50': 30.0, 'p95': 40.0, 'p99': 40.0, 'max': 40.0,
+                                                     'count': 3, 'errors': 1}
+    assert app.LoadTest.summarize([], 0.0)['throughput'] == 0.0
+
+
+def test_reports_are_saved_and_compared(tmp_path):
+    path = str(tmp_path / 'results.jsonl')
+    assert app.LoadTest.load(path) == []
+    report = dict(app.LoadTest.summarize([([('add_course', 12.0, None)], {'wait_ms': 0.0, 'retries': 0})], 1.0),
+                  label='baseline', started='2026-01-01T10:00:00',
+                  config={'processes': 1, 'clerks': 4, 'duration': 1.0, 'mix': {}, 'rate': 0.0})
+    app.LoadTest.save(report, path)
+    app.LoadTest.save(dict(report, label='after'), path)
+    assert [saved['label'] for saved in app.LoadTest.load(path)] == ['baseline', 'after']
+    lines = app.LoadTest.compare(app.LoadTest.load(path)).splitlines()
+    assert len(lines) == 3 and lines[1].split()[:4] == ['2026-01-01T10:00:00', 'baseline', '1', '4']
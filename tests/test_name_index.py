@@ -0,0 +1,50 @@
+import pytest
+
+
+@pytest.fixture
+def tk():
+    return pytest.importorskip('tkinter_withDB')
+
+
+def student(name, student_id):
+    return {'type': 'Student', 'id': student_id, 'name': name, 'age': '20',
+            'email': f'{student_id.lower()}@school.example', 'courses': []}
+
+
+def test_prefix_is_case_insensitive_and_sorted(tk):
+    index = tk.NameIndex(['bob', 'Alice', 'alfred', 'Bea', 'Carl'])
+    assert index.prefix() == ['alfred', 'Alice', 'Bea', 'bob', 'Carl']
+    assert index.prefix('AL') == ['alfred', 'Alice']
+    assert index.prefix('b', limit=1) == ['Bea']
+    assert index.prefix('z') == []
+    assert len(index) == 5
+
+
+def test_add_extend_and_remove(tk):
+    index = tk.NameIndex(['Carl'])
+    index.add('ann')
+    index.extend(['Bea', 'Anna', 'Ann'])
+    assert index.prefix('an') == ['Ann', 'ann', 'Anna']
+    index.remove('ann')
+    # Only the exact spelling is removed, and unknown names are ignored.
+    index.remove('Nobody')
+    assert index.prefix() == ['Ann', 'Anna', 'Bea', 'Carl']
+
+
+def test_record_store_names_follow_changes(tk):
+    ann, bea = student('Ann', 'S1'), student('Bea', 'S2')
+    store = tk.RecordStore([ann, bea, {'type': 'Instructor', 'id': 'I1', 'name': 'Abe', 'age': '40',
+                                       'email': 'i1@school.example', 'courses': []}])
+    assert store.names('Student', 'a') == ['Ann']
+    assert store.names('Instructor') == ['Abe']
+
+    store.add(student('Alma', 'S3'))
+    store.remove(bea)
+    assert store.names('Student') == ['Alma', 'Ann']
+    assert store.names('Student', 'a', limit=1) == ['Alma']
+
+    with store.editing(ann):
+        ann['name'] = 'Zoe'
+    assert store.names('Student') == ['Alma', 'Zoe']
+    assert store.find('Student', 'Zoe') is ann
+    assert store.find('Instructor', 'Zoe') is None
@@ -0,0 +1,102 @@
+import email
+import time
+
+import pytest
+
+from conftest import add_course, add_instructor, add_student
+from school.notify import NotificationDispatcher, Outbox, SpoolTransport
+
+
+class FlakyTransport:
+    """
+    Records the digests it is given and refuses those for the listed recipients.
+    """
+
+    def __init__(self, refuse=()):
+        self.refuse = set(refuse)
+        self.sent = []
+        self.closed = False
+
+    def send(self, message):
+        if message['To'] in self.refuse:
+            raise OSError('connection refused')
+        self.sent.append(message)
+
+    def close(self):
+        self.closed = True
+
+
+def test_registrations_and_assignments_are_queued(conn):
+    course = add_course(conn, 'C1', 'Math')
+    student = add_student(conn, 'S1', 'Ann')
+    instructor = add_instructor(conn, 'I1', 'Kim')
+    Outbox.registered(conn, student, course)
+    conn.execute("INSERT INTO Registrations (student_id, course_id) VALUES (?, ?)", (student, course))
+    Outbox.registered(conn, student, course)
+    Outbox.assigned(conn, course)
+    conn.execute("UPDATE Courses SET instructor_id = ? WHERE id = ?", (instructor, course))
+    Outbox.assigned(conn, course)
+    # Only the registration and the assignment that exist are announced.
+    assert conn.execute("SELECT recipient, subject FROM Outbox ORDER BY id").fetchall() == [
+        ('s1@school.example', 'Registered for Math'), ('i1@school.example', 'Assigned to Math')]
+    assert Outbox.counts(conn) == {'pending': 2, 'sent': 0, 'failed': 0}
+
+
+def test_dispatch_sends_one_digest_per_recipient(db_path, conn, tmp_path):
+    for course in ('Math', 'Art'):
+        Outbox.enqueue(conn, 'registered', 'ann@school.example', name='Ann', course_id='C', course_name=course)
+    Outbox.enqueue(conn, 'welcome', 'bob@school.example', name='Bob', record_id='S2')
+    dispatcher = NotificationDispatcher(db_path, SpoolTransport(str(tmp_path / 'spool')))
+    assert dispatcher.dispatch_once() == 3
+    assert dispatcher.dispatch_once() == 0
+    dispatcher.stop()
+    assert (dispatcher.sent, dispatcher.digests) == (3, 2)
+    messages = [email.message_from_bytes(path.read_bytes()) for path in (tmp_path / 'spool').glob('*.eml')]
+    assert sorted(message['Subject'] for message in messages) == ['2 updates from the school', 'Welcome to the school']
+    assert Outbox.counts(conn) == {'pending': 0, 'sent': 3, 'failed': 0}
+
+
+def test_failed_delivery_is_retried_then_given_up(db_path, conn):
+    Outbox.enqueue(conn, 'welcome', 'ann@school.example', name='Ann', record_id='S1')
+    Outbox.enqueue(conn, 'welcome', 'bob@school.example', name='Bob', record_id='S2')
+    transport = FlakyTransport(refuse={'bob@school.example'})
+    dispatcher = NotificationDispatcher(db_path, transport, max_attempts=2)
+    assert dispatcher.dispatch_once() == 2
+    assert [message['To'] for message in transport.sent] == ['ann@school.example']
+    status, attempts, next_attempt, error = conn.execute(
+        "SELECT status, attempts, next_attempt, last_error FROM Outbox WHERE recipient = 'bob@school.example'").fetchone()
+    assert (status, attempts, error) == ('pending', 1, 'OSError: connection refused')
+    assert next_attempt > time.time()
+    # Not due yet, so the next round sends nothing.
+    assert dispatcher.dispatch_once() == 0
+    conn.execute("UPDATE Outbox SET next_attempt = 0 WHERE status = 'pending'")
+    assert dispatcher.dispatch_once() == 1
+    dispatcher.stop()
+    assert conn.execute("SELECT status FROM Outbox WHERE recipient = 'bob@school.example'").fetchone() == ('failed',)
+    assert (dispatcher.retries, dispatcher.gave_up) == (1, 1)
+    assert transport.closed
+
+
+def test_background_thread_survives_failing_rounds(db_path, conn):
+    # A row written by another tool with a text timestamp fails the round after it is sent.
+    conn.execute("INSERT INTO Outbox (recipient, subject, body, created_at) VALUES ('ann@school.example', 'Hi', '', 'today')")
+    transport = FlakyTransport()
+    dispatcher = NotificationDispatcher(db_path, transport, interval=0.01)
+    dispatcher.start()
+    deadline = time.time() + 5
+    while not dispatcher.crashes and time.time() < deadline:
+        time.sleep(0.01)
+    Outbox.enqueue(conn, 'welcome', 'bob@school.example', name='Bob', record_id='S2')
+    while dispatcher.sent < 2 and time.time() < deadline:
+        time.sleep(0.01)
+    dispatcher.stop()
+    assert [message['To'] for message in transport.sent] == ['ann@school.example', 'bob@school.example']
+    assert dispatcher.crashes == 1 and dispatcher.last_error.startswith('TypeError')
+    assert '1 failed otherwise; last error: TypeError' in dispatcher.report()
+
+
+@pytest.mark.parametrize('kind', sorted(Outbox.TEMPLATES))
+def test_templates_format(kind):
+    subject, body = Outbox.TEMPLATES[kind]
+    values = dict(name='Ann', record_id='S1', course_id='C1', course_name='Math')
+    assert 'Ann' in body.format(**values) and '{' not in subject.format(**values)
@@ -0,0 +1,61 @@
+import logging
+
+from conftest import add_course, add_instructor, add_student
+
+
+def select(window, record_type, record_id):
+    table = window.records_table
+    row = next(row for row in range(table.rowCount())
+               if table.item(row, 0).text() == record_type and table.item(row, 2).text() == f'ID: {record_id}')
+    table.setCurrentCell(row, 0)
+
+
+def test_window_opens_without_building_forms(qt_window, db_path):
+    assert qt_window.student_form is None and qt_window.instructor_form is None
+
+
+def test_edit_with_unopened_form_adds_no_course(qt_window, conn):
+    add_course(conn, 'C101', 'Course 101')
+    add_student(conn, 'S1', 'Ann')
+    add_instructor(conn, 'I1', 'Kim')
+    qt_window.update_records_table()
+    for record_type, record_id in (('Student', 'S1'), ('Instructor', 'I1')):
+        select(qt_window, record_type, record_id)
+        qt_window.edit_record()
+    qt_window.flush_writes()
+    assert conn.execute("SELECT COUNT(*) FROM Registrations").fetchone()[0] == 0
+    assert conn.execute("SELECT instructor_id FROM Courses").fetchone()[0] is None
+    assert qt_window.messages == []
+
+
+def test_edit_with_open_form_registers_the_chosen_course(qt_window, conn):
+    add_course(conn, 'C101', 'Course 101')
+    student = add_student(conn, 'S1', 'Ann')
+    qt_window.update_records_table()
+    qt_window.toggle_student_form()
+    qt_window.student_name_input.setText('Anne')
+    select(qt_window, 'Student', 'S1')
+    qt_window.edit_record()
+    qt_window.flush_writes()
+    assert conn.execute("SELECT name FROM Students").fetchone()[0] == 'Anne'
+    assert conn.execute("SELECT student_id FROM Registrations").fetchall() == [(student,)]
+
+
+def test_startup_time_is_logged(qt_window, caplog, capsys):
+    from PyQt5.QtWidgets import QApplication
+    caplog.set_level(logging.INFO)
+    # The window showed itself when it was created; paint it again as if for the first time.
+    qt_window.startup_ms = None
+    qt_window.repaint()
+    QApplication.processEvents()
+    assert any(record.getMessage().startswith('Startup to first paint: ') for record in caplog.records)
+    assert capsys.readouterr() == ('', '')
+
+
+def test_memory_report_is_logged_on_close(qt_window, caplog, capsys):
+    from school.diagnostics import MemoryProfiler
+    caplog.set_level(logging.INFO)
+    qt_window.memory_profiler = MemoryProfiler()
+    qt_window.close()
+    assert any(record.getMessage().startswith('Memory report:\n') for record in caplog.records)
+    assert capsys.readouterr() == ('', '')
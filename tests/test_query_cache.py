@@ -0,0 +1,68 @@
+import pytest
+
+from conftest import add_course
+
+pytest.importorskip('PyQt5')
+app = pytest.importorskip('lab2_435lPyQt5')
+
+
+def row(name, record_id, email=''):
+    return {'name': name, 'record_id': record_id, 'email': email}
+
+
+def test_lru_eviction_and_stats():
+    cache = app.QueryCache(maxsize=2)
+    loads = []
+
+    def get(key):
+        return cache.get(key, lambda: loads.append(key) or key.upper(), ('search', ''))
+
+    assert get('a') == 'A' and get('b') == 'B'
+    assert get('a') == 'A'
+    # 'b' is now the least recently used entry.
+    get('c')
+    assert get('a') == 'A'
+    get('b')
+    assert loads == ['a', 'b', 'c', 'b']
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['evictions'], stats['size']) == (2, 4, 2, 2)
+    assert stats['hit_rate'] == pytest.approx(2 / 6)
+
+
+def test_invalidation_drops_only_affected_entries():
+    cache = app.QueryCache()
+    entries = {
+        'math id': ('course_name', 'Math'),
+        'art id': ('course_name', 'Art'),
+        'ann': ('record', 'Student', 'S1'),
+        'bob': ('record', 'Student', 'S2'),
+        'search ann': ('search', 'ann'),
+        'search all': ('search', ''),
+    }
+    for key, depends in entries.items():
+        cache.get(key, lambda: key, depends)
+
+    cache.invalidate('Student', row('Ann', 'S1', 'ann@school.example'))
+    assert cache.stats()['invalidations'] == 3
+    assert set(cache._entries) == {'math id', 'art id', 'bob'}
+    # A student named Math does not touch the course name lookup.
+    cache.invalidate('Student', row('Math', 'S9'))
+    cache.invalidate('Course', row('Chemistry', 'C1'), row('Math', 'C1'))
+    assert set(cache._entries) == {'art id', 'bob'}
+    cache.clear()
+    assert len(cache) == 0 and cache.stats()['invalidations'] == 6
+
+
+def test_course_lookup_is_cached_until_the_change_feed_reports_it(qt_window, conn):
+    window = qt_window
+    if window.change_feed is None:
+        window.start_background_work()
+    assert window.get_course_id_from_name('Math') is None
+    math = add_course(conn, 'C1', 'Math')
+    # The cached miss stands until the change is picked up.
+    assert window.get_course_id_from_name('Math') is None
+    window.sync_changes()
+    assert window.get_course_id_from_name('Math') == math
+    hits = window.cache_stats()['hits']
+    assert window.get_course_id_from_name('Math') == math
+    assert window.cache_stats()['hits'] == hits + 1
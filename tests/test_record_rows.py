@@ -0,0 +1,59 @@
+from itertools import islice
+
+import pytest
+
+from conftest import add_course, add_instructor, add_student
+
+pytest.importorskip('PyQt5')
+app = pytest.importorskip('lab2_435lPyQt5')
+
+
+@pytest.fixture
+def conn(conn):
+    # Names differing only in case, and IDs and emails repeated across record types, so
+    # the sort keys tie and the tie breakers decide.
+    for student_id, name in (('S3', 'ann'), ('S1', 'Ann'), ('X1', 'Bea'), ('S2', 'dan'), ('S4', 'Ann')):
+        add_student(conn, student_id, name)
+    for instructor_id, name in (('I2', 'Hana'), ('X1', 'ann'), ('I1', 'Zed')):
+        add_instructor(conn, instructor_id, name)
+    conn.execute("UPDATE Instructors SET email = 's2@school.example' WHERE instructor_id = 'I1'")
+    for course_id, name in (('C2', 'Annals'), ('X1', 'Art'), ('C1', 'Danish')):
+        add_course(conn, course_id, name)
+    return conn
+
+
+def read(conn, query, sort_column, descending, after=None, offset=0, limit=None):
+    return list(islice(app.iter_record_rows(conn.cursor(), query, sort_column, descending, after, offset), limit))
+
+
+ORDERS = [(sort_column, descending, query)
+          for sort_column in (None, 0, 1, 2, 3) for descending in (False, True) for query in ('', 'an')]
+
+
+@pytest.mark.parametrize('sort_column, descending, query', ORDERS)
+def test_rows_are_in_display_order(conn, sort_column, descending, query):
+    rows = read(conn, query, sort_column, descending)
+    assert len(rows) == app.count_records(conn.cursor(), query)
+    assert all(app.record_matches(row, query) for row in rows)
+    assert rows == sorted(rows, key=lambda row: app.record_sort_key(row, sort_column), reverse=descending)
+
+
+@pytest.mark.parametrize('sort_column, descending, query', ORDERS)
+@pytest.mark.parametrize('page_size', [1, 2, 5])
+def test_keyset_pages_add_up_to_all_rows(conn, sort_column, descending, query, page_size):
+    pages = []
+    after = None
+    while True:
+        page = read(conn, query, sort_column, descending, after=after, limit=page_size)
+        pages.extend(page)
+        if len(page) < page_size:
+            break
+        after = app.record_row_key(page[-1], sort_column)
+    assert pages == read(conn, query, sort_column, descending)
+
+
+@pytest.mark.parametrize('sort_column, descending, query', ORDERS)
+def test_offset_skips_rows(conn, sort_column, descending, query):
+    rows = read(conn, query, sort_column, descending)
+    for offset in range(len(rows) + 1):
+        assert read(conn, query, sort_column, descending, offset=offset) == rows[offset:]
@@ -0,0 +1,77 @@
+import sqlite3
+
+import pytest
+
+from conftest import add_course, add_instructor, add_student, course_record, instructor_record, student_record
+from school import reports
+from school.reports import RosterReports
+from school.schema import create_database
+
+
+@pytest.fixture(params=['python', 'numpy'])
+def backend(request, monkeypatch):
+    if request.param == 'numpy':
+        monkeypatch.setattr(reports, '_numpy', pytest.importorskip('numpy'))
+    else:
+        monkeypatch.setattr(reports, '_numpy', False)
+    assert bool(reports.numpy_module()) == (request.param == 'numpy')
+    return request.param
+
+
+def fill(conn):
+    ages = {'S1': 18, 'S2': 19, 'S3': 23, 'S4': 30}
+    students = {student_id: add_student(conn, student_id) for student_id in ages}
+    for student_id, age in ages.items():
+        conn.execute("UPDATE Students SET age = ? WHERE student_id = ?", (age, student_id))
+    hana, ivo = add_instructor(conn, 'I1', 'Hana'), add_instructor(conn, 'I2', 'Ivo')
+    conn.execute("UPDATE Instructors SET age = 52 WHERE id = ?", (ivo,))
+    math, art, bio = add_course(conn, 'C1', 'Math'), add_course(conn, 'C2', 'Art'), add_course(conn, 'C3', 'Bio')
+    conn.execute("UPDATE Courses SET instructor_id = ? WHERE id IN (?, ?)", (hana, math, art))
+    conn.executemany("INSERT INTO Registrations (student_id, course_id) VALUES (?, ?)",
+                     [(students['S1'], math), (students['S2'], math), (students['S3'], math), (students['S1'], bio)])
+
+
+EXPECTED = {
+    "Enrolment per course": [('C1', 'Math', 'Hana', 3), ('C3', 'Bio', '', 1), ('C2', 'Art', 'Hana', 0)],
+    "Instructor load": [('I1', 'Hana', 2, 3), ('I2', 'Ivo', 0, 0)],
+    "Age distribution": [('Student', '15-19', 2), ('Student', '20-24', 1), ('Student', '25-29', 0),
+                         ('Student', '30-34', 1), ('Instructor', '40-44', 1), ('Instructor', '45-49', 0),
+                         ('Instructor', '50-54', 1)],
+    "Age statistics": [('Student', 4, 22.5, 21.0, 18, 30), ('Instructor', 2, 46.0, 46.0, 40, 52)],
+}
+
+
+@pytest.mark.parametrize('title', list(EXPECTED))
+def test_reports_from_the_database(backend, conn, title):
+    fill(conn)
+    headers, rows = RosterReports.from_database(conn.cursor()).report(title)
+    assert headers == RosterReports.REPORTS[title][1]
+    assert rows == EXPECTED[title]
+    assert not conn.in_transaction
+
+
+@pytest.mark.parametrize('title', list(EXPECTED))
+def test_reports_from_records(backend, title):
+    ages = {'S1': '18', 'S2': '19', 'S3': '23', 'S4': '30'}
+    courses = {'S1': ['Math', 'Bio'], 'S2': ['Math'], 'S3': ['Math'], 'S4': []}
+    records = [student_record(student_id, student_id, courses[student_id], age) for student_id, age in ages.items()]
+    records += [instructor_record('Hana', 'I1', ['Math', 'Art']), instructor_record('Ivo', 'I2', age='52'),
+                course_record('Bio', 'C3'), course_record('Math', 'C1', 'Hana'), course_record('Art', 'C2', 'Hana')]
+    assert RosterReports.from_records(records).report(title)[1] == EXPECTED[title]
+
+
+def test_empty_roster(backend, conn):
+    empty = RosterReports.from_database(conn.cursor())
+    assert [empty.report(title)[1] for title in RosterReports.REPORTS] == [[], [], [], []]
+
+
+def test_shard_trends(backend, conn, tmp_path, db_path):
+    fill(conn)
+    other = str(tmp_path / 'other.db')
+    create_database(other)
+    other_conn = sqlite3.connect(other, isolation_level=None)
+    add_course(other_conn, 'C1')
+    other_conn.close()
+    assert RosterReports.shard_trends({'main': db_path, 'other': other}) == [
+        ('main', 4, 2, 3, 4, 1.3, 22.5), ('other', 0, 0, 1, 0, 0.0, 0.0)]
+    assert RosterReports.shard_trends({}) == []
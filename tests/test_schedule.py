@@ -0,0 +1,134 @@
+import pytest
+
+from conftest import add_course, add_instructor, add_student
+from school.schedule import Schedule, ScheduleIndex, format_meetings, parse_meetings, schedule_conflict
+
+MON_9 = 'Mon 09:00-10:00'
+MON_930 = 'Mon 09:30-10:30'
+MON_10 = 'Mon 10:00-11:00'
+
+
+def test_parse_and_format_meetings():
+    meetings = parse_meetings('wed 09:00-10:30; Mon 09:00-10:30')
+    assert meetings == [(540, 630), (2 * 1440 + 540, 2 * 1440 + 630)]
+    assert format_meetings(meetings) == 'Mon 09:00-10:30, Wed 09:00-10:30'
+    assert parse_meetings('') == []
+    for text in ('Mon 10:00-09:00', 'Someday 09:00-10:00', 'Mon 09:00-10:00, Mon 09:30-11:00'):
+        with pytest.raises(ValueError):
+            parse_meetings(text)
+
+
+def test_schedule_refuses_clashes_and_frees_removed_courses():
+    schedule = Schedule()
+    assert schedule.add('Math', parse_meetings(MON_9)) is None
+    assert schedule.add('Art', parse_meetings(MON_930)) == 'Math'
+    # Touching meetings do not clash, and adding a course again replaces it.
+    assert schedule.add('Bio', parse_meetings(MON_10)) is None
+    assert schedule.add('Bio', parse_meetings(MON_10)) is None
+    assert len(schedule.meetings) == 2
+    assert schedule.conflict(parse_meetings(MON_930), ignore='Math') == 'Bio'
+    schedule.remove('Math')
+    assert schedule.add('Art', parse_meetings('Mon 08:00-10:00')) is None
+
+
+def test_load_keeps_and_reports_stored_clashes():
+    schedule = Schedule()
+    clashes = schedule.load([('Math', parse_meetings(MON_9)), ('Art', parse_meetings(MON_930))])
+    assert clashes == [('Art', 'Math')]
+    # Art is not in the index, but a new course overlapping only Art still clashes.
+    assert schedule.conflict(parse_meetings('Mon 10:15-11:00')) == 'Art'
+    schedule.remove('Art')
+    assert schedule.conflict(parse_meetings('Mon 10:15-11:00')) is None
+
+
+def register(conn, student, course):
+    conn.execute("INSERT INTO Registrations (student_id, course_id) VALUES (?, ?)", (student, course))
+
+
+def test_schedule_conflict_in_the_database(conn):
+    math, art, bio = add_course(conn, 'C1', 'Math'), add_course(conn, 'C2', 'Art'), add_course(conn, 'C3', 'Bio')
+    for course, meetings in ((math, MON_9), (art, MON_930), (bio, 'Mon 10:15-11:00')):
+        conn.execute("UPDATE Courses SET meetings = ? WHERE id = ?", (meetings, course))
+    student = add_student(conn, 'S1')
+    register(conn, student, math)
+    assert schedule_conflict(conn, art, student_id='S1') == 'Math'
+    assert schedule_conflict(conn, bio, student_id='S1') is None
+    # The student is already registered for Math, so it does not clash with itself.
+    assert schedule_conflict(conn, math, student_id='S1') is None
+    # Math and Art were stored clashing; Bio overlaps Art only, and that is still found.
+    register(conn, student, art)
+    index = ScheduleIndex(conn)
+    assert index.conflict(bio, student_id='S1') == 'Art'
+    assert index.clashes == [(('Student', 'S1'), 'Art', 'Math')]
+
+
+def test_schedule_index_follows_registrations_and_assignments(conn):
+    math, art = add_course(conn, 'C1', 'Math'), add_course(conn, 'C2', 'Art')
+    for course, meetings in ((math, MON_9), (art, MON_930)):
+        conn.execute("UPDATE Courses SET meetings = ? WHERE id = ?", (meetings, course))
+    add_student(conn, 'S1')
+    add_instructor(conn, 'I1')
+    add_instructor(conn, 'I2')
+    index = ScheduleIndex(conn)
+    assert index.conflict(art, student_id='S1') is None
+    index.registered('S1', math)
+    assert index.conflict(art, student_id='S1') == 'Math'
+    assert index.conflict(art, instructor_id='I1') is None
+    index.assigned(math, 'I1')
+    assert index.conflict(art, instructor_id='I1') == 'Math'
+    index.assigned(math, 'I2')
+    assert index.conflict(art, instructor_id='I1') is None
+
+
+@pytest.fixture
+def app():
+    pytest.importorskip('PyQt5')
+    return pytest.importorskip('lab2_435lPyQt5')
+
+
+def test_course_roster_changes_keep_student_schedules(app):
+    ann = app.Student('Ann', 20, 'ann@school.example', 'S1')
+    bob = app.Student('Bob', 20, 'bob@school.example', 'S2')
+    math = app.Course('C1', 'Math', None, capacity=1, meetings=MON_9)
+    art = app.Course('C2', 'Art', None, meetings=MON_930)
+    math.add_student(ann)
+    assert ann.schedule.conflict(art.meetings) is math
+    # Registering from the student side as well does not add the meetings twice.
+    ann.register_course(math)
+    assert len(ann.schedule.meetings) == 1
+
+    math.add_student(bob)
+    assert bob in math._waiting and bob.schedule.meetings == []
+    assert math.remove_student(ann) == [bob]
+    assert ann.schedule.meetings == []
+    assert bob.schedule.conflict(art.meetings) is math
+
+
+def test_promotion_skips_students_whose_schedule_clashes(app):
+    ann = app.Student('Ann', 20, 'ann@school.example', 'S1')
+    bob = app.Student('Bob', 20, 'bob@school.example', 'S2')
+    cy = app.Student('Cy', 20, 'cy@school.example', 'S3')
+    math = app.Course('C1', 'Math', None, capacity=1, meetings=MON_9)
+    art = app.Course('C2', 'Art', None, meetings=MON_930)
+    math.add_student(ann)
+    math.add_student(bob)
+    math.add_student(cy)
+    art.add_student(bob)
+    assert math.remove_student(ann) == [cy]
+    assert math.enrolled_students == [cy] and not math._waiting
+    assert bob.schedule.conflict(math.meetings) is art
+
+
+def test_queued_registrations_are_checked_against_each_other(app, db_path, conn):
+    math, art = add_course(conn, 'C1', 'Math'), add_course(conn, 'C2', 'Art')
+    for course, meetings in ((math, MON_9), (art, MON_930)):
+        conn.execute("UPDATE Courses SET meetings = ? WHERE id = ?", (meetings, course))
+    add_student(conn, 'S1')
+    db = app.Database(db_path)
+    queue = app.WriteBehindQueue(db)
+    queue.register('S1', math)
+    queue.register('S1', art)
+    failures = queue.flush()
+    db.close()
+    assert [failure[:3] for failure in failures] == [('register', 'S1', art)]
+    assert str(failures[0][3]) == 'Schedule conflict with Math'
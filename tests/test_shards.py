@@ -0,0 +1,57 @@
+import sqlite3
+
+import pytest
+
+from conftest import add_course, add_student
+from school.schema import create_database
+
+pytest.importorskip('PyQt5')
+app = pytest.importorskip('lab2_435lPyQt5')
+
+
+@pytest.fixture
+def shards(tmp_path, monkeypatch):
+    monkeypatch.setattr(app, 'SHARD_DIR', str(tmp_path / 'shards'))
+    monkeypatch.setattr(app, 'DEFAULT_DB_PATH', str(tmp_path / 'main.db'))
+    contents = {
+        'north-2024': [('S1', 'Cy'), ('S3', 'ann')],
+        'south-2024': [('S2', 'Bea'), ('S4', 'Dan')],
+    }
+    paths = {}
+    for name, students in contents.items():
+        paths[name] = app.shard_path(name)
+        create_database(paths[name])
+        conn = sqlite3.connect(paths[name], isolation_level=None)
+        for student_id, student in students:
+            add_student(conn, student_id, student)
+        conn.close()
+    conn = sqlite3.connect(paths['south-2024'], isolation_level=None)
+    add_course(conn, 'C1', 'Annals')
+    conn.close()
+    return paths
+
+
+def test_list_shards_finds_the_shard_files(shards):
+    assert app.list_shards() == shards
+    create_database(app.DEFAULT_DB_PATH)
+    assert list(app.list_shards()) == ['main', 'north-2024', 'south-2024']
+
+
+def test_search_merges_the_shards_in_display_order(shards):
+    federated = app.FederatedQuery(shards)
+    for descending in (False, True):
+        results = federated.search('', 1, descending)
+        names = [row[1] for _, row in results]
+        expected = sorted(names, key=str.lower, reverse=descending)
+        assert names == expected and len(names) == 5
+    results = federated.search('an', 1)
+    assert [(shard, row[1]) for shard, row in results] == [
+        ('north-2024', 'ann'), ('south-2024', 'Annals'), ('south-2024', 'Dan')]
+    assert len(federated.search('', 1, limit=2)) == 2
+
+
+def test_count_per_shard(shards):
+    federated = app.FederatedQuery(shards)
+    assert federated.count() == {'north-2024': 2, 'south-2024': 3}
+    assert federated.count('an') == {'north-2024': 1, 'south-2024': 2}
+    assert app.FederatedQuery({}).count() == {}
@@ -0,0 +1,61 @@
+import os
+
+import pytest
+
+from conftest import add_student
+from school.snapshot import Snapshot
+
+COLUMNS = ['ID', 'Name', 'Age']
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / 'records.snap')
+
+
+def test_rows_round_trip_in_order(path):
+    rows = [[f'S{i}', f'Student {i:03}', i] for i in range(250)]
+    assert Snapshot.write(path, COLUMNS, iter(rows)) == 250
+    assert not os.path.exists(path + '.tmp')
+    with Snapshot(path) as snapshot:
+        assert (len(snapshot), snapshot.columns, snapshot.name_column) == (250, COLUMNS, 1)
+        assert snapshot[0] == rows[0] and snapshot[249] == rows[249]
+        assert snapshot.rows(100, 110) == rows[100:110]
+        assert snapshot.rows(-5, 3) == rows[:3] and snapshot.rows(245, 300) == rows[245:]
+        with pytest.raises(IndexError):
+            snapshot[250]
+
+
+def test_search_by_name_prefix(path):
+    names = ['bob', 'Álvaro', 'Anna', 'ann', 'Zoe', 'annie', 'Bea']
+    Snapshot.write(path, COLUMNS, ([f'S{i}', name, 20] for i, name in enumerate(names)))
+    with Snapshot(path) as snapshot:
+        assert [row[1] for row in snapshot.search('ann')] == ['ann', 'Anna', 'annie']
+        assert [row[1] for row in snapshot.search('B', limit=1)] == ['Bea']
+        assert [row[1] for row in snapshot.search('á')] == ['Álvaro']
+        assert snapshot.search('x') == [] and snapshot.search('zz') == []
+        assert len(snapshot.search('')) == len(names)
+
+
+def test_empty_snapshot(path):
+    assert Snapshot.write(path, COLUMNS, []) == 0
+    with Snapshot(path) as snapshot:
+        assert len(snapshot) == 0 and snapshot.search('a') == [] and snapshot.rows(0, 10) == []
+
+
+@pytest.mark.parametrize('content', [b'', b'not a snapshot at all, just some text'])
+def test_other_files_are_refused(path, content):
+    with open(path, 'wb') as f:
+        f.write(content)
+    with pytest.raises(ValueError, match='not a snapshot'):
+        Snapshot(path)
+
+
+def test_qt_window_saves_every_record(qt_window, conn, path):
+    for student_id in ('S2', 'S1'):
+        add_student(conn, student_id, f'Student {student_id}')
+    qt_window.save_snapshot(path)
+    with Snapshot(path) as snapshot:
+        assert snapshot.columns[1] == 'Name'
+        assert [row[1] for row in snapshot.search('student')] == ['Student S1', 'Student S2']
+    assert qt_window.messages == []
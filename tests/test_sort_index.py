@@ -0,0 +1,85 @@
+import pytest
+
+from conftest import add_student
+
+
+@pytest.fixture
+def tk():
+    return pytest.importorskip('tkinter_withDB')
+
+
+def student(name, student_id, age):
+    return {'type': 'Student', 'id': student_id, 'name': name, 'age': age,
+            'email': f'{student_id.lower()}@school.example', 'courses': []}
+
+
+def expected(tk, store, column, descending):
+    return sorted(store.records, key=lambda record: tk.sort_key(column, tk.table_values(record)[column]),
+                  reverse=descending)
+
+
+def keys(tk, records, column):
+    return [tk.sort_key(column, tk.table_values(record)[column]) for record in records]
+
+
+def test_sort_key_puts_numeric_ages_first(tk):
+    age = tk.TABLE_COLUMNS.index("Age")
+    values = ['9', 'n/a', '10', 'Unknown', '2.5']
+    assert sorted(values, key=lambda value: tk.sort_key(age, value)) == ['2.5', '9', '10', 'n/a', 'Unknown']
+    assert tk.sort_key(tk.TABLE_COLUMNS.index("Name"), 'Ann') == tk.sort_key(1, 'ann')
+
+
+def test_orders_follow_add_remove_and_edit(tk):
+    ann, bob = student('ann', 'S3', '30'), student('Bob', 'S1', '9')
+    store = tk.RecordStore([ann, bob, student('Cy', 'S2', 'unknown')])
+    store.add(student('Abe', 'S4', '10'))
+    store.remove(bob)
+    with store.editing(ann):
+        ann['name'] = 'Zed'
+        ann['age'] = '5'
+
+    for column in range(len(tk.TABLE_COLUMNS)):
+        for descending in (False, True):
+            ordered = list(store.ordered(column, descending))
+            assert sorted(map(id, ordered)) == sorted(map(id, store.records))
+            assert keys(tk, ordered, column) == keys(tk, expected(tk, store, column, descending), column)
+    assert [r['name'] for r in store.ordered(tk.TABLE_COLUMNS.index("Age"))] == ['Zed', 'Abe', 'Cy']
+
+
+def test_slice_matches_the_full_order(tk):
+    store = tk.RecordStore([student(f'Name {i:02}', f'S{i}', str(i)) for i in range(25)])
+    name = tk.TABLE_COLUMNS.index("Name")
+    for descending in (False, True):
+        full = list(store.ordered(name, descending))
+        for start, stop in ((0, 10), (10, 20), (20, 30), (30, 40)):
+            assert store.slice(name, descending, start, stop) == full[start:stop]
+    assert store.slice(None, False, 5, 8) == store.records[5:8]
+
+
+def test_editing_many_reindexes_once(tk):
+    records = [student(f'Name {i}', f'S{i}', str(i)) for i in range(5)]
+    store = tk.RecordStore(records)
+    with store.editing_many(records[:3]):
+        for record in records[:3]:
+            record['age'] = str(100 - int(record['age']))
+    age = tk.TABLE_COLUMNS.index("Age")
+    assert [r['age'] for r in store.ordered(age)] == ['3', '4', '98', '99', '100']
+
+
+def test_qt_header_click_sorts_and_reverses(qt_window, conn):
+    for student_id, name in (('S1', 'bea'), ('S2', 'Ann'), ('S3', 'cy')):
+        add_student(conn, student_id, name)
+    window = qt_window
+    table = window.records_table
+
+    def names():
+        window.update_records_table()
+        return [table.item(row, 1).text() for row in range(table.rowCount())]
+
+    window.sort_records(1)
+    assert names() == ['Ann', 'bea', 'cy']
+    window.sort_records(1)
+    assert names() == ['cy', 'bea', 'Ann']
+    # Columns without a sort key keep the current order.
+    window.sort_records(4)
+    assert (window.sort_column, window.sort_descending) == (1, True)
@@ -0,0 +1,83 @@
+import sqlite3
+
+import pytest
+
+from conftest import course_record, instructor_record, student_record
+
+tk = pytest.importorskip('tkinter_withDB')
+
+
+@pytest.fixture
+def backend(db_path):
+    backend = tk.SQLiteBackend(db_path)
+    yield backend
+    backend.close()
+
+
+def stored(backend, first_size=1000):
+    return [record for batch in backend.iter_batches(first_size) for record in batch]
+
+
+def test_records_round_trip_with_their_links(backend):
+    records = [
+        student_record('Ann', 'S1', ['Math']),
+        student_record('Bob', 'S2', ['Math', 'Art']),
+        instructor_record('Hana', 'I1', ['Math']),
+        course_record('Math', 'C1', 'Hana', ['Ann', 'Bob'], {'Ann': 3.5}),
+        course_record('Art', 'C2', '', ['Bob']),
+    ]
+    backend.replace_all(records)
+    assert stored(backend) == records
+    # Loading records queues no notifications.
+    assert backend.conn.execute('SELECT COUNT(*) FROM Outbox').fetchone()[0] == 0
+
+
+def test_batches_grow_and_cover_every_row(backend):
+    backend.replace_all([student_record(f'Student {i}', f'S{i}') for i in range(20)])
+    sizes = [len(batch) for batch in backend.iter_batches(first_size=2, max_size=8)]
+    assert sizes == [2, 4, 8, 6]
+
+
+def test_insert_update_and_delete_write_through(backend):
+    math = course_record('Math', 'C1')
+    backend.insert(math)
+    ann = student_record('Ann', 'S1', ['Math'])
+    backend.insert(ann)
+    assert backend.course_roster(math) == (['Ann'], {}, [])
+
+    old = dict(ann, courses=list(ann['courses']))
+    ann.update(name='Anna', age='21', courses=[])
+    backend.update(old, ann)
+    assert stored(backend)[0] == ann
+    assert backend.course_roster(math) == ([], {}, [])
+
+    backend.insert(instructor_record('Hana', 'I1', ['Math']))
+    assert stored(backend)[-1]['instructor'] == 'Hana'
+    backend.delete(stored(backend)[1])
+    assert stored(backend)[-1]['instructor'] == ''
+    # Deleting a record that is not stored does nothing.
+    backend.delete(student_record('Nobody', 'S9'))
+    assert [record['id'] for record in stored(backend)] == ['S1', 'C1']
+
+
+def test_rejected_changes_leave_the_store_unchanged(backend):
+    store = tk.RecordStore(backend=backend)
+    ann = student_record('Ann', 'S1')
+    store.add(ann)
+    with pytest.raises(sqlite3.IntegrityError):
+        store.add(student_record('Bob', 'S1'))
+    with pytest.raises(ValueError):
+        with store.editing(ann):
+            ann['age'] = 'old'
+    assert store.records == [ann] and ann['age'] == '20'
+    assert store.names('Student') == ['Ann']
+    assert stored(backend) == [ann]
+
+
+def test_a_failed_batch_rolls_back_every_change(backend):
+    store = tk.RecordStore(backend=backend)
+    with pytest.raises(sqlite3.IntegrityError):
+        with store.batch():
+            store.add(student_record('Ann', 'S1'))
+            store.add(student_record('Bob', 'S1'))
+    assert stored(backend) == []
@@ -0,0 +1,117 @@
+import pytest
+
+from conftest import add_course, add_student
+
+tkinter_withDB = pytest.importorskip('tkinter_withDB')
+
+
+def registered(conn, course):
+    return [row[0] for row in conn.execute(
+        "SELECT student_id FROM Registrations WHERE course_id = ? ORDER BY id", (course,))]
+
+
+def waitlisted(conn, course):
+    return [row[0] for row in conn.execute(
+        "SELECT student_id FROM Waitlist WHERE course_id = ? ORDER BY priority DESC, enqueued_at, id", (course,))]
+
+
+def test_full_course_registration_joins_waitlist(conn):
+    course = add_course(conn, 'C1', capacity=1)
+    first, second = add_student(conn, 'S1'), add_student(conn, 'S2')
+    conn.execute("INSERT INTO Registrations (student_id, course_id) VALUES (?, ?)", (first, course))
+    conn.execute("INSERT INTO Registrations (student_id, course_id) VALUES (?, ?)", (second, course))
+    assert registered(conn, course) == [first]
+    assert waitlisted(conn, course) == [second]
+
+
+def test_freed_seat_promotes_head_of_waitlist(conn):
+    course = add_course(conn, 'C1', capacity=1)
+    students = [add_student(conn, f'S{n}') for n in range(3)]
+    for student in students:
+        conn.execute("INSERT INTO Registrations (student_id, course_id) VALUES (?, ?)", (student, course))
+    conn.execute("UPDATE Waitlist SET priority = 1 WHERE student_id = ?", (students[2],))
+    conn.execute("DELETE FROM Registrations WHERE student_id = ?", (students[0],))
+    assert registered(conn, course) == [students[2]]
+    assert waitlisted(conn, course) == [students[1]]
+
+
+def test_higher_capacity_promotes_as_many_as_new_seats(conn):
+    course = add_course(conn, 'C1', capacity=1)
+    students = [add_student(conn, f'S{n}') for n in range(4)]
+    for student in students:
+        conn.execute("INSERT INTO Registrations (student_id, course_id) VALUES (?, ?)", (student, course))
+    conn.execute("UPDATE Courses SET capacity = 3 WHERE id = ?", (course,))
+    assert registered(conn, course) == students[:3]
+    assert waitlisted(conn, course) == students[3:]
+
+
+def test_deleted_student_leaves_waitlist(conn):
+    course = add_course(conn, 'C1', capacity=0)
+    student = add_student(conn, 'S1')
+    conn.execute("INSERT INTO Registrations (student_id, course_id) VALUES (?, ?)", (student, course))
+    conn.execute("DELETE FROM Students WHERE id = ?", (student,))
+    assert waitlisted(conn, course) == []
+
+
+class Instance:
+    """
+    One Tkinter application's records and write queue, without the window.
+    """
+
+    def __init__(self, db_path):
+        self.backend = tkinter_withDB.SQLiteBackend(db_path)
+        self.writes = tkinter_withDB.WriteBehindBackend(self.backend)
+        self.store = tkinter_withDB.RecordStore(backend=self.writes)
+        for batch in self.backend.iter_batches():
+            self.store.extend(batch)
+
+    def register(self, student_id, course_name):
+        student = next(r for r in self.store.records if r['type'] == 'Student' and r['id'] == student_id)
+        course = self.store.find('Course', course_name)
+        with self.store.batch():
+            with self.store.editing(course):
+                course['students'].append(student['name'])
+            with self.store.editing(student):
+                student['courses'].append(course_name)
+        assert self.writes.flush() == []
+        return course
+
+
+@pytest.fixture
+def instances(db_path, conn):
+    add_course(conn, 'C1', 'Math', capacity=1)
+    add_student(conn, 'S1', 'Ann')
+    add_student(conn, 'S2', 'Bob')
+    first, second = Instance(db_path), Instance(db_path)
+    yield first, second
+    first.backend.close()
+    second.backend.close()
+
+
+def test_registration_for_full_course_is_reconciled_to_waitlist(instances):
+    first, second = instances
+    assert first.store.reconcile(first.register('S1', 'Math')) == []
+    course = second.register('S2', 'Math')
+    assert course['students'] == ['Bob']
+    assert second.store.reconcile(course) == ['Bob']
+    assert course['students'] == ['Ann']
+    assert 'Math' not in next(r for r in second.store.records if r['id'] == 'S2')['courses']
+
+
+def test_stale_instance_does_not_undo_other_registrations(instances, conn):
+    first, second = instances
+    first.register('S1', 'Math')
+    # The second instance still shows the course empty; adding Bob and editing the course
+    # again must neither drop Ann's seat nor seat Bob past the waitlist.
+    course = second.store.find('Course', 'Math')
+    with second.store.editing(course):
+        course['students'].append('Bob')
+    second.writes.flush()
+    with second.store.editing(course):
+        course['meetings'] = 'Mon 09:00-10:00'
+    second.writes.flush()
+    ann, bob = (conn.execute("SELECT id FROM Students WHERE student_id = ?", (s,)).fetchone()[0] for s in ('S1', 'S2'))
+    assert registered(conn, 1) == [ann]
+    assert waitlisted(conn, 1) == [bob]
+    assert second.store.reconcile(course) == ['Bob']
+    assert course['students'] == ['Ann']
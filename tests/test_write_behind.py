@@ -0,0 +1,128 @@
+import sqlite3
+
+import pytest
+
+from conftest import add_course, add_student
+
+pytest.importorskip('PyQt5')
+app = pytest.importorskip('lab2_435lPyQt5')
+
+
+def student(student_id, name):
+    return {'name': name, 'age': 20, 'email': f"{student_id.lower()}@school.example", 'student_id': student_id}
+
+
+def names(conn):
+    return dict(conn.execute("SELECT student_id, name FROM Students"))
+
+
+@pytest.fixture
+def queue(db_path):
+    db = app.Database(db_path)
+    yield app.WriteBehindQueue(db)
+    db.close()
+
+
+def test_update_merges_into_pending_insert(queue, conn):
+    queue.insert('Student', student('S1', 'Ann'))
+    queue.update('Student', 'S1', {'name': 'Anne'})
+    queue.update('Student', 'S1', {'age': 21})
+    assert (len(queue), queue.queued, queue.coalesced) == (1, 1, 2)
+    assert queue.flush() == []
+    assert conn.execute("SELECT name, age FROM Students").fetchall() == [('Anne', 21)]
+    assert len(queue) == 0 and queue.flushes == 1
+
+
+def test_repeated_updates_write_once(queue, conn):
+    add_student(conn, 'S1', 'Ann')
+    for name in ('Anne', 'Annie', 'Anna'):
+        queue.update('Student', 'S1', {'name': name})
+    assert (len(queue), queue.queued, queue.coalesced) == (1, 1, 2)
+    seq = conn.execute("SELECT MAX(seq) FROM ChangeLog").fetchone()[0]
+    queue.flush()
+    assert names(conn) == {'S1': 'Anna'}
+    assert conn.execute("SELECT COUNT(*) FROM ChangeLog WHERE seq > ?", (seq,)).fetchone()[0] == 1
+
+
+def test_delete_cancels_pending_insert(queue, conn):
+    queue.insert('Student', student('S1', 'Ann'))
+    queue.update('Student', 'S1', {'name': 'Anne'})
+    queue.delete('Student', 'S1')
+    assert (len(queue), queue.queued, queue.coalesced) == (0, 1, 2)
+    assert queue.flush() == []
+    assert names(conn) == {} and queue.flushes == 0
+
+
+def test_insert_after_delete_replaces_the_record(queue, conn):
+    add_student(conn, 'S1', 'Ann')
+    queue.delete('Student', 'S1')
+    queue.update('Student', 'S1', {'name': 'Ignored'})
+    queue.insert('Student', student('S1', 'Bob'))
+    assert (len(queue), queue.coalesced) == (1, 2)
+    assert queue.flush() == []
+    assert names(conn) == {'S1': 'Bob'}
+
+
+def test_unregister_cancels_pending_registration(queue, conn):
+    course = add_course(conn, 'C1')
+    add_student(conn, 'S1')
+    queue.register('S1', course)
+    queue.grade('S1', course, 2.0)
+    queue.grade('S1', course, 3.0)
+    queue.unregister('S1', course)
+    assert (len(queue), queue.coalesced) == (1, 2)
+    queue.flush()
+    # The grade is applied to no registration.
+    assert conn.execute("SELECT COUNT(*) FROM Registrations").fetchone()[0] == 0
+
+
+def test_registration_can_refer_to_a_queued_student(queue, conn):
+    course = add_course(conn, 'C1')
+    queue.insert('Student', student('S1', 'Ann'))
+    queue.register('S1', course)
+    queue.grade('S1', course, 3.0)
+    assert queue.flush() == []
+    assert conn.execute("SELECT grade FROM Registrations").fetchall() == [(3.0,)]
+
+
+def test_rejected_write_does_not_stop_the_others(queue, conn):
+    add_student(conn, 'S1', 'Ann')
+    add_student(conn, 'S3', 'Cy')
+    queue.insert('Student', student('S1', 'Copy'))
+    queue.insert('Student', student('S2', 'Bob'))
+    queue.update('Student', 'S3', {'age': 200})
+    queue.update('Student', 'S2', {'name': 'Bo'})
+    failures = queue.flush()
+    assert [failure[:3] for failure in failures] == [('insert', 'Student', 'S1'), ('update', 'Student', 'S3')]
+    assert all(isinstance(failure[3], sqlite3.IntegrityError) for failure in failures)
+    assert names(conn) == {'S1': 'Ann', 'S2': 'Bo', 'S3': 'Cy'}
+    assert len(queue) == 0
+
+
+def test_busy_database_keeps_the_queue(queue, conn, monkeypatch):
+    monkeypatch.setattr('school.db.WRITE_RETRIES', 0)
+    queue.insert('Student', student('S1', 'Ann'))
+    conn.execute("BEGIN IMMEDIATE")
+    with pytest.raises(sqlite3.OperationalError):
+        queue.flush()
+    conn.execute("COMMIT")
+    assert len(queue) == 1
+    assert queue.flush() == []
+    assert names(conn) == {'S1': 'Ann'}
+
+
+def test_links_of_a_rejected_insert_are_skipped(queue, conn):
+    course = add_course(conn, 'C1')
+    add_student(conn, 'S1', 'Ann')
+    conn.execute("INSERT INTO Instructors (name, age, email, instructor_id) VALUES ('Kim', 40, 'kim@school.example', 'I1')")
+    queue.insert('Student', student('S1', 'Copy'))
+    queue.register('S1', course)
+    queue.insert('Instructor', {'name': 'Lee', 'age': 40, 'email': 'lee@school.example', 'instructor_id': 'I1'})
+    queue.assign(course, 'I1')
+    failures = queue.flush()
+    assert [failure[:3] for failure in failures] == [('insert', 'Student', 'S1'), ('register', 'S1', course),
+                                                     ('insert', 'Instructor', 'I1'), ('assign', course, None)]
+    # The existing S1 and I1 are neither registered nor assigned, nor told they were.
+    assert conn.execute("SELECT COUNT(*) FROM Registrations").fetchone()[0] == 0
+    assert conn.execute("SELECT instructor_id FROM Courses").fetchone()[0] is None
+    assert conn.execute("SELECT COUNT(*) FROM Outbox").fetchone()[0] == 0
@@ -1,6 +1,59 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog, simpledialog
+import bisect
+import copy
+import glob
+import gzip
+import itertools
 import json
+import os
+import sqlite3
+import sys
+import time
+from contextlib import contextmanager
+
+from school.audit import AuditLog, parse_when
+from school.dedup import DuplicateFinder
+from school.diagnostics import MemoryProfiler
+from school.grades import RecordGradebook, format_grade, parse_grade
+from school.notify import NOTIFY_TRANSPORT, NotificationDispatcher, Outbox, notification_transport
+from school.reports import RosterReports, numpy_module
+from school.schedule import Schedule, format_meetings, parse_meetings
+from school.snapshot import Snapshot
+from school.schema import create_database
+
+# Database shared with the PyQt application (see create_database).
+DB_PATH = 'school_management_system.db'
+# How long a write waits for another application instance to release the database, in milliseconds.
+BUSY_TIMEOUT_MS = 2000
+# Directory of the compressed archive batches, shared with the PyQt application.
+ARCHIVE_DIR = 'archive'
+# Set SMS_MEMORY_DIAGNOSTICS to trace memory around each user action with MemoryProfiler.
+MEMORY_DIAGNOSTICS = bool(os.environ.get('SMS_MEMORY_DIAGNOSTICS'))
+
+# Columns of the records table, in display order.
+TABLE_COLUMNS = ("ID", "Name", "Type", "Email", "Age", "Courses/Instructor/Students")
+
+# Changes offered by Bulk Edit, with the record types each one applies to.
+BULK_EDIT_ACTIONS = {
+    'Set age': ('Student', 'Instructor'),
+    'Change email domain': ('Student', 'Instructor'),
+    'Move students to course': ('Student',),
+    'Assign instructor': ('Course',),
+}
+
+# Page sizes offered for the records table; 0 in ManagementApp.page_size shows every record.
+PAGE_SIZES = (25, 50, 100, 500)
+DEFAULT_PAGE_SIZE = 100
+# Rows per page of the SnapshotViewer table.
+SNAPSHOT_PAGE_SIZE = 200
+# Students added to a CourseRosterWindow each time it is scrolled to the end.
+ROSTER_PAGE_SIZE = 100
+
+# Time queued database writes wait for more writes before being flushed, in milliseconds.
+WRITE_BEHIND_DELAY_MS = 200
+# Number of queued writes that triggers a flush without waiting for the timer.
+WRITE_BEHIND_MAX_OPS = 200
 
 class Student:
     """
@@ -86,6 +139,1897 @@ class Course:
         :type student: :class:`Student`
         """
         self.students.append(student)
+
+
+def find_schedule_conflicts(store):
+    """
+    Finds every pair of overlapping courses in a student's or an instructor's week.
+
+    All meetings are sorted once by person and start time and swept in a single pass,
+    keeping the meetings still running at each start: O(n log n) plus the number of
+    clashes, for n meetings across all registrations and assignments.
+
+    :param store: The records to check.
+    :type store: :class:`RecordStore`
+    :return: ``(record type, ID, name, first course, second course, overlap)`` per clash,
+        such as ``('Student', 'S1', 'Ann', 'Algebra', 'Biology', 'Mon 10:00-10:30')``.
+    :rtype: list of tuple
+    """
+    course_meetings = {record['name']: parse_meetings(record.get('meetings'))
+                       for record in store.records if record['type'] == 'Course'}
+    meetings = []
+    for record in store.records:
+        if record['type'] in ('Student', 'Instructor'):
+            for course in set(record.get('courses', [])):
+                meetings.extend((record['type'], record['id'], start, end, course, record['name'])
+                                for start, end in course_meetings.get(course, ()))
+    meetings.sort(key=lambda meeting: meeting[:4])
+
+    conflicts = []
+    person, active = None, []
+    for record_type, person_id, start, end, course, name in meetings:
+        if (record_type, person_id) != person:
+            person, active = (record_type, person_id), []
+        active = [(active_end, active_course) for active_end, active_course in active if active_end > start]
+        for active_end, active_course in active:
+            overlap = format_meetings([(start, min(end, active_end))])
+            conflicts.append((record_type, person_id, name, active_course, course, overlap))
+        active.append((end, course))
+    return conflicts
+
+def record_values(record):
+    """
+    Returns the values of a record in the columns of the records table, as exported.
+
+    For courses, the instructor and students are combined into the last column. For other types,
+    the associated courses are listed. The table itself shows :func:`table_values`.
+
+    :param record: A student, instructor, or course record.
+    :type record: dict
+    :return: One value per entry of :data:`TABLE_COLUMNS`.
+    :rtype: tuple of str
+    """
+    if record['type'] == 'Course':
+        combined_info = f"Instructor: {record.get('instructor', '')}; Students: {', '.join(record.get('students', []))}"
+    else:
+        combined_info = ', '.join(record.get('courses', []))
+    return (
+        record['id'],
+        record['name'],
+        record['type'],
+        record.get('email', ''),
+        str(record.get('age', '')),
+        combined_info
+    )
+
+
+def table_values(record):
+    """
+    Returns the values shown for a record in the records table.
+
+    The last column only counts the record's links, such as ``Instructor: Ann; 120 students``,
+    so it stays short however large a course grows; the students are listed by
+    :class:`CourseRosterWindow`.
+
+    :param record: A student, instructor, or course record.
+    :type record: dict
+    :return: One value per entry of :data:`TABLE_COLUMNS`.
+    :rtype: tuple of str
+    """
+    if record['type'] == 'Course':
+        count = len(record.get('students', []))
+        summary = f"Instructor: {record.get('instructor', '')}; {count} student{'s' if count != 1 else ''}"
+    else:
+        count = len(record.get('courses', []))
+        summary = f"{count} course{'s' if count != 1 else ''}"
+    return (
+        record['id'],
+        record['name'],
+        record['type'],
+        record.get('email', ''),
+        str(record.get('age', '')),
+        summary
+    )
+
+
+def record_matches(record, search_query):
+    """
+    Checks whether a record matches a lower-case search query.
+
+    A record matches if the query is found in its name or ID, or in any of its courses.
+
+    :param record: A student, instructor, or course record.
+    :type record: dict
+    :param search_query: The lower-case search text.
+    :type search_query: str
+    :return: True if the record matches.
+    :rtype: bool
+    """
+    return (
+        search_query in record['name'].lower() or
+        search_query in record['id'].lower() or
+        any(search_query in course.lower() for course in record.get('courses', []))
+    )
+
+
+def sort_key(column, value):
+    """
+    Returns the key a table value is sorted by.
+
+    Ages sort numerically, with non-numeric ages after all numbers; every other column
+    sorts case-insensitively.
+
+    :param column: The index of the column in :data:`TABLE_COLUMNS`.
+    :type column: int
+    :param value: The displayed value.
+    :type value: str
+    :return: A key comparable with the keys of the same column.
+    :rtype: tuple
+    """
+    if TABLE_COLUMNS[column] == "Age":
+        try:
+            return (0, float(value), '')
+        except ValueError:
+            return (1, 0.0, value.lower())
+    return (value.lower(),)
+
+
+class NameIndex:
+    """
+    A sorted index of record names used for prefix (type-ahead) lookups.
+
+    Names are kept sorted case-insensitively, so a prefix lookup is a bisect
+    followed by a slice of at most ``limit`` entries.
+
+    :param names: Initial names to index.
+    :type names: iterable of str, optional
+    """
+
+    def __init__(self, names=()):
+        """
+        Constructor method to build the index from an initial set of names.
+        """
+        self._keys = sorted((name.lower(), name) for name in names)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def add(self, name):
+        """
+        Adds a name to the index.
+
+        :param name: The name to add.
+        :type name: str
+        """
+        bisect.insort(self._keys, (name.lower(), name))
+
+    def extend(self, names):
+        """
+        Adds several names at once by merging them into the sorted list.
+
+        :param names: The names to add.
+        :type names: iterable of str
+        """
+        self._keys = sorted(self._keys + sorted((name.lower(), name) for name in names))
+
+    def remove(self, name):
+        """
+        Removes one occurrence of a name from the index, if present.
+
+        :param name: The name to remove.
+        :type name: str
+        """
+        key = (name.lower(), name)
+        position = bisect.bisect_left(self._keys, key)
+        if position < len(self._keys) and self._keys[position] == key:
+            del self._keys[position]
+
+    def prefix(self, prefix='', limit=None):
+        """
+        Returns the names starting with the given prefix, in sorted order.
+
+        :param prefix: The prefix to match, compared case-insensitively.
+        :type prefix: str
+        :param limit: The maximum number of names to return, defaults to all matches.
+        :type limit: int, optional
+        :return: The matching names.
+        :rtype: list of str
+        """
+        prefix = prefix.lower()
+        start = bisect.bisect_left(self._keys, (prefix,))
+        if prefix:
+            end = bisect.bisect_left(self._keys, (prefix + '\uffff',), start)
+        else:
+            end = len(self._keys)
+        if limit is not None:
+            end = min(end, start + limit)
+        return [name for _, name in self._keys[start:end]]
+
+
+class IntegrityChecker:
+    """
+    Keeps track of broken name links between records, checking only what changed.
+
+    Records refer to each other by name: a course lists its students and names its
+    instructor, and students and instructors list their courses. A link is sound when
+    the record it names exists and links back. Editing or deleting a record can break
+    links in other records, so every change marks the record's old and new names dirty,
+    and :meth:`check` re-checks only the dirty records and the records linking to them,
+    found through a reverse index of links. Loaded records are only checked by a full
+    check, so the first edit after loading a large file stays fast. :meth:`scan` checks
+    a whole list of records in one pass, without building the indexes.
+
+    :ivar issues: Per record ``(type, name)``, the broken links as a dict of the linked
+        ``(type, name)`` to ``missing`` (no such record) or ``one-sided`` (it does not link back).
+    :vartype issues: dict
+    """
+
+    def __init__(self, records=()):
+        """
+        Constructor method to index the links of an initial list of records.
+        """
+        self.reset(records)
+
+    @staticmethod
+    def links(record):
+        """
+        Returns the records a record links to by name.
+
+        :param record: A student, instructor or course record.
+        :type record: dict
+        :return: The ``(type, name)`` of each linked record.
+        :rtype: frozenset of tuple
+        """
+        if record['type'] == 'Course':
+            links = {('Student', name) for name in record.get('students', [])}
+            if record.get('instructor') not in (None, '', 'None'):
+                links.add(('Instructor', record['instructor']))
+            return frozenset(links)
+        return frozenset(('Course', name) for name in record.get('courses', []))
+
+    @classmethod
+    def scan(cls, records):
+        """
+        Checks every link of a list of records in one pass.
+
+        :param records: The records, such as the contents of a records file.
+        :type records: list of dict
+        :return: ``(type, name, linked type, linked name, problem)`` per broken link, sorted.
+        :rtype: list of tuple
+        """
+        keys = set()
+        edges = set()
+        for record in records:
+            key = (record['type'], record['name'])
+            keys.add(key)
+            edges.update((key, target) for target in cls.links(record))
+        return sorted(source + target + ('missing' if target not in keys else 'one-sided',)
+                      for source, target in edges if (target, source) not in edges)
+
+    def reset(self, records):
+        """
+        Replaces the indexed records; they are checked by the next full :meth:`check`.
+
+        :param records: The records.
+        :type records: list of dict
+        """
+        self.issues = {}
+        self._records = {}
+        self._entries = {}
+        self._referrers = {}
+        self._dirty = set()
+        self._unchecked = set()
+        self._unlinked = {}
+        self._since = {}
+        self._clock = itertools.count(1)
+        for record in records:
+            self.link(record, changed=False)
+
+    def link(self, record, changed=True):
+        """
+        Indexes the links of a record that was added or edited, and marks its name dirty.
+
+        :param record: The record.
+        :type record: dict
+        :param changed: Whether the record was changed by the user, rather than loaded;
+            :meth:`repair` gives way to the most recent change to either side of a link.
+        :type changed: bool
+        """
+        key = (record['type'], record['name'])
+        targets = self.links(record)
+        self._records.setdefault(key, {})[id(record)] = record
+        self._entries[id(record)] = (key, targets)
+        for target in targets:
+            referrers = self._referrers.setdefault(target, {})
+            referrers[key] = referrers.get(key, 0) + 1
+        previous = self._unlinked.pop(id(record), None)
+        if not changed:
+            self._unchecked.add(key)
+        else:
+            self._dirty.add(key)
+            old = previous[2] if previous and previous[0] is record and previous[1] == key else frozenset()
+            now = next(self._clock)
+            # Only links that appeared or disappeared are stamped, not the ones an edit kept.
+            for target in targets ^ old:
+                self._since[key, target] = now
+
+    def unlink(self, record):
+        """
+        Drops the links of a record that is removed or about to be edited, and marks its name dirty.
+
+        :param record: The record, still holding the values it was linked with.
+        :type record: dict
+        """
+        key, targets = self._entries.pop(id(record))
+        records = self._records[key]
+        del records[id(record)]
+        if not records:
+            del self._records[key]
+        for target in targets:
+            referrers = self._referrers[target]
+            referrers[key] -= 1
+            if not referrers[key]:
+                del referrers[key]
+                if not referrers:
+                    del self._referrers[target]
+        self._dirty.add(key)
+        self._unlinked[id(record)] = (record, key, targets)
+
+    def check(self, full=False):
+        """
+        Re-checks the links of the dirty records and of the records linking to them.
+
+        :param full: Whether to check the loaded records not checked yet as well.
+        :type full: bool
+        :return: ``(type, name, linked type, linked name, problem)`` per link this check
+            found broken that was not broken before, sorted.
+        :rtype: list of tuple
+        """
+        affected = set()
+        if full:
+            affected.update(self._unchecked)
+            self._unchecked = set()
+        for key in self._dirty:
+            affected.add(key)
+            affected.update(self._referrers.get(key, ()))
+        self._dirty = set()
+        self._unlinked = {}
+        found = []
+        for source in affected:
+            before = self.issues.pop(source, {})
+            broken = self._broken(source)
+            if broken:
+                self.issues[source] = broken
+            found += [source + target + (problem,) for target, problem in broken.items()
+                      if before.get(target) != problem]
+        return sorted(found)
+
+    def broken_links(self):
+        """
+        Returns every broken link known after the last :meth:`check`; run a full check
+        first to include the links of loaded records.
+
+        :return: ``(type, name, linked type, linked name, problem)`` per broken link, sorted.
+        :rtype: list of tuple
+        """
+        return sorted(source + target + (problem,)
+                      for source, broken in self.issues.items() for target, problem in broken.items())
+
+    def repair(self, store):
+        """
+        Repairs every known broken link through a store, in one batch.
+
+        A link to a missing record is dropped. A one-sided link is completed by adding
+        the link back, unless the link back was removed more recently than the link was
+        made, in which case the removal wins and the link is dropped; a course keeps the
+        instructor it names. Run a full :meth:`check` before, and :meth:`check` after,
+        to see what is left.
+
+        :param store: The store holding the indexed records.
+        :type store: :class:`RecordStore`
+        :return: The number of links repaired.
+        :rtype: int
+        """
+        changes = {}
+
+        def plan(key, change):
+            for record in self._records.get(key, {}).values():
+                changes.setdefault(id(record), (record, []))[1].append(change)
+
+        for source, broken in list(self.issues.items()):
+            for target, problem in broken.items():
+                drop = problem == 'missing' or self._since.get((target, source), 0) > self._since.get((source, target), 0)
+                if not drop and source[0] == 'Instructor':
+                    drop = any(record.get('instructor') not in (None, '', 'None')
+                               for record in self._records[target].values())
+                if drop:
+                    plan(source, ('remove', target))
+                else:
+                    plan(target, ('add', source))
+        with store.batch():
+            for record, planned in changes.values():
+                with store.editing(record):
+                    for action, (record_type, name) in planned:
+                        if record_type == 'Instructor':
+                            record['instructor'] = name if action == 'add' else 'None'
+                            continue
+                        names = record.setdefault('students' if record_type == 'Student' else 'courses', [])
+                        if action == 'add' and name not in names:
+                            names.append(name)
+                        elif action == 'remove':
+                            names[:] = [other for other in names if other != name]
+        return sum(len(planned) for _, planned in changes.values())
+
+    def _broken(self, source):
+        broken = {}
+        targets = set().union(*(self._entries[record_id][1] for record_id in self._records.get(source, ())))
+        for target in targets:
+            records = self._records.get(target)
+            if not records:
+                broken[target] = 'missing'
+            elif not any(source in self._entries[record_id][1] for record_id in records):
+                broken[target] = 'one-sided'
+        return broken
+
+
+class RecordStore:
+    """
+    Holds the application's records together with the indexes built over them.
+
+    Every change to a record goes through :meth:`add`, :meth:`remove` or
+    :meth:`editing` so the indexes are updated incrementally instead of being
+    rebuilt from ``records``.
+
+    Besides the name indexes, the store keeps one sort order per table column as a
+    sorted list of ``(key, sequence number)`` pairs, so switching the sort column
+    never sorts the records.
+
+    With a ``backend``, every change is written through to it before the store is
+    updated, and a change the backend rejects leaves the store as it was.
+
+    :ivar records: The records, as dictionaries with at least ``id``, ``name`` and ``type`` keys.
+    :vartype records: list of dict
+    :ivar name_indexes: A sorted name index per record type.
+    :vartype name_indexes: dict of str to :class:`NameIndex`
+    :ivar sort_indexes: A sorted list of ``(key, sequence number)`` pairs per table column.
+    :vartype sort_indexes: list of list
+    :ivar version: A counter increased on every change, for caches built from the records.
+    :vartype version: int
+    :ivar backend: The persistent storage changes are written to, if any.
+    :vartype backend: :class:`SQLiteBackend` or None
+    :ivar integrity: The broken name links between the records, kept up to date with every change.
+    :vartype integrity: :class:`IntegrityChecker`
+    :ivar gradebook: The GPAs, course averages and class ranks, kept up to date with every change.
+    :vartype gradebook: :class:`~school.grades.RecordGradebook`
+    """
+
+    RECORD_TYPES = ('Student', 'Instructor', 'Course')
+
+    def __init__(self, records=None, backend=None):
+        """
+        Constructor method to initialize the store with an optional list of records.
+        """
+        self.records = []
+        self.name_indexes = {}
+        self.version = 0
+        self.backend = backend
+        self.integrity = IntegrityChecker()
+        self.gradebook = RecordGradebook()
+        self.load(records or [])
+
+    def __len__(self):
+        return len(self.records)
+
+    def load(self, records):
+        """
+        Replaces all records and rebuilds the indexes in one pass.
+
+        :param records: The new records.
+        :type records: list of dict
+        """
+        self.version += 1
+        self.records = list(records)
+        self.integrity.reset(self.records)
+        self.gradebook.reset(self.records)
+        self.name_indexes = {
+            record_type: NameIndex(r['name'] for r in self.records if r['type'] == record_type)
+            for record_type in self.RECORD_TYPES
+        }
+
+        self._sequence = itertools.count()
+        self._entries = {}
+        self._by_sequence = {}
+        columns = [[] for _ in TABLE_COLUMNS]
+        for record in self.records:
+            sequence, keys = self._register(record)
+            for column, key in enumerate(keys):
+                columns[column].append((key, sequence))
+        self.sort_indexes = [sorted(column) for column in columns]
+
+    def extend(self, records):
+        """
+        Appends records that are already stored, such as a batch read from the backend.
+
+        The batch is indexed by sorting it and merging it into the existing indexes,
+        which is much cheaper than inserting the records one at a time.
+
+        :param records: The records to append.
+        :type records: list of dict
+        """
+        self.version += 1
+        self.records.extend(records)
+        for record in records:
+            self.integrity.link(record, changed=False)
+            self.gradebook.add(record)
+        for record_type, index in self.name_indexes.items():
+            index.extend(r['name'] for r in records if r['type'] == record_type)
+        columns = [[] for _ in TABLE_COLUMNS]
+        for record in records:
+            sequence, keys = self._register(record)
+            for column, key in enumerate(keys):
+                columns[column].append((key, sequence))
+        self.sort_indexes = [sorted(entries + sorted(column)) for entries, column in zip(self.sort_indexes, columns)]
+
+    def replace(self, records):
+        """
+        Replaces all records, in the backend as well as in memory.
+
+        :param records: The new records.
+        :type records: list of dict
+        """
+        if self.backend is not None:
+            self.backend.replace_all(records)
+        self.load(records)
+
+    @contextmanager
+    def batch(self):
+        """
+        Context manager grouping several changes into one backend transaction.
+
+        If a change in the batch fails, the backend rolls the whole batch back while
+        the store only undoes the failing change, so a batch should put the change
+        most likely to fail (such as adding a record) first.
+        """
+        if self.backend is None:
+            yield
+        else:
+            with self.backend.transaction():
+                yield
+
+    def add(self, record):
+        """
+        Adds a record and indexes it.
+
+        :param record: The record to add.
+        :type record: dict
+        """
+        if self.backend is not None:
+            self.backend.insert(record)
+        self.records.append(record)
+        self._index(record)
+
+    def remove(self, record):
+        """
+        Removes a record and drops it from the indexes.
+
+        :param record: The record to remove.
+        :type record: dict
+        """
+        if self.backend is not None:
+            self.backend.delete(record)
+        self.records.remove(record)
+        self._unindex(record)
+
+    @contextmanager
+    def editing(self, record):
+        """
+        Context manager wrapping an in-place change to a record.
+
+        The record is taken out of the indexes on entry and re-indexed with its
+        new values on exit. If the backend rejects the change, the record gets its
+        old values back and the error is raised.
+
+        :param record: The record about to be changed.
+        :type record: dict
+        """
+        old = copy.deepcopy(record) if self.backend is not None else None
+        sequence = self._unindex(record)
+        try:
+            yield record
+            if self.backend is not None:
+                try:
+                    self.backend.update(old, record)
+                except Exception:
+                    record.clear()
+                    record.update(old)
+                    raise
+        finally:
+            self._index(record, sequence)
+
+    @contextmanager
+    def editing_many(self, records, write=True):
+        """
+        Context manager wrapping in-place changes to many records at once.
+
+        Like :meth:`editing`, but the sort indexes are filtered once on entry and merged
+        once on exit instead of updated per record, and the backend writes share one
+        :meth:`batch`. If the backend rejects a change, every record gets its old values
+        back and the error is raised.
+
+        :param records: The records about to be changed; repeated records count once.
+        :type records: iterable of dict
+        :param write: Whether to write the changes to the backend; False for changes
+            read from it, such as in :meth:`reconcile`.
+        :type write: bool
+        """
+        records = list({id(record): record for record in records}.values())
+        write = write and self.backend is not None
+        old = [copy.deepcopy(record) for record in records] if write else None
+        sequences = [self._unlink(record) for record in records]
+        removed = set(sequences)
+        self.sort_indexes = [[entry for entry in entries if entry[1] not in removed] for entries in self.sort_indexes]
+        try:
+            yield records
+            if write:
+                try:
+                    with self.batch():
+                        for before, record in zip(old, records):
+                            self.backend.update(before, record)
+                except Exception:
+                    for before, record in zip(old, records):
+                        record.clear()
+                        record.update(before)
+                    raise
+        finally:
+            columns = [[] for _ in TABLE_COLUMNS]
+            for record, sequence in zip(records, sequences):
+                self._link(record)
+                _, keys = self._register(record, sequence)
+                for column, key in enumerate(keys):
+                    columns[column].append((key, sequence))
+            self.sort_indexes = [sorted(entries + sorted(column))
+                                 for entries, column in zip(self.sort_indexes, columns)]
+
+    def reconcile(self, course):
+        """
+        Makes a course and its students match the course's stored registrations.
+
+        The database seats students by itself: a registration for a full course joins
+        its waitlist instead, and a freed seat promotes the head of the waitlist, also
+        for changes made by other instances. Call this once the course's writes are
+        flushed. Only the course and the students whose registration changed are
+        re-indexed, and nothing is written back.
+
+        :param course: The course record.
+        :type course: dict
+        :return: The names of the course's waitlisted students, in promotion order.
+        :rtype: list of str
+        """
+        roster = self.backend.course_roster(course) if self.backend is not None else None
+        if roster is None:
+            return []
+        students, grades, waitlist = roster
+        changed = set(course.get('students', [])).symmetric_difference(students)
+        if not changed and grades == (course.get('grades') or {}):
+            return waitlist
+        affected = [record for record in (self.find('Student', name) for name in changed) if record is not None]
+        with self.editing_many([course] + affected, write=False):
+            course['students'] = students
+            course['grades'] = grades
+            for student in affected:
+                courses = [name for name in student.get('courses', []) if name != course['name']]
+                if student['name'] in students:
+                    courses.append(course['name'])
+                student['courses'] = courses
+        return waitlist
+
+    def names(self, record_type, prefix='', limit=None):
+        """
+        Returns the sorted names of one record type that start with a prefix.
+
+        :param record_type: One of ``Student``, ``Instructor`` or ``Course``.
+        :type record_type: str
+        :param prefix: The prefix to match, defaults to all names.
+        :type prefix: str
+        :param limit: The maximum number of names to return.
+        :type limit: int, optional
+        :return: The matching names.
+        :rtype: list of str
+        """
+        return self.name_indexes[record_type].prefix(prefix, limit)
+
+    def find(self, record_type, name):
+        """
+        Returns the first record of a type with exactly this name, by binary search.
+
+        :param record_type: One of ``Student``, ``Instructor`` or ``Course``.
+        :type record_type: str
+        :param name: The name to look up.
+        :type name: str
+        :return: The record, or None.
+        :rtype: dict or None
+        """
+        entries = self.sort_indexes[TABLE_COLUMNS.index("Name")]
+        key = sort_key(TABLE_COLUMNS.index("Name"), name)
+        for position in range(bisect.bisect_left(entries, (key,)), len(entries)):
+            entry_key, sequence = entries[position]
+            if entry_key != key:
+                break
+            record = self._by_sequence[sequence]
+            if record['type'] == record_type and record['name'] == name:
+                return record
+        return None
+
+    def ordered(self, column, descending=False):
+        """
+        Yields the records in the order of one table column.
+
+        :param column: The index of the column in :data:`TABLE_COLUMNS`.
+        :type column: int
+        :param descending: Whether to yield the records in descending order.
+        :type descending: bool
+        :return: The records, sorted by the column.
+        :rtype: generator of dict
+        """
+        entries = self.sort_indexes[column]
+        if descending:
+            entries = reversed(entries)
+        for _, sequence in entries:
+            yield self._by_sequence[sequence]
+
+    def slice(self, column, descending, start, stop):
+        """
+        Returns the records between two positions of a sort order, without walking the rest.
+
+        :param column: The index of the sort column, or None for insertion order.
+        :type column: int or None
+        :param descending: Whether the sort order is descending.
+        :type descending: bool
+        :param start: The position of the first record to return.
+        :type start: int
+        :param stop: The position after the last record to return.
+        :type stop: int
+        :return: The records in that range.
+        :rtype: list of dict
+        """
+        if column is None:
+            return self.records[start:stop]
+        entries = self.sort_indexes[column]
+        if descending:
+            size = len(entries)
+            entries = entries[max(size - stop, 0):max(size - start, 0)][::-1]
+        else:
+            entries = entries[start:stop]
+        return [self._by_sequence[sequence] for _, sequence in entries]
+
+    def _register(self, record, sequence=None):
+        if sequence is None:
+            sequence = next(self._sequence)
+        keys = tuple(sort_key(column, value) for column, value in enumerate(table_values(record)))
+        self._entries[id(record)] = (sequence, keys)
+        self._by_sequence[sequence] = record
+        return sequence, keys
+
+    def _index(self, record, sequence=None):
+        self._link(record)
+        sequence, keys = self._register(record, sequence)
+        for column, key in enumerate(keys):
+            bisect.insort(self.sort_indexes[column], (key, sequence))
+        return sequence
+
+    def _unindex(self, record):
+        keys = self._entries[id(record)][1]
+        sequence = self._unlink(record)
+        for column, key in enumerate(keys):
+            entries = self.sort_indexes[column]
+            del entries[bisect.bisect_left(entries, (key, sequence))]
+        return sequence
+
+    def _link(self, record):
+        # Everything but the sort indexes, which callers update one record or one batch at a time.
+        self.version += 1
+        index = self.name_indexes.get(record['type'])
+        if index is not None:
+            index.add(record['name'])
+        self.integrity.link(record)
+        self.gradebook.add(record)
+
+    def _unlink(self, record):
+        self.version += 1
+        index = self.name_indexes.get(record['type'])
+        if index is not None:
+            index.remove(record['name'])
+        self.integrity.unlink(record)
+        self.gradebook.remove(record)
+        sequence, _ = self._entries.pop(id(record))
+        del self._by_sequence[sequence]
+        return sequence
+
+
+class SQLiteBackend:
+    """
+    Stores the records of :class:`ManagementApp` in the shared SQLite database.
+
+    Records keep the in-memory format used by the application (dictionaries linking
+    students, instructors and courses by name); the backend translates them to rows and
+    registrations. Each call runs in its own small transaction unless it is made inside
+    :meth:`transaction`, and every lookup goes through an index. New students, registrations
+    and course assignments queue their notifications in the :class:`Outbox` in the same
+    transaction.
+
+    :param db_path: The path of the database file; the schema is created if needed.
+    :type db_path: str
+    """
+
+    TABLES = {
+        'Student': ('Students', 'student_id', 'name'),
+        'Instructor': ('Instructors', 'instructor_id', 'name'),
+        'Course': ('Courses', 'course_id', 'course_name'),
+    }
+
+    def __init__(self, db_path=DB_PATH):
+        """
+        Constructor method to create the schema if needed and open the connection.
+        """
+        create_database(db_path)
+        self.db_path = db_path
+        self.conn = sqlite3.connect(db_path, timeout=BUSY_TIMEOUT_MS / 1000)
+        self._depth = 0
+        self._notify = True
+
+    def close(self):
+        """
+        Closes the database connection.
+        """
+        self.conn.close()
+
+    @contextmanager
+    def transaction(self):
+        """
+        Context manager running the enclosed calls in one transaction.
+
+        Nested uses join the outermost transaction, which commits on success and
+        rolls back if an exception escapes.
+        """
+        self._depth += 1
+        try:
+            if self._depth == 1 and not self.conn.in_transaction:
+                # Take the write lock up front, so waiting for other instances uses the busy timeout.
+                self.conn.execute('BEGIN IMMEDIATE')
+            yield self.conn
+            if self._depth == 1:
+                self.conn.commit()
+        except Exception:
+            if self._depth == 1:
+                self.conn.rollback()
+            raise
+        finally:
+            self._depth -= 1
+
+    def iter_batches(self, first_size=1000, max_size=50000):
+        """
+        Yields all stored records in batches, students first, then instructors and courses.
+
+        Batches start small, so the first rows can be shown quickly, and double in size
+        up to ``max_size``. Each batch is read with a keyset query on the primary key.
+
+        :param first_size: The size of the first batch.
+        :type first_size: int
+        :param max_size: The largest batch size.
+        :type max_size: int
+        :return: Lists of records.
+        :rtype: generator of list of dict
+        """
+        size = first_size
+        for record_type in ('Student', 'Instructor', 'Course'):
+            last_id = 0
+            while True:
+                batch, last_id = self._read_batch(record_type, last_id, size)
+                if not batch:
+                    break
+                yield batch
+                size = min(size * 2, max_size)
+
+    def insert(self, record):
+        """
+        Inserts a new record together with its course, instructor or student links.
+
+        :param record: The record to insert.
+        :type record: dict
+        :raises sqlite3.Error: If the record violates the schema, such as a duplicate ID or email.
+        :raises ValueError: If the age is not a number.
+        """
+        with self.transaction():
+            record_type = record['type']
+            if record_type == 'Course':
+                instructor = self._row_id('Instructor', record.get('instructor'))
+                row_id = self.conn.execute(
+                    'INSERT INTO Courses (course_id, course_name, instructor_id, meetings) VALUES (?, ?, ?, ?)',
+                    (record['id'], record['name'], instructor, record.get('meetings', ''))).lastrowid
+                if self._notify and instructor is not None:
+                    Outbox.assigned(self.conn, row_id)
+            else:
+                table, id_column, _ = self.TABLES[record_type]
+                self.conn.execute(
+                    f'INSERT INTO {table} (name, age, email, {id_column}) VALUES (?, ?, ?, ?)',
+                    (record['name'], int(record['age']), record['email'], record['id']))
+                if self._notify and record_type == 'Student':
+                    Outbox.enqueue(self.conn, 'welcome', record['email'], name=record['name'], record_id=record['id'])
+            self._sync_links(record)
+
+    def update(self, old, record):
+        """
+        Updates a stored record from its new in-memory values.
+
+        :param old: The record's values before the change; its ID locates the row.
+        :type old: dict
+        :param record: The record's new values.
+        :type record: dict
+        :raises sqlite3.Error: If the new values violate the schema.
+        :raises ValueError: If the age is not a number.
+        """
+        with self.transaction():
+            table, id_column, name_column = self.TABLES[record['type']]
+            if record['type'] == 'Course':
+                instructor = self._row_id('Instructor', record.get('instructor'))
+                previous = self.conn.execute('SELECT id, instructor_id FROM Courses WHERE course_id = ?',
+                                             (old['id'],)).fetchone()
+                self.conn.execute(
+                    'UPDATE Courses SET course_id = ?, course_name = ?, instructor_id = ?, meetings = ? '
+                    'WHERE course_id = ?',
+                    (record['id'], record['name'], instructor, record.get('meetings', ''), old['id']))
+                if self._notify and previous is not None and instructor not in (None, previous[1]):
+                    Outbox.assigned(self.conn, previous[0])
+            else:
+                self.conn.execute(
+                    f'UPDATE {table} SET name = ?, age = ?, email = ?, {id_column} = ? WHERE {id_column} = ?',
+                    (record['name'], int(record['age']), record['email'], record['id'], old['id']))
+            self._sync_links(record, old)
+
+    def delete(self, record):
+        """
+        Deletes a stored record and the registrations or assignments pointing to it.
+
+        :param record: The record to delete.
+        :type record: dict
+        """
+        with self.transaction():
+            table, id_column, _ = self.TABLES[record['type']]
+            row_id = self.conn.execute(f'SELECT id FROM {table} WHERE {id_column} = ?', (record['id'],)).fetchone()
+            if row_id is None:
+                return
+            if record['type'] == 'Student':
+                self.conn.execute('DELETE FROM Registrations WHERE student_id = ?', row_id)
+            elif record['type'] == 'Course':
+                self.conn.execute('DELETE FROM Registrations WHERE course_id = ?', row_id)
+            else:
+                self.conn.execute('UPDATE Courses SET instructor_id = NULL WHERE instructor_id = ?', row_id)
+            self.conn.execute(f'DELETE FROM {table} WHERE id = ?', row_id)
+
+    def replace_all(self, records):
+        """
+        Replaces the whole database contents with the given records in one transaction.
+
+        Loading records is not a change anyone is told about, so no notifications are queued.
+
+        :param records: The records to store.
+        :type records: list of dict
+        """
+        self._notify = False
+        try:
+            with self.transaction():
+                for table in ('Registrations', 'Courses', 'Instructors', 'Students'):
+                    self.conn.execute(f'DELETE FROM {table}')
+                ordered = sorted(records, key=lambda r: ('Instructor', 'Course', 'Student').index(r['type']))
+                for record in ordered:
+                    self.insert(record)
+                # Links to records inserted later in the batch are only resolvable now.
+                for record in ordered:
+                    self._sync_links(record)
+        finally:
+            self._notify = True
+
+    def _row_id(self, record_type, name):
+        """
+        Returns the primary key of the first record of a type with exactly this name.
+
+        The case-insensitive comparison lets SQLite use the name index; the exact
+        comparison then keeps only the matching spelling.
+        """
+        if not name or name == 'None':
+            return None
+        table, _, name_column = self.TABLES[record_type]
+        row = self.conn.execute(
+            f'SELECT id FROM {table} WHERE {name_column} = ? COLLATE NOCASE AND {name_column} = ? LIMIT 1',
+            (name, name)).fetchone()
+        return row[0] if row else None
+
+    def _sync_links(self, record, old=None):
+        """
+        Writes the links added to or removed from the record's name lists since ``old``
+        to the stored registrations or assignments, and the course grades that changed.
+
+        Links both lists hold are left as they are stored: one missing from the database
+        was removed by another instance, or joined the course's waitlist because the
+        course was full, and writing it again would undo that. Names that do not match
+        a stored record are skipped.
+        """
+        table, id_column, _ = self.TABLES[record['type']]
+        row = self.conn.execute(f'SELECT id FROM {table} WHERE {id_column} = ?', (record['id'],)).fetchone()
+        if row is None:
+            return
+        row_id = row[0]
+        old = old or {}
+        if record['type'] == 'Course':
+            names = record.get('students', [])
+            before = set(old.get('students', []))
+            grades = record.get('grades') or {}
+            old_grades = old.get('grades') or {}
+            current = dict(self.conn.execute('SELECT student_id, grade FROM Registrations WHERE course_id = ?', (row_id,)))
+            added = {}
+            regraded = {}
+            for name in names:
+                if name in before and grades.get(name) == old_grades.get(name):
+                    continue
+                student = self._row_id('Student', name)
+                if student is None:
+                    continue
+                if name not in before and student not in current:
+                    added[student] = grades.get(name)
+                elif student in current and current[student] != grades.get(name):
+                    regraded[student] = grades.get(name)
+            removed = {self._row_id('Student', name) for name in before.difference(names)} - {None}
+            self.conn.executemany('INSERT INTO Registrations (student_id, course_id, grade) VALUES (?, ?, ?)',
+                                  [(student, row_id, grade) for student, grade in added.items()])
+            self.conn.executemany('DELETE FROM Registrations WHERE student_id = ? AND course_id = ?',
+                                  [(student, row_id) for student in removed])
+            self.conn.executemany('DELETE FROM Waitlist WHERE student_id = ? AND course_id = ?',
+                                  [(student, row_id) for student in removed])
+            self.conn.executemany('UPDATE Registrations SET grade = ? WHERE student_id = ? AND course_id = ?',
+                                  [(grade, student, row_id) for student, grade in regraded.items()])
+            if self._notify:
+                for student in added:
+                    Outbox.registered(self.conn, student, row_id)
+            return
+
+        names = set(record.get('courses', []))
+        before = set(old.get('courses', []))
+        added = {self._row_id('Course', name) for name in names - before} - {None}
+        removed = {self._row_id('Course', name) for name in before - names} - {None}
+        if record['type'] == 'Student':
+            current = {r[0] for r in self.conn.execute('SELECT course_id FROM Registrations WHERE student_id = ?', (row_id,))}
+            self.conn.executemany('INSERT INTO Registrations (student_id, course_id) VALUES (?, ?)',
+                                  [(row_id, course) for course in added - current])
+            self.conn.executemany('DELETE FROM Registrations WHERE student_id = ? AND course_id = ?',
+                                  [(row_id, course) for course in removed])
+            self.conn.executemany('DELETE FROM Waitlist WHERE student_id = ? AND course_id = ?',
+                                  [(row_id, course) for course in removed])
+            if self._notify:
+                for course in added - current:
+                    Outbox.registered(self.conn, row_id, course)
+        else:
+            current = {r[0] for r in self.conn.execute('SELECT id FROM Courses WHERE instructor_id = ?', (row_id,))}
+            self.conn.executemany('UPDATE Courses SET instructor_id = ? WHERE id = ?',
+                                  [(row_id, course) for course in added - current])
+            self.conn.executemany('UPDATE Courses SET instructor_id = NULL WHERE id = ?',
+                                  [(course,) for course in removed & current])
+            if self._notify:
+                for course in added - current:
+                    Outbox.assigned(self.conn, course)
+
+    def course_roster(self, course):
+        """
+        Reads a course's registrations and waitlist as they are stored.
+
+        :param course: The course record; its ID locates the row.
+        :type course: dict
+        :return: The names of the registered students in registration order, their grades
+            by name, and the names of the waitlisted students in promotion order, or None
+            if the course is not stored.
+        :rtype: tuple or None
+        """
+        row = self.conn.execute('SELECT id FROM Courses WHERE course_id = ?', (course['id'],)).fetchone()
+        if row is None:
+            return None
+        students = []
+        grades = {}
+        for name, grade in self.conn.execute('''
+                SELECT s.name, r.grade FROM Registrations r JOIN Students s ON s.id = r.student_id
+                WHERE r.course_id = ? ORDER BY r.id''', row):
+            students.append(name)
+            if grade is not None:
+                grades[name] = grade
+        waitlist = [r[0] for r in self.conn.execute('''
+            SELECT s.name FROM Waitlist w JOIN Students s ON s.id = w.student_id
+            WHERE w.course_id = ? ORDER BY w.priority DESC, w.enqueued_at, w.id''', row)]
+        return students, grades, waitlist
+
+    def _read_batch(self, record_type, last_id, size):
+        """
+        Reads up to ``size`` records of one type with a primary key above ``last_id``.
+
+        :return: The records and the largest primary key read.
+        :rtype: tuple
+        """
+        if record_type == 'Course':
+            rows = self.conn.execute('''
+                SELECT c.id, c.course_id, c.course_name, i.name, c.meetings
+                FROM Courses c LEFT JOIN Instructors i ON i.id = c.instructor_id
+                WHERE c.id > ? ORDER BY c.id LIMIT ?''', (last_id, size)).fetchall()
+            if not rows:
+                return [], last_id
+            links = {}
+            grades = {}
+            for course, student, grade in self.conn.execute('''
+                    SELECT r.course_id, s.name, r.grade FROM Registrations r JOIN Students s ON s.id = r.student_id
+                    WHERE r.course_id BETWEEN ? AND ? ORDER BY r.id''', (rows[0][0], rows[-1][0])):
+                links.setdefault(course, []).append(student)
+                if grade is not None:
+                    grades.setdefault(course, {})[student] = grade
+            records = [{'id': course_id, 'name': name, 'type': 'Course', 'instructor': instructor or '',
+                        'students': links.get(row_id, []), 'grades': grades.get(row_id, {}), 'meetings': meetings}
+                       for row_id, course_id, name, instructor, meetings in rows]
+            return records, rows[-1][0]
+
+        table, id_column, _ = self.TABLES[record_type]
+        rows = self.conn.execute(
+            f'SELECT id, {id_column}, name, age, email FROM {table} WHERE id > ? ORDER BY id LIMIT ?',
+            (last_id, size)).fetchall()
+        if not rows:
+            return [], last_id
+        if record_type == 'Student':
+            links = self._links('''
+                SELECT r.student_id, c.course_name FROM Registrations r JOIN Courses c ON c.id = r.course_id
+                WHERE r.student_id BETWEEN ? AND ? ORDER BY r.id''', rows[0][0], rows[-1][0])
+        else:
+            links = self._links('''
+                SELECT instructor_id, course_name FROM Courses
+                WHERE instructor_id BETWEEN ? AND ? ORDER BY id''', rows[0][0], rows[-1][0])
+        records = [{'id': record_id, 'name': name, 'type': record_type, 'age': str(age), 'email': email,
+                    'courses': links.get(row_id, [])}
+                   for row_id, record_id, name, age, email in rows]
+        return records, rows[-1][0]
+
+    def _links(self, sql, first_id, last_id):
+        """
+        Groups the (owner, name) rows of a link query by owner primary key.
+        """
+        links = {}
+        for owner, name in self.conn.execute(sql, (first_id, last_id)):
+            links.setdefault(owner, []).append(name)
+        return links
+
+
+class ColdArchive:
+    """
+    A compressed, read-only archive of completed courses and the people only they involve.
+
+    This is the archive of the PyQt application, working on the same directory and
+    batch format, so batches archived by one application can be restored by the other.
+    Each :meth:`archive_courses` call writes one gzip-compressed JSON batch with the
+    courses, their registrations, the students who have no other registration and the
+    instructors who teach no other course, and removes them from the database.
+
+    :param directory: The directory holding the batch files.
+    :type directory: str
+    """
+
+    def __init__(self, directory=ARCHIVE_DIR):
+        """
+        Constructor method to initialize the archive in a directory.
+        """
+        self.directory = directory
+
+    def batches(self):
+        """
+        Returns the names of the archived batches, oldest first.
+
+        :return: The batch names.
+        :rtype: list of str
+        """
+        return sorted(os.path.basename(path)[:-len('.json.gz')]
+                      for path in glob.glob(os.path.join(self.directory, '*.json.gz')))
+
+    def load(self, name):
+        """
+        Reads one batch.
+
+        :param name: The batch name.
+        :type name: str
+        :return: Lists of ``students``, ``instructors``, ``courses`` and ``registrations``.
+        :rtype: dict
+        """
+        with gzip.open(self._path(name), 'rt', encoding='utf-8') as file:
+            return json.load(file)
+
+    def archive_courses(self, backend, course_ids, name=None):
+        """
+        Moves courses and the records that only they involve into a new batch.
+
+        :param backend: The database to archive from.
+        :type backend: :class:`SQLiteBackend`
+        :param course_ids: The IDs of the completed courses.
+        :type course_ids: list of str
+        :param name: The batch name; defaults to one based on the current time.
+        :type name: str, optional
+        :return: The batch name, or None if none of the courses exist.
+        :rtype: str or None
+        """
+        name = name or time.strftime('batch-%Y%m%d-%H%M%S')
+        with backend.transaction() as conn:
+            conn.execute('DROP TABLE IF EXISTS temp.archived_courses')
+            conn.execute('CREATE TEMP TABLE archived_courses AS '
+                         'SELECT id FROM Courses WHERE course_id IN (SELECT value FROM json_each(?))',
+                         (json.dumps(list(course_ids)),))
+            batch = {
+                'courses': self._rows(conn, '''
+                    SELECT c.course_id, c.course_name, i.instructor_id, c.meetings FROM Courses c
+                    LEFT JOIN Instructors i ON i.id = c.instructor_id
+                    WHERE c.id IN archived_courses'''),
+                'registrations': self._rows(conn, '''
+                    SELECT s.student_id, c.course_id, r.grade FROM Registrations r
+                    JOIN Students s ON s.id = r.student_id JOIN Courses c ON c.id = r.course_id
+                    WHERE r.course_id IN archived_courses'''),
+                'students': self._rows(conn, '''
+                    SELECT name, age, email, student_id FROM Students s
+                    WHERE id IN (SELECT student_id FROM Registrations WHERE course_id IN archived_courses)
+                    AND NOT EXISTS (SELECT 1 FROM Registrations r
+                                    WHERE r.student_id = s.id AND r.course_id NOT IN archived_courses)'''),
+                'instructors': self._rows(conn, '''
+                    SELECT name, age, email, instructor_id FROM Instructors i
+                    WHERE id IN (SELECT instructor_id FROM Courses WHERE id IN archived_courses)
+                    AND NOT EXISTS (SELECT 1 FROM Courses c
+                                    WHERE c.instructor_id = i.id AND c.id NOT IN archived_courses)'''),
+            }
+            if not batch['courses']:
+                return None
+            # The batch is written before anything is deleted, so a failure leaves duplicates, not losses.
+            self._write(name, batch)
+            conn.execute('DELETE FROM Waitlist WHERE course_id IN archived_courses')
+            conn.execute('DELETE FROM Registrations WHERE course_id IN archived_courses')
+            conn.executemany('DELETE FROM Students WHERE student_id = ?',
+                             [(student['student_id'],) for student in batch['students']])
+            conn.executemany('DELETE FROM Instructors WHERE instructor_id = ?',
+                             [(instructor['instructor_id'],) for instructor in batch['instructors']])
+            conn.execute('DELETE FROM Courses WHERE id IN archived_courses')
+            conn.execute('DROP TABLE temp.archived_courses')
+        return name
+
+    def restore(self, backend, name):
+        """
+        Puts a whole batch back into the database and removes it from the archive.
+
+        Records whose ID is already in use are skipped, and registrations link to them.
+
+        :param backend: The database to restore into.
+        :type backend: :class:`SQLiteBackend`
+        :param name: The batch name.
+        :type name: str
+        :return: The number of records and registrations restored.
+        :rtype: int
+        """
+        batch = self.load(name)
+        with backend.transaction() as conn:
+            conn.executemany('INSERT OR IGNORE INTO Students (name, age, email, student_id) VALUES (?, ?, ?, ?)',
+                             [(s['name'], s['age'], s['email'], s['student_id']) for s in batch['students']])
+            conn.executemany('INSERT OR IGNORE INTO Instructors (name, age, email, instructor_id) VALUES (?, ?, ?, ?)',
+                             [(i['name'], i['age'], i['email'], i['instructor_id']) for i in batch['instructors']])
+            conn.executemany('INSERT OR IGNORE INTO Courses (course_id, course_name, instructor_id, meetings) '
+                             'SELECT ?, ?, (SELECT id FROM Instructors WHERE instructor_id = ?), ?',
+                             [(c['course_id'], c['course_name'], c['instructor_id'], c.get('meetings', ''))
+                              for c in batch['courses']])
+            conn.executemany('INSERT OR IGNORE INTO Registrations (student_id, course_id, grade) '
+                             'SELECT s.id, c.id, ? FROM Students s, Courses c WHERE s.student_id = ? AND c.course_id = ?',
+                             [(r.get('grade'), r['student_id'], r['course_id']) for r in batch['registrations']])
+        # The batch is only removed once the restore is committed.
+        os.remove(self._path(name))
+        return sum(len(batch[table]) for table in ('students', 'instructors', 'courses', 'registrations'))
+
+    def _path(self, name):
+        return os.path.join(self.directory, f'{name}.json.gz')
+
+    def _write(self, name, batch):
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(name)
+        with gzip.open(path + '.tmp', 'wt', encoding='utf-8') as file:
+            json.dump(batch, file)
+        os.replace(path + '.tmp', path)
+
+    @staticmethod
+    def _rows(conn, sql):
+        cursor = conn.execute(sql)
+        columns = [column[0] for column in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor]
+
+
+class ReportsWindow(tk.Toplevel):
+    """
+    A window showing the reports of :class:`RosterReports` for the application's records.
+
+    The records are read into columns when the window opens and on "Refresh";
+    switching reports only recomputes them from those columns.
+
+    :param parent: The management app whose records are reported on.
+    :type parent: :class:`ManagementApp`
+    """
+
+    def __init__(self, parent):
+        """
+        Initializes the window and shows the first report.
+
+        :param parent: The management app whose records are reported on.
+        :type parent: :class:`ManagementApp`
+        """
+        super().__init__(parent)
+        self.title("Reports")
+        self.geometry("700x450")
+        self.parent = parent
+        self.reports = None
+
+        controls = tk.Frame(self)
+        controls.pack(fill=tk.X, padx=10, pady=5)
+        self.report_picker = ttk.Combobox(controls, values=list(RosterReports.REPORTS), state="readonly", width=30)
+        self.report_picker.current(0)
+        self.report_picker.bind("<<ComboboxSelected>>", lambda event: self.show_report())
+        self.report_picker.pack(side=tk.LEFT)
+        tk.Button(controls, text="Refresh", command=self.refresh).pack(side=tk.LEFT, padx=5)
+
+        self.report_table = ttk.Treeview(self, show='headings')
+        self.report_table.pack(fill=tk.BOTH, expand=True, padx=10)
+        self.status_label = tk.Label(self, anchor=tk.W)
+        self.status_label.pack(fill=tk.X, padx=10, pady=5)
+        self.refresh()
+
+    def refresh(self):
+        """
+        Re-reads the records and shows the selected report again.
+        """
+        self.reports = RosterReports.from_records(self.parent.data_records)
+        self.show_report()
+
+    def show_report(self):
+        """
+        Computes the selected report and fills the table with it.
+        """
+        started = time.perf_counter()
+        headers, rows = self.reports.report(self.report_picker.get())
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self.report_table.delete(*self.report_table.get_children())
+        self.report_table.configure(columns=headers)
+        for header in headers:
+            self.report_table.heading(header, text=header)
+        for row in rows:
+            self.report_table.insert("", tk.END, values=row)
+        engine = "NumPy" if numpy_module() else "Python"
+        self.status_label.config(text=f"{len(rows)} rows in {elapsed_ms:.1f} ms ({engine})")
+
+
+class DuplicatesWindow(tk.Toplevel):
+    """
+    A window listing the merge suggestions of :class:`DuplicateFinder` and merging the chosen ones.
+
+    :param parent: The management app whose records are checked.
+    :type parent: :class:`ManagementApp`
+    """
+
+    HEADERS = ("Score", "Type", "Keep", "Duplicate")
+
+    def __init__(self, parent):
+        """
+        Initializes the window and searches for duplicates.
+
+        :param parent: The management app whose records are checked.
+        :type parent: :class:`ManagementApp`
+        """
+        super().__init__(parent)
+        self.title("Duplicate People")
+        self.geometry("800x450")
+        self.parent = parent
+        self.suggestions = []
+
+        self.suggestion_table = ttk.Treeview(self, columns=self.HEADERS, show='headings', selectmode='extended')
+        for header in self.HEADERS:
+            self.suggestion_table.heading(header, text=header)
+        self.suggestion_table.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
+        buttons = tk.Frame(self)
+        buttons.pack(fill=tk.X, padx=10)
+        tk.Button(buttons, text="Merge Selected", command=self.merge_selected).pack(side=tk.LEFT)
+        tk.Button(buttons, text="Refresh", command=self.refresh).pack(side=tk.LEFT, padx=5)
+        self.status_label = tk.Label(self, anchor=tk.W)
+        self.status_label.pack(fill=tk.X, padx=10, pady=5)
+        self.refresh()
+
+    def refresh(self):
+        """
+        Searches the records for duplicates again and lists them.
+        """
+        started = time.perf_counter()
+        records = list(self.parent.data_records)
+        finder = DuplicateFinder.from_records(records)
+        # Keep the records themselves, since positions change once one is merged away.
+        self.suggestions = [(score, records[keep[0]], records[duplicate[0]])
+                            for score, keep, duplicate in finder.suggestions()]
+        elapsed_ms = (time.perf_counter() - started) * 1000
+
+        def describe(record):
+            return f"{record['name']} ({record['id']}, {record.get('email', '')})"
+
+        self.suggestion_table.delete(*self.suggestion_table.get_children())
+        for index, (score, keep, duplicate) in enumerate(self.suggestions):
+            self.suggestion_table.insert("", tk.END, iid=str(index),
+                                         values=(f"{score:.2f}", keep['type'], describe(keep), describe(duplicate)))
+        self.status_label.config(text=f"{len(self.suggestions)} suggestions among {len(finder.people)} people "
+                                      f"in {elapsed_ms:.0f} ms")
+
+    def merge_selected(self):
+        """
+        Merges the duplicate of each selected suggestion into the record kept, then
+        writes all the merges in one transaction.
+
+        Suggestions involving a record already merged away are skipped.
+        """
+        rows = sorted(int(iid) for iid in self.suggestion_table.selection())
+        if not rows:
+            messagebox.showwarning("Merge", "Select the suggestions to merge.", parent=self)
+            return
+        merged = []
+        for row in rows:
+            _, keep, duplicate = self.suggestions[row]
+            if any(keep is record or duplicate is record for record in merged):
+                continue
+            DuplicateFinder.merge_records(self.parent.store, keep, duplicate)
+            merged.append(duplicate)
+        self.parent.flush_writes()
+        self.refresh()
+        messagebox.showinfo("Merge", f"{len(merged)} duplicates merged.", parent=self)
+
+
+class SnapshotViewer(tk.Toplevel):
+    """
+    A read-only window paging through a :class:`Snapshot`, one page of decoded rows at a time.
+
+    :param parent: The management app opening the snapshot.
+    :type parent: :class:`ManagementApp`
+    :param snapshot: The snapshot to show; the window closes it when closed.
+    :type snapshot: :class:`Snapshot`
+    """
+
+    def __init__(self, parent, snapshot):
+        """
+        Initializes the window and shows the first page.
+
+        :param parent: The management app opening the snapshot.
+        :type parent: :class:`ManagementApp`
+        :param snapshot: The snapshot to show; the window closes it when closed.
+        :type snapshot: :class:`Snapshot`
+        """
+        super().__init__(parent)
+        self.title(f"Snapshot - {os.path.basename(snapshot.path)}")
+        self.geometry("800x450")
+        self.snapshot = snapshot
+        self.page = 0
+
+        controls = tk.Frame(self)
+        controls.pack(fill=tk.X, padx=10, pady=5)
+        self.search_input = tk.Entry(controls)
+        self.search_input.bind("<Return>", lambda event: self.search())
+        self.search_input.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        tk.Button(controls, text="Search Name", command=self.search).pack(side=tk.LEFT, padx=5)
+        tk.Button(controls, text="Previous", command=lambda: self.show_page(self.page - 1)).pack(side=tk.LEFT)
+        tk.Button(controls, text="Next", command=lambda: self.show_page(self.page + 1)).pack(side=tk.LEFT, padx=5)
+
+        self.snapshot_table = ttk.Treeview(self, columns=snapshot.columns, show='headings')
+        for column in snapshot.columns:
+            self.snapshot_table.heading(column, text=column)
+        self.snapshot_table.pack(fill=tk.BOTH, expand=True, padx=10)
+        self.status_label = tk.Label(self, anchor=tk.W)
+        self.status_label.pack(fill=tk.X, padx=10, pady=5)
+        self.protocol("WM_DELETE_WINDOW", self.close)
+        self.show_page(0)
+
+    def show_page(self, page):
+        """
+        Decodes and shows one page of rows.
+
+        :param page: The page number; it is clamped to the existing pages.
+        :type page: int
+        """
+        pages = max((len(self.snapshot) + SNAPSHOT_PAGE_SIZE - 1) // SNAPSHOT_PAGE_SIZE, 1)
+        self.page = min(max(page, 0), pages - 1)
+        start = self.page * SNAPSHOT_PAGE_SIZE
+        self.fill(self.snapshot.rows(start, start + SNAPSHOT_PAGE_SIZE))
+        self.status_label.config(text=f"Page {self.page + 1} of {pages} ({len(self.snapshot)} rows)")
+
+    def search(self):
+        """
+        Shows the rows whose name starts with the search text, or the current page if it is empty.
+        """
+        prefix = self.search_input.get().strip()
+        if not prefix:
+            self.show_page(self.page)
+            return
+        rows = self.snapshot.search(prefix, limit=SNAPSHOT_PAGE_SIZE)
+        self.fill(rows)
+        self.status_label.config(text=f"{len(rows)} rows starting with {prefix!r}")
+
+    def fill(self, rows):
+        """
+        Replaces the table contents with rows.
+
+        :param rows: The rows to show.
+        :type rows: list of list
+        """
+        self.snapshot_table.delete(*self.snapshot_table.get_children())
+        for row in rows:
+            self.snapshot_table.insert("", tk.END, values=row)
+
+    def close(self):
+        """
+        Closes the snapshot and the window.
+        """
+        self.snapshot.close()
+        self.destroy()
+
+
+class CourseRosterWindow(tk.Toplevel):
+    """
+    A course's details, average grade and roster, with the students read from the store a page at a time.
+
+    Only :data:`ROSTER_PAGE_SIZE` students are looked up and shown at first; the next
+    page is added whenever the roster is scrolled to its end. The roster starts over
+    if the records change while the window is open.
+
+    :param parent: The management app.
+    :type parent: :class:`ManagementApp`
+    :param course: The course record.
+    :type course: dict
+    """
+
+    COLUMNS = ("ID", "Name", "Email", "Grade")
+
+    def __init__(self, parent, course):
+        """
+        Initializes the window and shows the first page of the roster.
+
+        :param parent: The management app.
+        :type parent: :class:`ManagementApp`
+        :param course: The course record.
+        :type course: dict
+        """
+        super().__init__(parent)
+        self.title(f"Course - {course['name']}")
+        self.geometry("500x400")
+        self.parent = parent
+        self.course = course
+
+        self.details_label = tk.Label(self, anchor=tk.W, justify=tk.LEFT)
+        self.details_label.pack(fill=tk.X, padx=10, pady=5)
+        table_frame = tk.Frame(self)
+        table_frame.pack(fill=tk.BOTH, expand=True, padx=10)
+        self.roster_table = ttk.Treeview(table_frame, columns=self.COLUMNS, show='headings')
+        for column in self.COLUMNS:
+            self.roster_table.heading(column, text=column)
+        self.scrollbar = tk.Scrollbar(table_frame, command=self.roster_table.yview)
+        self.roster_table.configure(yscrollcommand=self.on_scroll)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.roster_table.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.status_label = tk.Label(self, anchor=tk.W)
+        self.status_label.pack(fill=tk.X, padx=10, pady=5)
+        self.reload()
+
+    def reload(self):
+        """
+        Shows the course details again and the roster from its first page.
+        """
+        self.version = self.parent.store.version
+        self.loaded = 0
+        self.roster_table.delete(*self.roster_table.get_children())
+        average = self.parent.store.gradebook.average(self.course)
+        graded = len(RecordGradebook.grades(self.course))
+        self.details_label.config(text=f"{self.course['id']}  {self.course['name']}\n"
+                                       f"Instructor: {self.course.get('instructor') or 'None'}\n"
+                                       f"Meetings: {self.course.get('meetings') or 'not set'}\n"
+                                       f"Average grade: {f'{average:.2f} over {graded} graded' if graded else 'no grades yet'}")
+        self.load_more()
+
+    def load_more(self):
+        """
+        Looks up and adds the next page of students.
+        """
+        if self.parent.store.version != self.version:
+            self.reload()
+            return
+        students = self.course.get('students', [])
+        grades = self.course.get('grades') or {}
+        for name in students[self.loaded:self.loaded + ROSTER_PAGE_SIZE]:
+            student = self.parent.store.find('Student', name)
+            grade = format_grade(grades.get(name))
+            if student is None:
+                self.roster_table.insert("", tk.END, values=("", name, "(no such student)", grade))
+            else:
+                self.roster_table.insert("", tk.END, values=(student['id'], name, student.get('email', ''), grade))
+        self.loaded = min(len(students), self.loaded + ROSTER_PAGE_SIZE)
+        self.status_label.config(text=f"Showing {self.loaded} of {len(students)} students")
+
+    def on_scroll(self, first, last):
+        """
+        Moves the scrollbar, and loads the next page once the end of the roster is visible.
+        """
+        self.scrollbar.set(first, last)
+        if float(last) >= 1.0 and self.loaded < len(self.course.get('students', [])):
+            self.after_idle(self.load_more)
+
+
+class WriteBehindBackend:
+    """
+    Queues the writes of a :class:`RecordStore` and applies them to a backend later.
+
+    It has the same interface as :class:`SQLiteBackend`, so a store can use it in its
+    place. Writes to the same record are coalesced while they wait: edits of a record
+    that is still queued for insertion are written with the insert, repeated edits
+    become one update, and a record deleted before it was written is never written.
+    :meth:`flush` then applies everything in one transaction.
+
+    :param backend: The backend the writes are applied to.
+    :type backend: :class:`SQLiteBackend`
+    :param on_queued: Called without arguments after each queued write, to schedule a flush.
+    :type on_queued: callable, optional
+    :ivar queued: Number of writes submitted.
+    :vartype queued: int
+    :ivar coalesced: Number of writes merged into or cancelled by others.
+    :vartype coalesced: int
+    """
+
+    def __init__(self, backend, on_queued=None):
+        """
+        Constructor method to initialize an empty queue.
+        """
+        self.backend = backend
+        self.on_queued = on_queued
+        self.queued = 0
+        self.coalesced = 0
+        self._pending = {}
+        self._depth = 0
+        self._held = False
+
+    def __len__(self):
+        return len(self._pending)
+
+    @contextmanager
+    def transaction(self):
+        """
+        Context manager holding back ``on_queued`` until the enclosed writes are all
+        queued, so a batch of changes is not flushed part way; every flush is one
+        transaction.
+        """
+        self._depth += 1
+        try:
+            yield
+        finally:
+            self._depth -= 1
+        if not self._depth and self._held:
+            self._held = False
+            self.on_queued()
+
+    def iter_batches(self, first_size=1000, max_size=50000):
+        """
+        Yields the stored records in batches, see :meth:`SQLiteBackend.iter_batches`.
+        """
+        return self.backend.iter_batches(first_size, max_size)
+
+    def course_roster(self, course):
+        """
+        Reads a course's stored roster, see :meth:`SQLiteBackend.course_roster`; queued
+        writes are not included until they are flushed.
+        """
+        return self.backend.course_roster(course)
+
+    def insert(self, record):
+        """
+        Queues a new record; it is written with its values at flush time.
+
+        :param record: The record to insert.
+        :type record: dict
+        """
+        self._queue(record, 'insert', None)
+
+    def update(self, old, record):
+        """
+        Queues a change to a record.
+
+        :param old: The record's values before the change.
+        :type old: dict
+        :param record: The changed record.
+        :type record: dict
+        """
+        pending = self._pending.get(id(record))
+        if pending is not None and pending[1] in ('insert', 'update'):
+            # The queued write already uses the record's values at flush time.
+            self._count_coalesced()
+        else:
+            self._queue(record, 'update', old)
+
+    def delete(self, record):
+        """
+        Queues the deletion of a record.
+
+        :param record: The record to delete.
+        :type record: dict
+        """
+        pending = self._pending.get(id(record))
+        if pending is None:
+            self._queue(record, 'delete', copy.deepcopy(record))
+        elif pending[1] == 'insert':
+            del self._pending[id(record)]
+            self._count_coalesced()
+        else:
+            # Delete the row the queued update would have changed.
+            self._pending[id(record)] = (record, 'delete', pending[2])
+            self._count_coalesced()
+
+    def replace_all(self, records):
+        """
+        Drops the queued writes and replaces the stored records right away.
+
+        :param records: The records to store.
+        :type records: list of dict
+        """
+        self._pending.clear()
+        self.backend.replace_all(records)
+
+    def flush(self):
+        """
+        Applies the queued writes in one transaction and empties the queue.
+
+        A write the backend rejects does not stop the others.
+
+        :return: A tuple of (action, record, error) per rejected write.
+        :rtype: list of tuple
+        """
+        pending, self._pending = list(self._pending.values()), {}
+        failures = []
+        with self.backend.transaction() as conn:
+            if not conn.in_transaction:
+                # Otherwise releasing the first savepoint would commit it on its own.
+                conn.execute('BEGIN')
+            for record, action, old in pending:
+                conn.execute('SAVEPOINT queued_write')
+                try:
+                    if action == 'insert':
+                        self.backend.insert(record)
+                    elif action == 'update':
+                        self.backend.update(old, record)
+                    else:
+                        self.backend.delete(old)
+                except (sqlite3.Error, ValueError) as error:
+                    conn.execute('ROLLBACK TO queued_write')
+                    failures.append((action, record, error))
+                conn.execute('RELEASE queued_write')
+        return failures
+
+    def _queue(self, record, action, old):
+        self._pending[id(record)] = (record, action, old)
+        self.queued += 1
+        self._queued()
+
+    def _count_coalesced(self):
+        self.queued += 1
+        self.coalesced += 1
+        self._queued()
+
+    def _queued(self):
+        if self.on_queued is None:
+            return
+        if self._depth:
+            self._held = True
+        else:
+            self.on_queued()
+
+
+class TypeAheadCombobox(ttk.Combobox):
+    """
+    A combobox whose drop-down only lists the names matching what has been typed.
+
+    :param parent: The parent widget.
+    :type parent: :class:`tk.Widget`
+    :param store: The record store providing the name index.
+    :type store: :class:`RecordStore`
+    :param record_type: The record type whose names are offered.
+    :type record_type: str
+    :param extra: Fixed choices listed before the matches, such as ``"None"``.
+    :type extra: tuple of str, optional
+    """
+
+    MATCH_LIMIT = 50
+
+    def __init__(self, parent, store, record_type, extra=(), **kwargs):
+        """
+        Constructor method to create the combobox and bind filtering to key presses.
+        """
+        super().__init__(parent, **kwargs)
+        self.store = store
+        self.record_type = record_type
+        self.extra = list(extra)
+        self.filter_values()
+        self.bind('<KeyRelease>', self.filter_values)
+
+    def filter_values(self, event=None):
+        """
+        Updates the drop-down values to the names matching the current text.
+        """
+        matches = self.store.names(self.record_type, self.get().strip(), self.MATCH_LIMIT)
+        self['values'] = self.extra + matches
+
+
+class NamePicker(tk.Frame):
+    """
+    A filter entry above a multi-selection listbox of names.
+
+    Only the names matching the filter prefix are rendered. Selections are kept
+    across filter changes, so names can be picked from several searches.
+
+    :param parent: The parent widget.
+    :type parent: :class:`tk.Widget`
+    :param store: The record store providing the name index.
+    :type store: :class:`RecordStore`
+    :param record_type: The record type whose names are offered.
+    :type record_type: str
+    """
+
+    MATCH_LIMIT = 100
+
+    def __init__(self, parent, store, record_type):
+        """
+        Constructor method to create the filter entry, listbox and selection counter.
+        """
+        super().__init__(parent)
+        self.store = store
+        self.record_type = record_type
+        self.selected = []
+
+        self.filter_input = tk.Entry(self)
+        self.filter_input.pack(fill=tk.X)
+        self.filter_input.bind('<KeyRelease>', self.filter_names)
+
+        self.listbox = tk.Listbox(self, selectmode=tk.MULTIPLE, exportselection=False)
+        self.listbox.pack(fill=tk.BOTH, expand=True)
+        self.listbox.bind('<<ListboxSelect>>', self.sync_selection)
+
+        self.count_label = tk.Label(self, text="0 selected")
+        self.count_label.pack(anchor=tk.W)
+
+        self.filter_names()
+
+    def filter_names(self, event=None):
+        """
+        Re-renders the listbox with the names matching the filter prefix.
+        """
+        self.listbox.delete(0, tk.END)
+        for position, name in enumerate(self.store.names(self.record_type, self.filter_input.get().strip(), self.MATCH_LIMIT)):
+            self.listbox.insert(tk.END, name)
+            if name in self.selected:
+                self.listbox.selection_set(position)
+
+    def sync_selection(self, event=None):
+        """
+        Updates the kept selection from the names currently shown in the listbox.
+        """
+        shown = self.listbox.get(0, tk.END)
+        chosen = {self.listbox.get(i) for i in self.listbox.curselection()}
+        self.selected = [name for name in self.selected if name not in shown or name in chosen]
+        self.selected += [name for name in shown if name in chosen and name not in self.selected]
+        self.count_label.config(text=f"{len(self.selected)} selected")
+
+    def get_selected(self):
+        """
+        Returns the selected names in the order they were picked.
+
+        :return: The selected names.
+        :rtype: list of str
+        """
+        return list(self.selected)
+
+
 class ManagementApp(tk.Tk):
     """
     Represents a school management system application built using Tkinter.
@@ -97,14 +2041,30 @@ class ManagementApp(tk.Tk):
     :vartype course_list: list of :class:`Course`
     :ivar data_records: A list to store student data records.
     :vartype data_records: list
+    :ivar store: The record store holding ``data_records`` and its name indexes.
+    :vartype store: :class:`RecordStore`
+    :ivar backend: The SQLite database the records are persisted in.
+    :vartype backend: :class:`SQLiteBackend`
+    :ivar writes: The queue through which :attr:`store` writes to :attr:`backend`.
+    :vartype writes: :class:`WriteBehindBackend`
+    :ivar archive: The archive of completed courses.
+    :vartype archive: :class:`ColdArchive`
+    :ivar dispatcher: Sends the notification Outbox when :data:`NOTIFY_TRANSPORT` is set.
+    :vartype dispatcher: :class:`NotificationDispatcher` or None
+
+    :param db_path: The path of the SQLite database file.
+    :type db_path: str
     """
-    
-    def __init__(self):
+
+    LOAD_BATCH_SIZE = 1000
+
+    def __init__(self, db_path=DB_PATH):
         """
         Constructor method to initialize the management application.
 
         Initializes the main window with title, size, and background color, and sets up
-        initial courses and student records.
+        initial courses. Stored records are read from the database in batches after the
+        window is shown, so the first rows appear without waiting for the whole table.
         """
         super().__init__()
         self.title("School Management System")
@@ -117,10 +2077,356 @@ class ManagementApp(tk.Tk):
             Course("id3", "Chemistry 301")
         ]
 
-        self.data_records = []
+        self.backend = SQLiteBackend(db_path)
+        self.writes = WriteBehindBackend(self.backend, on_queued=self.schedule_flush)
+        self.archive = ColdArchive(ARCHIVE_DIR)
+        self.audit = AuditLog()
+        self.dispatcher = None
+        if NOTIFY_TRANSPORT:
+            self.dispatcher = NotificationDispatcher(db_path, notification_transport(NOTIFY_TRANSPORT))
+            self.dispatcher.start()
+        self._flush_job = None
+        self.store = RecordStore(backend=self.writes)
+        self._batches = self.backend.iter_batches(self.LOAD_BATCH_SIZE)
+        self.search_query = ''
+        self.sort_column = None
+        self.sort_descending = False
+        self.page_size = DEFAULT_PAGE_SIZE
+        self.page_number = 1
+        self._filtered = None
+        self.memory_profiler = None
+        if MEMORY_DIAGNOSTICS:
+            # Before the UI is built, so buttons are given the tracked methods.
+            self.memory_profiler = MemoryProfiler()
+            self.memory_profiler.instrument(self, {
+                'refresh_data_table': 'refresh', 'search_records': 'search',
+                'load_records': 'load', 'export_csv': 'export', 'save_records': 'export',
+                'show_student_form': 'form open', 'show_instructor_form': 'form open',
+                'show_course_form': 'form open', 'show_reports': 'window open',
+                'show_duplicates': 'window open',
+            })
 
         self.setupUI()
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.after(0, self.load_next_batch)
+
+    def on_close(self):
+        """
+        Flushes the queued writes, then closes the database and the window.
+
+        In memory diagnostics mode the memory report is logged first.
+        """
+        if self.memory_profiler is not None:
+            import logging
+            logging.getLogger(__name__).info("Memory report:\n%s", self.memory_profiler.report())
+        self.flush_writes()
+        if self.dispatcher is not None:
+            self.dispatcher.stop()
+        self.backend.close()
+        self.destroy()
+
+    def schedule_flush(self):
+        """
+        Schedules :meth:`flush_writes` after queued writes, or runs it straight away
+        once ``WRITE_BEHIND_MAX_OPS`` writes are waiting.
+        """
+        if len(self.writes) >= WRITE_BEHIND_MAX_OPS:
+            self.flush_writes()
+        elif self._flush_job is None:
+            self._flush_job = self.after(WRITE_BEHIND_DELAY_MS, self.flush_writes)
+
+    def flush_writes(self):
+        """
+        Writes the queued changes to the database in one transaction and refreshes the table once.
+
+        If the database rejects some of the changes, they are reported and the records are
+        read back from the database, so the table shows what was actually saved. The audit
+        log gets a new checkpoint once enough changes have been logged.
+
+        :return: The rejected writes, see :meth:`WriteBehindBackend.flush`.
+        :rtype: list of tuple
+        """
+        if self._flush_job is not None:
+            self.after_cancel(self._flush_job)
+            self._flush_job = None
+        if not len(self.writes):
+            return []
+        failures = self.writes.flush()
+        try:
+            with self.backend.transaction() as conn:
+                self.audit.maybe_checkpoint(conn)
+        except sqlite3.Error:
+            pass  # The next flush tries again.
+        if failures:
+            messagebox.showerror("Error", "Some changes could not be saved:\n" + "\n".join(
+                f"{action} {record['type']} {record['name']}: {error}" for action, record, error in failures))
+            self.reload_records()
+            return failures
+        self.refresh_data_table()
+        return failures
+
+    def reconcile_courses(self, courses):
+        """
+        Reads back the registrations and waitlists of courses whose changes were flushed,
+        so the table shows who the database seated, and refreshes the table if that differs.
+
+        :param courses: The course records.
+        :type courses: list of dict
+        :return: The names of the waitlisted students per course name, in promotion order.
+        :rtype: dict
+        """
+        version = self.store.version
+        waitlists = {course['name']: self.store.reconcile(course) for course in courses}
+        if self.store.version != version:
+            self.refresh_data_table()
+        return waitlists
+
+    def reload_records(self):
+        """
+        Empties the store and reads the records back from the database in batches.
+        """
+        self.store.load([])
+        self._batches = self.backend.iter_batches(self.LOAD_BATCH_SIZE)
+        self.load_next_batch()
+
+    def archive_courses(self):
+        """
+        Moves completed courses, their registrations and the people only they involve
+        into the archive.
+
+        The course IDs are asked for, separated by commas. Queued writes are flushed first
+        and the records are read back from the database afterwards.
+
+        :raises messagebox.showerror: If the courses could not be archived.
+        """
+        text = simpledialog.askstring("Archive Courses", "IDs of the completed courses (comma-separated):")
+        course_ids = [course_id.strip() for course_id in (text or '').split(',') if course_id.strip()]
+        if not course_ids:
+            return
+        self.flush_writes()
+        try:
+            name = self.archive.archive_courses(self.backend, course_ids)
+        except (sqlite3.Error, OSError) as error:
+            messagebox.showerror("Error", f"Error archiving courses: {error}")
+            return
+        if name is None:
+            messagebox.showwarning("Archive", "None of these courses exist.")
+            return
+        self.reload_records()
+        messagebox.showinfo("Success", f"Courses archived to {name}.")
+
+    def restore_archive(self):
+        """
+        Restores a whole archive batch, chosen in a file dialog.
+
+        :raises messagebox.showerror: If the batch could not be restored.
+        """
+        file_path = filedialog.askopenfilename(initialdir=ARCHIVE_DIR, filetypes=[("Archive Batches", "*.json.gz")])
+        if not file_path:
+            return
+        self.flush_writes()
+        try:
+            restored = self.archive.restore(self.backend, os.path.basename(file_path)[:-len('.json.gz')])
+        except (sqlite3.Error, OSError, ValueError) as error:
+            messagebox.showerror("Error", f"Error restoring archive: {error}")
+            return
+        self.reload_records()
+        messagebox.showinfo("Success", f"{restored} archived records restored.")
+
+    def show_reports(self):
+        """
+        Opens a Reports window over the current records.
+        """
+        ReportsWindow(self)
+
+    def show_duplicates(self):
+        """
+        Opens a window of likely duplicate students and instructors.
+        """
+        DuplicatesWindow(self)
+
+    def show_notifications(self):
+        """
+        Shows how many notifications are waiting, sent and failed, and the throughput
+        and retries of this instance's :class:`NotificationDispatcher`.
+        """
+        self.flush_writes()
+        counts = Outbox.counts(self.backend.conn)
+        lines = [f"{counts['pending']} waiting, {counts['sent']} sent, {counts['failed']} failed.", ""]
+        if self.dispatcher is None:
+            lines.append("This instance does not send notifications; set SMS_NOTIFY_TRANSPORT to "
+                         "smtp://host:port or spool:directory, or run --dispatch-notifications.")
+        else:
+            lines.append(self.dispatcher.report())
+        messagebox.showinfo("Notifications", "\n".join(lines))
+
+    def show_memory_report(self):
+        """
+        Shows the memory growth per action tracked so far by :attr:`memory_profiler`.
+        """
+        messagebox.showinfo("Memory Report", self.memory_profiler.report())
+
+    def show_history(self):
+        """
+        Shows a record as it was at a point in time, and for a course, its roster then.
+
+        The record type, ID and time are asked for in dialogs; the state is rebuilt by
+        :class:`AuditLog` from the nearest checkpoint before that time.
+        """
+        record_type = simpledialog.askstring("Record History", "Enter the type (Student, Instructor, Course):")
+        if not record_type or record_type.strip().title() not in RecordStore.RECORD_TYPES:
+            return
+        record_type = record_type.strip().title()
+        record_id = simpledialog.askstring("Record History", f"Enter {record_type} ID:")
+        text = simpledialog.askstring("Record History", "As of (YYYY-MM-DD or YYYY-MM-DD HH:MM):")
+        if not record_id or not text:
+            return
+        self.flush_writes()
+        try:
+            when = parse_when(text)
+            record = self.audit.record_at(self.backend.conn, record_type, record_id, when)
+            roster = self.audit.roster_at(self.backend.conn, record_id, when) if record_type == 'Course' else None
+        except (ValueError, sqlite3.Error) as error:
+            messagebox.showwarning("Record History", str(error))
+            return
+        if record is None:
+            messagebox.showinfo("Record History", f"{record_type} {record_id} did not exist on {text.strip()}.")
+            return
+        lines = [f"{column}: {value}" for column, value in record.items()]
+        if roster is not None:
+            lines.append(f"Enrolled: {len(roster)}")
+            lines += [f"  {name} ({student_id})" for student_id, name in roster[:50]]
+            if len(roster) > 50:
+                lines.append(f"  ... and {len(roster) - 50} more")
+        messagebox.showinfo(f"{record_type} {record_id} on {text.strip()}", "\n".join(lines))
+
+    def open_course_roster(self, event=None):
+        """
+        Opens the roster of a course in the records table.
+
+        The course is the double-clicked row, or the selected row without an event.
+        """
+        item = self.data_table.identify_row(event.y) if event is not None else self.data_table.focus()
+        values = self.data_table.item(item, 'values') if item else ()
+        course = self.store.find('Course', values[1]) if values and values[2] == 'Course' else None
+        if course is None:
+            if event is None:
+                messagebox.showwarning("Course Roster", "Select a course in the table first.")
+            return
+        CourseRosterWindow(self, course)
+
+    def check_integrity(self):
+        """
+        Lists every broken name link between the records, and offers to repair them all.
+
+        Broken links are tracked as records change, so only the records changed since
+        the last check, and the loaded records not checked yet, are checked.
+        """
+        self.store.integrity.check(full=True)
+        broken = self.store.integrity.broken_links()
+        if not broken:
+            messagebox.showinfo("Check Integrity", "All links between records are intact.")
+            return
+        self.offer_repair("Check Integrity", broken)
+
+    def check_links(self):
+        """
+        Re-checks the links touched by the last change, and warns about the ones it broke.
+        """
+        broken = self.store.integrity.check()
+        if broken:
+            self.offer_repair("Broken Links", broken)
+
+    def offer_repair(self, title, broken):
+        """
+        Lists broken links and repairs all known ones if the user agrees.
 
+        :param title: The dialog title.
+        :type title: str
+        :param broken: ``(type, name, linked type, linked name, problem)`` per broken link.
+        :type broken: list of tuple
+        """
+        lines = [f"{record_type} {name} links to {linked_type} {linked_name}, which "
+                 + ("does not exist" if problem == 'missing' else "does not link back")
+                 for record_type, name, linked_type, linked_name, problem in broken[:50]]
+        if len(broken) > 50:
+            lines.append(f"... and {len(broken) - 50} more")
+        if not messagebox.askyesno(title, "\n".join(lines) + "\n\nRepair all broken links?"):
+            return
+        try:
+            repaired = self.store.integrity.repair(self.store)
+        except Exception as error:
+            messagebox.showerror("Error", f"Error repairing links: {error}")
+            return
+        self.store.integrity.check()
+        self.schedule_flush()
+        self.refresh_data_table()
+        messagebox.showinfo("Success", f"{repaired} links repaired.")
+
+    def show_schedule_conflicts(self):
+        """
+        Lists the students and instructors with overlapping courses.
+
+        Registrations and assignments are checked as they are made, but edited meeting
+        times and records loaded from a file are not, so this report finds the rest.
+        """
+        conflicts = find_schedule_conflicts(self.store)
+        if not conflicts:
+            messagebox.showinfo("Schedule Conflicts", "No schedule conflicts found.")
+            return
+        lines = [f"{record_type} {name} ({person_id}): {first} and {second} overlap on {overlap}"
+                 for record_type, person_id, name, first, second, overlap in conflicts[:50]]
+        if len(conflicts) > 50:
+            lines.append(f"... and {len(conflicts) - 50} more")
+        messagebox.showinfo("Schedule Conflicts", "\n".join(lines))
+
+    def schedule_conflict(self, person, course):
+        """
+        Returns the course a student's registration or an instructor's assignment would clash with.
+
+        The person's other courses are loaded into a :class:`Schedule`, which answers in
+        O(log n) per meeting of the new course. Other courses that already clash with
+        each other still count.
+
+        :param person: The student or instructor record.
+        :type person: dict
+        :param course: The course record.
+        :type course: dict
+        :return: The name of the first clashing course, or None.
+        :rtype: str or None
+        """
+        meetings = parse_meetings(course.get('meetings'))
+        if not meetings:
+            return None
+        others = (self.store.find('Course', course_name) for course_name in person.get('courses', []))
+        schedule = Schedule()
+        schedule.load((other['name'], parse_meetings(other.get('meetings')))
+                      for other in others if other is not None and other is not course)
+        return schedule.conflict(meetings)
+
+    def load_next_batch(self):
+        """
+        Adds the next batch of stored records to the table and schedules the one after it.
+        """
+        batch = next(self._batches, None)
+        if batch is None:
+            return
+        self.store.extend(batch)
+        self.refresh_data_table()
+        self.after(1, self.load_next_batch)
+
+    @property
+    def data_records(self):
+        """
+        The list of records held by :attr:`store`.
+
+        Assigning a new list reloads the store and rebuilds its indexes.
+        """
+        return self.store.records
+
+    @data_records.setter
+    def data_records(self, records):
+        self.store.load(records)
 
     def setupUI(self):
         """
@@ -153,19 +2459,43 @@ class ManagementApp(tk.Tk):
         tree_frame.pack(fill=tk.BOTH, expand=True)
 
         # Define columns for the table
-        columns = ("ID", "Name", "Type", "Email", "Age", "Courses/Instructor/Students")
+        columns = TABLE_COLUMNS
         self.data_table = ttk.Treeview(tree_frame, columns=columns, show='headings')
         
-        # Set up headings and column widths
-        for col in columns:
-            self.data_table.heading(col, text=col)
+        # Set up headings (click to sort) and column widths
+        for index, col in enumerate(columns):
+            self.data_table.heading(col, text=col, command=lambda column=index: self.sort_by(column))
             self.data_table.column(col, width=120)
+        self.data_table.bind("<Double-1>", self.open_course_roster)
         self.data_table.pack(fill=tk.BOTH, expand=True)
 
         # Style the table
         style = ttk.Style()
         style.configure("Treeview", borderwidth=0, relief='flat', background="white", foreground="black", fieldbackground="white")
 
+        # Create a frame for the page controls
+        page_frame = tk.Frame(self, bg=bg_color)
+        page_frame.pack(pady=5, fill=tk.X)
+
+        tk.Label(page_frame, text="Rows per page", bg=bg_color).pack(side=tk.LEFT, padx=5)
+        self.page_size_combobox = ttk.Combobox(page_frame, values=["All"] + [str(size) for size in PAGE_SIZES], width=6, state="readonly")
+        self.page_size_combobox.set(str(self.page_size) if self.page_size else "All")
+        self.page_size_combobox.bind("<<ComboboxSelected>>", self.change_page_size)
+        self.page_size_combobox.pack(side=tk.LEFT, padx=5)
+
+        tk.Button(page_frame, text="<< First", command=lambda: self.go_to_page(1)).pack(side=tk.LEFT, padx=2)
+        tk.Button(page_frame, text="< Prev", command=lambda: self.go_to_page(self.page_number - 1)).pack(side=tk.LEFT, padx=2)
+        tk.Button(page_frame, text="Next >", command=lambda: self.go_to_page(self.page_number + 1)).pack(side=tk.LEFT, padx=2)
+        tk.Button(page_frame, text="Last >>", command=lambda: self.go_to_page(self.page_count())).pack(side=tk.LEFT, padx=2)
+
+        self.page_label = tk.Label(page_frame, bg=bg_color)
+        self.page_label.pack(side=tk.LEFT, padx=5)
+
+        self.jump_field = tk.Entry(page_frame, width=6)
+        self.jump_field.pack(side=tk.LEFT, padx=2)
+        self.jump_field.bind("<Return>", self.jump_to_page)
+        tk.Button(page_frame, text="Go", command=self.jump_to_page).pack(side=tk.LEFT, padx=2)
+
         # Create a search frame
         search_frame = tk.Frame(self, bg=bg_color)
         search_frame.pack(pady=10, fill=tk.X)
@@ -218,6 +2548,48 @@ class ManagementApp(tk.Tk):
         delete_btn = tk.Button(button_frame, text="Delete Data", command=self.delete, width=button_width)
         delete_btn.grid(row=4, column=1, padx=5, pady=5, sticky='nsew')
 
+        archive_btn = tk.Button(button_frame, text="Archive Courses", command=self.archive_courses, width=button_width)
+        archive_btn.grid(row=5, column=0, padx=5, pady=5, sticky='nsew')
+
+        restore_btn = tk.Button(button_frame, text="Restore Archive", command=self.restore_archive, width=button_width)
+        restore_btn.grid(row=5, column=1, padx=5, pady=5, sticky='nsew')
+
+        reports_btn = tk.Button(button_frame, text="Reports", command=self.show_reports, width=button_width)
+        reports_btn.grid(row=6, column=0, padx=5, pady=5, sticky='nsew')
+
+        duplicates_btn = tk.Button(button_frame, text="Find Duplicates", command=self.show_duplicates, width=button_width)
+        duplicates_btn.grid(row=6, column=1, padx=5, pady=5, sticky='nsew')
+
+        conflicts_btn = tk.Button(button_frame, text="Schedule Conflicts", command=self.show_schedule_conflicts, width=button_width)
+        conflicts_btn.grid(row=7, column=0, padx=5, pady=5, sticky='nsew')
+
+        history_btn = tk.Button(button_frame, text="Record History", command=self.show_history, width=button_width)
+        history_btn.grid(row=7, column=1, padx=5, pady=5, sticky='nsew')
+
+        roster_btn = tk.Button(button_frame, text="Course Roster", command=self.open_course_roster, width=button_width)
+        roster_btn.grid(row=8, column=0, padx=5, pady=5, sticky='nsew')
+
+        integrity_btn = tk.Button(button_frame, text="Check Integrity", command=self.check_integrity, width=button_width)
+        integrity_btn.grid(row=8, column=1, padx=5, pady=5, sticky='nsew')
+
+        grade_btn = tk.Button(button_frame, text="Set Grade", command=self.set_grade, width=button_width)
+        grade_btn.grid(row=9, column=0, padx=5, pady=5, sticky='nsew')
+
+        grades_btn = tk.Button(button_frame, text="Show Grades", command=self.show_grades, width=button_width)
+        grades_btn.grid(row=9, column=1, padx=5, pady=5, sticky='nsew')
+
+        bulk_edit_btn = tk.Button(button_frame, text="Bulk Edit Selected", command=self.bulk_edit_records,
+                                  width=button_width)
+        bulk_edit_btn.grid(row=10, column=0, padx=5, pady=5, sticky='nsew')
+
+        notifications_btn = tk.Button(button_frame, text="Notifications", command=self.show_notifications,
+                                      width=button_width)
+        notifications_btn.grid(row=10, column=1, padx=5, pady=5, sticky='nsew')
+
+        if self.memory_profiler is not None:
+            memory_btn = tk.Button(button_frame, text="Memory Report", command=self.show_memory_report, width=button_width)
+            memory_btn.grid(row=11, column=0, columnspan=2, padx=5, pady=5, sticky='nsew')
+
         # Configure column weights to make the columns equal in width
         button_frame.columnconfigure(0, weight=1)
         button_frame.columnconfigure(1, weight=1)
@@ -230,8 +2602,10 @@ class ManagementApp(tk.Tk):
         information from `self.data_records`. The records may be of different types (e.g., Course or other types), 
         and the method formats the data accordingly before inserting it into the table.
 
-        For courses, it combines the instructor and students information. For other types, 
-        it lists the associated courses.
+        For courses, it shows the instructor and the number of students. For other types,
+        it shows the number of associated courses. Double-clicking a course opens its roster.
+
+        Only records matching the active search query are shown, in the active sort order.
 
         :ivar data_table: The table widget displaying the records.
         :vartype data_table: :class:`ttk.Treeview`
@@ -239,24 +2613,129 @@ class ManagementApp(tk.Tk):
         :vartype data_records: list of dict
         """
         # Clear existing data
-        for item in self.data_table.get_children():
-            self.data_table.delete(item)
+        self.data_table.delete(*self.data_table.get_children())
 
         # Insert new data
-        for record in self.data_records:
-            if record['type'] == 'Course':
-                combined_info = f"Instructor: {record.get('instructor', '')}; Students: {', '.join(record.get('students', []))}"
-            else:
-                combined_info = ', '.join(record.get('courses', []))
-            values = (
-                record['id'],
-                record['name'],
-                record['type'],
-                record.get('email', ''),
-                str(record.get('age', '')),
-                combined_info
-            )
-            self.data_table.insert('', 'end', values=values)
+        for record in self.current_page():
+            self.data_table.insert('', 'end', values=table_values(record))
+        self.page_label.config(text=f"Page {self.page_number} of {self.page_count()} ({self.visible_count()} records)")
+
+    def visible_records(self):
+        """
+        Returns the records to show, filtered by the search query and in the chosen sort order.
+
+        The sort order is read from the store's maintained sort indexes, so no sorting happens here.
+
+        :return: The records to display.
+        :rtype: iterable of dict
+        """
+        if self.sort_column is None:
+            records = self.data_records
+        else:
+            records = self.store.ordered(self.sort_column, self.sort_descending)
+        if self.search_query:
+            records = (record for record in records if record_matches(record, self.search_query))
+        return records
+
+    def filtered_records(self):
+        """
+        Returns the records matching the active search query, in the chosen sort order.
+
+        The result is cached until the records, query or sort order change, so turning
+        pages of a search result does not filter again.
+
+        :return: The matching records.
+        :rtype: list of dict
+        """
+        cache_key = (self.store.version, self.search_query, self.sort_column, self.sort_descending)
+        if self._filtered is None or self._filtered[0] != cache_key:
+            self._filtered = (cache_key, list(self.visible_records()))
+        return self._filtered[1]
+
+    def visible_count(self):
+        """
+        Returns the number of records matching the active search query.
+
+        :rtype: int
+        """
+        return len(self.filtered_records()) if self.search_query else len(self.store)
+
+    def page_count(self):
+        """
+        Returns the number of pages at the current page size (1 when every record is shown).
+
+        :rtype: int
+        """
+        if not self.page_size:
+            return 1
+        return max(1, -(-self.visible_count() // self.page_size))
+
+    def current_page(self):
+        """
+        Returns the records on the current page.
+
+        Without a search query the page is sliced straight out of the store's sort index,
+        so it costs the same on any page.
+
+        :return: The records to display.
+        :rtype: list of dict
+        """
+        self.page_number = max(1, min(self.page_number, self.page_count()))
+        if not self.page_size:
+            return list(self.visible_records())
+        start = (self.page_number - 1) * self.page_size
+        stop = start + self.page_size
+        if self.search_query:
+            return self.filtered_records()[start:stop]
+        return self.store.slice(self.sort_column, self.sort_descending, start, stop)
+
+    def go_to_page(self, page_number):
+        """
+        Shows a page of the table; out-of-range numbers are clamped to the first or last page.
+
+        :param page_number: The 1-based number of the page to show.
+        :type page_number: int
+        """
+        self.page_number = page_number
+        self.refresh_data_table()
+
+    def jump_to_page(self, event=None):
+        """
+        Shows the page typed into the jump field.
+        """
+        text = self.jump_field.get().strip()
+        if text.isdigit():
+            self.jump_field.delete(0, tk.END)
+            self.go_to_page(int(text))
+
+    def change_page_size(self, event=None):
+        """
+        Applies the page size chosen in the page size selector and returns to the first page.
+        """
+        selected = self.page_size_combobox.get()
+        self.page_size = 0 if selected == "All" else int(selected)
+        self.go_to_page(1)
+
+    def sort_by(self, column):
+        """
+        Sorts the table by a column; sorting by the same column again reverses the order.
+
+        :param column: The index of the column in :data:`TABLE_COLUMNS`.
+        :type column: int
+        """
+        if column == self.sort_column:
+            self.sort_descending = not self.sort_descending
+        else:
+            self.sort_column = column
+            self.sort_descending = False
+        self.page_number = 1
+
+        for index, col in enumerate(TABLE_COLUMNS):
+            arrow = ''
+            if index == column:
+                arrow = ' \u25bc' if self.sort_descending else ' \u25b2'
+            self.data_table.heading(col, text=col + arrow)
+        self.refresh_data_table()
 
     def show_student_form(self):
         """
@@ -297,7 +2776,8 @@ class ManagementApp(tk.Tk):
         - Whether the search query is found in the record's name or ID.
         - Whether the search query matches any of the courses the student or instructor is associated with.
 
-        After filtering, the table is refreshed to only show the matching records.
+        After filtering, the table is refreshed to only show the matching records. The query stays
+        active, in the current sort order, until a new search is made.
 
         :ivar search_field: The entry widget where the user inputs their search query.
         :vartype search_field: :class:`tk.Entry`
@@ -306,33 +2786,9 @@ class ManagementApp(tk.Tk):
         :ivar data_table: The table widget displaying the filtered records.
         :vartype data_table: :class:`ttk.Treeview`
         """
-        search_query = self.search_field.get().lower()
-        filtered_data = [
-            record for record in self.data_records if
-            search_query in record['name'].lower() or
-            search_query in record['id'].lower() or
-            any(search_query in course.lower() for course in record.get('courses', []))
-        ]
-
-        # Update table with filtered data
-        for item in self.data_table.get_children():
-            self.data_table.delete(item)
-
-        for record in filtered_data:
-            if record['type'] == 'Course':
-                combined_info = f"Instructor: {record.get('instructor', '')}; Students: {', '.join(record.get('students', []))}"
-            else:
-                combined_info = ', '.join(record.get('courses', []))
-            
-            values = (
-                record['id'],
-                record['name'],
-                record['type'],
-                record.get('email', ''),
-                str(record.get('age', '')),
-                combined_info
-            )
-            self.data_table.insert('', 'end', values=values)
+        self.search_query = self.search_field.get().lower()
+        self.page_number = 1
+        self.refresh_data_table()
 
     def edit_records(self):
         """
@@ -358,6 +2814,159 @@ class ManagementApp(tk.Tk):
                 else:
                     messagebox.showwarning("Error", f"{record_type} not found.")
 
+    def bulk_edit_records(self):
+        """
+        Applies one change to every record selected in the records table.
+
+        Ctrl-click and Shift-click select several rows. The change is one of
+        :data:`BULK_EDIT_ACTIONS`; selected records it does not apply to are skipped.
+        The change is written in one transaction and the table is refreshed once.
+
+        :raises messagebox.showwarning: If nothing is selected or the change has an invalid value.
+        """
+        selected = {(values[2], values[0]) for values in
+                    (self.data_table.item(item, 'values') for item in self.data_table.selection())}
+        if not selected:
+            messagebox.showwarning("Bulk Edit", "Select the records to edit in the table first.")
+            return
+        action = simpledialog.askstring("Bulk Edit", f"Change for the {len(selected)} selected records "
+                                        f"({', '.join(BULK_EDIT_ACTIONS)}):")
+        if action is None:
+            return
+        action = next((name for name in BULK_EDIT_ACTIONS if name.lower() == action.strip().lower()), None)
+        if action is None:
+            messagebox.showwarning("Bulk Edit", f"Choose one of: {', '.join(BULK_EDIT_ACTIONS)}.")
+            return
+        records = [record for record in self.data_records
+                   if record['type'] in BULK_EDIT_ACTIONS[action] and (record['type'], record['id']) in selected]
+        if not records:
+            messagebox.showwarning("Bulk Edit", f"{action} does not apply to any of the selected records.")
+            return
+
+        if action == 'Set age':
+            value = simpledialog.askinteger("Bulk Edit", "Enter Age:", minvalue=5, maxvalue=120)
+        elif action == 'Change email domain':
+            value = simpledialog.askstring("Bulk Edit", "Enter the new email domain:")
+            if value is not None:
+                value = value.strip().lstrip('@')
+                if not value or '@' in value or ' ' in value:
+                    messagebox.showwarning("Bulk Edit", f"Invalid email domain: {value!r}")
+                    return
+        elif action == 'Move students to course':
+            source = simpledialog.askstring("Bulk Edit", "Enter the Course Name to move from (empty to only register):")
+            target = simpledialog.askstring("Bulk Edit", "Enter the Course Name to move to:") if source is not None else None
+            value = None
+            if target is not None:
+                value = (self.store.find('Course', source.strip()) if source.strip() else None,
+                         self.store.find('Course', target.strip()))
+                if value[1] is None or (source.strip() and value[0] is None):
+                    messagebox.showwarning("Bulk Edit", "Course Name is incorrect.")
+                    return
+        else:
+            value = simpledialog.askstring("Bulk Edit", "Enter Instructor Name:")
+            if value is not None:
+                value = self.store.find('Instructor', value.strip())
+                if value is None:
+                    messagebox.showwarning("Bulk Edit", "Instructor not found.")
+                    return
+        if value is None:
+            return
+
+        try:
+            changed, skipped = self.apply_bulk_edit(action, records, value)
+        except Exception as error:
+            messagebox.showerror("Error", f"Error updating records: {error}")
+            return
+        failures = self.flush_writes()
+        message = f"{action}: {changed} of {len(selected)} selected records changed."
+        if skipped:
+            message += "\n\nSkipped because of schedule conflicts:\n" + "\n".join(skipped)
+        if action == 'Move students to course' and not failures:
+            source, target = value
+            waitlists = self.reconcile_courses([target] if source is None or source is target else [source, target])
+            waitlisted = [record['name'] for record in records if record['name'] in waitlists[target['name']]]
+            if waitlisted:
+                message += f"\n\nWaitlisted because {target['name']} is full:\n" + "\n".join(waitlisted)
+        messagebox.showinfo("Bulk Edit", message)
+        self.check_links()
+
+    def apply_bulk_edit(self, action, records, value):
+        """
+        Applies a bulk edit to the records in memory and queues it for the database.
+
+        All touched records, including the courses and instructors on the other side of
+        a move or assignment, are changed inside one :meth:`RecordStore.editing_many`,
+        so the indexes are rebuilt once and the writes share one transaction.
+
+        :param action: One of :data:`BULK_EDIT_ACTIONS`.
+        :type action: str
+        :param records: The records the action applies to.
+        :type records: list of dict
+        :param value: The age for ``Set age``, the domain for ``Change email domain``, a
+            tuple of the course records to move from (or None) and to for ``Move students
+            to course``, and the instructor record for ``Assign instructor``.
+        :return: The number of selected records changed, and the names of the students
+            whose move was skipped because the course clashes with their other courses.
+        :rtype: tuple
+        """
+        if action == 'Set age':
+            changed = [record for record in records if record.get('age') != str(value)]
+            with self.store.editing_many(changed):
+                for record in changed:
+                    record['age'] = str(value)
+            return len(changed), []
+        if action == 'Change email domain':
+            changed = [record for record in records
+                       if record.get('email', '').partition('@')[2] != value]
+            with self.store.editing_many(changed):
+                for record in changed:
+                    record['email'] = f"{record.get('email', '').partition('@')[0]}@{value}"
+            return len(changed), []
+        if action == 'Move students to course':
+            source, target = value
+            moved, skipped = [], []
+            for student in records:
+                remaining = {'courses': [name for name in student.get('courses', [])
+                                         if source is None or name != source['name']]}
+                if target['name'] in student.get('courses', []) and (source is None or source is target):
+                    continue
+                if self.schedule_conflict(remaining, target) is not None:
+                    skipped.append(student['name'])
+                else:
+                    moved.append(student)
+            courses = [target] if source is None or source is target else [source, target]
+            with self.store.editing_many(moved + courses):
+                names = {student['name'] for student in moved}
+                if source is not None and source is not target:
+                    source['students'] = [name for name in source.get('students', []) if name not in names]
+                    if source.get('grades'):
+                        # Grades of students taken off the course go with them, as in EditRecordForm.
+                        source['grades'] = {name: grade for name, grade in source['grades'].items()
+                                            if name not in names}
+                enrolled = set(target.setdefault('students', []))
+                target['students'].extend(student['name'] for student in moved if student['name'] not in enrolled)
+                for student in moved:
+                    courses_of = [name for name in student.get('courses', [])
+                                  if source is None or name != source['name']]
+                    if target['name'] not in courses_of:
+                        courses_of.append(target['name'])
+                    student['courses'] = courses_of
+            return len(moved), skipped
+        changed = [course for course in records if course.get('instructor') != value['name']]
+        previous = {course.get('instructor') for course in changed} - {value['name'], '', None}
+        instructors = [self.store.find('Instructor', name) for name in previous]
+        instructors = [instructor for instructor in instructors if instructor is not None]
+        with self.store.editing_many(changed + instructors + [value]):
+            names = [course['name'] for course in changed]
+            changed_names = set(names)
+            for course in changed:
+                course['instructor'] = value['name']
+            for instructor in instructors:
+                instructor['courses'] = [name for name in instructor.get('courses', []) if name not in changed_names]
+            assigned = set(value.setdefault('courses', []))
+            value['courses'].extend(name for name in names if name not in assigned)
+        return len(changed), []
+
     def register_course(self):
         """
         Registers a student to a course.
@@ -366,8 +2975,11 @@ class ManagementApp(tk.Tk):
         It then checks if both the student and the course exist in `data_records`. 
         If found, the student is added to the course's student list, and the course is added to the student's list of courses.
         
-        After registration, the data table is refreshed, and a success message is shown.
-        If the student ID or course name is incorrect, a warning message is displayed.
+        The registration is written straight away, so the success message is only shown
+        once it is saved, and the course is read back afterwards: if it was full, the
+        student joined its waitlist instead, and is told their place in it. If the student
+        ID or course name is incorrect, or the course clashes with the student's other
+        courses, a warning message is displayed.
 
         :ivar data_records: A list of dictionaries containing student, instructor, or course records.
         :vartype data_records: list of dict
@@ -378,24 +2990,109 @@ class ManagementApp(tk.Tk):
         course_name = simpledialog.askstring("Register Course", "Enter Course Name:")
         if student_id and course_name:
             student_record = next((r for r in self.data_records if r['id'] == student_id and r['type'] == 'Student'), None)
-            course_record = next((c for c in self.data_records if c['name'] == course_name and c['type'] == 'Course'), None)
-            if student_record and course_record:
-                if student_record['name'] not in course_record['students']:
-                    course_record['students'].append(student_record['name'])
-                if course_name not in student_record['courses']:
-                    student_record['courses'].append(course_name)
-                self.refresh_data_table()
-                messagebox.showinfo("Success", f"Student {student_record['name']} registered to {course_name}.")
+            course_record = self.store.find('Course', course_name)
+            clash = self.schedule_conflict(student_record, course_record) if student_record and course_record else None
+            if clash is not None:
+                messagebox.showwarning("Error", f"{course_name} clashes with {clash} for {student_record['name']}.")
+            elif student_record and course_record:
+                with self.store.batch():
+                    if student_record['name'] not in course_record['students']:
+                        with self.store.editing(course_record):
+                            course_record['students'].append(student_record['name'])
+                    if course_name not in student_record['courses']:
+                        with self.store.editing(student_record):
+                            student_record['courses'].append(course_name)
+                if not self.flush_writes():
+                    waitlist = self.reconcile_courses([course_record])[course_name]
+                    if student_record['name'] in waitlist:
+                        messagebox.showinfo("Waitlisted", f"{course_name} is full; student {student_record['name']} "
+                                            f"is number {waitlist.index(student_record['name']) + 1} on its waitlist.")
+                    else:
+                        messagebox.showinfo("Success", f"Student {student_record['name']} registered to {course_name}.")
             else:
                 messagebox.showwarning("Error", "Student ID or Course Name is incorrect.")
 
+    def set_grade(self):
+        """
+        Sets or clears a student's grade for one of the courses they are registered for.
+
+        The grade is kept in the course's ``grades``; the student's GPA and the course
+        average follow as :class:`~school.grades.RecordGradebook` sees the course change.
+
+        :raises messagebox.showwarning: If the student or course is not found, the student
+            is not registered for the course, or the grade is invalid.
+        """
+        student_id = simpledialog.askstring("Set Grade", "Enter Student ID:")
+        course_name = simpledialog.askstring("Set Grade", "Enter Course Name:")
+        if not (student_id and course_name):
+            return
+        student_record = next((r for r in self.data_records if r['id'] == student_id and r['type'] == 'Student'), None)
+        course_record = self.store.find('Course', course_name)
+        if student_record is None or course_record is None:
+            messagebox.showwarning("Error", "Student ID or Course Name is incorrect.")
+            return
+        name = student_record['name']
+        if name not in course_record.get('students', []):
+            messagebox.showwarning("Error", f"{name} is not registered for {course_name}.")
+            return
+        grade = simpledialog.askstring("Set Grade", "Enter Grade (A to F or points from 0 to 4, empty to clear):")
+        if grade is None:
+            return
+        try:
+            points = parse_grade(grade)
+        except ValueError as error:
+            messagebox.showwarning("Error", str(error))
+            return
+        with self.store.editing(course_record):
+            grades = course_record.setdefault('grades', {})
+            if points is None:
+                grades.pop(name, None)
+            else:
+                grades[name] = points
+        if not self.flush_writes():
+            messagebox.showinfo("Success", f"Grade of {name} in {course_name} set to {format_grade(points) or 'none'}.")
+
+    def show_grades(self):
+        """
+        Shows the grades, GPA and class rank of the student selected in the records table,
+        or the average grade of the selected course.
+
+        The figures come from the store's :class:`~school.grades.RecordGradebook`, which keeps
+        them up to date, so nothing is recomputed here.
+        """
+        item = self.data_table.focus()
+        values = self.data_table.item(item, 'values') if item else ()
+        record = self.store.find(values[2], values[1]) if values and values[2] in ('Student', 'Course') else None
+        if record is None:
+            messagebox.showwarning("Grades", "Select a student or course in the table first.")
+            return
+        gradebook = self.store.gradebook
+        if record['type'] == 'Course':
+            average = gradebook.average(record)
+            lines = [f"Average: {f'{average:.2f}' if average is not None else 'no grades yet'}",
+                     f"{len(RecordGradebook.grades(record))} of {len(record.get('students', []))} students graded."]
+        else:
+            gpa = gradebook.gpa(record['name'])
+            standing = gradebook.standing(record['name'])
+            lines = [f"GPA: {f'{gpa:.2f}' if gpa is not None else 'no grades yet'}"]
+            if standing is not None:
+                rank, ranked, percentile = standing
+                lines.append(f"Class rank: {rank} of {ranked}, ahead of {percentile:.1f}% of ranked students")
+            lines.append("")
+            for course_name in record.get('courses', []):
+                course = self.store.find('Course', course_name)
+                grade = RecordGradebook.grades(course).get(record['name']) if course is not None else None
+                lines.append(f"{course_name}: {format_grade(grade) or 'not graded'}")
+        messagebox.showinfo(f"Grades of {record['name']}", "\n".join(lines))
+
     def delete(self):
         """
         Deletes a record from the system.
 
         This method prompts the user to input the name of the record they wish to delete.
-        If a matching record is found in `data_records`, the record is removed, the table is refreshed,
-        and a success message is displayed. If no matching record is found, a warning is shown.
+        If a matching record is found in `data_records`, the record is removed and the deletion is
+        written straight away; a success message is displayed once it is saved. If no matching
+        record is found, a warning is shown.
 
         :ivar data_records: A list of dictionaries containing student, instructor, or course records.
         :vartype data_records: list of dict
@@ -406,9 +3103,10 @@ class ManagementApp(tk.Tk):
         if record_name:
             record = next((r for r in self.data_records if r['name'] == record_name), None)
             if record:
-                self.data_records.remove(record)
-                self.refresh_data_table()
-                messagebox.showinfo("Success", "Record deleted successfully!")
+                self.store.remove(record)
+                if not self.flush_writes():
+                    messagebox.showinfo("Success", "Record deleted successfully!")
+                self.check_links()
             else:
                 messagebox.showwarning("Error", "Record not found.")
 
@@ -418,10 +3116,11 @@ class ManagementApp(tk.Tk):
 
         This method prompts the user to input an instructor's ID or name and the name of a course.
         If both the instructor and the course are found in `data_records`, the course is assigned to the
-        instructor, and the course record is updated to include the instructor. The table is then refreshed,
-        and a success message is displayed.
+        instructor, and the course record is updated to include the instructor. The change is written
+        straight away, and a success message is displayed once it is saved.
 
-        If either the instructor or course is not found, a warning message is shown.
+        If either the instructor or course is not found, or the course clashes with the
+        instructor's other courses, a warning message is shown.
 
         :ivar data_records: A list of dictionaries containing student, instructor, or course records.
         :vartype data_records: list of dict
@@ -432,22 +3131,31 @@ class ManagementApp(tk.Tk):
         course_name = simpledialog.askstring("Assign Course", "Enter Course Name:")
         if instructor_id and course_name:
             instructor_record = next((r for r in self.data_records if (r['id'] == instructor_id or r['name'] == instructor_id) and r['type'] == 'Instructor'), None)
-            course_record = next((c for c in self.data_records if c['name'] == course_name and c['type'] == 'Course'), None)
-            if instructor_record and course_record:
-                course_record['instructor'] = instructor_record['name']
-                if course_name not in instructor_record['courses']:
-                    instructor_record['courses'].append(course_name)
-                self.refresh_data_table()
-                messagebox.showinfo("Success", f"Course {course_name} assigned to Instructor {instructor_record['name']}.")
+            course_record = self.store.find('Course', course_name)
+            clash = self.schedule_conflict(instructor_record, course_record) if instructor_record and course_record else None
+            if clash is not None:
+                messagebox.showwarning("Error", f"{course_name} clashes with {clash} for {instructor_record['name']}.")
+            elif instructor_record and course_record:
+                with self.store.batch():
+                    with self.store.editing(course_record):
+                        course_record['instructor'] = instructor_record['name']
+                    if course_name not in instructor_record['courses']:
+                        with self.store.editing(instructor_record):
+                            instructor_record['courses'].append(course_name)
+                if not self.flush_writes():
+                    messagebox.showinfo("Success", f"Course {course_name} assigned to Instructor {instructor_record['name']}.")
+                self.check_links()
             else:
                 messagebox.showwarning("Error", "Instructor ID or Course Name is incorrect.")
 
     def save_records(self):
         """
-        Saves the current records to a JSON file.
+        Saves the current records to a JSON file, or to a snapshot file.
 
         This method opens a file dialog for the user to specify the location and filename
         to save the data. It then writes the content of `data_records` to a JSON file.
+        A ``.snap`` file is written as a :class:`Snapshot` of the table rows instead, streamed
+        from the database in batches.
         
         If the file is saved successfully, an info message is displayed. If an error occurs
         during the saving process, an error message is shown.
@@ -457,11 +3165,18 @@ class ManagementApp(tk.Tk):
         :raises messagebox.showinfo: If the data is saved successfully.
         :raises messagebox.showerror: If an error occurs during the save process.
         """
-        file_path = filedialog.asksaveasfilename(defaultextension=".json", filetypes=[("JSON Files", "*.json")])
+        file_path = filedialog.asksaveasfilename(defaultextension=".json",
+                                                 filetypes=[("JSON Files", "*.json"), ("Snapshot Files", "*.snap")])
         if file_path:
             try:
-                with open(file_path, 'w') as file:
-                    json.dump(self.data_records, file, indent=4)
+                if file_path.endswith('.snap'):
+                    self.flush_writes()
+                    Snapshot.write(file_path, TABLE_COLUMNS, (record_values(record)
+                                                              for batch in self.backend.iter_batches()
+                                                              for record in batch))
+                else:
+                    with open(file_path, 'w') as file:
+                        json.dump(self.data_records, file, indent=4)
                 messagebox.showinfo("Success", "Data saved successfully!")
             except Exception as error:
                 messagebox.showerror("Error", f"Error saving data: {error}")
@@ -471,22 +3186,33 @@ class ManagementApp(tk.Tk):
         Loads records from a JSON file.
 
         This method opens a file dialog for the user to select a JSON file containing
-        records. It then reads the file and updates `data_records` with the loaded data.
+        records. It then reads the file and replaces `data_records`, and the database
+        contents, with the loaded data.
         
         The table is refreshed to display the loaded data. If the data is loaded successfully,
         an info message is displayed. If an error occurs during the loading process, an error
         message is shown.
 
+        A snapshot file (``.snap``) is opened read-only in a :class:`SnapshotViewer` instead,
+        without reading it whole or touching the database.
+
         :ivar data_records: A list of dictionaries containing student, instructor, or course records.
         :vartype data_records: list of dict
         :raises messagebox.showinfo: If the data is loaded successfully.
         :raises messagebox.showerror: If an error occurs during the load process.
         """
-        file_path = filedialog.askopenfilename(filetypes=[("JSON Files", "*.json")])
-        if file_path:
+        file_path = filedialog.askopenfilename(filetypes=[("JSON Files", "*.json"), ("Snapshot Files", "*.snap")])
+        if file_path.endswith('.snap'):
+            try:
+                SnapshotViewer(self, Snapshot(file_path))
+            except (ValueError, OSError) as error:
+                messagebox.showerror("Error", f"Error opening snapshot: {error}")
+        elif file_path:
             try:
                 with open(file_path, 'r') as file:
-                    self.data_records = json.load(file)
+                    records = json.load(file)
+                self._batches = iter(())
+                self.store.replace(records)
                 self.refresh_data_table()
                 messagebox.showinfo("Success", "Data loaded successfully!")
             except Exception as error:
@@ -497,19 +3223,10 @@ class ManagementApp(tk.Tk):
         if file_path:
             try:
                 with open(file_path, 'w') as file:
-                    headers = ["ID", "Name", "Type", "Email", "Age", "Courses/Instructor/Students"]
+                    headers = TABLE_COLUMNS
                     file.write(','.join(headers) + '\n')
                     for record in self.data_records:
-                        id = record['id']
-                        name = record['name']
-                        type = record['type']
-                        email = record.get('email', '')
-                        age = str(record.get('age', ''))
-                        if type == 'Course':
-                            combined_info = f"Instructor: {record.get('instructor', '')}; Students: {', '.join(record.get('students', []))}"
-                        else:
-                            combined_info = ', '.join(record.get('courses', []))
-                        file.write(f"{id},{name},{type},{email},{age},{combined_info}\n")
+                        file.write(','.join(record_values(record)) + '\n')
                 messagebox.showinfo("Success", "Data exported to CSV successfully!")
             except Exception as error:
                 messagebox.showerror("Error", f"Error exporting data: {error}")
@@ -603,37 +3320,39 @@ class StudentEntryForm(tk.Toplevel):
             return
 
         try:
-            # Add student to data records
-            self.parent.data_records.append({
-                'id': student_id,
-                'name': name,
-                'type': 'Student',
-                'age': age,
-                'email': email,
-                'courses': selected_courses
-            })
-
-            # Update the course records with the new student
-            for course_name in selected_courses:
-                course_record = next((c for c in self.parent.data_records if c['name'] == course_name and c['type'] == 'Course'), None)
-                if course_record:
-                    if name not in course_record['students']:
-                        course_record['students'].append(name)
-                else:
-                    # Add new course record if it doesn't exist in data_records
-                    course_obj = next((c for c in self.parent.course_list if c.course_name == course_name), None)
-                    if course_obj:
-                        new_course_record = {
-                            'id': course_obj.course_id,
-                            'name': course_obj.course_name,
-                            'type': 'Course',
-                            'instructor': '',
-                            'students': [name]
-                        }
-                        self.parent.data_records.append(new_course_record)
-
-            # Refresh data table in the parent window
-            self.parent.refresh_data_table()
+            with self.parent.store.batch():
+                # Add student to data records
+                self.parent.store.add({
+                    'id': student_id,
+                    'name': name,
+                    'type': 'Student',
+                    'age': age,
+                    'email': email,
+                    'courses': selected_courses
+                })
+
+                # Update the course records with the new student
+                for course_name in selected_courses:
+                    course_record = next((c for c in self.parent.data_records if c['name'] == course_name and c['type'] == 'Course'), None)
+                    if course_record:
+                        if name not in course_record['students']:
+                            with self.parent.store.editing(course_record):
+                                course_record['students'].append(name)
+                    else:
+                        # Add new course record if it doesn't exist in data_records
+                        course_obj = next((c for c in self.parent.course_list if c.course_name == course_name), None)
+                        if course_obj:
+                            new_course_record = {
+                                'id': course_obj.course_id,
+                                'name': course_obj.course_name,
+                                'type': 'Course',
+                                'instructor': '',
+                                'students': [name]
+                            }
+                            self.parent.store.add(new_course_record)
+
+            # The parent window refreshes its table when the queued writes are flushed
+            self.parent.schedule_flush()
             self.destroy()
         except Exception as error:
             messagebox.showerror("Error", f"Error saving student: {error}")
@@ -727,36 +3446,38 @@ class InstructorEntryForm(tk.Toplevel):
             return
 
         try:
-            # Add instructor to data records
-            self.parent.data_records.append({
-                'id': instructor_id,
-                'name': name,
-                'type': 'Instructor',
-                'age': age,
-                'email': email,
-                'courses': selected_courses
-            })
-
-            # Update the course records with the new instructor
-            for course_name in selected_courses:
-                course_record = next((c for c in self.parent.data_records if c['name'] == course_name and c['type'] == 'Course'), None)
-                if course_record:
-                    course_record['instructor'] = name
-                else:
-                    # Add new course record if it doesn't exist in data_records
-                    course_obj = next((c for c in self.parent.course_list if c.course_name == course_name), None)
-                    if course_obj:
-                        new_course_record = {
-                            'id': course_obj.course_id,
-                            'name': course_obj.course_name,
-                            'type': 'Course',
-                            'instructor': name,
-                            'students': []
-                        }
-                        self.parent.data_records.append(new_course_record)
-
-            # Refresh data table in the parent window
-            self.parent.refresh_data_table()
+            with self.parent.store.batch():
+                # Add instructor to data records
+                self.parent.store.add({
+                    'id': instructor_id,
+                    'name': name,
+                    'type': 'Instructor',
+                    'age': age,
+                    'email': email,
+                    'courses': selected_courses
+                })
+
+                # Update the course records with the new instructor
+                for course_name in selected_courses:
+                    course_record = next((c for c in self.parent.data_records if c['name'] == course_name and c['type'] == 'Course'), None)
+                    if course_record:
+                        with self.parent.store.editing(course_record):
+                            course_record['instructor'] = name
+                    else:
+                        # Add new course record if it doesn't exist in data_records
+                        course_obj = next((c for c in self.parent.course_list if c.course_name == course_name), None)
+                        if course_obj:
+                            new_course_record = {
+                                'id': course_obj.course_id,
+                                'name': course_obj.course_name,
+                                'type': 'Course',
+                                'instructor': name,
+                                'students': []
+                            }
+                            self.parent.store.add(new_course_record)
+
+            # The parent window refreshes its table when the queued writes are flushed
+            self.parent.schedule_flush()
             self.destroy()
         except Exception as error:
             messagebox.showerror("Error", f"Error saving instructor: {error}")
@@ -764,7 +3485,8 @@ class CourseEntryForm(tk.Toplevel):
     """
     A form for adding a new course to the system.
 
-    This class opens a modal window with fields to input course details such as course name, course ID, instructor, and students.
+    This class opens a modal window with fields to input course details such as course name, course ID, instructor,
+    meeting times and students.
     The user can select an instructor from a dropdown list and enroll multiple students using a multi-selection listbox.
 
     :param parent: The parent window (typically the main management app).
@@ -775,8 +3497,9 @@ class CourseEntryForm(tk.Toplevel):
         """
         Initializes the Course Entry Form.
 
-        Creates a form with input fields for course details (course name, course ID), a dropdown to select an instructor,
-        and a multi-selection listbox for enrolling students.
+        Creates a form with input fields for course details (course name, course ID, meeting times), a type-ahead dropdown to select
+        an instructor, and a filterable multi-selection picker for enrolling students. Both are served from the
+        parent's name indexes, so opening the form does not scan ``data_records``.
 
         A "Submit" button is included to add the new course and update the parent data table.
 
@@ -801,24 +3524,25 @@ class CourseEntryForm(tk.Toplevel):
         self.course_id_input = tk.Entry(layout)
         self.course_id_input.grid(row=1, column=1)
 
-        # Instructor dropdown
+        # Instructor dropdown (type to filter)
         tk.Label(layout, text="Instructor").grid(row=2, column=0, sticky=tk.W)
-        instructors = [record['name'] for record in self.parent.data_records if record['type'] == 'Instructor']
-        self.instructor_combobox = ttk.Combobox(layout, values=["None"] + instructors)
+        self.instructor_combobox = TypeAheadCombobox(layout, self.parent.store, 'Instructor', extra=("None",))
         self.instructor_combobox.current(0)
         self.instructor_combobox.grid(row=2, column=1)
 
-        # Students listbox
-        tk.Label(layout, text="Enroll Students").grid(row=3, column=0, sticky=tk.W)
-        students = [record['name'] for record in self.parent.data_records if record['type'] == 'Student']
-        self.student_listbox = tk.Listbox(layout, selectmode=tk.MULTIPLE)
-        for student in students:
-            self.student_listbox.insert(tk.END, student)
-        self.student_listbox.grid(row=3, column=1)
+        # Meeting times input, such as "Mon 09:00-10:30, Wed 09:00-10:30"
+        tk.Label(layout, text="Meeting Times").grid(row=3, column=0, sticky=tk.W)
+        self.meetings_input = tk.Entry(layout)
+        self.meetings_input.grid(row=3, column=1)
+
+        # Students picker (type to filter)
+        tk.Label(layout, text="Enroll Students").grid(row=4, column=0, sticky=tk.W)
+        self.student_picker = NamePicker(layout, self.parent.store, 'Student')
+        self.student_picker.grid(row=4, column=1)
 
         # Submit button
         submit_btn = tk.Button(layout, text="Submit", command=self.submit_course)
-        submit_btn.grid(row=4, column=0, columnspan=2, pady=10)
+        submit_btn.grid(row=5, column=0, columnspan=2, pady=10)
 
     def submit_course(self):
         """
@@ -828,47 +3552,64 @@ class CourseEntryForm(tk.Toplevel):
         It also updates the selected instructor's courses and the students' enrolled courses. The data table in the parent window is
         refreshed after a successful submission.
 
-        If any required fields are missing, an error message is displayed. If any error occurs during the process,
-        an exception is caught and an error message is shown.
+        If any required fields are missing, the meeting times are invalid, or the course clashes with the schedule
+        of its instructor or of a selected student, an error message is displayed. If any error occurs during the
+        process, an exception is caught and an error message is shown.
 
         :raises messagebox.showerror: If any required fields are empty or an error occurs while saving the course.
         """
         course_name = self.course_name_input.get().strip()
         course_id = self.course_id_input.get().strip()
         selected_instructor_name = self.instructor_combobox.get()
-        selected_students_indices = self.student_listbox.curselection()
-        selected_students = [self.student_listbox.get(i) for i in selected_students_indices]
+        selected_students = self.student_picker.get_selected()
 
         if not course_name or not course_id:
             messagebox.showerror("Error", "Course Name and Course ID must be filled.")
             return
-
         try:
-            instructor_name = selected_instructor_name if selected_instructor_name != 'None' else ''
-
-            self.parent.data_records.append({
-                'id': course_id,
-                'name': course_name,
-                'type': 'Course',
-                'instructor': instructor_name,
-                'students': selected_students
-            })
-
-            # Update instructor's courses
-            if instructor_name:
-                instructor_record = next((i for i in self.parent.data_records if i['name'] == instructor_name and i['type'] == 'Instructor'), None)
-                if instructor_record:
-                    if course_name not in instructor_record['courses']:
-                        instructor_record['courses'].append(course_name)
-
-            # Update students' courses
-            for student_name in selected_students:
-                student_record = next((s for s in self.parent.data_records if s['name'] == student_name and s['type'] == 'Student'), None)
-                if student_record:
-                    if course_name not in student_record['courses']:
-                        student_record['courses'].append(course_name)
+            meetings = format_meetings(parse_meetings(self.meetings_input.get()))
+        except ValueError as error:
+            messagebox.showerror("Error", str(error))
+            return
+        course = {'name': course_name, 'meetings': meetings}
+        people = [('Instructor', selected_instructor_name)] + [('Student', name) for name in selected_students]
+        for record_type, name in people:
+            person = self.parent.store.find(record_type, name)
+            clash = self.parent.schedule_conflict(person, course) if person else None
+            if clash is not None:
+                messagebox.showerror("Error", f"{course_name} clashes with {clash} for {name}.")
+                return
 
-            self.parent.refresh_data_table()
+        try:
+            with self.parent.store.batch():
+                instructor_name = selected_instructor_name if selected_instructor_name != 'None' else ''
+
+                self.parent.store.add({
+                    'id': course_id,
+                    'name': course_name,
+                    'type': 'Course',
+                    'instructor': instructor_name,
+                    'students': selected_students,
+                    'meetings': meetings
+                })
+
+                # Update instructor's courses
+                if instructor_name:
+                    instructor_record = next((i for i in self.parent.data_records if i['name'] == instructor_name and i['type'] == 'Instructor'), None)
+                    if instructor_record:
+                        if course_name not in instructor_record['courses']:
+                            with self.parent.store.editing(instructor_record):
+                                instructor_record['courses'].append(course_name)
+
+                # Update students' courses
+                for student_name in selected_students:
+                    student_record = next((s for s in self.parent.data_records if s['name'] == student_name and s['type'] == 'Student'), None)
+                    if student_record:
+                        if course_name not in student_record['courses']:
+                            with self.parent.store.editing(student_record):
+                                student_record['courses'].append(course_name)
+
+            self.parent.schedule_flush()
             self.destroy()
 
         except Exception as error:
@@ -937,8 +3678,7 @@ class EditRecordForm(tk.Toplevel):
         if record['type'] == "Course":
             # Instructor input for Course records
             tk.Label(layout, text="Instructor").grid(row=4, column=0, sticky=tk.W)
-            instructors = ["None"] + [rec['name'] for rec in self.parent.data_records if rec['type'] == 'Instructor']
-            self.instructor_combobox = ttk.Combobox(layout, values=instructors)
+            self.instructor_combobox = TypeAheadCombobox(layout, self.parent.store, 'Instructor', extra=("None",))
             self.instructor_combobox.set(record.get('instructor', 'None'))
             self.instructor_combobox.grid(row=4, column=1)
 
@@ -947,6 +3687,12 @@ class EditRecordForm(tk.Toplevel):
             self.students_input = tk.Entry(layout)
             self.students_input.insert(0, ", ".join(record.get('students', [])))
             self.students_input.grid(row=5, column=1)
+
+            # Meeting times input for Course records
+            tk.Label(layout, text="Meeting Times").grid(row=6, column=0, sticky=tk.W)
+            self.meetings_input = tk.Entry(layout)
+            self.meetings_input.insert(0, record.get('meetings', ''))
+            self.meetings_input.grid(row=6, column=1)
         else:
             # Courses input for Student or Instructor records
             tk.Label(layout, text="Courses (comma-separated)").grid(row=4, column=0, sticky=tk.W)
@@ -956,34 +3702,139 @@ class EditRecordForm(tk.Toplevel):
 
         # Save button
         save_btn = tk.Button(layout, text="Save Changes", command=self.save_edit)
-        save_btn.grid(row=6, column=0, columnspan=2, pady=10)
+        save_btn.grid(row=7, column=0, columnspan=2, pady=10)
 
     def save_edit(self):
         """
         Saves the edited details to the record and updates the parent data table.
 
         This method retrieves the updated values from the form fields and modifies the record accordingly.
-        After saving the changes, the parent data table is refreshed, and a success message is displayed.
+        The change is written straight away, and a success message is displayed once it is saved.
 
         :raises messagebox.showinfo: If the record is updated successfully.
+        :raises messagebox.showerror: If the database rejects the new values.
         """
-        self.record['name'] = self.name_input.get()
-        self.record['id'] = self.id_input.get()
-        self.record['email'] = self.email_input.get()
-        self.record['age'] = self.age_input.get()
-
-        if self.record['type'] == "Course":
-            self.record['instructor'] = self.instructor_combobox.get()
-            students = self.students_input.get()
-            self.record['students'] = [s.strip() for s in students.split(',') if s.strip()]
-        else:
-            courses = self.courses_input.get()
-            self.record['courses'] = [c.strip() for c in courses.split(',') if c.strip()]
+        try:
+            if self.record['type'] == "Course":
+                # Parsed before editing so invalid times leave the record unchanged.
+                meetings = format_meetings(parse_meetings(self.meetings_input.get()))
+            with self.parent.store.editing(self.record):
+                self.record['name'] = self.name_input.get()
+                self.record['id'] = self.id_input.get()
+                self.record['email'] = self.email_input.get()
+                self.record['age'] = self.age_input.get()
+
+                if self.record['type'] == "Course":
+                    self.record['instructor'] = self.instructor_combobox.get()
+                    students = self.students_input.get()
+                    self.record['students'] = [s.strip() for s in students.split(',') if s.strip()]
+                    if self.record.get('grades'):
+                        # Grades of students taken off the course go with them.
+                        self.record['grades'] = {name: grade for name, grade in self.record['grades'].items()
+                                                 if name in self.record['students']}
+                    self.record['meetings'] = meetings
+                else:
+                    courses = self.courses_input.get()
+                    self.record['courses'] = [c.strip() for c in courses.split(',') if c.strip()]
+        except Exception as error:
+            messagebox.showerror("Error", f"Error updating record: {error}")
+            return
 
-        self.parent.refresh_data_table()
         self.destroy()
-        messagebox.showinfo("Success", "Record updated successfully!")
+        if not self.parent.flush_writes():
+            messagebox.showinfo("Success", "Record updated successfully!")
+        self.parent.check_links()
 
 if __name__ == '__main__':
+    if sys.argv[1:2] == ['--check-integrity']:
+        import argparse
+        parser = argparse.ArgumentParser(prog=f"{sys.argv[0]} --check-integrity",
+                                         description="Check the name links of a records file without opening the window.")
+        parser.add_argument('file', help="records file saved with Save Data")
+        parser.add_argument('--repair', metavar='OUTPUT', help="write the records with all links repaired to this file")
+        arguments = parser.parse_args(sys.argv[2:])
+        with open(arguments.file) as file:
+            records = json.load(file)
+        broken = IntegrityChecker.scan(records)
+        for link in broken:
+            print("\t".join(link))
+        print(f"{len(broken)} broken links in {len(records)} records", file=sys.stderr)
+        if arguments.repair:
+            store = RecordStore(records)
+            store.integrity.check(full=True)
+            repaired = store.integrity.repair(store)
+            with open(arguments.repair, 'w') as file:
+                json.dump(store.records, file, indent=4)
+            print(f"{repaired} links repaired", file=sys.stderr)
+        sys.exit(1 if broken and not arguments.repair else 0)
+
+    if sys.argv[1:2] == ['--dispatch-notifications']:
+        import argparse
+        parser = argparse.ArgumentParser(prog=f"{sys.argv[0]} --dispatch-notifications",
+                                         description="Send the notification outbox without opening the window.")
+        parser.add_argument('--db', default=DB_PATH, help="database to send from (default: %(default)s)")
+        parser.add_argument('--transport', default=NOTIFY_TRANSPORT or 'spool:outbox',
+                            help="smtp://host:port or spool:directory (default: %(default)s)")
+        parser.add_argument('--once', action='store_true', help="send what is due, then exit")
+        arguments = parser.parse_args(sys.argv[2:])
+        create_database(arguments.db)
+        dispatcher = NotificationDispatcher(arguments.db, notification_transport(arguments.transport))
+        try:
+            if arguments.once:
+                # Failed messages wait for their retry time, so this ends.
+                while dispatcher.dispatch_once():
+                    pass
+            else:
+                dispatcher.start()
+                while True:
+                    time.sleep(60)
+                    print(dispatcher.report(), flush=True)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            dispatcher.stop()
+        print(dispatcher.report())
+        sys.exit(0)
+
+    if sys.argv[1:2] == ['--soak-test']:
+        import argparse
+        parser = argparse.ArgumentParser(prog=f"{sys.argv[0]} --soak-test",
+                                         description="Repeat user actions and report the memory they leave behind.")
+        parser.add_argument('--db', default=DB_PATH, help="database to open (default: %(default)s)")
+        parser.add_argument('--iterations', type=int, default=2000, help="repetitions measured per action")
+        parser.add_argument('--warmup', type=int, default=20)
+        arguments = parser.parse_args(sys.argv[2:])
+        profiler = MemoryProfiler()
+        app = ManagementApp(arguments.db)
+        app.withdraw()
+        for batch in app._batches:
+            app.store.extend(batch)
+        queries = iter(['a', 'an', 'e', ''] * (arguments.iterations + arguments.warmup))
+
+        def search():
+            app.search_field.delete(0, tk.END)
+            app.search_field.insert(0, next(queries))
+            app.search_records()
+
+        def form_open():
+            app.show_student_form()
+            for child in app.winfo_children():
+                if isinstance(child, StudentEntryForm):
+                    child.destroy()
+
+        growth = profiler.soak({
+            'refresh': app.refresh_data_table,
+            'search': search,
+            'form open': form_open,
+        }, arguments.iterations, arguments.warmup, progress=app.update)
+        print(profiler.report())
+        print("\nLeft behind per repetition:")
+        for action, per_call in growth.items():
+            print(f"    {per_call:>+10.1f} B  {action}")
+        app.on_close()
+        sys.exit(0)
+
+    import logging
+    logging.basicConfig(format='%(message)s', level=logging.INFO if MEMORY_DIAGNOSTICS else logging.WARNING)
     app = ManagementApp()
     app.mainloop()